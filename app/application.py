@@ -1,16 +1,27 @@
 import logging
+import threading
 import tkinter as tk
 
 from app import __version__
 from app.main_window import VoiceInputManager
 from app.notification_manager import NotificationManager
 from app.ui_queue_processor import UIQueueProcessor
-from external_service.elevenlabs_api import setup_elevenlabs_client
+from external_service.elevenlabs_api import setup_async_elevenlabs_client, setup_elevenlabs_client
+from external_service.http_connection import (
+    API_BASE_URL,
+    ConnectionCanceller,
+    ConnectionMetrics,
+    ConnectionWarmer,
+    create_async_httpx_client,
+    create_httpx_client,
+)
 from service.audio_file_manager import AudioFileManager
 from service.audio_recorder import AudioRecorder
 from service.clipboard_manager import ClipboardManager
 from service.recording_lifecycle import RecordingLifecycle
-from service.text_transformer import load_replacements
+from service.replacements_cache import ReplacementsCache
+from service.replacements_watcher import ReplacementsWatcher
+from service.text_transformer import load_replacements, read_replacements
 from service.transcription_handler import TranscriptionHandler
 from utils.app_config import AppConfig
 from utils.config_manager import load_config
@@ -20,6 +31,7 @@ from utils.log_rotation import setup_debug_logging, setup_logging
 class Application:
     def __init__(self) -> None:
         self._voice_manager: VoiceInputManager | None = None
+        self._replacements_watcher: ReplacementsWatcher | None = None
 
     def run(self) -> None:
         raw_config = load_config()
@@ -30,12 +42,39 @@ class Application:
         logging.info('アプリケーションを開始します')
 
         recorder = AudioRecorder(config)
-        client = setup_elevenlabs_client()
+        threading.Thread(target=recorder.warm_up, daemon=True, name='AudioEngine-WarmUp').start()
+        connection_metrics = ConnectionMetrics()
+        connection_canceller = ConnectionCanceller()
+        base_url = config.elevenlabs_base_url or None
+        http_client = create_httpx_client(
+            connection_metrics, config.keepalive_expiry_seconds, connection_canceller
+        )
+        client = setup_elevenlabs_client(http_client, base_url)
+        async_http_client = None
+        async_client = None
+        if config.transcription_engine == 'asyncio':
+            async_http_client = create_async_httpx_client(connection_metrics, config.keepalive_expiry_seconds)
+            async_client = setup_async_elevenlabs_client(async_http_client, base_url)
         logging.info('ElevenLabs APIクライアントを初期化しました')
 
-        replacements = load_replacements(config.replacements_file)
+        replacements_cache = ReplacementsCache(config.replacements_cache_file) if config.replacements_cache else None
+        if replacements_cache:
+            replacements, is_current = replacements_cache.load(config.replacements_file)
+        else:
+            replacements, is_current = load_replacements(config.replacements_file), True
         clipboard_manager = ClipboardManager(config, replacements)
         clipboard_manager.initialize()
+        if replacements_cache and not is_current:
+            # 前回の内容で起動し、変更された置換ルールは構築し終えてから差し替える
+            replacements_cache.rebuild_in_background(config.replacements_file, clipboard_manager.update_replacements)
+        # 置換辞書の編集やバックアップからの更新を再起動せずに反映する
+        self._replacements_watcher = ReplacementsWatcher(
+            config.replacements_file,
+            clipboard_manager.update_replacements,
+            config.replacements_reload_seconds,
+            loader=replacements_cache.rebuild if replacements_cache else read_replacements
+        )
+        self._replacements_watcher.start()
 
         audio_file_manager = AudioFileManager(config)
 
@@ -46,13 +85,28 @@ class Application:
         notification_manager = NotificationManager(root, config)
 
         transcription_handler = TranscriptionHandler(
-            config, client, audio_file_manager, ui_processor, config.use_punctuation
+            config, client, audio_file_manager, ui_processor, async_client, connection_canceller
         )
 
+        connection_warmer = None
+        warm_url = base_url or API_BASE_URL
+        if config.warmup_on_record or config.keepalive_seconds > 0:
+            engine = transcription_handler.async_engine
+            if engine is not None and async_http_client is not None:
+                # 非同期クライアントの接続プールはイベントループごとに持つため、送信と同じループで温める
+                connection_warmer = ConnectionWarmer(
+                    async_http_client, warm_url, run_coroutine=engine.run_coroutine
+                )
+            else:
+                connection_warmer = ConnectionWarmer(http_client, warm_url)
+            connection_warmer.warm_async()
+            connection_warmer.start_keepalive(config.keepalive_seconds)
+
         recording_lifecycle = RecordingLifecycle(
             root, config, recorder, audio_file_manager,
             transcription_handler, clipboard_manager,
-            ui_processor, notification_manager.show_timed_message
+            ui_processor, notification_manager.show_timed_message,
+            connection_warmer
         )
 
         self._voice_manager = VoiceInputManager(
@@ -63,5 +117,7 @@ class Application:
         root.mainloop()
 
     def close(self) -> None:
+        if self._replacements_watcher:
+            self._replacements_watcher.stop()
         if self._voice_manager:
             self._voice_manager.close_application()
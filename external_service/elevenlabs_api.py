@@ -1,26 +1,425 @@
+import bisect
+import io
 import logging
 import os
+import queue
+import socket
+import struct
+import threading
+import time
 import traceback
-from typing import Optional
+from collections import deque
+from typing import Callable, NoReturn, Optional
+from urllib.parse import urlsplit
 
 import httpx
-from elevenlabs.client import ElevenLabs
+from elevenlabs.client import AsyncElevenLabs, ElevenLabs
 
+from external_service.http_connection import create_async_httpx_client, create_httpx_client
 from utils.app_config import AppConfig
 from utils.env_loader import load_env_variables
 
+AudioPayload = bytes | io.IOBase
 
-def setup_elevenlabs_client() -> ElevenLabs:
+API_HOST = 'api.elevenlabs.io'
+_FALLBACK_BYTES_PER_SECOND = 32000
+
+
+class TranscriptionNetworkError(Exception):
+    """通信障害により文字起こしできなかったことを示す。接続回復後の再送信の対象になる"""
+
+
+class CircuitOpenError(TranscriptionNetworkError):
+    """障害が続いているためAPIへの送信を行わずに失敗したことを示す"""
+
+
+def _load_api_key(base_url: Optional[str] = None) -> str:
     env_vars = load_env_variables()
     api_key = env_vars.get('ELEVENLABS_API_KEY')
     if not api_key:
+        if base_url:
+            # ローカルの代替サーバーはAPIキーを検証しない
+            return 'local'
         raise ValueError('ELEVENLABS_API_KEYが未設定です')
+    return api_key
 
-    timeout = httpx.Timeout(connect=15.0, read=240.0, write=30.0, pool=5.0)
-    httpx_client = httpx.Client(timeout=timeout)
+
+def setup_elevenlabs_client(
+        httpx_client: Optional[httpx.Client] = None,
+        base_url: Optional[str] = None
+) -> ElevenLabs:
+    """base_urlを指定するとElevenLabsの代わりにそのサーバーへ送信する"""
+    api_key = _load_api_key(base_url)
+    if httpx_client is None:
+        httpx_client = create_httpx_client()
+    if base_url:
+        logging.info(f'音声認識APIの送信先: {base_url}')
+        return ElevenLabs(api_key=api_key, base_url=base_url, httpx_client=httpx_client)
     return ElevenLabs(api_key=api_key, httpx_client=httpx_client)
 
 
+def setup_async_elevenlabs_client(
+        httpx_client: Optional[httpx.AsyncClient] = None,
+        base_url: Optional[str] = None
+) -> AsyncElevenLabs:
+    """イベントループ上で使う非同期クライアントを作成する"""
+    api_key = _load_api_key(base_url)
+    if httpx_client is None:
+        httpx_client = create_async_httpx_client()
+    if base_url:
+        return AsyncElevenLabs(api_key=api_key, base_url=base_url, httpx_client=httpx_client)
+    return AsyncElevenLabs(api_key=api_key, httpx_client=httpx_client)
+
+
+def api_address(base_url: Optional[str] = None) -> tuple[str, int]:
+    """接続確認に使う送信先のホストとポート。未指定ならElevenLabsのAPIサーバー"""
+    if not base_url:
+        return API_HOST, 443
+    parts = urlsplit(base_url)
+    return parts.hostname or API_HOST, parts.port or (443 if parts.scheme == 'https' else 80)
+
+
+class LatencyHistogram:
+    """直近の応答時間を保持し、パーセンタイルと区間ごとの件数を返す"""
+
+    BUCKET_BOUNDS = (0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+
+    def __init__(self, max_samples: int = 200):
+        self._samples: deque[float] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(int(len(samples) * percent / 100), len(samples) - 1)
+        return samples[index]
+
+    def buckets(self) -> dict[str, int]:
+        """応答時間の分布を上限秒数ごとに数える"""
+        counts = [0] * (len(self.BUCKET_BOUNDS) + 1)
+        with self._lock:
+            for seconds in self._samples:
+                counts[bisect.bisect_left(self.BUCKET_BOUNDS, seconds)] += 1
+        labels = [f'<={bound:g}s' for bound in self.BUCKET_BOUNDS] + [f'>{self.BUCKET_BOUNDS[-1]:g}s']
+        return dict(zip(labels, counts))
+
+
+class HedgingPolicy:
+    """直近の応答時間のパーセンタイルを超えても応答がない場合に、同じリクエストを追加送信するかを決める"""
+
+    def __init__(
+            self,
+            percentile: float = 95.0,
+            min_samples: int = 20,
+            max_hedges_per_minute: int = 6,
+            min_delay_seconds: float = 1.0
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_hedges_per_minute = max_hedges_per_minute
+        self.min_delay_seconds = min_delay_seconds
+        self.histogram = LatencyHistogram()
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0
+        self._recent_hedges: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> Optional[float]:
+        """追加送信までの待ち時間。応答時間の記録が少ないうちはNoneを返し追加送信しない"""
+        if self.histogram.count < self.min_samples:
+            return None
+        threshold = self.histogram.percentile(self.percentile)
+        return max(threshold or 0.0, self.min_delay_seconds)
+
+    def try_acquire(self, now: Optional[float] = None) -> bool:
+        """1分あたりの上限内であれば追加送信の枠を確保する"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            while self._recent_hedges and now - self._recent_hedges[0] >= 60.0:
+                self._recent_hedges.popleft()
+            if len(self._recent_hedges) >= self.max_hedges_per_minute:
+                self.hedges_skipped += 1
+                return False
+            self._recent_hedges.append(now)
+            self.hedges_fired += 1
+            return True
+
+    def record_win(self, hedged: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            if hedged:
+                self.hedges_won += 1
+
+    def metrics(self) -> dict[str, float]:
+        with self._lock:
+            metrics = {
+                'requests': float(self.requests),
+                'hedges_fired': float(self.hedges_fired),
+                'hedges_won': float(self.hedges_won),
+                'hedges_skipped': float(self.hedges_skipped),
+            }
+        for percent in (50, 90, 99):
+            value = self.histogram.percentile(percent)
+            metrics[f'p{percent}_ms'] = value * 1000 if value is not None else 0.0
+        return metrics
+
+
+class CircuitBreaker:
+    """通信障害が続いた場合に送信を止めて即座に失敗させ、接続の回復を確認してから再開する
+
+    closed: 通常どおり送信する。window_seconds以内にfailure_threshold回続けて通信障害が起きるとopenにする
+    open: 送信せずにCircuitOpenErrorで失敗させる。reset_seconds間隔で接続確認し、成功したらhalf_openにする
+    half_open: 1件だけ送信を試し、成功したらclosed、失敗したらopenに戻す
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+            self,
+            failure_threshold: int = 3,
+            window_seconds: float = 60.0,
+            reset_seconds: float = 30.0,
+            probe: Optional[Callable[[], bool]] = None
+    ):
+        """probeを省略した場合はreset_seconds経過後に接続確認なしでhalf_openにする"""
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.reset_seconds = reset_seconds
+        self._probe = probe
+        self._state = self.CLOSED
+        self._failures: deque[float] = deque()
+        self._trial_in_flight = False
+        self._opened_at = 0.0
+        self._listeners: list[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.opened_count = 0
+        self.rejected_count = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._probe is None and self._reset_elapsed():
+                self._set_state(self.HALF_OPEN)
+            return self._state
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """状態が変わるたびに新しい状態で呼ばれる。呼び出し元のスレッドで実行される"""
+        self._listeners.append(listener)
+
+    def before_request(self) -> None:
+        """送信してよいかを判定し、送信できない場合はCircuitOpenErrorを送出する"""
+        with self._lock:
+            if self._state == self.OPEN and self._probe is None and self._reset_elapsed():
+                self._set_state(self.HALF_OPEN)
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected_count += 1
+        raise CircuitOpenError('通信障害が続いているため送信を停止しています')
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures.clear()
+            self._trial_in_flight = False
+            if self._state != self.CLOSED:
+                logging.info('APIへの送信を再開しました')
+                self._set_state(self.CLOSED)
+
+    def release(self) -> None:
+        """キャンセルなどで結果を判定できなかった送信の枠を返す"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN:
+                self._open(now)
+                return
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window_seconds:
+                self._failures.popleft()
+            if self._state == self.CLOSED and len(self._failures) >= self.failure_threshold:
+                self._open(now)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def metrics(self) -> dict[str, float]:
+        state = self.state
+        with self._lock:
+            return {
+                'open': float(state == self.OPEN),
+                'half_open': float(state == self.HALF_OPEN),
+                'opened': float(self.opened_count),
+                'rejected': float(self.rejected_count),
+                'recent_failures': float(len(self._failures)),
+            }
+
+    def _reset_elapsed(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.reset_seconds
+
+    def _open(self, now: float) -> None:
+        self._failures.clear()
+        self._opened_at = now
+        self.opened_count += 1
+        logging.warning(f'通信障害が続いているためAPIへの送信を停止します: {self.reset_seconds:g}秒後に接続を確認します')
+        self._set_state(self.OPEN)
+        if self._probe is not None:
+            threading.Thread(target=self._probe_loop, daemon=True, name='CircuitBreakerProbe').start()
+
+    def _probe_loop(self) -> None:
+        """open中はバックグラウンドで接続を確認し、つながったらhalf_openにする"""
+        while not self._stopped.wait(self.reset_seconds):
+            with self._lock:
+                if self._state != self.OPEN:
+                    return
+            if self._probe():
+                with self._lock:
+                    if self._state == self.OPEN:
+                        logging.info('APIサーバーへの接続を確認しました。次の送信で再開を試みます')
+                        self._set_state(self.HALF_OPEN)
+                return
+
+    def _set_state(self, state: str) -> None:
+        # ロックを保持したまま呼ばれる。リスナーはUIへの予約など短い処理に限る
+        self._state = state
+        for listener in self._listeners:
+            try:
+                listener(state)
+            except Exception as e:
+                logging.error(f'回路遮断の状態通知でエラー: {str(e)}')
+
+
+def estimate_audio_seconds(audio: AudioPayload) -> float:
+    """送信する音声の長さを求める。WAVとFLACはヘッダーから、それ以外は16kHzモノラル相当として概算する"""
+    duration = getattr(audio, 'duration_seconds', None)
+    if duration is not None:
+        return duration
+    if not isinstance(audio, (bytes, bytearray, memoryview)):
+        return payload_size(audio) / _FALLBACK_BYTES_PER_SECOND
+    head = bytes(audio[:44])
+    if len(head) >= 44 and head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        byte_rate = struct.unpack('<I', head[28:32])[0]
+        data_size = struct.unpack('<I', head[40:44])[0]
+        if byte_rate:
+            return data_size / byte_rate
+    if len(head) >= 26 and head[:4] == b'fLaC':
+        # STREAMINFOのサンプルレート(20bit)と総サンプル数(36bit)
+        packed = int.from_bytes(head[18:26], 'big')
+        sample_rate = packed >> 44
+        total_samples = packed & ((1 << 36) - 1)
+        if sample_rate and total_samples:
+            return total_samples / sample_rate
+    return len(audio) / _FALLBACK_BYTES_PER_SECOND
+
+
+def payload_size(audio: AudioPayload) -> int:
+    try:
+        return len(audio)
+    except TypeError:
+        return 0
+
+
+class AdaptiveTimeout:
+    """音声の長さとサイズ、直近の処理速度から1リクエストごとのタイムアウト秒数を求める
+
+    短い音声の送信が止まった場合に数分待たず、数秒で再送信や代替経路へ切り替えられるようにする。
+    """
+
+    TIMEOUT_TYPES = (
+        ('connect', httpx.ConnectTimeout),
+        ('write', httpx.WriteTimeout),
+        ('read', httpx.ReadTimeout),
+        ('pool', httpx.PoolTimeout),
+    )
+
+    def __init__(
+            self,
+            min_seconds: float = 10.0,
+            max_seconds: float = 240.0,
+            margin: float = 3.0,
+            min_samples: int = 5,
+            default_seconds_per_audio_second: float = 1.0,
+            upload_bytes_per_second: float = 64 * 1024
+    ):
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.margin = margin
+        self.min_samples = min_samples
+        self.default_seconds_per_audio_second = default_seconds_per_audio_second
+        self.upload_bytes_per_second = upload_bytes_per_second
+        self.rates = LatencyHistogram(max_samples=50)
+        self.requests = 0
+        self.last_timeout_seconds = 0.0
+        self.fired = {name: 0 for name, _ in self.TIMEOUT_TYPES}
+        self._lock = threading.Lock()
+
+    def seconds_per_audio_second(self) -> float:
+        """音声1秒あたりの応答時間。記録が少ないうちは既定値を返す"""
+        if self.rates.count < self.min_samples:
+            return self.default_seconds_per_audio_second
+        return self.rates.percentile(90) or self.default_seconds_per_audio_second
+
+    def timeout_for(self, audio_seconds: float, size: int) -> float:
+        """想定される処理時間と送信時間に余裕を掛け、上下限の範囲に収めた秒数を返す"""
+        expected = (self.seconds_per_audio_second() * max(audio_seconds, 1.0)
+                    + size / self.upload_bytes_per_second)
+        timeout = min(self.max_seconds, max(self.min_seconds, expected * self.margin))
+        with self._lock:
+            self.requests += 1
+            self.last_timeout_seconds = timeout
+        logging.debug(f'タイムアウト: {timeout:.1f}秒 (音声 {audio_seconds:.1f}秒 / {size} bytes)')
+        return timeout
+
+    def record_success(self, audio_seconds: float, elapsed_seconds: float) -> None:
+        self.rates.record(elapsed_seconds / max(audio_seconds, 1.0))
+
+    def record_timeout(self, error: httpx.TimeoutException) -> None:
+        """発生したタイムアウトを接続・送信・受信・プール待ちに分けて数える"""
+        name = next((name for name, error_type in self.TIMEOUT_TYPES if isinstance(error, error_type)), 'read')
+        with self._lock:
+            self.fired[name] += 1
+            timeout = self.last_timeout_seconds
+        logging.warning(f'文字起こしの{name}タイムアウトが発生しました: 上限 {timeout:.1f}秒')
+
+    def metrics(self) -> dict[str, float]:
+        with self._lock:
+            metrics = {f'{name}_fired': float(count) for name, count in self.fired.items()}
+            metrics['requests'] = float(self.requests)
+            metrics['last_seconds'] = self.last_timeout_seconds
+        metrics['seconds_per_audio_second'] = self.seconds_per_audio_second()
+        return metrics
+
+
+def check_connectivity(host: str = API_HOST, port: int = 443, timeout: float = 3.0) -> bool:
+    """APIサーバーへTCP接続できるかを確認する"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
 def validate_audio_file(file_path: str) -> tuple[bool, Optional[str]]:
     if not file_path:
         return False, '音声ファイルパスが未指定です'
@@ -59,7 +458,9 @@ def convert_response_to_text(response) -> Optional[str]:
 def transcribe_audio(
         audio_file_path: str,
         config: AppConfig,
-        client: ElevenLabs
+        client: ElevenLabs,
+        hedging: Optional[HedgingPolicy] = None,
+        timeouts: Optional[AdaptiveTimeout] = None
 ) -> Optional[str]:
     is_valid, error_msg = validate_audio_file(audio_file_path)
     if not is_valid:
@@ -71,47 +472,206 @@ def transcribe_audio(
         with open(audio_file_path, 'rb') as file:
             file_content = file.read()
             logging.info(f'ファイル読み込み完了: {len(file_content)} bytes')
+    except Exception as e:
+        _log_transcription_error(e)
+        return None
 
-            transcription = client.speech_to_text.convert(
-                file=(os.path.basename(audio_file_path), file_content),
-                model_id=config.elevenlabs_model,
-                language_code=config.elevenlabs_language,
-                tag_audio_events=config.tag_audio_events
-            )
+    return transcribe_audio_data(
+        file_content, os.path.basename(audio_file_path), config, client, hedging, timeouts
+    )
 
-        text_result = convert_response_to_text(transcription)
-        if text_result is None:
-            return None
 
-        if len(text_result) == 0:
-            logging.warning('文字起こし結果が空です')
-            return ''
+def transcribe_audio_data(
+        audio: AudioPayload,
+        file_name: str,
+        config: AppConfig,
+        client: ElevenLabs,
+        hedging: Optional[HedgingPolicy] = None,
+        timeouts: Optional[AdaptiveTimeout] = None
+) -> Optional[str]:
+    """メモリ上の音声データをファイルを介さずに文字起こしする。通信障害時はTranscriptionNetworkError"""
+    audio_seconds, request_timeout = _plan_timeout(audio, timeouts)
+    try:
+        started_at = time.perf_counter()
+        if hedging is None:
+            transcription = _convert(audio, file_name, config, client, request_timeout)
+        else:
+            transcription = _convert_hedged(audio, file_name, config, client, hedging, request_timeout)
+        if timeouts is not None:
+            timeouts.record_success(audio_seconds, time.perf_counter() - started_at)
 
-        logging.info(f'文字起こし完了: {len(text_result)}文字')
-        return text_result
+        return _result_text(transcription)
 
-    except httpx.ConnectTimeout as e:
-        logging.error(f'API接続タイムアウト: {str(e)}')
-        logging.debug(f'詳細: {traceback.format_exc()}')
+    except httpx.TransportError as e:
+        _handle_transport_error(e, timeouts)
+    except Exception as e:
+        _log_transcription_error(e)
         return None
-    except httpx.TimeoutException as e:
-        logging.error(f'API通信タイムアウト: {str(e)}')
-        logging.debug(f'詳細: {traceback.format_exc()}')
+
+
+async def transcribe_audio_data_async(
+        audio: AudioPayload,
+        file_name: str,
+        config: AppConfig,
+        client: AsyncElevenLabs,
+        timeouts: Optional[AdaptiveTimeout] = None
+) -> Optional[str]:
+    """非同期クライアントで文字起こしする。タスクをキャンセルすると送信中の通信も中断される"""
+    audio_seconds, request_timeout = _plan_timeout(audio, timeouts)
+    try:
+        started_at = time.perf_counter()
+        transcription = await client.speech_to_text.convert(
+            file=(file_name, audio),
+            model_id=config.elevenlabs_model,
+            language_code=config.elevenlabs_language,
+            tag_audio_events=config.tag_audio_events,
+            request_options=_request_options(request_timeout)
+        )
+        if timeouts is not None:
+            timeouts.record_success(audio_seconds, time.perf_counter() - started_at)
+        return _result_text(transcription)
+
+    except httpx.TransportError as e:
+        _handle_transport_error(e, timeouts)
+    except Exception as e:
+        _log_transcription_error(e)
         return None
-    except FileNotFoundError as e:
-        logging.error(f'ファイルが見つかりません: {str(e)}')
-        logging.debug(f'詳細: {traceback.format_exc()}')
+
+
+def _plan_timeout(audio: AudioPayload, timeouts: Optional[AdaptiveTimeout]) -> tuple[float, Optional[float]]:
+    if timeouts is None:
+        return 0.0, None
+    audio_seconds = estimate_audio_seconds(audio)
+    return audio_seconds, timeouts.timeout_for(audio_seconds, payload_size(audio))
+
+
+def _request_options(timeout: Optional[float]) -> Optional[dict]:
+    """SDKのリクエスト単位のタイムアウト。接続・送信・受信の各待ち時間の上限になる"""
+    return {'timeout_in_seconds': timeout} if timeout is not None else None
+
+
+def _handle_transport_error(error: httpx.TransportError, timeouts: Optional[AdaptiveTimeout]) -> NoReturn:
+    _log_transcription_error(error)
+    if timeouts is not None and isinstance(error, httpx.TimeoutException):
+        timeouts.record_timeout(error)
+    raise TranscriptionNetworkError(f'API通信エラー: {str(error)}') from error
+
+
+def _result_text(transcription) -> Optional[str]:
+    text_result = convert_response_to_text(transcription)
+    if text_result is None:
         return None
-    except PermissionError as e:
+
+    if len(text_result) == 0:
+        logging.warning('文字起こし結果が空です')
+        return ''
+
+    logging.info(f'文字起こし完了: {len(text_result)}文字')
+    return text_result
+
+
+def _convert(
+        audio: AudioPayload,
+        file_name: str,
+        config: AppConfig,
+        client: ElevenLabs,
+        timeout: Optional[float] = None
+):
+    return client.speech_to_text.convert(
+        file=(file_name, audio),
+        model_id=config.elevenlabs_model,
+        language_code=config.elevenlabs_language,
+        tag_audio_events=config.tag_audio_events,
+        request_options=_request_options(timeout)
+    )
+
+
+def _payload_factory(audio: AudioPayload) -> Callable[[], AudioPayload]:
+    """同時に送信しても読み出し位置が干渉しないよう、送信ごとの音声データを返す関数を作る"""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return lambda: audio
+    clone = getattr(audio, 'clone', None)
+    if clone is not None:
+        return clone
+    data = audio.read()
+    return lambda: data
+
+
+def _convert_hedged(
+        audio: AudioPayload,
+        file_name: str,
+        config: AppConfig,
+        client: ElevenLabs,
+        hedging: HedgingPolicy,
+        timeout: Optional[float] = None
+):
+    """応答が遅い場合に同じリクエストを追加送信し、先に成功した応答を採用する
+
+    同期クライアントでは送信中のリクエストを1件だけ中断する手段がないため、採用されなかった側は
+    バックグラウンドで完了させて結果を破棄する。
+    """
+    new_payload = _payload_factory(audio)
+    results: queue.Queue = queue.Queue()
+    started_at = time.perf_counter()
+
+    def attempt(hedged: bool, payload: AudioPayload) -> None:
+        attempt_started = time.perf_counter()
+        try:
+            response = _convert(payload, file_name, config, client, timeout)
+        except Exception as e:
+            results.put((hedged, None, e))
+            return
+        hedging.histogram.record(time.perf_counter() - attempt_started)
+        results.put((hedged, response, None))
+
+    def launch(hedged: bool) -> None:
+        threading.Thread(
+            target=attempt,
+            args=(hedged, new_payload()),
+            daemon=True,
+            name='ElevenLabsHedge' if hedged else 'ElevenLabsRequest'
+        ).start()
+
+    launch(False)
+    running = 1
+    outcome = None
+    delay = hedging.hedge_delay()
+    if delay is not None:
+        try:
+            outcome = results.get(timeout=delay)
+        except queue.Empty:
+            if hedging.try_acquire():
+                logging.info(f'応答が{delay:.1f}秒を超えたため同じリクエストを追加送信します')
+                launch(True)
+                running += 1
+            else:
+                logging.info('追加送信の上限に達しているため応答を待ちます')
+
+    while True:
+        hedged, response, error = outcome if outcome is not None else results.get()
+        outcome = None
+        running -= 1
+        if error is None:
+            hedging.record_win(hedged)
+            if hedged:
+                logging.info(f'追加送信した側の応答を採用しました: {time.perf_counter() - started_at:.1f}秒')
+            return response
+        if running == 0:
+            raise error
+
+
+def _log_transcription_error(e: Exception) -> None:
+    if isinstance(e, httpx.ConnectTimeout):
+        logging.error(f'API接続タイムアウト: {str(e)}')
+    elif isinstance(e, httpx.TimeoutException):
+        logging.error(f'API通信タイムアウト: {str(e)}')
+    elif isinstance(e, FileNotFoundError):
+        logging.error(f'ファイルが見つかりません: {str(e)}')
+    elif isinstance(e, PermissionError):
         logging.error(f'ファイルアクセス権限エラー: {str(e)}')
-        logging.debug(f'詳細: {traceback.format_exc()}')
-        return None
-    except OSError as e:
+    elif isinstance(e, OSError):
         logging.error(f'OS関連エラー: {str(e)}')
-        logging.debug(f'詳細: {traceback.format_exc()}')
-        return None
-    except Exception as e:
+    else:
         logging.error(f'文字起こしエラー: {str(e)}')
         logging.error(f'エラーのタイプ: {type(e).__name__}')
-        logging.debug(f'詳細: {traceback.format_exc()}')
-        return None
+    logging.debug(f'詳細: {traceback.format_exc()}')
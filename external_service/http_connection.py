@@ -0,0 +1,292 @@
+import concurrent.futures
+import functools
+import logging
+import threading
+import time
+import weakref
+from typing import Callable, Coroutine, Iterator, Optional
+
+import httpx
+
+API_BASE_URL = 'https://api.elevenlabs.io'
+
+_CONNECT_EVENTS = ('connection.connect_tcp', 'connection.start_tls')
+
+
+class _ConnectionTrace:
+    """httpcoreのtrace拡張として渡し、新規接続の確立にかかった時間を集計する"""
+
+    def __init__(self):
+        self.connect_ms = 0.0
+        self.new_connection = False
+        self._started: dict[str, float] = {}
+
+    def __call__(self, event_name: str, info: dict) -> None:
+        step, _, phase = event_name.rpartition('.')
+        if step not in _CONNECT_EVENTS:
+            return
+        if phase == 'started':
+            self.new_connection = True
+            self._started[step] = time.perf_counter()
+        elif phase in ('complete', 'failed') and step in self._started:
+            self.connect_ms += (time.perf_counter() - self._started.pop(step)) * 1000
+
+
+class _AsyncConnectionTrace(_ConnectionTrace):
+    """非同期クライアント用。httpcoreは非同期の経路ではコルーチン関数のtraceを要求する"""
+
+    async def __call__(self, event_name: str, info: dict) -> None:
+        super().__call__(event_name, info)
+
+
+def _attach_trace(request: httpx.Request, trace_type: type[_ConnectionTrace]) -> _ConnectionTrace:
+    """リクエストのtrace拡張を取得する。未設定なら作成し、複数のフックで共有する"""
+    trace = request.extensions.get('trace')
+    if not isinstance(trace, trace_type):
+        trace = trace_type()
+        request.extensions['trace'] = trace
+    return trace
+
+
+class ConnectionMetrics:
+    """リクエストごとに既存接続の再利用か新規接続かを記録し、接続確立の所要時間を集計する"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.total_connect_ms = 0.0
+        self.last_connect_ms = 0.0
+
+    def on_request(self, request: httpx.Request) -> None:
+        _attach_trace(request, _ConnectionTrace)
+
+    async def on_request_async(self, request: httpx.Request) -> None:
+        _attach_trace(request, _AsyncConnectionTrace)
+
+    async def on_response_async(self, response: httpx.Response) -> None:
+        self.on_response(response)
+
+    def on_response(self, response: httpx.Response) -> None:
+        trace = response.request.extensions.get('trace')
+        if not isinstance(trace, _ConnectionTrace) or response.request.method == 'HEAD':
+            # 接続の事前確立のリクエストは送信経路の計測に含めない
+            return
+        with self._lock:
+            self.requests += 1
+            self.last_connect_ms = trace.connect_ms
+            if trace.new_connection:
+                self.new_connections += 1
+                self.total_connect_ms += trace.connect_ms
+        request = response.request
+        if trace.new_connection:
+            logging.info(f'新規接続: {request.method} {request.url.path} 接続確立 {trace.connect_ms:.0f} ms')
+        else:
+            logging.info(f'既存接続を再利用: {request.method} {request.url.path}')
+
+    def metrics(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                'requests': float(self.requests),
+                'new_connections': float(self.new_connections),
+                'reused_connections': float(self.requests - self.new_connections),
+                'total_connect_ms': self.total_connect_ms,
+                'last_connect_ms': self.last_connect_ms,
+            }
+
+
+class _TrackedStream(httpx.SyncByteStream):
+    """応答本文の読み出しを終えた時点で送信中のリクエストから外すためのストリーム"""
+
+    def __init__(self, stream: httpx.SyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close: Optional[Callable[[], None]] = on_close
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            on_close, self._on_close = self._on_close, None
+            if on_close is not None:
+                on_close()
+
+
+class _CancellableTransport(httpx.BaseTransport):
+    """接続プールを差し替えられるトランスポート。キャンセル時は送信中のリクエストごとプールを閉じる"""
+
+    def __init__(self, limits: httpx.Limits):
+        self._limits = limits
+        self._lock = threading.Lock()
+        self._transport = httpx.HTTPTransport(limits=limits)
+        self._in_flight = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            transport = self._transport
+            self._in_flight += 1
+        on_close = functools.partial(self._finish, transport)
+        try:
+            response = transport.handle_request(request)
+        except BaseException:
+            on_close()
+            raise
+        assert isinstance(response.stream, httpx.SyncByteStream)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, on_close),
+            extensions=response.extensions
+        )
+
+    def _finish(self, transport: httpx.HTTPTransport) -> None:
+        with self._lock:
+            # 閉じたプールで送信していたリクエストはキャンセル時に数え終えている
+            if transport is self._transport:
+                self._in_flight -= 1
+
+    def cancel(self) -> int:
+        """送信中のリクエストがあれば接続プールを新しいものに差し替えて閉じ、中断したリクエスト数を返す
+
+        待機中の接続しかなければ、次の送信で再利用できるようプールを残す。
+        """
+        with self._lock:
+            cancelled = self._in_flight
+            if cancelled == 0:
+                return 0
+            closing = self._transport
+            self._transport = httpx.HTTPTransport(limits=self._limits)
+            self._in_flight = 0
+        closing.close()
+        return cancelled
+
+    def close(self) -> None:
+        with self._lock:
+            transport = self._transport
+        transport.close()
+
+
+class ConnectionCanceller:
+    """同期クライアントの送信中のリクエストを、使っている接続プールを閉じて中断する
+
+    非同期クライアントの送信はAsyncTranscriptionEngineのタスクのキャンセルで中断する。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._transports: weakref.WeakSet = weakref.WeakSet()
+
+    def create_transport(self, limits: httpx.Limits) -> httpx.BaseTransport:
+        """キャンセルの対象にするHTTPクライアント用のトランスポートを作成する"""
+        transport = _CancellableTransport(limits)
+        with self._lock:
+            self._transports.add(transport)
+        return transport
+
+    def cancel_all(self) -> int:
+        """送信中のリクエストの接続プールを閉じ、中断したリクエスト数を返す。以降の送信は新しい接続を使う"""
+        with self._lock:
+            transports = list(self._transports)
+        cancelled = sum(transport.cancel() for transport in transports)
+        if cancelled:
+            logging.info(f'送信中のリクエストの接続を閉じました: {cancelled}件')
+        return cancelled
+
+
+def create_httpx_client(
+        metrics: Optional[ConnectionMetrics] = None,
+        keepalive_expiry: float = 60.0,
+        canceller: Optional[ConnectionCanceller] = None
+) -> httpx.Client:
+    """文字起こし用のHTTPクライアントを作成する。録音中も接続を保持できるよう待機接続の保持時間を延ばす"""
+    timeout = httpx.Timeout(connect=15.0, read=240.0, write=30.0, pool=5.0)
+    limits = httpx.Limits(keepalive_expiry=keepalive_expiry)
+    event_hooks: dict[str, list] = {'request': [], 'response': []}
+    if metrics is not None:
+        event_hooks['request'].append(metrics.on_request)
+        event_hooks['response'].append(metrics.on_response)
+    transport = canceller.create_transport(limits) if canceller is not None else None
+    return httpx.Client(timeout=timeout, limits=limits, transport=transport, event_hooks=event_hooks)
+
+
+def create_async_httpx_client(
+        metrics: Optional[ConnectionMetrics] = None,
+        keepalive_expiry: float = 60.0
+) -> httpx.AsyncClient:
+    """イベントループ上で使う非同期HTTPクライアントを作成する。設定は同期版と同じ
+
+    送信中のリクエストは、送信しているタスクをキャンセルすると接続ごと中断される。
+    """
+    timeout = httpx.Timeout(connect=15.0, read=240.0, write=30.0, pool=5.0)
+    limits = httpx.Limits(keepalive_expiry=keepalive_expiry)
+    event_hooks: dict[str, list] = {'request': [], 'response': []}
+    if metrics is not None:
+        event_hooks['request'].append(metrics.on_request_async)
+        event_hooks['response'].append(metrics.on_response_async)
+    return httpx.AsyncClient(timeout=timeout, limits=limits, event_hooks=event_hooks)
+
+
+class ConnectionWarmer:
+    """APIサーバーへの接続を事前に確立し、録音停止後の送信でTCP・TLSの確立を待たないようにする"""
+
+    def __init__(
+            self,
+            http_client: httpx.Client | httpx.AsyncClient,
+            base_url: str = API_BASE_URL,
+            timeout: float = 5.0,
+            run_coroutine: Optional[Callable[[Coroutine], concurrent.futures.Future]] = None
+    ):
+        """非同期クライアントの場合はrun_coroutineにそのクライアントを使うイベントループでの実行関数を渡す"""
+        self._http_client = http_client
+        self._run_coroutine = run_coroutine
+        self._base_url = base_url
+        self._timeout = timeout
+        self._warming = threading.Lock()
+        self._stopped = threading.Event()
+        self._keepalive_thread: Optional[threading.Thread] = None
+        self.last_warmup_ms: Optional[float] = None
+
+    def warm(self) -> bool:
+        """軽量なHEADリクエストで接続を確立してプールに残す"""
+        if not self._warming.acquire(blocking=False):
+            return False
+        started_at = time.perf_counter()
+        try:
+            response = self._http_client.head(self._base_url, timeout=self._timeout)
+            if self._run_coroutine is not None:
+                self._run_coroutine(response).result(self._timeout)
+        except (httpx.HTTPError, TimeoutError) as e:
+            logging.warning(f'接続の事前確立に失敗しました: {str(e)}')
+            return False
+        finally:
+            self._warming.release()
+        self.last_warmup_ms = (time.perf_counter() - started_at) * 1000
+        logging.debug(f'接続の事前確立完了: {self.last_warmup_ms:.0f} ms')
+        return True
+
+    def warm_async(self) -> threading.Thread:
+        thread = threading.Thread(target=self.warm, daemon=True, name='ConnectionWarmUp')
+        thread.start()
+        return thread
+
+    def start_keepalive(self, interval_seconds: float) -> None:
+        """待機中も一定間隔で接続を使い、プールの接続が切れないようにする"""
+        if interval_seconds <= 0 or self._keepalive_thread is not None:
+            return
+        self._keepalive_thread = threading.Thread(
+            target=self._keepalive_loop,
+            args=(interval_seconds,),
+            daemon=True,
+            name='ConnectionKeepAlive'
+        )
+        self._keepalive_thread.start()
+        logging.info(f'接続の維持を開始しました: {interval_seconds:g}秒間隔')
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _keepalive_loop(self, interval_seconds: float) -> None:
+        while not self._stopped.wait(interval_seconds):
+            self.warm()
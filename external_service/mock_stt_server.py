@@ -0,0 +1,211 @@
+"""ElevenLabsの音声認識APIを模したローカルHTTPサーバー
+
+ネットワークのない環境で文字起こしの経路全体を負荷試験・計測できるよう、
+用意した文字起こし結果を遅延・ゆらぎ・エラーを注入して返す。
+
+実行方法: python -m external_service.mock_stt_server --port 8765 --jitter-ms 200 --error-rate 0.05
+設定ファイルの [ELEVENLABS] base_url に http://127.0.0.1:8765 を指定するとアプリから送信できる。
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Sequence
+
+from external_service.elevenlabs_api import estimate_audio_seconds
+
+SPEECH_TO_TEXT_PATH = '/v1/speech-to-text'
+
+
+def _extract_file_part(content_type: str, body: bytes) -> bytes:
+    message = BytesParser(policy=HTTP).parsebytes(
+        f'Content-Type: {content_type}\r\n\r\n'.encode() + body
+    )
+    for part in message.iter_parts():
+        if part.get_param('name', header='content-disposition') == 'file':
+            return part.get_payload(decode=True) or b''
+    return b''
+
+
+def load_transcripts(path: str) -> list[str]:
+    """1行に1件の文字起こし結果を読み込む。空行は無視する"""
+    with open(path, encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+
+class MockSttServer:
+    """ElevenLabsの音声認識APIを模したローカルHTTPサーバー。音声の長さに応じた遅延を再現する
+
+    transcriptsを渡すと受信順に繰り返し返し、渡さなければ音声の長さを返す。
+    error_rateの割合でHTTP 500を返し、disconnect_rateの割合で応答せずに接続を切る。
+    """
+
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            base_latency_ms: float = 300.0,
+            latency_per_audio_second_ms: float = 100.0,
+            transcripts: Optional[Sequence[str]] = None,
+            jitter_ms: float = 0.0,
+            error_rate: float = 0.0,
+            disconnect_rate: float = 0.0,
+            seed: Optional[int] = None
+    ):
+        self.base_latency_ms = base_latency_ms
+        self.latency_per_audio_second_ms = latency_per_audio_second_ms
+        self.transcripts = list(transcripts) if transcripts else []
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.disconnect_rate = disconnect_rate
+        self.request_count = 0
+        self.error_count = 0
+        self.disconnect_count = 0
+        self._received = 0
+        self._random = random.Random(seed)
+        self._count_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name='MockSttServer')
+        self._thread.start()
+        logging.info(f'モック音声認識サーバーを起動しました: {self.base_url}')
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            # 未起動のままshutdownを呼ぶとserve_foreverの終了を待ち続ける
+            self._server.shutdown()
+            self._thread.join()
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockSttServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _plan(self, audio: bytes) -> tuple[float, str, Optional[str]]:
+        """応答までの秒数と返す文字起こし結果、注入する障害(error/disconnect/None)を決める"""
+        seconds = estimate_audio_seconds(audio)
+        with self._count_lock:
+            index = self._received
+            self._received += 1
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms > 0 else 0.0
+            roll = self._random.random()
+        latency = (self.base_latency_ms + self.latency_per_audio_second_ms * seconds + jitter) / 1000
+        if self.transcripts:
+            text = self.transcripts[index % len(self.transcripts)]
+        else:
+            text = f'[{seconds:.1f}秒]'
+
+        fault = None
+        if roll < self.disconnect_rate:
+            fault = 'disconnect'
+        elif roll < self.disconnect_rate + self.error_rate:
+            fault = 'error'
+        return latency, text, fault
+
+    def _respond(self, audio: bytes) -> tuple[Optional[dict], Optional[str]]:
+        latency, text, fault = self._plan(audio)
+        time.sleep(latency)
+        with self._count_lock:
+            if fault == 'disconnect':
+                self.disconnect_count += 1
+            elif fault == 'error':
+                self.error_count += 1
+            else:
+                self.request_count += 1
+        if fault is not None:
+            return None, fault
+        return {
+            'language_code': 'jpn',
+            'language_probability': 1.0,
+            'text': text,
+            'words': [],
+        }, None
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # 実際のAPIと同様に接続を維持し、接続の再利用を計測できるようにする
+            protocol_version = 'HTTP/1.1'
+
+            def do_HEAD(self) -> None:
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_POST(self) -> None:
+                if self.path.split('?')[0] != SPEECH_TO_TEXT_PATH:
+                    self.send_error(404)
+                    return
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                audio = _extract_file_part(self.headers.get('Content-Type', ''), body)
+                result, fault = server._respond(audio)
+                if fault == 'disconnect':
+                    self.close_connection = True
+                    return
+                status = 200
+                if fault == 'error':
+                    status = 500
+                    result = {'detail': {'status': 'mock_error', 'message': '注入したサーバーエラー'}}
+                payload = json.dumps(result, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args) -> None:
+                logging.debug(f'モック音声認識サーバー: {format % args}')
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='ElevenLabsの音声認識APIを模したローカルHTTPサーバー')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=300.0, help='音声の長さによらない応答遅延')
+    parser.add_argument('--latency-per-second-ms', type=float, default=100.0, help='音声1秒あたりの追加遅延')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='遅延に加える0からこの値までのゆらぎ')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='HTTP 500を返す割合')
+    parser.add_argument('--disconnect-rate', type=float, default=0.0, help='応答せずに接続を切る割合')
+    parser.add_argument('--transcripts', help='返す文字起こし結果を1行に1件書いたファイル')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    server = MockSttServer(
+        args.host, args.port, args.latency_ms, args.latency_per_second_ms,
+        load_transcripts(args.transcripts) if args.transcripts else None,
+        args.jitter_ms, args.error_rate, args.disconnect_rate, args.seed
+    )
+    server.start()
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f'成功 {server.request_count}件 / エラー {server.error_count}件 / 切断 {server.disconnect_count}件')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+import functools
+import io
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional, Protocol
+
+from elevenlabs.client import ElevenLabs
+
+from external_service.elevenlabs_api import (
+    AdaptiveTimeout,
+    AudioPayload,
+    CircuitBreaker,
+    HedgingPolicy,
+    TranscriptionNetworkError,
+    transcribe_audio,
+    transcribe_audio_data,
+)
+from utils.app_config import AppConfig
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+
+class SpeechToTextBackend(Protocol):
+    """文字起こしの送信先。通信障害はTranscriptionNetworkError、それ以外の失敗はNoneで返す"""
+
+    name: str
+
+    def transcribe_file(self, audio_file_path: str) -> Optional[str]:
+        ...
+
+    def transcribe_data(self, audio: AudioPayload, file_name: str) -> Optional[str]:
+        ...
+
+
+class ElevenLabsBackend:
+    """ElevenLabsの音声認識API。base_urlを変えたクライアントを渡せばローカルの代替サーバーにも送信できる"""
+
+    name = 'elevenlabs'
+
+    def __init__(
+            self,
+            config: AppConfig,
+            client: ElevenLabs,
+            hedging: Optional[HedgingPolicy] = None,
+            timeouts: Optional[AdaptiveTimeout] = None
+    ):
+        self.config = config
+        self.client = client
+        self._transcribe_file = transcribe_audio
+        self._transcribe_data = transcribe_audio_data
+        if hedging is not None:
+            self._transcribe_file = functools.partial(self._transcribe_file, hedging=hedging)
+            self._transcribe_data = functools.partial(self._transcribe_data, hedging=hedging)
+        if timeouts is not None:
+            self._transcribe_file = functools.partial(self._transcribe_file, timeouts=timeouts)
+            self._transcribe_data = functools.partial(self._transcribe_data, timeouts=timeouts)
+
+    def transcribe_file(self, audio_file_path: str) -> Optional[str]:
+        return self._transcribe_file(audio_file_path, self.config, self.client)
+
+    def transcribe_data(self, audio: AudioPayload, file_name: str) -> Optional[str]:
+        return self._transcribe_data(audio, file_name, self.config, self.client)
+
+
+class CircuitBreakerBackend:
+    """通信障害の状況を回路遮断器に記録し、障害が続いている間は送信せずに即座に失敗させる"""
+
+    def __init__(
+            self,
+            backend: SpeechToTextBackend,
+            breaker: CircuitBreaker,
+            is_cancelled: Optional[Callable[[], bool]] = None
+    ):
+        """is_cancelledがTrueを返す間の通信エラーはキャンセルによる遮断として障害に数えない"""
+        self.backend = backend
+        self.breaker = breaker
+        self.name = backend.name
+        self._is_cancelled = is_cancelled
+
+    def transcribe_file(self, audio_file_path: str) -> Optional[str]:
+        return self._run(lambda: self.backend.transcribe_file(audio_file_path))
+
+    def transcribe_data(self, audio: AudioPayload, file_name: str) -> Optional[str]:
+        return self._run(lambda: self.backend.transcribe_data(audio, file_name))
+
+    def _run(self, transcribe: Callable[[], Optional[str]]) -> Optional[str]:
+        self.breaker.before_request()
+        try:
+            result = transcribe()
+        except TranscriptionNetworkError:
+            if self._is_cancelled is not None and self._is_cancelled():
+                self.breaker.release()
+            else:
+                self.breaker.record_failure()
+            raise
+        except Exception:
+            # 応答があった失敗は接続の障害ではないため、送信の再開を妨げない
+            self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        return result
+
+
+def is_local_backend_available() -> bool:
+    return WhisperModel is not None
+
+
+def _load_whisper_model(model_name: str, compute_type: str, cpu_threads: int) -> Any:
+    if WhisperModel is None:
+        raise RuntimeError('ローカル音声認識にはfaster-whisperが必要です')
+    return WhisperModel(model_name, device='cpu', compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+class LocalWhisperBackend:
+    """CPUで動くfaster-whisperの音声認識。処理時間と実時間比(RTF)を記録する"""
+
+    name = 'local'
+
+    def __init__(
+            self,
+            model_name: str = 'small',
+            compute_type: str = 'int8',
+            cpu_threads: int = 0,
+            language: str = 'ja',
+            load_model: Callable[[str, str, int], Any] = _load_whisper_model
+    ):
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.language = language
+        self._load_model = load_model
+        self._model: Any = None
+        self._load_lock = threading.Lock()
+        # 同時に推論するとCPUを奪い合って全体が遅くなるため1件ずつ処理する
+        self._infer_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self.load_ms: Optional[float] = None
+        self.requests = 0
+        self.total_audio_seconds = 0.0
+        self.total_seconds = 0.0
+        self.last_latency_ms = 0.0
+        self.last_rtf = 0.0
+
+    @classmethod
+    def from_config(cls, config: AppConfig) -> 'LocalWhisperBackend':
+        return cls(
+            config.offline_model,
+            config.offline_compute_type,
+            config.offline_cpu_threads,
+            config.offline_language
+        )
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def load_in_background(self) -> threading.Thread:
+        """起動を妨げないよう別スレッドでモデルを読み込む"""
+        thread = threading.Thread(target=self._load_quietly, daemon=True, name='LocalSttModelLoad')
+        thread.start()
+        return thread
+
+    def _load_quietly(self) -> None:
+        try:
+            self._ensure_model()
+        except Exception as e:
+            logging.error(f'ローカル音声認識のモデルを読み込めません: {str(e)}')
+
+    def _ensure_model(self) -> Any:
+        """読み込み中なら完了を待ち、未読み込みならこのスレッドで読み込む"""
+        with self._load_lock:
+            if self._model is None:
+                started_at = time.perf_counter()
+                self._model = self._load_model(self.model_name, self.compute_type, self.cpu_threads)
+                self.load_ms = (time.perf_counter() - started_at) * 1000
+                logging.info(f'ローカル音声認識のモデルを読み込みました: {self.model_name} ({self.compute_type}) {self.load_ms:.0f} ms')
+            return self._model
+
+    def transcribe_file(self, audio_file_path: str) -> Optional[str]:
+        return self._transcribe(audio_file_path)
+
+    def transcribe_data(self, audio: AudioPayload, file_name: str) -> Optional[str]:
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            return self._transcribe(io.BytesIO(audio))
+        clone = getattr(audio, 'clone', None)
+        if clone is not None:
+            # 先にAPIへの送信で読み出したストリームでも先頭から読めるようにする
+            return self._transcribe(clone())
+        audio.seek(0)
+        return self._transcribe(audio)
+
+    def _transcribe(self, audio: str | io.IOBase) -> Optional[str]:
+        model = self._ensure_model()
+        with self._infer_lock:
+            started_at = time.perf_counter()
+            segments, info = model.transcribe(audio, language=self.language)
+            text = ''.join(segment.text for segment in segments).strip()
+            elapsed = time.perf_counter() - started_at
+        rtf = elapsed / info.duration if info.duration > 0 else 0.0
+        with self._metrics_lock:
+            self.requests += 1
+            self.total_audio_seconds += info.duration
+            self.total_seconds += elapsed
+            self.last_latency_ms = elapsed * 1000
+            self.last_rtf = rtf
+        logging.info(f'ローカル音声認識: 音声 {info.duration:.1f}秒 / 処理 {elapsed * 1000:.0f} ms / RTF {rtf:.2f}')
+        return text or None
+
+    def metrics(self) -> dict[str, float]:
+        with self._metrics_lock:
+            return {
+                'requests': float(self.requests),
+                'loaded': float(self.is_loaded),
+                'load_ms': self.load_ms or 0.0,
+                'last_latency_ms': self.last_latency_ms,
+                'last_rtf': self.last_rtf,
+                'avg_rtf': self.total_seconds / self.total_audio_seconds if self.total_audio_seconds else 0.0,
+            }
+
+
+class FallbackBackend:
+    """主の送信先に通信障害で届かない場合に、代わりの送信先で文字起こしする
+
+    回路遮断中の主の送信先はCircuitOpenErrorで即座に失敗するため、送信を待たずに代わりの送信先を使う。
+    代わりの送信先でも失敗した場合は主の送信先の通信障害を送出し、再送信キューに回せるようにする。
+    """
+
+    def __init__(self, primary: SpeechToTextBackend, fallback: SpeechToTextBackend):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = primary.name
+        self._state = threading.local()
+        self.fallback_count = 0
+
+    @property
+    def used_fallback(self) -> bool:
+        """このスレッドの直前の文字起こしを代わりの送信先で行ったか"""
+        return getattr(self._state, 'used_fallback', False)
+
+    def transcribe_file(self, audio_file_path: str) -> Optional[str]:
+        return self._run(lambda backend: backend.transcribe_file(audio_file_path))
+
+    def transcribe_data(self, audio: AudioPayload, file_name: str) -> Optional[str]:
+        return self._run(lambda backend: backend.transcribe_data(audio, file_name))
+
+    def _run(self, transcribe: Callable[[SpeechToTextBackend], Optional[str]]) -> Optional[str]:
+        self._state.used_fallback = False
+        try:
+            return transcribe(self.primary)
+        except TranscriptionNetworkError as e:
+            logging.warning(f'{self.primary.name}に接続できないため{self.fallback.name}で文字起こしします: {str(e)}')
+            network_error = e
+        self._state.used_fallback = True
+        self.fallback_count += 1
+        try:
+            return transcribe(self.fallback)
+        except Exception as e:
+            logging.error(f'{self.fallback.name}での文字起こしに失敗しました: {str(e)}')
+            raise network_error from e
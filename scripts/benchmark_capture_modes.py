@@ -0,0 +1,109 @@
+"""録音方式(blocking / callback)の取り込みと停止時の引き渡しコストを比較する
+
+実行方法: python -m scripts.benchmark_capture_modes
+"""
+import configparser
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from service.audio_buffer import GrowableAudioBuffer, join_frames
+from service.audio_recorder import SAMPLE_WIDTH, AudioRecorder
+from utils.app_config import AppConfig
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+DURATION_SECONDS = 60
+REPEAT = 5
+
+
+class _FakeBlockingStream:
+    """事前生成したチャンクを順に返し、終端で録音を停止させるストリーム"""
+
+    def __init__(self, chunks: list[bytes], recorder: AudioRecorder):
+        self._chunks = iter(chunks)
+        self._last = chunks[-1]
+        self._recorder = recorder
+
+    def read(self, num_frames: int, exception_on_overflow: bool = True) -> bytes:
+        data = next(self._chunks)
+        if data is self._last:
+            self._recorder._stop_event.set()
+        return data
+
+
+def _make_recorder(capture_mode: str, temp_dir: str) -> AudioRecorder:
+    raw = configparser.ConfigParser()
+    raw.read_dict({
+        'AUDIO': {'SAMPLE_RATE': str(SAMPLE_RATE), 'CHANNELS': '1', 'CHUNK': str(CHUNK),
+                  'CAPTURE_MODE': capture_mode},
+        'PATHS': {'TEMP_DIR': temp_dir},
+        'RECORDING': {'AUTO_STOP_TIMER': str(DURATION_SECONDS)},
+    })
+    return AudioRecorder(AppConfig(raw))
+
+
+def _synthetic_chunks() -> list[bytes]:
+    chunk_bytes = CHUNK * SAMPLE_WIDTH
+    total = SAMPLE_RATE * DURATION_SECONDS * SAMPLE_WIDTH
+    source = os.urandom(chunk_bytes) * (total // chunk_bytes)
+    # PortAudioは各チャンクを新しいbytesとして渡すため、チャンクごとに別オブジェクトを用意する
+    return [source[i:i + chunk_bytes] for i in range(0, len(source), chunk_bytes)]
+
+
+def _run_blocking(chunks: list[bytes], temp_dir: str) -> tuple[float, float]:
+    recorder = _make_recorder('blocking', temp_dir)
+    recorder.stream = _FakeBlockingStream(chunks, recorder)  # type: ignore[assignment]
+
+    start = time.perf_counter()
+    recorder.record()
+    captured = time.perf_counter()
+    data = join_frames(recorder.frames)
+    handed_off = time.perf_counter()
+
+    assert len(data) == len(chunks) * CHUNK * SAMPLE_WIDTH
+    return captured - start, handed_off - captured
+
+
+def _run_callback(chunks: list[bytes], temp_dir: str) -> tuple[float, float]:
+    recorder = _make_recorder('callback', temp_dir)
+    recorder._capture_buffer = GrowableAudioBuffer(recorder._prealloc_bytes)
+
+    start = time.perf_counter()
+    for chunk in chunks:
+        recorder._stream_callback(chunk, CHUNK, {}, 0)
+    captured = time.perf_counter()
+    frames, _ = recorder.stop_recording()
+    data = join_frames(frames)
+    handed_off = time.perf_counter()
+
+    assert len(data) == len(chunks) * CHUNK * SAMPLE_WIDTH
+    return captured - start, handed_off - captured
+
+
+def _peak_memory(runner, chunks: list[bytes], temp_dir: str) -> int:
+    tracemalloc.start()
+    runner(chunks, temp_dir)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    chunks = _synthetic_chunks()
+    print(f'合成入力: {DURATION_SECONDS}秒 / {len(chunks)}チャンク / {len(chunks) * CHUNK * SAMPLE_WIDTH:,} bytes')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, runner in (('blocking', _run_blocking), ('callback', _run_callback)):
+            results = [runner(chunks, temp_dir) for _ in range(REPEAT)]
+            capture_ms = statistics.median(r[0] for r in results) * 1000
+            handoff_ms = statistics.median(r[1] for r in results) * 1000
+            peak_kb = _peak_memory(runner, chunks, temp_dir) / 1024
+            print(f'{name:>8}: 取り込み {capture_ms:8.2f} ms / 停止時引き渡し {handoff_ms:7.3f} ms / '
+                  f'ピークメモリ {peak_kb:9.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
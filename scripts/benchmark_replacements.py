@@ -0,0 +1,71 @@
+"""置換ルール数ごとに、従来のルール順の置換ループとトライ木による1回走査の置換の処理時間を比較する
+
+医療用語辞書を想定した合成ルール（置換前の1文字を変える訂正）で、1件の口述（約600文字）を置換する時間を計測する。
+トライ木はアプリ起動時や辞書の再読込時に一度だけ構築するため、構築時間は別に表示する。
+
+実行方法: python -m scripts.benchmark_replacements
+"""
+import random
+import time
+from typing import Callable
+
+from service.text_transformer import ReplacementMatcher
+
+RULE_COUNTS = (1_000, 10_000, 100_000)
+TEXT_REPEATS = 20
+CHARACTERS = 'あいうえおかきくけこさしすせそたちつてとなにぬねのアイウエオカキクケコ医療診断検査投与処方血圧症状'
+
+
+def _sequential_replace(text: str, replacements: dict[str, str]) -> str:
+    """変更前のreplace_textと同じく、ルールごとに包含判定と全置換を繰り返す"""
+    result = text
+    for old, new in replacements.items():
+        if old in result:
+            result = result.replace(old, new)
+    return result
+
+
+def _rules(count: int, rng: random.Random) -> dict[str, str]:
+    """誤認識の訂正を想定し、置換後は置換前の1文字を同じ文字集合の別の文字に変えたものにする"""
+    rules: dict[str, str] = {}
+    while len(rules) < count:
+        term = ''.join(rng.choices(CHARACTERS, k=rng.randint(2, 6)))
+        position = rng.randrange(len(term))
+        rules[term] = term[:position] + rng.choice(CHARACTERS.replace(term[position], '')) + term[position + 1:]
+    return rules
+
+
+def _dictation(rules: dict[str, str], rng: random.Random) -> str:
+    terms = rng.sample(list(rules), 20)
+    sentence = '患者は本日来院し、' + '、'.join(terms) + 'について説明した。'
+    return sentence * (600 // len(sentence) + 1)
+
+
+def _best_of(run: Callable[[], object], repeats: int) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f'{"ルール数":>8} | {"従来ループ":>10} | {"トライ木":>10} | {"倍率":>6} | {"構築":>8}')
+    for count in RULE_COUNTS:
+        rules = _rules(count, rng)
+        text = _dictation(rules, rng)
+
+        started_at = time.perf_counter()
+        matcher = ReplacementMatcher(rules)
+        build_seconds = time.perf_counter() - started_at
+
+        sequential = _best_of(lambda: _sequential_replace(text, rules), 3)
+        compiled = _best_of(lambda: matcher.replace(text), TEXT_REPEATS)
+        print(f'{count:>8} | {sequential * 1000:>8.2f}ms | {compiled * 1000:>8.3f}ms | '
+              f'{sequential / compiled:>5.0f}x | {build_seconds * 1000:>6.0f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""置換ルールの起動時の読み込み時間を、キャッシュなし・キャッシュ作成時・キャッシュ使用時で比較する
+
+医療用語辞書を想定した合成ルールのファイルを一時フォルダに作成し、それぞれ最良値を表示する。
+「作成時」はキャッシュがない場合の起動時の読み込みで、キャッシュの保存は別スレッドで行うため含まない。
+「日時のみ変更」は元ファイルの更新日時だけを変えた場合で、内容のハッシュを比較してからキャッシュを使う。
+
+実行方法: python -m scripts.benchmark_replacements_cache
+"""
+import os
+import random
+import tempfile
+import time
+from typing import Callable
+
+from scripts.benchmark_replacements import _rules
+from service.replacements_cache import ReplacementsCache
+from service.text_transformer import load_replacements
+
+RULE_COUNTS = (10_000, 50_000)
+REPEATS = 5
+
+
+def _best_of(run: Callable[[], object], repeats: int = REPEATS, prepare: Callable[[], object] = lambda: None) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        prepare()
+        started_at = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f'{"ルール数":>8} | {"キャッシュなし":>12} | {"作成時":>8} | {"使用時":>8} | {"日時のみ変更":>10} | {"サイズ":>7}')
+    for count in RULE_COUNTS:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_path = os.path.join(temp_dir, 'replacements.txt')
+            with open(source_path, 'w', encoding='utf-8') as f:
+                f.writelines(f'{old},{new}\n' for old, new in _rules(count, rng).items())
+            cache = ReplacementsCache(os.path.join(temp_dir, 'replacements_cache.json'))
+
+            def remove_cache() -> None:
+                # 前回の計測で起動したキャッシュの保存が終わってから削除する
+                if cache._save_thread is not None:
+                    cache._save_thread.join()
+                if os.path.exists(cache.cache_path):
+                    os.remove(cache.cache_path)
+
+            plain = _best_of(lambda: load_replacements(source_path))
+            created = _best_of(lambda: cache.load(source_path), prepare=remove_cache)
+            cache._save_thread.join()
+            warm = _best_of(lambda: cache.load(source_path))
+            hashed = _best_of(lambda: cache.load(source_path), prepare=lambda: os.utime(source_path))
+            cache_mb = os.path.getsize(cache.cache_path) / 1024 / 1024
+
+        print(f'{count:>8} | {plain * 1000:>10.0f}ms | {created * 1000:>6.0f}ms | {warm * 1000:>6.0f}ms | '
+              f'{hashed * 1000:>8.0f}ms | {cache_mb:>5.1f}MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""録音中の区間文字起こしと停止後の一括文字起こしで、停止からテキスト取得までの時間を比較する
+
+遅延を注入したモック音声認識サーバーに対して実際のElevenLabsクライアントで送信する。
+録音は合成音声を実時間でチャンク単位に流し込んで再現する。
+
+実行方法: python -m scripts.benchmark_segment_pipeline
+"""
+import configparser
+import threading
+import time
+
+import numpy as np
+from elevenlabs.client import ElevenLabs
+
+from external_service.elevenlabs_api import transcribe_audio_data
+from external_service.mock_stt_server import MockSttServer
+from service.audio_encoder import encode_wav
+from service.segment_pipeline import SegmentPipeline
+from utils.app_config import AppConfig
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+UTTERANCE_SECONDS = (4.5, 5.0, 4.0)
+PAUSE_SECONDS = 1.0
+TRAILING_SILENCE_SECONDS = 0.8
+BASE_LATENCY_MS = 400.0
+LATENCY_PER_AUDIO_SECOND_MS = 150.0
+
+
+def _utterance(seconds: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    phase = 2 * np.pi * np.cumsum(140 + 30 * np.sin(2 * np.pi * 0.7 * t)) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = 0.4 + 0.6 * np.clip(np.sin(2 * np.pi * 4.5 * t), 0, None)
+    return voiced * envelope * 0.2 + rng.normal(0, 0.003, t.size)
+
+
+def _dictation() -> bytes:
+    rng = np.random.default_rng(0)
+    parts = []
+    for index, seconds in enumerate(UTTERANCE_SECONDS):
+        if index:
+            parts.append(rng.normal(0, 0.003, int(PAUSE_SECONDS * SAMPLE_RATE)))
+        parts.append(_utterance(seconds, index))
+    parts.append(rng.normal(0, 0.003, int(TRAILING_SILENCE_SECONDS * SAMPLE_RATE)))
+    return (np.clip(np.concatenate(parts), -1, 1) * 32767).astype('<i2').tobytes()
+
+
+def _transcriber(config: AppConfig, client: ElevenLabs):
+    def transcribe(pcm, index: int):
+        encoded = encode_wav(pcm, SAMPLE_RATE, 1)
+        return transcribe_audio_data(encoded.data, f'segment_{index + 1:03d}.wav', config, client)
+    return transcribe
+
+
+def main() -> None:
+    raw = configparser.ConfigParser()
+    raw.read_dict({'ELEVENLABS': {'MODEL': 'scribe_v2', 'LANGUAGE': 'jpn'}})
+    config = AppConfig(raw)
+    recording = _dictation()
+    chunk_bytes = CHUNK * 2
+    chunk_seconds = CHUNK / SAMPLE_RATE
+
+    with MockSttServer(base_latency_ms=BASE_LATENCY_MS,
+                       latency_per_audio_second_ms=LATENCY_PER_AUDIO_SECOND_MS) as server:
+        client = ElevenLabs(api_key='mock', base_url=server.base_url)
+        transcribe = _transcriber(config, client)
+        transcribe(b'\x00\x00' * 160, 0)
+
+        pipeline = SegmentPipeline(
+            transcribe, SAMPLE_RATE, 1, threshold_db=-45.0, split_silence_ms=700,
+            min_segment_ms=3000, min_speech_ms=300, max_workers=3
+        )
+        print(f'録音を再生中: {len(recording) / 2 / SAMPLE_RATE:.1f}秒 '
+              f'(遅延 {BASE_LATENCY_MS:.0f} ms + {LATENCY_PER_AUDIO_SECOND_MS:.0f} ms/音声秒)')
+        started_at = time.perf_counter()
+        for offset in range(0, len(recording), chunk_bytes):
+            pipeline.feed(recording[offset:offset + chunk_bytes])
+            next_tick = started_at + (offset // chunk_bytes + 1) * chunk_seconds
+            time.sleep(max(next_tick - time.perf_counter(), 0))
+
+        stopped_at = time.perf_counter()
+        results: dict[str, tuple[float, str]] = {}
+
+        def run_batch() -> None:
+            text = transcribe(recording, 0) or ''
+            results['一括'] = (time.perf_counter() - stopped_at, text)
+
+        batch = threading.Thread(target=run_batch)
+        batch.start()
+        pipeline.finish(recording)
+        text = pipeline.result() or ''
+        results['区間'] = (time.perf_counter() - stopped_at, text)
+        batch.join()
+
+    for name, (elapsed, text) in results.items():
+        print(f'{name}: 停止→テキスト {elapsed * 1000:7.0f} ms / {text}')
+    print(f'区間数: {pipeline.segment_count}')
+
+
+if __name__ == '__main__':
+    main()
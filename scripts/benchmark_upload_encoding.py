@@ -0,0 +1,64 @@
+"""送信形式(WAV / FLAC)ごとのエンコード時間と削減バイト数を比較する
+
+実行方法: python -m scripts.benchmark_upload_encoding
+"""
+import statistics
+import time
+
+import numpy as np
+
+from service.audio_encoder import ENCODERS, is_encoder_available
+
+SAMPLE_RATE = 16000
+CLIP_SECONDS = (5, 10, 15)
+REPEAT = 7
+UPLINK_MBPS = (2, 10)
+
+
+def _speech_like_clip(seconds: int, seed: int) -> bytes:
+    """基本周波数が揺れる倍音と子音風ノイズ、息継ぎの無音を含む合成音声"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * SAMPLE_RATE) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t) + rng.normal(0, 2, t.size).cumsum() / SAMPLE_RATE
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    syllables = np.clip(np.sin(2 * np.pi * 4.5 * t), 0, None) ** 2
+    fricatives = rng.normal(0, 0.15, t.size) * (np.sin(2 * np.pi * 2.1 * t) > 0.8)
+    pauses = (np.sin(2 * np.pi * 0.25 * t) > -0.7).astype(np.float64)
+    background = rng.normal(0, 0.003, t.size)
+    signal = (voiced * syllables * 0.25 + fricatives) * pauses + background
+    return (np.clip(signal, -1, 1) * 32767 * 0.8).astype('<i2').tobytes()
+
+
+def _measure(name: str, pcm: bytes) -> tuple[float, int]:
+    encoder = ENCODERS[name]
+    timings = []
+    size = 0
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        encoded = encoder(pcm, SAMPLE_RATE, 1)
+        size = encoded.size
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, size
+
+
+def main() -> None:
+    names = [name for name in ENCODERS if is_encoder_available(name)]
+    skipped = sorted(set(ENCODERS) - set(names))
+    if skipped:
+        print(f'利用できないため除外: {", ".join(skipped)}')
+
+    for seconds in CLIP_SECONDS:
+        pcm = _speech_like_clip(seconds, seed=seconds)
+        print(f'\n{seconds}秒のクリップ (PCM {len(pcm):,} bytes)')
+        baseline = None
+        for name in names:
+            encode_ms, size = _measure(name, pcm)
+            baseline = baseline or size
+            uploads = ' / '.join(f'{mbps}Mbps {size * 8 / (mbps * 1e6) * 1000:6.0f} ms' for mbps in UPLINK_MBPS)
+            print(f'{name:>5}: {size:>9,} bytes ({size / baseline * 100:5.1f}%) / '
+                  f'エンコード {encode_ms:6.2f} ms / 送信目安 {uploads}')
+
+
+if __name__ == '__main__':
+    main()
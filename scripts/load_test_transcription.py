@@ -0,0 +1,132 @@
+"""文字起こしの経路全体をモック音声認識サーバーに対して負荷試験する
+
+ネットワークに接続せずに、ジョブキュー・送信・結果の並べ替えを含むTranscriptionHandlerへ
+録音を連続して投入し、投入から結果通知までの時間の分布と失敗の件数を表示する。
+サーバーには遅延のゆらぎとエラー・切断を注入できる。
+
+実行方法: python -m scripts.load_test_transcription --jobs 50 --jitter-ms 300 --error-rate 0.05
+"""
+import argparse
+import configparser
+import queue
+import tempfile
+import threading
+import time
+from typing import Callable
+
+import httpx
+import numpy as np
+
+from external_service.elevenlabs_api import setup_elevenlabs_client
+from external_service.mock_stt_server import MockSttServer
+from service.audio_file_manager import AudioFileManager
+from service.transcription_handler import TranscriptionHandler
+from utils.app_config import AppConfig
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+
+
+class _InlineUIProcessor:
+    """Tkのメインスレッドの代わりに、1つのスレッドでUIコールバックを順に実行する"""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self.is_shutting_down = False
+        threading.Thread(target=self._run, daemon=True, name='InlineUI').start()
+
+    def schedule_callback(self, callback: Callable, *args) -> None:
+        self._queue.put((callback, args))
+
+    def is_ui_valid(self) -> bool:
+        return True
+
+    def _run(self) -> None:
+        while True:
+            callback, args = self._queue.get()
+            callback(*args)
+
+
+def _recording(seconds: float, seed: int) -> list[bytes]:
+    rng = np.random.default_rng(seed)
+    pcm = (rng.normal(0, 0.1, int(seconds * SAMPLE_RATE)).clip(-1, 1) * 32767).astype('<i2').tobytes()
+    return [pcm[offset:offset + CHUNK * 2] for offset in range(0, len(pcm), CHUNK * 2)]
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    return float(np.percentile(values, percentile)) if values else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='文字起こしの経路全体をモック音声認識サーバーに対して負荷試験する')
+    parser.add_argument('--jobs', type=int, default=30, help='投入する録音の数')
+    parser.add_argument('--interval-ms', type=float, default=100.0, help='録音を投入する間隔')
+    parser.add_argument('--audio-seconds', type=float, default=5.0, help='1件あたりの録音の長さ')
+    parser.add_argument('--workers', type=int, default=2, help='文字起こしの同時実行数')
+    parser.add_argument('--latency-ms', type=float, default=300.0)
+    parser.add_argument('--latency-per-second-ms', type=float, default=100.0)
+    parser.add_argument('--jitter-ms', type=float, default=200.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--disconnect-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir, MockSttServer(
+            base_latency_ms=args.latency_ms,
+            latency_per_audio_second_ms=args.latency_per_second_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            disconnect_rate=args.disconnect_rate,
+            seed=args.seed
+    ) as server:
+        raw = configparser.ConfigParser()
+        raw.read_dict({
+            'ELEVENLABS': {'MODEL': 'scribe_v2', 'LANGUAGE': 'jpn', 'IN_MEMORY_UPLOAD': 'True'},
+            'PATHS': {'TEMP_DIR': temp_dir},
+            'TRANSCRIPTION': {'WORKERS': str(args.workers), 'MAX_PENDING': str(args.jobs)},
+        })
+        config = AppConfig(raw)
+        http_client = httpx.Client(timeout=httpx.Timeout(30.0))
+        client = setup_elevenlabs_client(http_client, server.base_url)
+        handler = TranscriptionHandler(config, client, AudioFileManager(config), _InlineUIProcessor())
+
+        latencies: list[float] = []
+        errors: list[str] = []
+        done = threading.Semaphore(0)
+
+        def on_complete(submitted_at: float, _text: str) -> None:
+            latencies.append(time.perf_counter() - submitted_at)
+            done.release()
+
+        def on_error(_submitted_at: float, message: str) -> None:
+            errors.append(message)
+            done.release()
+
+        print(f'{args.jobs}件の録音を{args.interval_ms:.0f} ms間隔で投入します: {server.base_url}')
+        started_at = time.perf_counter()
+        for index in range(args.jobs):
+            submitted_at = time.perf_counter()
+            handler.submit_frames(
+                _recording(args.audio_seconds, index), SAMPLE_RATE,
+                lambda text, at=submitted_at: on_complete(at, text),
+                lambda message, at=submitted_at: on_error(at, message),
+                audio_path=f'loadtest_{index:03d}.wav'
+            )
+            time.sleep(args.interval_ms / 1000)
+        for _ in range(args.jobs):
+            done.acquire()
+        elapsed = time.perf_counter() - started_at
+        metrics = handler.queue_metrics()
+        http_client.close()
+
+    print(f'所要時間 {elapsed:.1f}秒 / 成功 {len(latencies)}件 / 失敗 {len(errors)}件')
+    print(f'投入→結果 p50 {_percentile(latencies, 50) * 1000:.0f} ms / '
+          f'p90 {_percentile(latencies, 90) * 1000:.0f} ms / p99 {_percentile(latencies, 99) * 1000:.0f} ms')
+    print(f'サーバー: 応答 {server.request_count}件 / エラー {server.error_count}件 / 切断 {server.disconnect_count}件')
+    print(f'キュー: 最大待ち {metrics.get("max_wait_ms", 0.0):.0f} ms')
+    for message in sorted(set(errors)):
+        print(f'  失敗: {message} ({errors.count(message)}件)')
+
+
+if __name__ == '__main__':
+    main()
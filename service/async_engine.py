@@ -0,0 +1,163 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Coroutine, Optional, Set
+
+AsyncTranscriptionJob = Callable[[int], Awaitable[object]]
+
+
+class AsyncTranscriptionEngine:
+    """1つのバックグラウンドスレッドで動くイベントループ上で文字起こしジョブを並行実行する
+
+    TranscriptionJobQueueと同じ受付・待機・メトリクスのインターフェースを持ち、
+    加えて実行中のジョブをタスクごとキャンセルできる。
+    """
+
+    def __init__(self, max_concurrency: int, max_pending: int):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_pending = max(max_pending, 1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._condition = threading.Condition()
+        self._next_sequence = 0
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    @property
+    def pending_count(self) -> int:
+        """待機中と処理中のジョブ数"""
+        with self._condition:
+            return self._pending
+
+    def is_full(self) -> bool:
+        with self._condition:
+            return self._pending >= self.max_pending
+
+    def submit(self, job: AsyncTranscriptionJob, on_finished: Optional[Callable[[int], None]] = None) -> int:
+        """ジョブを登録して受付番号を返す。上限に達している場合はRuntimeError
+
+        on_finishedは実行枠を待つ間にキャンセルされた場合も含め、ジョブの終了時に受付番号を渡して呼び出す。
+        """
+        with self._condition:
+            if self._pending >= self.max_pending:
+                raise RuntimeError('文字起こし待ちが上限に達しています')
+            sequence = self._next_sequence
+            self._next_sequence += 1
+            self._pending += 1
+        self.run_coroutine(self._run(sequence, time.perf_counter(), job, on_finished))
+        return sequence
+
+    def run_coroutine(self, coroutine: Coroutine) -> concurrent.futures.Future:
+        """イベントループ上でコルーチンを実行し、他のスレッドから待機できるFutureを返す"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    def cancel_all(self) -> None:
+        """実行中と待機中のジョブをキャンセルする。送信中の通信も中断される"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+
+        def cancel() -> None:
+            for task in list(self._tasks):
+                task.cancel()
+
+        loop.call_soon_threadsafe(cancel)
+
+    def join(self, timeout: float) -> bool:
+        """すべてのジョブの完了を待機し、完了したかを返す"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending == 0, timeout)
+
+    def metrics(self) -> dict[str, float]:
+        """キューの深さと待ち時間を返す"""
+        with self._condition:
+            completed = self._completed
+            return {
+                'queue_depth': float(self._pending - self._running),
+                'in_flight': float(self._running),
+                'completed': float(completed),
+                'cancelled': float(self._cancelled),
+                'avg_wait_ms': self._total_wait / completed * 1000 if completed else 0.0,
+                'max_wait_ms': self._max_wait * 1000,
+                'last_wait_ms': self._last_wait * 1000,
+            }
+
+    def close(self) -> None:
+        """ジョブをキャンセルしてイベントループを停止する"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        self.cancel_all()
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._condition:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(self._loop,),
+                    daemon=True,
+                    name='TranscriptionEventLoop'
+                )
+                self._thread.start()
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    async def _run(
+            self,
+            sequence: int,
+            enqueued_at: float,
+            job: AsyncTranscriptionJob,
+            on_finished: Optional[Callable[[int], None]]
+    ) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._tasks.add(task)
+        wait = 0.0
+        started_at: Optional[float] = None
+        cancelled = False
+        try:
+            async with self._semaphore:
+                wait = time.perf_counter() - enqueued_at
+                with self._condition:
+                    self._running += 1
+                    depth = self._pending - self._running
+                started_at = time.perf_counter()
+                logging.info(f'文字起こしジョブ#{sequence + 1} 開始: 待ち時間 {wait * 1000:.0f} ms / 待機中 {depth}件')
+                await job(sequence)
+        except asyncio.CancelledError:
+            cancelled = True
+            logging.info(f'文字起こしジョブ#{sequence + 1} をキャンセルしました')
+        except Exception as e:
+            logging.error(f'文字起こしジョブ#{sequence + 1} でエラー: {str(e)}')
+        finally:
+            self._tasks.discard(task)
+            with self._condition:
+                if started_at is not None:
+                    self._running -= 1
+                self._pending -= 1
+                self._completed += 1
+                self._cancelled += int(cancelled)
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+                self._last_wait = wait
+                self._condition.notify_all()
+            if started_at is not None:
+                elapsed = time.perf_counter() - started_at
+                logging.info(f'文字起こしジョブ#{sequence + 1} 完了: 処理 {elapsed * 1000:.0f} ms')
+            if on_finished is not None:
+                on_finished(sequence)
@@ -0,0 +1,89 @@
+from typing import Sequence
+
+AudioChunk = bytes | bytearray | memoryview
+
+
+class GrowableAudioBuffer:
+    """事前確保したbytearrayへ音声チャンクを追記する連続バッファ"""
+
+    def __init__(self, initial_capacity: int):
+        self._buffer = bytearray(max(initial_capacity, 1))
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buffer)
+
+    def write(self, data: AudioChunk) -> None:
+        """チャンクを末尾へコピーする。容量不足時のみ倍々で拡張する"""
+        end = self._size + len(data)
+        if end > len(self._buffer):
+            self._grow(end)
+        self._buffer[self._size:end] = data
+        self._size = end
+
+    def _grow(self, required: int) -> None:
+        new_buffer = bytearray(max(required, len(self._buffer) * 2))
+        new_buffer[:self._size] = memoryview(self._buffer)[:self._size]
+        self._buffer = new_buffer
+
+    def detach(self) -> memoryview:
+        """書き込み済み領域をコピーせずに引き渡し、バッファを空にする"""
+        view = memoryview(self._buffer)[:self._size]
+        self._buffer = bytearray(1)
+        self._size = 0
+        return view
+
+
+class PrerollRingBuffer:
+    """直近の音声のみを固定サイズで保持する循環バッファ"""
+
+    def __init__(self, capacity: int):
+        self._buffer = bytearray(capacity)
+        self._capacity = capacity
+        self._position = 0
+        self._filled = 0
+
+    def __len__(self) -> int:
+        return self._filled
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def write(self, data: AudioChunk) -> None:
+        """チャンクを書き込み、容量を超えた古いデータを上書きする"""
+        view = memoryview(data).cast('B')
+        if len(view) >= self._capacity:
+            self._buffer[:] = view[len(view) - self._capacity:]
+            self._position = 0
+            self._filled = self._capacity
+            return
+
+        first = min(len(view), self._capacity - self._position)
+        self._buffer[self._position:self._position + first] = view[:first]
+        rest = len(view) - first
+        if rest:
+            self._buffer[:rest] = view[first:]
+        self._position = (self._position + len(view)) % self._capacity
+        self._filled = min(self._filled + len(view), self._capacity)
+
+    def snapshot(self) -> bytes:
+        """保持している音声を古い順に連結して返す"""
+        if self._filled < self._capacity:
+            return bytes(self._buffer[:self._filled])
+        return bytes(self._buffer[self._position:]) + bytes(self._buffer[:self._position])
+
+    def clear(self) -> None:
+        self._position = 0
+        self._filled = 0
+
+
+def join_frames(frames: Sequence[AudioChunk]) -> AudioChunk:
+    """フレーム列を連続したバイト列にする。単一バッファの場合はコピーしない"""
+    if len(frames) == 1:
+        return frames[0]
+    return b''.join(frames)
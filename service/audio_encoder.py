@@ -0,0 +1,66 @@
+import io
+import logging
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from service.audio_buffer import AudioChunk
+from service.audio_recorder import SAMPLE_WIDTH
+from service.wav_io import WavPayload
+
+try:
+    import soundfile
+except (ImportError, OSError):
+    soundfile = None
+
+
+class EncodedAudio(NamedTuple):
+    data: bytes | io.IOBase
+    extension: str
+    size: int
+
+
+AudioEncoder = Callable[[AudioChunk, int, int], EncodedAudio]
+
+
+def encode_wav(pcm: AudioChunk, sample_rate: int, channels: int) -> EncodedAudio:
+    """PCMをコピーせずにWAVとして送信できる形にする"""
+    payload = WavPayload(pcm, sample_rate, channels, SAMPLE_WIDTH)
+    return EncodedAudio(payload, '.wav', len(payload))
+
+
+def encode_flac(pcm: AudioChunk, sample_rate: int, channels: int) -> EncodedAudio:
+    """16bit PCMを可逆圧縮のFLACへ変換する"""
+    if soundfile is None:
+        raise RuntimeError('FLACエンコードにはsoundfileが必要です')
+    samples = np.frombuffer(pcm, dtype='<i2')
+    if channels > 1:
+        samples = samples[:samples.shape[0] - samples.shape[0] % channels].reshape(-1, channels)
+    output = io.BytesIO()
+    soundfile.write(output, samples, sample_rate, format='FLAC', subtype='PCM_16')
+    data = output.getvalue()
+    return EncodedAudio(data, '.flac', len(data))
+
+
+ENCODERS: dict[str, AudioEncoder] = {
+    'wav': encode_wav,
+    'flac': encode_flac,
+}
+
+
+def is_encoder_available(name: str) -> bool:
+    if name == 'flac':
+        return soundfile is not None
+    return name in ENCODERS
+
+
+def get_encoder(name: str) -> AudioEncoder:
+    """設定名に対応するエンコーダーを返す。利用できない場合はWAVにフォールバックする"""
+    key = name.strip().lower()
+    if key not in ENCODERS:
+        logging.warning(f'未対応のアップロード形式のためWAVを使用します: {name}')
+        return encode_wav
+    if not is_encoder_available(key):
+        logging.warning(f'{key}エンコーダーが利用できないためWAVを使用します')
+        return encode_wav
+    return ENCODERS[key]
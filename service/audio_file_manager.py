@@ -1,12 +1,15 @@
 import glob
 import logging
 import os
+import threading
 import wave
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Optional, Sequence
 
 import pyaudio
 
+from service.audio_buffer import AudioChunk, join_frames
+from service.wav_io import StreamingWavWriter
 from utils.app_config import AppConfig
 
 
@@ -16,7 +19,7 @@ class AudioFileManager:
     def __init__(self, config: AppConfig):
         self._config = config
 
-    def save_audio(self, frames: List[bytes], sample_rate: int) -> Optional[str]:
+    def save_audio(self, frames: Sequence[AudioChunk], sample_rate: int) -> Optional[str]:
         """音声フレームをWAVファイルとして保存しパスを返す"""
         try:
             temp_dir = self._config.temp_dir
@@ -27,9 +30,9 @@ class AudioFileManager:
 
             with wave.open(temp_path, 'wb') as wf:
                 wf.setnchannels(self._config.audio_channels)
-                wf.setsampwidth(pyaudio.PyAudio().get_sample_size(pyaudio.paInt16))
+                wf.setsampwidth(pyaudio.get_sample_size(pyaudio.paInt16))
                 wf.setframerate(sample_rate)
-                wf.writeframes(b''.join(frames))
+                wf.writeframes(join_frames(frames))
 
             logging.info(f'音声ファイル保存完了: {temp_path}')
             return temp_path
@@ -38,6 +41,37 @@ class AudioFileManager:
             logging.error(f'音声ファイル保存エラー: {str(e)}')
             return None
 
+    def save_audio_in_background(self, frames: Sequence[AudioChunk], sample_rate: int) -> threading.Thread:
+        """音声再読込用のWAVファイルを別スレッドで保存する"""
+        thread = threading.Thread(
+            target=self.save_audio,
+            args=(frames, sample_rate),
+            daemon=True,
+            name='AudioFileSave'
+        )
+        thread.start()
+        return thread
+
+    def open_stream_writer(self, sample_rate: int) -> Optional[StreamingWavWriter]:
+        """録音と並行して書き込むWAVファイルを開く"""
+        try:
+            temp_dir = self._config.temp_dir
+            os.makedirs(temp_dir, exist_ok=True)
+
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            temp_path = os.path.join(temp_dir, f'recording_{timestamp}.wav')
+
+            return StreamingWavWriter(
+                temp_path,
+                sample_rate,
+                self._config.audio_channels,
+                pyaudio.get_sample_size(pyaudio.paInt16)
+            )
+
+        except Exception as e:
+            logging.error(f'音声ファイル作成エラー: {str(e)}')
+            return None
+
     def cleanup_temp_files(self) -> None:
         """保存期間を超えた一時ファイルを削除"""
         try:
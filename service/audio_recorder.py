@@ -1,67 +1,292 @@
 import logging
 import os
 import threading
-from typing import List, Optional, Tuple
+import time
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 
 import pyaudio
 
+from service.audio_buffer import AudioChunk, GrowableAudioBuffer, PrerollRingBuffer
 from utils.app_config import AppConfig
 
+SAMPLE_WIDTH = 2
+CAPTURE_MODE_BLOCKING = 'blocking'
+CAPTURE_MODE_CALLBACK = 'callback'
+
 
 class AudioRecorder:
     def __init__(self, config: AppConfig):
         self.sample_rate = config.audio_sample_rate
         self.channels = config.audio_channels
         self.chunk = config.audio_chunk
-        self.frames: List[bytes] = []
+        self.capture_mode = config.audio_capture_mode
+        self.keep_engine_warm = config.keep_audio_engine_warm
+        self.keep_stream_warm = config.keep_audio_stream_warm
+        self.last_start_latency_ms: Optional[float] = None
+        self.frames: List[AudioChunk] = []
         self.is_recording = False
         self.p: Optional[pyaudio.PyAudio] = None
         self.stream: Optional[pyaudio.Stream] = None
         self._stream_lock = threading.Lock()
+        self._engine_lock = threading.Lock()
         self._stop_event = threading.Event()
+        self._capture_buffer: Optional[GrowableAudioBuffer] = None
+        self._chunk_listeners: List[Callable[[AudioChunk], None]] = []
+        self._prealloc_bytes = self.sample_rate * self.channels * SAMPLE_WIDTH * config.auto_stop_timer
 
         os.makedirs(config.temp_dir, exist_ok=True)
 
         self.logger = logging.getLogger(__name__)
 
+        self._preroll: Optional[PrerollRingBuffer] = None
+        self._preroll_lock = threading.Lock()
+        self._capturing = False
+        self._preroll_idle_seconds = 0.0
+        self._preroll_idle_callbacks = 0
+        self._preroll_idle_since = time.perf_counter()
+        self._setup_preroll(config.preroll_seconds)
+
+    def _setup_preroll(self, preroll_seconds: float) -> None:
+        """プリロールはストリームを常時動かすため、コールバック方式とエンジン保持を前提とする"""
+        frame_bytes = self.channels * SAMPLE_WIDTH
+        capacity = int(self.sample_rate * preroll_seconds) * frame_bytes
+        if capacity <= 0:
+            return
+        if not self.uses_callback:
+            self.logger.warning('プリロールにはコールバック方式が必要なため、録音方式をcallbackに切り替えます')
+            self.capture_mode = CAPTURE_MODE_CALLBACK
+        self.keep_engine_warm = True
+        self.keep_stream_warm = True
+        self._preroll = PrerollRingBuffer(capacity)
+
+    @property
+    def preroll_enabled(self) -> bool:
+        return self._preroll is not None
+
+    @property
+    def uses_callback(self) -> bool:
+        return self.capture_mode == CAPTURE_MODE_CALLBACK
+
+    def add_chunk_listener(self, listener: Callable[[AudioChunk], None]) -> None:
+        """録音中のチャンクを録音スレッド上で受け取るリスナーを登録する"""
+        self._chunk_listeners.append(listener)
+
+    def remove_chunk_listener(self, listener: Callable[[AudioChunk], None]) -> None:
+        if listener in self._chunk_listeners:
+            self._chunk_listeners.remove(listener)
+
+    def _notify_chunk_listeners(self, chunk: AudioChunk) -> None:
+        for listener in self._chunk_listeners:
+            try:
+                listener(chunk)
+            except Exception as e:
+                self.logger.error(f'録音チャンクの通知中にエラーが発生しました: {e}')
+
+    def warm_up(self) -> None:
+        """PortAudioを事前に初期化し、設定に応じて一時停止状態のストリームを開いておく"""
+        if not self.keep_engine_warm:
+            return
+        started_at = time.perf_counter()
+        try:
+            with self._engine_lock:
+                self._ensure_engine()
+                if self.keep_stream_warm and self.stream is None:
+                    self.stream = self._open_stream(start=self.preroll_enabled)
+                    self._preroll_idle_since = time.perf_counter()
+            self.logger.info(f'音声エンジンを初期化しました: {(time.perf_counter() - started_at) * 1000:.1f} ms')
+        except Exception as e:
+            self.logger.error(f'音声エンジンの初期化中にエラーが発生しました: {e}')
+
     def start_recording(self) -> None:
+        started_at = time.perf_counter()
         self._stop_event.clear()
         self.is_recording = True
         self.frames = []
+        if self.uses_callback:
+            self._capture_buffer = GrowableAudioBuffer(self._prealloc_bytes)
         try:
-            self.p = pyaudio.PyAudio()
-            self.stream = self.p.open(
-                format=pyaudio.paInt16,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=self.chunk,
-            )
+            with self._engine_lock:
+                reused = self._start_stream()
+            if self.preroll_enabled:
+                self._begin_capture_with_preroll()
+            self._log_start_latency(started_at, reused)
             self.logger.info('音声入力を開始しました。')
         except Exception as e:
             self.logger.error(f'音声入力の開始中に予期せぬエラーが発生しました: {e}')
 
-    def stop_recording(self) -> Tuple[List[bytes], int]:
+    def _start_stream(self) -> bool:
+        """ストリームを開始し、初期化済みのエンジンを再利用できたかを返す"""
+        if not self.keep_engine_warm:
+            self.p = pyaudio.PyAudio()
+            self.stream = self._open_stream()
+            return False
+
+        reused = self.p is not None
+        try:
+            self._ensure_engine()
+            if self.preroll_enabled and self.stream is not None:
+                if not self.stream.is_active():
+                    self.stream.start_stream()
+            elif self.keep_stream_warm and self.stream is not None:
+                self.stream.start_stream()
+            else:
+                self.stream = self._open_stream()
+        except Exception as e:
+            if not reused:
+                raise
+            # デバイス構成の変化などで保持中のエンジンが使えない場合は一度だけ作り直す
+            self.logger.warning(f'保持中の音声エンジンを再初期化します: {e}')
+            self._release_engine()
+            self._ensure_engine()
+            self.stream = self._open_stream()
+            reused = False
+        return reused
+
+    def _ensure_engine(self) -> pyaudio.PyAudio:
+        if self.p is None:
+            self.p = pyaudio.PyAudio()
+        return self.p
+
+    def _open_stream(self, start: bool = True) -> pyaudio.Stream:
+        assert self.p is not None
+        stream_options: dict[str, Any] = {}
+        if self.uses_callback:
+            stream_options['stream_callback'] = self._stream_callback
+        if not start:
+            stream_options['start'] = False
+        return self.p.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=self.chunk,
+            **stream_options,
+        )
+
+    def _begin_capture_with_preroll(self) -> None:
+        """循環バッファの内容を録音バッファの先頭に移し、書き込み先を切り替える"""
+        assert self._preroll is not None and self._capture_buffer is not None
+        with self._preroll_lock:
+            preroll = self._preroll.snapshot()
+            self._preroll.clear()
+            self._capture_buffer.write(preroll)
+            if preroll:
+                self._notify_chunk_listeners(preroll)
+            self._capturing = True
+        self._log_preroll_stats(len(preroll))
+
+    def preroll_stats(self) -> dict[str, float]:
+        """待機中プリロールのメモリ使用量とコールバック処理コストを返す"""
+        elapsed = max(time.perf_counter() - self._preroll_idle_since, 1e-9)
+        callbacks = self._preroll_idle_callbacks
+        return {
+            'buffer_bytes': float(self._preroll.capacity if self._preroll is not None else 0),
+            'idle_callbacks': float(callbacks),
+            'avg_callback_us': self._preroll_idle_seconds / callbacks * 1e6 if callbacks else 0.0,
+            'cpu_percent': self._preroll_idle_seconds / elapsed * 100,
+        }
+
+    def _log_preroll_stats(self, preroll_bytes: int) -> None:
+        stats = self.preroll_stats()
+        bytes_per_second = self.sample_rate * self.channels * SAMPLE_WIDTH
+        self.logger.info(
+            f'プリロール付加: {preroll_bytes / bytes_per_second * 1000:.0f} ms '
+            f'(バッファ {stats["buffer_bytes"]:.0f} bytes / 待機中コールバック平均 {stats["avg_callback_us"]:.1f} µs / '
+            f'CPU {stats["cpu_percent"]:.3f}%)'
+        )
+        self._preroll_idle_seconds = 0.0
+        self._preroll_idle_callbacks = 0
+
+    def _log_start_latency(self, started_at: float, reused: bool) -> None:
+        self.last_start_latency_ms = (time.perf_counter() - started_at) * 1000
+        engine_state = '再利用' if reused else '新規初期化'
+        self.logger.info(f'録音開始レイテンシ: {self.last_start_latency_ms:.1f} ms (音声エンジン{engine_state})')
+
+    def stop_recording(self) -> Tuple[Sequence[AudioChunk], int]:
         self.is_recording = False
         self._stop_event.set()
+        if self.preroll_enabled:
+            # ストリームは止めずに書き込み先を循環バッファへ戻す
+            with self._preroll_lock:
+                self._capturing = False
+            self._preroll_idle_since = time.perf_counter()
+        else:
+            self._close_stream_after_recording()
+
+        if self._capture_buffer is not None:
+            self.frames = [self._capture_buffer.detach()]
+            self._capture_buffer = None
+
+        self.logger.info('音声入力を停止しました。')
+        return self.frames, self.sample_rate
+
+    def _close_stream_after_recording(self) -> None:
         with self._stream_lock:
             try:
                 if self.stream:
                     self.stream.stop_stream()
-                    self.stream.close()
+                    if not (self.keep_engine_warm and self.keep_stream_warm):
+                        self.stream.close()
             except Exception as e:
                 self.logger.error(f'音声入力の停止中に予期せぬエラーが発生しました: {e}')
 
+        if not self.keep_engine_warm:
+            try:
+                if self.p:
+                    self.p.terminate()
+            except Exception as e:
+                self.logger.error(f'PyAudio終了中に予期せぬエラーが発生しました: {e}')
+
+    def close(self) -> None:
+        """保持している音声エンジンとストリームを解放する"""
+        with self._engine_lock:
+            self._release_engine()
+
+    def _release_engine(self) -> None:
+        try:
+            if self.stream:
+                self.stream.close()
+        except Exception as e:
+            self.logger.error(f'音声入力の停止中に予期せぬエラーが発生しました: {e}')
+        self.stream = None
+
         try:
             if self.p:
                 self.p.terminate()
         except Exception as e:
             self.logger.error(f'PyAudio終了中に予期せぬエラーが発生しました: {e}')
+        self.p = None
 
-        self.logger.info('音声入力を停止しました。')
-        return self.frames, self.sample_rate
+    def _stream_callback(self, in_data: Optional[bytes], frame_count: int, time_info: Any, status: int):
+        """PortAudioのコールバックスレッドで呼ばれ、チャンクを連続バッファへ書き込む"""
+        if self._preroll is not None:
+            return self._preroll_callback(in_data)
+        if self._stop_event.is_set():
+            return None, pyaudio.paComplete
+        if in_data and self._capture_buffer is not None:
+            self._capture_buffer.write(in_data)
+            self._notify_chunk_listeners(in_data)
+        return None, pyaudio.paContinue
+
+    def _preroll_callback(self, in_data: Optional[bytes]):
+        if not in_data:
+            return None, pyaudio.paContinue
+        with self._preroll_lock:
+            if self._capturing and self._capture_buffer is not None:
+                self._capture_buffer.write(in_data)
+                self._notify_chunk_listeners(in_data)
+            elif self._preroll is not None:
+                started_at = time.perf_counter()
+                self._preroll.write(in_data)
+                self._preroll_idle_seconds += time.perf_counter() - started_at
+                self._preroll_idle_callbacks += 1
+        return None, pyaudio.paContinue
 
     def record(self) -> None:
+        if self.uses_callback:
+            self._wait_for_callback_stream()
+            return
+
         while not self._stop_event.is_set():
             try:
                 if self.stream is None:
@@ -71,6 +296,7 @@ class AudioRecorder:
                         break
                     data = self.stream.read(self.chunk, exception_on_overflow=False)
                 self.frames.append(data)
+                self._notify_chunk_listeners(data)
             except AttributeError:
                 self.logger.error('音声入力中にストリーム初期化エラーが発生しました')
                 raise
@@ -78,3 +304,21 @@ class AudioRecorder:
                 self.logger.error(f'音声入力中に予期せぬエラーが発生しました: {e}')
                 self.is_recording = False
                 break
+
+    def _wait_for_callback_stream(self) -> None:
+        """コールバック方式ではストリームの生存のみを監視する"""
+        if self.stream is None:
+            self.logger.error('音声入力中にストリーム初期化エラーが発生しました')
+            raise AttributeError('ストリームが初期化されていません')
+
+        while not self._stop_event.wait(0.1):
+            try:
+                with self._stream_lock:
+                    if self._stop_event.is_set():
+                        break
+                    if not self.stream.is_active():
+                        raise OSError('ストリームが停止しました')
+            except Exception as e:
+                self.logger.error(f'音声入力中に予期せぬエラーが発生しました: {e}')
+                self.is_recording = False
+                break
@@ -0,0 +1,172 @@
+import asyncio
+import functools
+import logging
+from typing import Any, Callable, Optional
+
+from external_service.elevenlabs_api import (
+    AdaptiveTimeout,
+    CircuitBreaker,
+    HedgingPolicy,
+    TranscriptionNetworkError,
+    api_address,
+    check_connectivity,
+    transcribe_audio_data_async,
+)
+from external_service.stt_backend import (
+    CircuitBreakerBackend,
+    ElevenLabsBackend,
+    FallbackBackend,
+    LocalWhisperBackend,
+    SpeechToTextBackend,
+    is_local_backend_available,
+)
+from utils.app_config import AppConfig
+
+
+class BackendChain:
+    """文字起こしの送信先を設定に従って組み立てる
+
+    APIへの送信に追加送信とタイムアウトの方針を付け、回路遮断器とローカル音声認識への切り替えで包む。
+    同期の送信はbackend、非同期クライアントの送信はtranscribe_data_asyncを使う。
+    """
+
+    def __init__(
+            self,
+            config: AppConfig,
+            client: Any,
+            async_client: Any = None,
+            backend: Optional[SpeechToTextBackend] = None,
+            is_cancelled: Callable[[], bool] = lambda: False
+    ):
+        """is_cancelledがTrueを返す間の通信エラーはキャンセルによる遮断として回路遮断器の障害に数えない"""
+        self.config = config
+        self.async_client = async_client
+        self._is_cancelled = is_cancelled
+        self.transcribe_audio_data_async_func = transcribe_audio_data_async
+        self.hedging: Optional[HedgingPolicy] = None
+        if config.hedge_enabled:
+            self.hedging = HedgingPolicy(
+                config.hedge_percentile,
+                config.hedge_min_samples,
+                config.hedge_max_per_minute,
+                config.hedge_min_delay_seconds
+            )
+        self.timeouts: Optional[AdaptiveTimeout] = None
+        if config.adaptive_timeout:
+            self.timeouts = AdaptiveTimeout(
+                config.timeout_min_seconds,
+                config.timeout_max_seconds,
+                config.timeout_margin
+            )
+            self.transcribe_audio_data_async_func = functools.partial(
+                transcribe_audio_data_async, timeouts=self.timeouts
+            )
+        self.backend: SpeechToTextBackend = backend or ElevenLabsBackend(config, client, self.hedging, self.timeouts)
+        self.circuit_breaker: Optional[CircuitBreaker] = None
+        if config.circuit_breaker:
+            self.circuit_breaker = CircuitBreaker(
+                config.breaker_failure_threshold,
+                config.breaker_window_seconds,
+                config.breaker_reset_seconds,
+                functools.partial(check_connectivity, *api_address(config.elevenlabs_base_url))
+            )
+            self.backend = CircuitBreakerBackend(self.backend, self.circuit_breaker, is_cancelled)
+        self.offline_backend = self._create_offline_backend(config)
+        if self.offline_backend is not None:
+            self.backend = FallbackBackend(self.backend, self.offline_backend)
+
+    @staticmethod
+    def _create_offline_backend(config: AppConfig) -> Optional[LocalWhisperBackend]:
+        if not config.offline_enabled:
+            return None
+        if not is_local_backend_available():
+            logging.warning('faster-whisperが見つからないため、ローカル音声認識を使用しません')
+            return None
+        backend = LocalWhisperBackend.from_config(config)
+        backend.load_in_background()
+        return backend
+
+    @property
+    def used_fallback(self) -> bool:
+        """このスレッドの直前の同期の送信をローカル音声認識で行ったか"""
+        return isinstance(self.backend, FallbackBackend) and self.backend.used_fallback
+
+    async def transcribe_data_async(self, audio: Any, file_name: str) -> tuple[Optional[str], bool]:
+        """非同期クライアントで送信し、結果とローカル音声認識で文字起こししたかを返す
+
+        同じスレッドで複数の送信が並行するため、used_fallbackではなく戻り値で切り替えを伝える。
+        """
+        try:
+            return await self.send_async(audio, file_name), False
+        except TranscriptionNetworkError as e:
+            if self.offline_backend is None:
+                raise
+            logging.warning(f'APIに接続できないためローカル音声認識で文字起こしします: {str(e)}')
+            try:
+                return await asyncio.to_thread(self.offline_backend.transcribe_data, audio, file_name), True
+            except Exception as offline_error:
+                # ローカル音声認識でも失敗した場合は通信障害として再送信キューに回す
+                logging.error(f'ローカル音声認識での文字起こしに失敗しました: {str(offline_error)}')
+                raise e from offline_error
+
+    async def send_async(self, audio: Any, file_name: str) -> Optional[str]:
+        """非同期クライアントで送信する。回路遮断器があれば同期の送信と同じく障害を記録する"""
+        if self.circuit_breaker is None:
+            return await self.transcribe_audio_data_async_func(audio, file_name, self.config, self.async_client)
+        self.circuit_breaker.before_request()
+        try:
+            transcription = await self.transcribe_audio_data_async_func(
+                audio, file_name, self.config, self.async_client
+            )
+        except asyncio.CancelledError:
+            self.circuit_breaker.release()
+            raise
+        except TranscriptionNetworkError:
+            if self._is_cancelled():
+                self.circuit_breaker.release()
+            else:
+                self.circuit_breaker.record_failure()
+            raise
+        except Exception:
+            self.circuit_breaker.record_success()
+            raise
+        self.circuit_breaker.record_success()
+        return transcription
+
+    def api_status(self, retry_enabled: bool) -> Optional[str]:
+        """送信を停止中または再開を確認中ならステータス表示に添える説明を返す"""
+        if self.circuit_breaker is None:
+            return None
+        state = self.circuit_breaker.state
+        if state == CircuitBreaker.HALF_OPEN:
+            return 'API接続を確認中'
+        if state != CircuitBreaker.OPEN:
+            return None
+        if self.offline_backend is not None:
+            return 'API停止中: ローカル音声認識で処理'
+        if retry_enabled:
+            return 'API停止中: 回復後に自動で再送信'
+        return 'API停止中'
+
+    def add_status_listener(self, listener: Callable[[], None]) -> None:
+        """送信の停止・再開時に呼ばれる。送信したスレッドや接続確認のスレッドから呼ばれる"""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.add_listener(lambda _state: listener())
+
+    def metrics(self) -> dict[str, float]:
+        """追加送信・タイムアウト・回路遮断・ローカル音声認識の状況を、それぞれの接頭辞を付けて返す"""
+        metrics: dict[str, float] = {}
+        if self.hedging is not None:
+            metrics.update({f'hedge_{key}': value for key, value in self.hedging.metrics().items()})
+        if self.timeouts is not None:
+            metrics.update({f'timeout_{key}': value for key, value in self.timeouts.metrics().items()})
+        if self.circuit_breaker is not None:
+            metrics.update({f'breaker_{key}': value for key, value in self.circuit_breaker.metrics().items()})
+        if self.offline_backend is not None:
+            metrics.update({f'offline_{key}': value for key, value in self.offline_backend.metrics().items()})
+        return metrics
+
+    def stop(self) -> None:
+        """送信再開のための接続確認を止める"""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.stop()
@@ -1,23 +1,41 @@
 import logging
 import threading
 import time
-from typing import Dict
+from typing import Mapping
 
 import pyperclip
 
 from service.paste_backend import is_paste_available, safe_clipboard_copy, safe_paste_text
-from service.text_transformer import replace_text
+from service.text_pipeline import TextPipeline
 from utils.app_config import AppConfig
 
 
 class ClipboardManager:
     """クリップボード操作とペースト処理を管理する"""
 
-    def __init__(self, config: AppConfig, replacements: Dict[str, str]):
+    def __init__(self, config: AppConfig, replacements: Mapping[str, str]):
         self._config = config
-        self._replacements = replacements
+        self.text_pipeline = TextPipeline(
+            replacements, config.use_punctuation, config.normalize_width, config.normalize_numerals
+        )
         self._clipboard_lock = threading.Lock()
 
+    @property
+    def replacements(self) -> Mapping[str, str]:
+        return self.text_pipeline.replacements
+
+    def update_replacements(self, replacements: Mapping[str, str]) -> None:
+        """構築済みの置換テーブルに差し替える。置換中の処理は差し替え前のテーブルを最後まで使う"""
+        self.text_pipeline.update_replacements(replacements)
+
+    @property
+    def use_punctuation(self) -> bool:
+        return self.text_pipeline.use_punctuation
+
+    @use_punctuation.setter
+    def use_punctuation(self, value: bool) -> None:
+        self.text_pipeline.use_punctuation = value
+
     def initialize(self) -> bool:
         """クリップボード機能を初期化してテストする"""
         try:
@@ -34,7 +52,7 @@ class ClipboardManager:
             return False
 
     def copy_and_paste(self, text: str) -> None:
-        """テキストを置換してクリップボードにコピーしバックグラウンドでペーストする"""
+        """テキストを後処理してクリップボードにコピーしバックグラウンドでペーストする"""
         if not text:
             logging.warning('空のテキスト')
             return
@@ -47,12 +65,17 @@ class ClipboardManager:
         )
         thread.start()
 
+    def copy(self, text: str) -> bool:
+        """テキストを後処理してクリップボードにコピーする。貼り付けは行わない"""
+        replaced_text = self.text_pipeline.run(text)
+        return bool(replaced_text) and safe_clipboard_copy(replaced_text)
+
     def _paste_in_thread(self, text: str) -> None:
-        """バックグラウンドスレッドで置換→クリップボードコピー→ペーストを実行"""
+        """バックグラウンドスレッドで後処理→クリップボードコピー→ペーストを実行"""
         try:
             logging.debug('_paste_in_thread開始')
 
-            replaced_text = replace_text(text, self._replacements)
+            replaced_text = self.text_pipeline.run(text)
             if not replaced_text:
                 logging.error('テキスト置換結果が空です')
                 return
@@ -1,6 +1,8 @@
+import ctypes
 import logging
 import time
 import traceback
+from typing import Optional
 
 import keyboard
 import pyperclip
@@ -74,3 +76,15 @@ def is_paste_available() -> bool:
     except Exception as e:
         logger.error(f"貼り付け機能利用不可: {e}")
         return False
+
+
+def get_foreground_window() -> Optional[int]:
+    """最前面のウィンドウハンドルを返す。Windows以外ではNone"""
+    windll = getattr(ctypes, 'windll', None)
+    if windll is None:
+        return None
+    try:
+        return windll.user32.GetForegroundWindow() or None
+    except Exception as e:
+        logger.debug(f"最前面ウィンドウの取得に失敗: {e}")
+        return None
@@ -1,16 +1,22 @@
 import logging
 import os
 import threading
-import time
 import tkinter as tk
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
 
 from app.ui_queue_processor import UIQueueProcessor
+from external_service.http_connection import ConnectionWarmer
+from service.audio_buffer import AudioChunk
 from service.audio_file_manager import AudioFileManager
 from service.audio_recorder import AudioRecorder
 from service.clipboard_manager import ClipboardManager
+from service.paste_backend import get_foreground_window
 from service.recording_timer import RecordingTimer
+from service.retry_queue import RetryJob
+from service.segment_pipeline import SegmentPipeline
 from service.transcription_handler import TranscriptionHandler
+from service.voice_activity import StreamingEndpointDetector
+from service.wav_io import StreamingWavWriter
 from utils.app_config import AppConfig
 
 
@@ -26,7 +32,8 @@ class RecordingLifecycle:
             transcription_handler: TranscriptionHandler,
             clipboard_manager: ClipboardManager,
             ui_processor: UIQueueProcessor,
-            notification_callback: Callable
+            notification_callback: Callable,
+            connection_warmer: Optional[ConnectionWarmer] = None
     ):
         self.master = master
         self.config = config
@@ -36,6 +43,7 @@ class RecordingLifecycle:
         self.clipboard_manager = clipboard_manager
         self.ui_processor = ui_processor
         self.show_notification = notification_callback
+        self.connection_warmer = connection_warmer
 
         self._ui_callbacks: Dict[str, Callable] = {}
 
@@ -48,7 +56,24 @@ class RecordingLifecycle:
             self._stop_recording_process
         )
 
+        self._stream_writer: Optional[StreamingWavWriter] = None
+        self._segment_pipeline: Optional[SegmentPipeline] = None
+        self._processing_check_scheduled = False
+        self._endpoint_detector: Optional[StreamingEndpointDetector] = None
+        if config.endpoint_silence_ms > 0:
+            self._endpoint_detector = StreamingEndpointDetector(
+                config.audio_sample_rate,
+                config.audio_channels,
+                config.vad_threshold_db,
+                config.endpoint_min_speech_ms,
+                config.endpoint_silence_ms
+            )
+
         self.audio_file_manager.cleanup_temp_files()
+        self.transcription_handler.start_retry_queue(self._on_retry_result)
+        self.transcription_handler.add_api_status_listener(
+            lambda: self.ui_processor.schedule_callback(self._refresh_idle_status)
+        )
 
     def wire_ui_callbacks(
             self,
@@ -61,14 +86,29 @@ class RecordingLifecycle:
             'update_status_label': update_status_label,
         }
 
+    def _idle_status(self) -> str:
+        """待機中のステータス表示。APIへの送信を停止中ならその旨を添える"""
+        status = f'{self.config.toggle_recording_key}キーで音声入力開始/停止'
+        api_status = self.transcription_handler.api_status()
+        if api_status:
+            status += f'\n{api_status}'
+        return status
+
+    def _refresh_idle_status(self) -> None:
+        """送信の停止・再開に合わせて待機中のステータス表示を更新する"""
+        if self.recorder.is_recording or self.transcription_handler.is_processing:
+            return
+        try:
+            self._ui_callbacks['update_status_label'](self._idle_status())
+        except Exception as e:
+            logging.error(f'ステータス表示の更新中にエラー: {str(e)}')
+
     def _handle_error(self, error_msg: str) -> None:
         """エラーを処理してUIに反映する"""
         try:
             if self.ui_processor.is_ui_valid():
                 self.show_notification('エラー', error_msg)
-                self._ui_callbacks['update_status_label'](
-                    f'{self.config.toggle_recording_key}キーで音声入力開始/停止'
-                )
+                self._ui_callbacks['update_status_label'](self._idle_status())
                 self._ui_callbacks['update_record_button'](False)
                 if self.recorder.is_recording:
                     self.recorder.stop_recording()
@@ -96,11 +136,21 @@ class RecordingLifecycle:
             self.stop_recording()
 
     def start_recording(self) -> None:
-        if (self.transcription_handler.processing_thread and
-                self.transcription_handler.processing_thread.is_alive()):
-            raise RuntimeError('前回の処理が完了していません')
+        if not self.transcription_handler.can_accept_job():
+            raise RuntimeError('文字起こし待ちが上限に達しています')
 
         self.transcription_handler.reset_cancel()
+        if self.connection_warmer is not None and self.config.warmup_on_record:
+            # 話している間に接続を確立しておき、停止後の送信で接続確立を待たない
+            self.connection_warmer.warm_async()
+        if self._endpoint_detector is not None:
+            self._endpoint_detector.reset()
+            self.recorder.add_chunk_listener(self._on_audio_chunk)
+        if self.config.stream_to_disk:
+            self._open_stream_writer()
+        if self.config.segment_transcription:
+            self._segment_pipeline = self.transcription_handler.create_segment_pipeline()
+            self.recorder.add_chunk_listener(self._segment_pipeline.feed)
         self.recorder.start_recording()
         self._ui_callbacks['update_record_button'](True)
         self._ui_callbacks['update_status_label'](
@@ -112,6 +162,19 @@ class RecordingLifecycle:
 
         self.recording_timer.start()
 
+    def _open_stream_writer(self) -> None:
+        """録音開始前にWAVファイルを開き、チャンクを逐次書き込む"""
+        self._stream_writer = self.audio_file_manager.open_stream_writer(self.config.audio_sample_rate)
+        if self._stream_writer is not None:
+            self.recorder.add_chunk_listener(self._stream_writer.write)
+
+    def _close_stream_writer(self) -> Optional[str]:
+        writer, self._stream_writer = self._stream_writer, None
+        if writer is None:
+            return None
+        self.recorder.remove_chunk_listener(writer.write)
+        return writer.close()
+
     def _safe_record(self) -> None:
         try:
             self.recorder.record()
@@ -123,6 +186,17 @@ class RecordingLifecycle:
             except Exception:
                 pass
 
+    def _on_audio_chunk(self, chunk: AudioChunk) -> None:
+        """録音スレッド上で終話を判定し、検出したらUIスレッドで停止する"""
+        if self._endpoint_detector is not None and self._endpoint_detector.feed(chunk):
+            self.ui_processor.schedule_callback(self._stop_on_endpoint)
+
+    def _stop_on_endpoint(self) -> None:
+        if not self.recorder.is_recording:
+            return
+        logging.info(f'{self.config.endpoint_silence_ms} msの無音を検出したため音声入力を停止します')
+        self.stop_recording()
+
     def stop_recording(self) -> None:
         try:
             self.recording_timer.cancel()
@@ -133,44 +207,51 @@ class RecordingLifecycle:
     def _stop_recording_process(self) -> None:
         """録音停止後の文字起こし処理を開始する"""
         try:
+            self.recorder.remove_chunk_listener(self._on_audio_chunk)
             frames, sample_rate = self.recorder.stop_recording()
+            audio_path = self._close_stream_writer()
             logging.info('音声データを取得しました')
 
             self._ui_callbacks['update_record_button'](False)
             self._ui_callbacks['update_status_label']('テキスト出力中...')
 
-            self.transcription_handler.processing_thread = threading.Thread(
-                target=self.transcription_handler.transcribe_frames,
-                args=(frames, sample_rate, self._safe_ui_update, self._safe_error_handler),
-                daemon=True
-            )
-            self.transcription_handler.processing_thread.start()
-
-            if self.ui_processor.is_ui_valid():
-                self.master.after(
-                    100,
-                    self._check_process_thread,
-                    self.transcription_handler.processing_thread
+            pipeline, self._segment_pipeline = self._segment_pipeline, None
+            if pipeline is not None:
+                self.recorder.remove_chunk_listener(pipeline.feed)
+                self.transcription_handler.submit_segments(
+                    pipeline, frames, sample_rate, self._safe_ui_update, self._safe_error_handler, audio_path
+                )
+            else:
+                self.transcription_handler.submit_frames(
+                    frames, sample_rate, self._safe_ui_update, self._safe_error_handler, audio_path
                 )
+
+            self._schedule_processing_check()
         except Exception as e:
             logging.error(f'録音停止処理中にエラー: {str(e)}')
             self._safe_error_handler(f'録音停止処理中にエラー: {str(e)}')
 
-    def _check_process_thread(self, thread: threading.Thread) -> None:
-        """処理スレッドの完了を監視し完了後にステータスを更新する"""
+    def _schedule_processing_check(self) -> None:
+        if self._processing_check_scheduled or not self.ui_processor.is_ui_valid():
+            return
+        self._processing_check_scheduled = True
+        self.master.after(100, self._check_processing)
+
+    def _check_processing(self) -> None:
+        """文字起こしジョブの完了を監視し、すべて完了したらステータスを戻す"""
+        self._processing_check_scheduled = False
         try:
-            if not thread.is_alive():
-                self._ui_callbacks['update_status_label'](
-                    f'{self.config.toggle_recording_key}キーで音声入力開始/停止'
-                )
-                self.transcription_handler.processing_thread = None
+            if not self.transcription_handler.is_processing:
+                if not self.recorder.is_recording:
+                    self._ui_callbacks['update_status_label'](self._idle_status())
                 return
 
-            self._ui_callbacks['update_status_label']('テキスト出力中...')
-            if self.ui_processor.is_ui_valid():
-                self.master.after(100, self._check_process_thread, thread)
+            # 次の録音中は録音中の表示を上書きしない
+            if not self.recorder.is_recording:
+                self._ui_callbacks['update_status_label']('テキスト出力中...')
+            self._schedule_processing_check()
         except Exception as e:
-            logging.error(f'処理スレッドチェック中にエラー: {str(e)}')
+            logging.error(f'処理状況チェック中にエラー: {str(e)}')
 
     def handle_audio_file(self, event: Any) -> None:
         """クリップボードから音声ファイルパスを取得して文字起こしする"""
@@ -190,9 +271,7 @@ class RecordingLifecycle:
         except Exception as e:
             self.show_notification('エラー', str(e))
         finally:
-            self._ui_callbacks['update_status_label'](
-                f'{self.config.toggle_recording_key}キーで音声入力開始/停止'
-            )
+            self._ui_callbacks['update_status_label'](self._idle_status())
 
     def _safe_ui_update(self, text: str) -> None:
         """文字起こし完了後にクリップボードコピーとペーストを実行する"""
@@ -205,29 +284,41 @@ class RecordingLifecycle:
         except Exception as e:
             logging.error(f'UI更新中にエラー: {str(e)}')
 
+    def _on_retry_result(self, job: RetryJob, text: str) -> None:
+        """再送信スレッドから呼ばれ、UIスレッドで結果を反映する"""
+        self.ui_processor.schedule_callback(self._deliver_retry_result, job, text)
+
+    def _deliver_retry_result(self, job: RetryJob, text: str) -> None:
+        """録音したときのウィンドウが前面にあれば貼り付け、なければクリップボードにコピーして通知する"""
+        if job.target_window is None or job.target_window == get_foreground_window():
+            logging.info('再送信した文字起こし結果を貼り付けます')
+            self._safe_ui_update(text)
+        elif self.clipboard_manager.copy(text):
+            logging.info('貼り付け先のウィンドウがないため、再送信した文字起こし結果をクリップボードにコピーしました')
+            self.show_notification('文字起こし再送信', '再送信した文字起こし結果をクリップボードにコピーしました')
+        else:
+            logging.error('再送信した文字起こし結果をクリップボードにコピーできませんでした')
+            self.show_notification('エラー', '再送信した文字起こし結果をクリップボードにコピーできませんでした')
+
     def cleanup(self) -> None:
         """リソースをクリーンアップする"""
         try:
             logging.info('RecordingLifecycle クリーンアップ開始')
             self.ui_processor.shutdown()
             self.transcription_handler.cancel()
+            self.transcription_handler.stop_retry_queue()
+            if self.connection_warmer is not None:
+                self.connection_warmer.stop()
 
             if self.recorder.is_recording:
                 self.stop_recording()
 
-            if (self.transcription_handler.processing_thread and
-                    self.transcription_handler.processing_thread.is_alive()):
-                logging.info('処理スレッドの完了を待機中...')
-                for _ in range(50):
-                    if not self.transcription_handler.processing_thread.is_alive():
-                        break
-                    time.sleep(0.1)
-
-                if self.transcription_handler.processing_thread.is_alive():
-                    logging.warning('処理スレッドが強制終了されました')
-                    self.transcription_handler.processing_thread.join(1.0)
+            if not self.transcription_handler.wait_for_processing(timeout=5.0):
+                logging.warning('文字起こしジョブが完了しないまま終了します')
 
             self.recording_timer.cleanup()
+            self._close_stream_writer()
+            self.recorder.close()
             self.audio_file_manager.cleanup_temp_files()
 
         except Exception as e:
@@ -240,4 +331,4 @@ class RecordingLifecycle:
     @use_punctuation.setter
     def use_punctuation(self, value: bool) -> None:
         self._use_punctuation = value
-        self.transcription_handler.use_punctuation = value
+        self.clipboard_manager.use_punctuation = value
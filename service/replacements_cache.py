@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from service.text_transformer import ReplacementMatcher, ReplacementTable, load_replacements, parse_replacements
+
+# 保存する形式やトライ木の構造を変えたら上げる。版の異なるキャッシュは使わずに作り直す
+_CACHE_VERSION = 3
+
+
+class ReplacementsCache:
+    """解釈とトライ木の構築を済ませた置換テーブルを、元ファイルのパス・更新日時・サイズ・ハッシュとともに保存する
+
+    1行目にこれらを記録したヘッダー、2行目にルールとトライ木をJSONで置き、元ファイルと一致する場合だけ本体を復元する。
+    文字列と辞書だけのデータなので読み込みでコードは実行されず、書き換えられても置換ルールファイルの編集と同じ影響にとどまる。
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._save_thread: Optional[threading.Thread] = None
+
+    def load(self, replacements_path: str) -> tuple[ReplacementTable, bool]:
+        """置換テーブルと、それが元ファイルの現在の内容から作られたものかを返す
+
+        元ファイルが変わっていても読めるキャッシュがあれば古いテーブルを返すので、
+        rebuild_in_backgroundで作り直して差し替える。キャッシュがなければ元ファイルから読み込み、
+        キャッシュは別スレッドで保存する。
+        """
+        started_at = time.perf_counter()
+        cached = self._read(replacements_path)
+        if cached is None:
+            try:
+                table, header = self._build(replacements_path)
+            except (OSError, ValueError):
+                # 読み込めない場合のエラー処理と記録は従来の読み込みに任せ、キャッシュは作らない
+                return load_replacements(replacements_path), True
+            logging.info(f'置換ルールを元ファイルから読み込みました: {len(table)}件 '
+                         f'{(time.perf_counter() - started_at) * 1000:.0f} ms')
+            # キャッシュの書き込みで起動を待たせないよう、別スレッドで保存する
+            self._save_thread = threading.Thread(
+                target=self._write, args=(header, table), daemon=True, name='ReplacementsCacheSave'
+            )
+            self._save_thread.start()
+            return table, True
+
+        header, table = cached
+        is_current = self._matches(header, replacements_path)
+        state = '' if is_current else '（元ファイルが変更されているため作り直します）'
+        logging.info(f'置換ルールをキャッシュから読み込みました: {len(table)}件 '
+                     f'{(time.perf_counter() - started_at) * 1000:.0f} ms{state}')
+        return table, is_current
+
+    def rebuild(self, replacements_path: str) -> ReplacementTable:
+        """元ファイルを読み込んで置換テーブルを構築し、キャッシュに保存する。読み込めない場合はOSErrorまたはValueError"""
+        table, header = self._build(replacements_path)
+        self._write(header, table)
+        return table
+
+    def rebuild_in_background(
+            self,
+            replacements_path: str,
+            on_rebuilt: Callable[[ReplacementTable], None]
+    ) -> threading.Thread:
+        def run() -> None:
+            try:
+                table = self.rebuild(replacements_path)
+                logging.info(f'置換ルールのキャッシュを作り直しました: {len(table)}件')
+                on_rebuilt(table)
+            except Exception as e:
+                logging.error(f'置換ルールのキャッシュの作り直し中にエラー: {str(e)}')
+
+        thread = threading.Thread(target=run, daemon=True, name='ReplacementsCacheRebuild')
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _build(replacements_path: str) -> tuple[ReplacementTable, dict[str, Any]]:
+        with open(replacements_path, 'rb') as f:
+            data = f.read()
+            stat = os.fstat(f.fileno())
+        replacements = parse_replacements(data.decode('utf-8').splitlines())
+        logging.info(f'置換ルールの総数: {len(replacements)}')
+        header = {
+            'version': _CACHE_VERSION,
+            'path': os.path.abspath(replacements_path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': hashlib.sha256(data).hexdigest(),
+        }
+        return ReplacementTable(replacements), header
+
+    def _read(self, replacements_path: str) -> Optional[tuple[dict[str, Any], ReplacementTable]]:
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                if (not isinstance(header, dict) or header.get('version') != _CACHE_VERSION
+                        or header.get('path') != os.path.abspath(replacements_path)):
+                    logging.info('置換ルールのキャッシュの版または元ファイルが異なるため使用しません')
+                    return None
+                body = json.loads(f.readline())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f'置換ルールのキャッシュの読み込みに失敗しました: {e}')
+            return None
+        if not (isinstance(body, list) and len(body) == 3 and isinstance(body[0], list)
+                and isinstance(body[1], list) and len(body[0]) == len(body[1]) and isinstance(body[2], dict)):
+            logging.warning('置換ルールのキャッシュの形式が正しくありません')
+            return None
+        olds, news, trie = body
+        matcher = ReplacementMatcher.from_trie(trie, sum(1 for old in olds if old))
+        return header, ReplacementTable(dict(zip(olds, news)), matcher)
+
+    @staticmethod
+    def _matches(header: dict[str, Any], replacements_path: str) -> bool:
+        try:
+            stat = os.stat(replacements_path)
+        except OSError:
+            # 元ファイルを確認できない場合は最新とみなさず、作り直しに回す
+            return False
+        if stat.st_size != header.get('size'):
+            return False
+        if stat.st_mtime_ns == header.get('mtime_ns'):
+            return True
+        # 更新日時だけが変わった場合（バックアップからの復元など）は内容で判定する
+        try:
+            with open(replacements_path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest() == header.get('sha256')
+        except OSError:
+            return False
+
+    def _write(self, header: dict[str, Any], table: ReplacementTable) -> None:
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_path))
+        try:
+            with self._lock:
+                os.makedirs(cache_dir, exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+                try:
+                    body = [list(table), list(table.values()), table.matcher.trie]
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        f.write(json.dumps(header) + '\n')
+                        f.write(json.dumps(body, ensure_ascii=False, separators=(',', ':')))
+                    os.replace(temp_path, self.cache_path)
+                except BaseException:
+                    os.remove(temp_path)
+                    raise
+        except (OSError, ValueError, RecursionError) as e:
+            logging.error(f'置換ルールのキャッシュの保存に失敗しました: {e}')
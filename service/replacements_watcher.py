@@ -0,0 +1,86 @@
+import logging
+import os
+import threading
+from typing import Callable, Optional
+
+from service.text_transformer import ReplacementTable, read_replacements
+
+FileSignature = tuple[int, int]
+
+
+def _file_signature(path: str) -> Optional[FileSignature]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ReplacementsWatcher:
+    """置換ルールファイルの更新日時とサイズを定期的に確認し、変更されたら読み込み直して渡す
+
+    読み込みとトライ木の構築は監視スレッドで行い、完成した置換テーブルだけをon_reloadに渡す。
+    loaderは読み込めない場合に例外を送出し、その間は現在のルールを使い続けて次の確認で読み込み直す。
+    """
+
+    def __init__(
+            self,
+            path: str,
+            on_reload: Callable[[ReplacementTable], None],
+            interval_seconds: float = 2.0,
+            loader: Callable[[str], ReplacementTable] = read_replacements
+    ):
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.reload_count = 0
+        self._on_reload = on_reload
+        self._loader = loader
+        self._signature = _file_signature(path)
+        self._pending: Optional[FileSignature] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True, name='ReplacementsWatcher')
+        self._thread.start()
+        logging.info(f'置換ルールファイルの監視を開始しました: {self.interval_seconds:g}秒間隔')
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def check(self) -> bool:
+        """変更後のファイルが次の確認まで変わらなければ読み込み直し、読み込み直した場合はTrueを返す"""
+        signature = _file_signature(self.path)
+        if signature is None or signature == self._signature:
+            # 保存の途中などでファイルが一時的に見つからない場合は現在のルールを使い続ける
+            self._pending = None
+            return False
+        if signature != self._pending:
+            # 書き込みの途中で読まないよう、同じ状態が続くことを確認してから読み込む
+            self._pending = signature
+            return False
+
+        try:
+            replacements = self._loader(self.path)
+        except (OSError, ValueError) as e:
+            logging.warning(f'置換ルールファイルを読み込めないため、現在のルールを使い続けます: {e}')
+            return False
+        if _file_signature(self.path) != signature:
+            # 読み込み中にさらに書き換えられた場合は、書き込みが落ち着いた次の確認で読み込み直す
+            return False
+
+        self._signature = signature
+        self._pending = None
+        self.reload_count += 1
+        logging.info(f'置換ルールファイルの変更を反映しました: {len(replacements)}件')
+        self._on_reload(replacements)
+        return True
+
+    def _watch_loop(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                logging.error(f'置換ルールファイルの再読み込み中にエラー: {str(e)}')
@@ -0,0 +1,298 @@
+import functools
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from external_service.elevenlabs_api import api_address, check_connectivity
+from service.audio_buffer import AudioChunk
+from service.audio_recorder import SAMPLE_WIDTH
+from service.wav_io import build_wav_header
+from utils.app_config import AppConfig
+
+_QUEUE_FILE = 'queue.json'
+_HISTORY_FILE = 'history.json'
+
+
+class RetryJob(NamedTuple):
+    job_id: str
+    audio_path: str
+    created_at: float
+    attempts: int
+    next_attempt_at: float
+    target_window: Optional[int]
+
+
+RetryTranscriber = Callable[[str], Optional[str]]
+RetryResultCallback = Callable[[RetryJob, str], None]
+
+
+def backoff_delay(attempts: int, base_seconds: float, max_seconds: float,
+                  jitter: Callable[[], float] = random.random) -> float:
+    """指数バックオフの待ち時間を求める。再送信が同時に集中しないよう後半の半分をランダムにする"""
+    delay = min(max_seconds, base_seconds * 2 ** attempts)
+    return delay / 2 + jitter() * delay / 2
+
+
+def _write_json_atomic(path: str, data) -> None:
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _read_json(path: str, default):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        logging.error(f'ファイルの読み込みに失敗しました: {path}, {e}')
+        return default
+
+
+class RetryHistory:
+    """再送信で得た文字起こし結果を新しい順に保持し、再起動後も参照できるよう保存する"""
+
+    def __init__(self, path: str, max_entries: int = 50):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: List[dict] = _read_json(path, [])
+
+    def add(self, text: str, created_at: float) -> None:
+        with self._lock:
+            self._entries.insert(0, {'text': text, 'created_at': created_at, 'completed_at': time.time()})
+            del self._entries[self.max_entries:]
+            try:
+                _write_json_atomic(self.path, self._entries)
+            except OSError as e:
+                logging.error(f'再送信履歴の保存に失敗しました: {e}')
+
+    def entries(self) -> List[dict]:
+        with self._lock:
+            return list(self._entries)
+
+
+class TranscriptionRetryQueue:
+    """通信障害で失敗した文字起こしをディスクに保存し、接続回復後にバックグラウンドで再送信する"""
+
+    def __init__(
+            self,
+            retry_dir: str,
+            transcribe: RetryTranscriber,
+            probe: Callable[[], bool],
+            base_seconds: float,
+            max_seconds: float,
+            max_attempts: int
+    ):
+        self.retry_dir = retry_dir
+        self._transcribe = transcribe
+        self._probe = probe
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(retry_dir, exist_ok=True)
+        self._queue_file = os.path.join(retry_dir, _QUEUE_FILE)
+        self.history = RetryHistory(os.path.join(retry_dir, _HISTORY_FILE))
+
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, RetryJob] = self._load()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._on_result: Optional[RetryResultCallback] = None
+        if self._jobs:
+            logging.info(f'再送信待ちの文字起こしを{len(self._jobs)}件読み込みました')
+
+    @classmethod
+    def from_config(cls, config: AppConfig, transcribe: RetryTranscriber) -> 'TranscriptionRetryQueue':
+        """送信先のAPIサーバーへの接続で回復を確認するキューを作成する。保存先を作成できない場合はOSError"""
+        return cls(
+            config.retry_dir,
+            transcribe,
+            functools.partial(check_connectivity, *api_address(config.elevenlabs_base_url)),
+            config.retry_base_seconds,
+            config.retry_max_seconds,
+            config.retry_max_attempts
+        )
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def jobs(self) -> List[RetryJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+
+    def enqueue_audio(
+            self,
+            pcm: AudioChunk,
+            sample_rate: int,
+            channels: int,
+            target_window: Optional[int] = None
+    ) -> Optional[RetryJob]:
+        """録音データをWAVとして保存し再送信待ちに追加する"""
+        job_id = uuid.uuid4().hex
+        audio_path = os.path.join(self.retry_dir, f'{job_id}.wav')
+        try:
+            with open(audio_path, 'wb') as f:
+                f.write(build_wav_header(len(memoryview(pcm).cast('B')), sample_rate, channels, SAMPLE_WIDTH))
+                f.write(pcm)
+        except OSError as e:
+            logging.error(f'再送信用の音声ファイル保存に失敗しました: {e}')
+            return None
+        return self._add(job_id, audio_path, target_window)
+
+    def enqueue_file(self, file_path: str, target_window: Optional[int] = None) -> Optional[RetryJob]:
+        """一時ファイルの削除に影響されないよう音声ファイルを複製して再送信待ちに追加する"""
+        job_id = uuid.uuid4().hex
+        audio_path = os.path.join(self.retry_dir, job_id + os.path.splitext(file_path)[1])
+        try:
+            shutil.copyfile(file_path, audio_path)
+        except OSError as e:
+            logging.error(f'再送信用の音声ファイル複製に失敗しました: {e}')
+            return None
+        return self._add(job_id, audio_path, target_window)
+
+    def _add(self, job_id: str, audio_path: str, target_window: Optional[int]) -> RetryJob:
+        now = time.time()
+        job = RetryJob(job_id, audio_path, now, 0,
+                       now + backoff_delay(0, self.base_seconds, self.max_seconds), target_window)
+        with self._lock:
+            self._jobs[job_id] = job
+            self._save()
+        logging.info(f'文字起こしを再送信待ちに追加しました: {audio_path} (待機中 {self.pending_count}件)')
+        self._wake.set()
+        return job
+
+    def start(self, on_result: RetryResultCallback) -> None:
+        """再送信スレッドを開始する。結果は再送信スレッドから通知される"""
+        self._on_result = on_result
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name='TranscriptionRetry')
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """再送信時刻を過ぎたジョブを処理し、成功した件数を返す"""
+        now = time.time() if now is None else now
+        due = [job for job in self.jobs() if job.next_attempt_at <= now]
+        if not due:
+            return 0
+
+        if not self._probe():
+            logging.info(f'API接続を確認できないため再送信を延期します: {len(due)}件')
+            for job in due:
+                self._reschedule(job, job.attempts, now)
+            return 0
+
+        succeeded = 0
+        for job in due:
+            if self._stopped.is_set():
+                break
+            if self._attempt(job, now):
+                succeeded += 1
+        return succeeded
+
+    def _attempt(self, job: RetryJob, now: float) -> bool:
+        if not os.path.exists(job.audio_path):
+            logging.error(f'再送信用の音声ファイルが見つからないため破棄します: {job.audio_path}')
+            self._remove(job)
+            return False
+
+        attempts = job.attempts + 1
+        logging.info(f'文字起こしを再送信します: {job.audio_path} ({attempts}回目)')
+        try:
+            text = self._transcribe(job.audio_path)
+        except Exception as e:
+            logging.warning(f'文字起こしの再送信に失敗しました: {str(e)}')
+            text = None
+
+        if not text:
+            if attempts >= self.max_attempts:
+                logging.error(f'再送信の上限回数に達したため破棄します。音声ファイル: {job.audio_path}')
+                self._remove(job, keep_audio=True)
+            else:
+                self._reschedule(job, attempts, now)
+            return False
+
+        self.history.add(text, job.created_at)
+        self._remove(job)
+        logging.info(f'文字起こしの再送信に成功しました: {len(text)}文字 / '
+                     f'失敗から {time.time() - job.created_at:.0f}秒')
+        if self._on_result is not None:
+            try:
+                self._on_result(job, text)
+            except Exception as e:
+                logging.error(f'再送信結果の通知中にエラー: {str(e)}')
+        return True
+
+    def _reschedule(self, job: RetryJob, attempts: int, now: float) -> None:
+        delay = backoff_delay(attempts, self.base_seconds, self.max_seconds)
+        with self._lock:
+            if job.job_id in self._jobs:
+                self._jobs[job.job_id] = job._replace(attempts=attempts, next_attempt_at=now + delay)
+                self._save()
+
+    def _remove(self, job: RetryJob, keep_audio: bool = False) -> None:
+        with self._lock:
+            self._jobs.pop(job.job_id, None)
+            self._save()
+        if not keep_audio:
+            try:
+                os.remove(job.audio_path)
+            except OSError:
+                pass
+
+    def _next_wait(self) -> Optional[float]:
+        with self._lock:
+            if not self._jobs:
+                return None
+            next_attempt_at = min(job.next_attempt_at for job in self._jobs.values())
+        return max(next_attempt_at - time.time(), 0.0)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self._next_wait())
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.run_pending()
+            except Exception as e:
+                logging.error(f'再送信処理中にエラー: {str(e)}')
+
+    def _load(self) -> Dict[str, RetryJob]:
+        jobs = {}
+        for entry in _read_json(self._queue_file, []):
+            try:
+                job = RetryJob(**entry)
+            except TypeError as e:
+                logging.error(f'再送信待ちの読み込みに失敗しました: {e}')
+                continue
+            jobs[job.job_id] = job
+        return jobs
+
+    def _save(self) -> None:
+        try:
+            _write_json_atomic(self._queue_file, [job._asdict() for job in self._jobs.values()])
+        except OSError as e:
+            logging.error(f'再送信待ちの保存に失敗しました: {e}')
@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from service.audio_buffer import AudioChunk
+from service.voice_activity import StreamingEndpointDetector, frame_energy_db
+from utils.app_config import AppConfig
+
+SegmentTranscriber = Callable[[AudioChunk, int], Optional[str]]
+
+_SPEECH_CHECK_FRAME_MS = 20
+
+
+class SegmentPipeline:
+    """録音中に無音位置で区切った区間を並行して文字起こしし、録音順に連結する"""
+
+    def __init__(
+            self,
+            transcribe_segment: SegmentTranscriber,
+            sample_rate: int,
+            channels: int,
+            threshold_db: float,
+            split_silence_ms: int,
+            min_segment_ms: int,
+            min_speech_ms: int,
+            max_workers: int
+    ):
+        self._transcribe_segment = transcribe_segment
+        self._sample_rate = sample_rate
+        self._channels = channels
+        self._threshold_db = threshold_db
+        self._detector = StreamingEndpointDetector(
+            sample_rate, channels, threshold_db, min_speech_ms, split_silence_ms
+        )
+        self._min_segment_bytes = int(sample_rate * min_segment_ms / 1000) * channels * 2
+        self._slots = threading.Semaphore(max(max_workers, 1))
+        self._buffer = bytearray()
+        self._submitted_bytes = 0
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, config: AppConfig, transcribe_segment: SegmentTranscriber) -> 'SegmentPipeline':
+        return cls(
+            transcribe_segment,
+            config.audio_sample_rate,
+            config.audio_channels,
+            config.vad_threshold_db,
+            config.segment_silence_ms,
+            config.segment_min_ms,
+            config.endpoint_min_speech_ms,
+            config.segment_max_workers
+        )
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._futures)
+
+    def feed(self, chunk: AudioChunk) -> None:
+        """録音スレッドから呼ばれ、区切りを検出したら区間の文字起こしを開始する"""
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer += chunk
+            if not self._detector.feed(chunk):
+                return
+            self._detector.reset()
+            if len(self._buffer) >= self._min_segment_bytes:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+
+    def finish(self, recording: Optional[AudioChunk] = None) -> None:
+        """録音停止後に残りの区間を送信する。録音全体を渡すと取りこぼしなく末尾を切り出す"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if recording is not None:
+                tail: AudioChunk = memoryview(recording).cast('B')[self._submitted_bytes:]
+            else:
+                tail = bytes(self._buffer)
+            self._buffer = bytearray()
+            if not self._futures or self._contains_speech(tail):
+                self._submit(tail)
+
+    def result(self, timeout: Optional[float] = None) -> Optional[str]:
+        """全区間の結果を録音順に連結する。失敗した区間があればNoneを返す"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        texts = []
+        for future in self._futures:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            text = future.result(remaining)
+            if text is None:
+                return None
+            texts.append(text)
+        return ''.join(texts)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._closed = True
+            for future in self._futures:
+                future.cancel()
+
+    def _contains_speech(self, pcm: AudioChunk) -> bool:
+        samples = np.frombuffer(pcm, dtype='<i2')
+        frame_length = max(self._sample_rate * self._channels * _SPEECH_CHECK_FRAME_MS // 1000, 1)
+        return bool((frame_energy_db(samples, frame_length) > self._threshold_db).any())
+
+    def _submit(self, pcm: AudioChunk) -> None:
+        index = len(self._futures)
+        future: Future = Future()
+        self._futures.append(future)
+        self._submitted_bytes += len(pcm)
+        seconds = len(pcm) / (self._sample_rate * self._channels * 2)
+        logging.info(f'区間{index + 1}の文字起こしを開始: {seconds:.1f}秒')
+        threading.Thread(
+            target=self._run_segment,
+            args=(pcm, index, future),
+            daemon=True,
+            name=f'Segment-{index + 1}'
+        ).start()
+
+    def _run_segment(self, pcm: AudioChunk, index: int, future: Future) -> None:
+        with self._slots:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self._transcribe_segment(pcm, index))
+            except Exception as e:
+                logging.error(f'区間{index + 1}の文字起こし中にエラー: {str(e)}')
+                future.set_exception(e)
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from typing import Mapping, NamedTuple, Optional
+
+from service.text_transformer import ReplacementMatcher, ReplacementTable, normalize_numerals
+
+PUNCTUATION_CHARS = '。、'
+# 全角の英数字（０-９、Ａ-Ｚ、ａ-ｚ）を半角にする。全角の記号や括弧は医療文書の表記として残す
+_FULLWIDTH_ALNUM = {
+    code: code - 0xFEE0
+    for start, end in ((0xFF10, 0xFF19), (0xFF21, 0xFF3A), (0xFF41, 0xFF5A))
+    for code in range(start, end + 1)
+}
+
+STAGES = ('translate', 'replace')
+
+
+class PipelinePlan(NamedTuple):
+    """1回の後処理で使う変換表・トライ木。作成後は変更せず、設定や辞書が変わったら作り直す"""
+    translate_table: Optional[dict[int, Optional[int]]]
+    normalize_numerals: bool
+    matcher: Optional[ReplacementMatcher]
+    replacements: Mapping[str, str]
+
+
+def build_plan(
+        replacements: Mapping[str, str],
+        use_punctuation: bool,
+        normalize_width: bool,
+        normalize_numerals: bool = False
+) -> PipelinePlan:
+    """文字単位の削除と変換を1つの変換表に、漢数字の変換と辞書置換のトライ木を1つの処理計画にまとめる"""
+    table: dict[int, Optional[int]] = dict(_FULLWIDTH_ALNUM) if normalize_width else {}
+    if not use_punctuation:
+        table.update(dict.fromkeys(map(ord, PUNCTUATION_CHARS)))
+
+    matcher: Optional[ReplacementMatcher] = None
+    if isinstance(replacements, ReplacementTable):
+        matcher = replacements.matcher
+    elif replacements:
+        matcher = ReplacementMatcher(replacements)
+    return PipelinePlan(
+        table or None, normalize_numerals, matcher if matcher and matcher.rule_count else None, replacements
+    )
+
+
+class TextPipeline:
+    """文字起こし結果の後処理（句読点の削除・文字の正規化・漢数字の変換・辞書置換）を処理計画にまとめて使い回す
+
+    句読点の削除と文字の正規化は1つの変換表でstr.translateを1回だけ、漢数字の変換と辞書置換は
+    トライ木でテキストを1回走査してまとめて行う。
+    漢数字は変換後のテキストに辞書置換を行うため、辞書には「1部,一部」のような変換後の表記を戻すルールだけを置けばよい。
+    処理計画は設定や辞書を変えたときだけ作り直して参照ごと差し替えるため、実行中の処理は作り直しの影響を受けない。
+    """
+
+    def __init__(
+            self,
+            replacements: Mapping[str, str],
+            use_punctuation: bool = True,
+            normalize_width: bool = False,
+            normalize_numerals: bool = False
+    ):
+        self._use_punctuation = use_punctuation
+        self._normalize_width = normalize_width
+        self._normalize_numerals = normalize_numerals
+        self._plan = self._build(replacements)
+        self._plan_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._runs = 0
+        self._total_ms = dict.fromkeys(STAGES, 0.0)
+        self._last_ms = dict.fromkeys(STAGES, 0.0)
+
+    @property
+    def replacements(self) -> Mapping[str, str]:
+        return self._plan.replacements
+
+    @property
+    def use_punctuation(self) -> bool:
+        return self._use_punctuation
+
+    @use_punctuation.setter
+    def use_punctuation(self, value: bool) -> None:
+        # 句読点の切り替え（Tkスレッド）と辞書の差し替え（監視スレッド）が互いの変更を消さないよう順に作り直す
+        with self._plan_lock:
+            self._use_punctuation = value
+            self._plan = self._build(self._plan.replacements)
+
+    def update_replacements(self, replacements: Mapping[str, str]) -> None:
+        with self._plan_lock:
+            self._plan = self._build(replacements)
+
+    def _build(self, replacements: Mapping[str, str]) -> PipelinePlan:
+        return build_plan(replacements, self._use_punctuation, self._normalize_width, self._normalize_numerals)
+
+    def run(self, text: str) -> str:
+        """処理計画に従ってテキストを変換し、段階ごとの処理時間を記録する"""
+        if not text:
+            logging.error('入力テキストが空です')
+            return ''
+
+        plan = self._plan
+        started_at = time.perf_counter()
+        if plan.translate_table is not None:
+            text = text.translate(plan.translate_table)
+        translated_at = time.perf_counter()
+        count = 0
+        if plan.matcher is not None:
+            text, count = plan.matcher.replace(text, plan.normalize_numerals)
+        elif plan.normalize_numerals:
+            text = normalize_numerals(text)
+        finished_at = time.perf_counter()
+
+        translate_ms = (translated_at - started_at) * 1000
+        replace_ms = (finished_at - translated_at) * 1000
+        self._record(translate_ms, replace_ms)
+        logging.info(f'後処理完了 - 文字数: {len(text)} / 置換箇所: {count} / '
+                     f'変換 {translate_ms:.2f} ms / 漢数字・置換 {replace_ms:.2f} ms')
+        return text
+
+    def _record(self, *stage_ms: float) -> None:
+        with self._metrics_lock:
+            self._runs += 1
+            for stage, elapsed_ms in zip(STAGES, stage_ms):
+                self._total_ms[stage] += elapsed_ms
+                self._last_ms[stage] = elapsed_ms
+
+    def metrics(self) -> dict[str, float]:
+        with self._metrics_lock:
+            metrics: dict[str, float] = {'runs': self._runs}
+            for stage in STAGES:
+                metrics[f'{stage}_last_ms'] = self._last_ms[stage]
+                metrics[f'{stage}_avg_ms'] = self._total_ms[stage] / self._runs if self._runs else 0.0
+            return metrics
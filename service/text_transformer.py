@@ -1,76 +1,346 @@
 import logging
-from typing import Dict
+import re
+from typing import Dict, Iterable, Iterator, Mapping, Optional
 
+# トライ木の節点で、そこまでの文字列に一致するルールの置換後の文字列を保持するキー。1文字のキーと衝突しない
+_TERMINAL = ''
+# 先のルールの置換後を含むルールの書き直しに、ルールの文字数の合計に加えて使える文字数
+_CHAINED_CHARS_MARGIN = 10_000
 
-def process_punctuation(text: str, use_punctuation: bool) -> str:
-    """句読点の有無に応じてテキストを処理する"""
-    if use_punctuation:
-        return text
 
-    try:
-        return text.replace('。', '').replace('、', '')
-    except (AttributeError, TypeError) as e:
-        logging.error(f'句読点処理中にタイプエラー: {str(e)}')
-        return text
-    except Exception as e:
-        logging.error(f'句読点処理中に予期しないエラー: {str(e)}')
-        return text
+class ReplacementMatcher:
+    """置換ルールをトライ木にまとめ、テキストを左から1回走査して最左最長一致で置換する
 
+    ルールの数によらず処理量はテキストの長さと最長のルールの長さで決まり、
+    重なるルールは辞書の順序ではなく、より左で始まり、同じ位置ならより長いものを優先する。
+    置換後の文字列は再び置換しないため、先のルールの置換後を含むルール（「一,1」の後の「1部,一部」など）には
+    置換前に戻したルール（「一部,一部」）を加え、ルールを順に適用していた頃と同じ結果にする。
+    置換後の文字列とキーが文字を共有する辞書ではこの書き直しがルール数の2乗で増えるため、
+    書き直したルールの文字数の合計は元のルールの文字数の合計（と_CHAINED_CHARS_MARGIN）までとし、
+    超えた後のルールは最左最長一致だけで置換する。
+    """
 
-def load_replacements(replacements_path: str) -> Dict[str, str]:
-    """置換ルールファイルを読み込む"""
-    replacements: Dict[str, str] = {}
-    logging.info(f'置換ルールファイルのパス: {replacements_path}')
+    def __init__(self, replacements: Mapping[str, str]):
+        self._root: dict = {}
+        self._heads: Optional[re.Pattern] = None
+        self.rule_count = 0
+        # 書き直したルールに使える残りの文字数。構築時間をルールの文字数の合計に比例させる
+        budget = sum(len(old) for old in replacements) + _CHAINED_CHARS_MARGIN
+        # outputsに登録した最長の文字列。置換前の部分文字列はこれより長いものを調べない
+        longest_output = 0
+        key_chars = set(''.join(replacements))
+        heads = {old[0] for old in replacements if old}
+        tails = {old[-1] for old in replacements if old}
+        # 先のルールの置換後の文字列（全体・末尾・先頭）→ そのルールの置換前と置換後
+        outputs: dict[str, list[tuple[str, str]]] = {}
+        suffixes: dict[str, list[tuple[str, str]]] = {}
+        prefixes: dict[str, list[tuple[str, str]]] = {}
+        # 上の3つに登録した文字列の先頭と末尾の文字。これを含まないルールは重なりを調べない
+        edge_chars: set[str] = set()
+        for old, new in replacements.items():
+            if not old:
+                continue
+            if self._insert(old, new):
+                self.rule_count += 1
+            if budget <= 0:
+                continue
+            if edge_chars and not edge_chars.isdisjoint(old):
+                chained_rules = self._chained_rules(old, new, outputs, suffixes, prefixes, edge_chars, longest_output)
+                for chained, replacement in chained_rules:
+                    budget -= len(chained)
+                    if budget <= 0:
+                        logging.warning(
+                            '置換ルールの重なりが多いため、これ以降のルールは先のルールの置換後を含む一致を展開しません'
+                        )
+                        break
+                    if chained not in replacements:
+                        self._insert(chained, replacement, overwrite=False)
+                    elif replacements[chained] == old:
+                        # 先のルールの置換後全体を置換するルール（「A,B」の後の「B,C」）は先のルールの置換後を差し替える
+                        self._insert(chained, replacement)
+            if not new or key_chars.isdisjoint(new):
+                continue
+            outputs.setdefault(new, []).append((old, new))
+            longest_output = max(longest_output, len(new))
+            edge_chars.update((new[0], new[-1]))
+            if heads.isdisjoint(new) and tails.isdisjoint(new):
+                continue
+            for size in range(1, len(new)):
+                if new[-size] in heads:
+                    suffixes.setdefault(new[-size:], []).append((old, new))
+                    edge_chars.add(new[-size])
+                if new[size - 1] in tails:
+                    prefixes.setdefault(new[:size], []).append((old, new))
+                    edge_chars.add(new[size - 1])
 
-    try:
-        with open(replacements_path, encoding='utf-8') as f:
-            for line_number, line in enumerate(f.readlines(), 1):
-                line = line.strip()
-                if not line:
+    def _insert(self, old: str, new: str, overwrite: bool = True) -> bool:
+        node = self._root
+        for char in old:
+            node = node.setdefault(char, {})
+        is_new = _TERMINAL not in node
+        if is_new or overwrite:
+            node[_TERMINAL] = new
+        return is_new
+
+    @staticmethod
+    def _chained_rules(
+            old: str,
+            new: str,
+            outputs: Mapping[str, list[tuple[str, str]]],
+            suffixes: Mapping[str, list[tuple[str, str]]],
+            prefixes: Mapping[str, list[tuple[str, str]]],
+            edge_chars: set[str],
+            longest_output: int
+    ) -> Iterator[tuple[str, str]]:
+        """先のルールの置換後の文字列と重なるルールを、元のテキストに対するルールに書き直す"""
+        for start in range(len(old)):
+            if old[start] not in edge_chars:
+                continue
+            for end in range(start + 1, min(len(old), start + longest_output) + 1):
+                for source, _ in outputs.get(old[start:end], ()):
+                    yield old[:start] + source + old[end:], new
+        if old[0] not in edge_chars and old[-1] not in edge_chars:
+            return
+        for size in range(1, len(old)):
+            # 先のルールの置換後の末尾が置換前の先頭と重なる（「十一,11」の後の「1部,一部」など）
+            for source, output in suffixes.get(old[:size], ()):
+                yield source + old[size:], output[:-size] + new
+            # 先のルールの置換後の先頭が置換前の末尾と重なる
+            for source, output in prefixes.get(old[-size:], ()):
+                yield old[:-size] + source, new + output[size:]
+
+    @property
+    def trie(self) -> dict:
+        """構築済みのトライ木。文字列だけの入れ子の辞書なので、そのままJSONに変換して保存できる"""
+        return self._root
+
+    @classmethod
+    def from_trie(cls, trie: dict, rule_count: int) -> 'ReplacementMatcher':
+        """trieで取り出したトライ木から、ルールを解釈し直さずに復元する"""
+        matcher = cls({})
+        matcher._root = trie
+        matcher.rule_count = rule_count
+        return matcher
+
+    def _head_pattern(self) -> re.Pattern:
+        """ルールの先頭の文字のいずれかに一致する正規表現。一致しない文字を1文字ずつ調べずに読み飛ばす"""
+        if self._heads is None:
+            self._heads = re.compile('[' + ''.join(re.escape(char) for char in self._root) + ']')
+        return self._heads
+
+    def replace(self, text: str, normalize_numerals: bool = False) -> tuple[str, int]:
+        """置換後のテキストと置換した箇所の数を返す
+
+        normalize_numeralsがTrueなら漢数字を変換した断片を順に読みながら走査し、変換後のテキストに対して置換する。
+        変換後のテキスト全体を別に作らず、漢数字の変換と置換をテキストの1回の走査で行う。
+        """
+        pieces = _numeral_pieces(text) if normalize_numerals else iter(())
+        root = self._root
+        heads = self._head_pattern()
+        parts: list[str] = []
+        count = 0
+        window = next(pieces, text) if normalize_numerals else text
+        length = len(window)
+        copied_until = 0
+        position = 0
+        while True:
+            if position >= length:
+                piece = next(pieces, None)
+                if piece is None:
+                    break
+                parts.append(window[copied_until:])
+                window = piece
+                length = len(window)
+                copied_until = position = 0
+                continue
+            node = root.get(window[position])
+            if node is None:
+                head = heads.search(window, position + 1)
+                position = head.start() if head is not None else length
+                continue
+            match_end = -1
+            replacement = ''
+            cursor = position + 1
+            while True:
+                if _TERMINAL in node:
+                    match_end = cursor
+                    replacement = node[_TERMINAL]
+                if cursor >= length:
+                    piece = next(pieces, None)
+                    if piece is None:
+                        break
+                    # 照合の途中で断片が尽きたら、照合中の部分に次の断片を続けて照合を続ける
+                    parts.append(window[copied_until:position])
+                    window = window[position:] + piece
+                    length = len(window)
+                    cursor -= position
+                    if match_end >= 0:
+                        match_end -= position
+                    copied_until = position = 0
                     continue
-                try:
-                    old, new = line.split(',')
-                    replacements[old.strip()] = new.strip()
-                    logging.debug(f'置換ルール読み込み - {line_number}行目: \'{old.strip()}\' → \'{new.strip()}\'')
-                except ValueError:
-                    logging.error(f'置換ファイルの{line_number}行目に無効な行があります: {line}')
+                node = node.get(window[cursor])
+                if node is None:
+                    break
+                cursor += 1
+            if match_end < 0:
+                position += 1
+                continue
+            parts.append(window[copied_until:position])
+            parts.append(replacement)
+            copied_until = position = match_end
+            count += 1
+        if not parts:
+            return window, 0
+        parts.append(window[copied_until:])
+        return ''.join(parts), count
 
-        logging.info(f'置換ルールの総数: {len(replacements)}')
 
-    except IOError as e:
-        logging.error(f'置換ファイルの読み込み中にエラーが発生しました: {e}')
-        return {}
-    except Exception as e:
-        logging.error(f'予期せぬエラーが発生しました: {e}', exc_info=True)
-        return {}
+class ReplacementTable(Dict[str, str]):
+    """読み込んだ置換ルールと、それをまとめたReplacementMatcher。作成後は変更しない"""
 
-    return replacements
+    def __init__(self, replacements: Mapping[str, str], matcher: Optional[ReplacementMatcher] = None):
+        super().__init__(replacements)
+        self.matcher = matcher if matcher is not None else ReplacementMatcher(self)
 
 
-def replace_text(text: str, replacements: Dict[str, str]) -> str:
-    """置換ルールに従ってテキストを変換する"""
-    if not text:
-        logging.error('入力テキストが空です')
-        return ''
+_KANJI_DIGITS = {'〇': 0, '零': 0, '一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+_SMALL_UNITS = {'十': 10, '百': 100, '千': 1000}
+_LARGE_UNITS = {'万': 10 ** 4, '億': 10 ** 8, '兆': 10 ** 12}
+_DIGIT_CHARS = frozenset('0123456789') | frozenset(_KANJI_DIGITS)
+_UNIT_CHARS = frozenset(_SMALL_UNITS) | frozenset(_LARGE_UNITS)
+_LARGE_UNIT_CHARS = ''.join(_LARGE_UNITS)
+# 漢数字を含むが数を表さない語。数字と単位の連続より先に照合し、そのまま残す
+_NUMERAL_COMPOUNDS = (
+    '一緒', '一致', '一体', '一石二鳥', '万一', '十分', '千葉', '千代田', '八百屋', '八百長', '八千代',
+    '九州', '四国', '三重', '七夕', '五月雨', '百貨店', '千差万別',
+)
+_NUMERAL_CLASS = '[0-9' + ''.join(_KANJI_DIGITS) + ''.join(_UNIT_CHARS) + ']'
+# 先頭の先読みで、数字と単位以外の文字の位置では語の候補を照合せずに読み飛ばす
+_NUMERAL_RUN = re.compile(
+    '(?=' + _NUMERAL_CLASS + ')'
+    '(?:(' + '|'.join(sorted(_NUMERAL_COMPOUNDS, key=len, reverse=True)) + ')|' + _NUMERAL_CLASS + '+)'
+)
+_KANJI_DIGIT_TABLE = str.maketrans({char: str(value) for char, value in _KANJI_DIGITS.items()})
+# 単独では「零細」「〇〇さん」「〇×」のように数を表さないことが多い0の文字
+_ZERO_CHARS = frozenset('〇零')
 
-    if not replacements:
-        logging.warning('置換ルールが空です')
-        return text
 
-    try:
-        result = text
-        logging.info(f'テキスト置換開始 - 文字数: {len(text)}')
+def _parse_numeral(run: str) -> Optional[int]:
+    """単位を含む漢数字を解釈する。単位の並びが正しくなければNoneを返す
+
+    「三万五」のように大きな単位の直後で終わる1桁は、話し言葉の慣用に従って1つ下の位（三万五千）として扱う。
+    """
+    total = 0
+    section = 0
+    number: Optional[int] = None
+    small_limit = 10_000
+    large_limit = 10 ** 16
+    for char in run:
+        if char in _SMALL_UNITS:
+            unit = _SMALL_UNITS[char]
+            if unit >= small_limit or (number is not None and number >= 10):
+                return None
+            section += (1 if number is None else number) * unit
+            number = None
+            small_limit = unit
+        elif char in _LARGE_UNITS:
+            unit = _LARGE_UNITS[char]
+            section += number or 0
+            if unit >= large_limit or not section:
+                return None
+            total += section * unit
+            section = 0
+            number = None
+            small_limit = 10_000
+            large_limit = unit
+        else:
+            digit = _KANJI_DIGITS[char] if char in _KANJI_DIGITS else ord(char) - 48
+            number = digit if number is None else number * 10 + digit
+    if number is not None and len(run) >= 2 and run[-2] in _LARGE_UNITS and run[-1] in _DIGIT_CHARS:
+        return total + number * _LARGE_UNITS[run[-2]] // 10
+    return total + section + (number or 0)
 
-        for old, new in replacements.items():
-            if old in result:
-                before_replace = result
-                result = result.replace(old, new)
-                if before_replace != result:
-                    logging.debug(f'置換実行: \'{old}\' → \'{new}\'')
 
-        logging.info('テキスト置換完了')
-        return result
+def _convert_numeral_run(match: re.Match) -> str:
+    run = match.group()
+    if match.group(1) or run[0].isascii():
+        # 「1万」「3千」のようにアラビア数字で始まる表記は書き手の表記として残す
+        return run
+    # 「万全」「億二千」のように大きな単位で始まる語は、先頭の単位を数として扱わない
+    if len(run) == 1:
+        # 漢数字1文字（「一般」の「一」など）は最も多いため、単位の解釈をせずに置き換える
+        return run if run in _ZERO_CHARS or run in _UNIT_CHARS else str(_KANJI_DIGITS[run])
+    body = run.lstrip(_LARGE_UNIT_CHARS)
+    prefix = run[:len(run) - len(body)]
+    if len(body) < 2 and _DIGIT_CHARS.isdisjoint(body):
+        # 「百人力」「千秋楽」のように単位1文字だけの語は変換しない。「百万」「十億」は変換する
+        return run
+    if _ZERO_CHARS.issuperset(body):
+        # 〇と零は「二〇二五」のように他の数字と続く場合だけ0にする
+        return run
+    if _UNIT_CHARS.isdisjoint(body):
+        # 「二〇二五」のような位取りの表記は先頭の0も含めて1文字ずつ置き換える
+        return prefix + body.translate(_KANJI_DIGIT_TABLE)
+    value = _parse_numeral(body)
+    return run if value is None else prefix + str(value)
 
+
+def _numeral_pieces(text: str) -> Iterator[str]:
+    """漢数字を変換したテキストを、数字と単位の連続ごとに、その前の部分と変換した数字を合わせた断片にして順に返す"""
+    start = 0
+    for match in _NUMERAL_RUN.finditer(text):
+        yield text[start:match.start()] + _convert_numeral_run(match)
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
+
+
+def normalize_numerals(text: str) -> str:
+    """漢数字（十・百・千・万・億・兆の単位を含む）をアラビア数字に変換する
+
+    数字と単位の連続を1回の走査で取り出し、それぞれを先頭から1回だけ読んで値を求めるため、
+    処理量はテキストの長さに比例する。_NUMERAL_COMPOUNDSの語、単位1文字だけの語、単位の並びが正しくないもの、
+    アラビア数字で始まるもの（「1万」）、〇・零だけのもの（「零細」「〇〇さん」）は変換しない。
+    """
+    return _NUMERAL_RUN.sub(_convert_numeral_run, text)
+
+
+def parse_replacements(lines: Iterable[str]) -> Dict[str, str]:
+    """置換ルールファイルの各行を「置換前,置換後」として解釈する"""
+    replacements: Dict[str, str] = {}
+    # 数万件の辞書ではルールごとのログ文字列の組み立てだけで起動が遅くなるため、DEBUG時だけ出力する
+    log_rules = logging.getLogger().isEnabledFor(logging.DEBUG)
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            old, new = line.split(',')
+            replacements[old.strip()] = new.strip()
+            if log_rules:
+                logging.debug(f'置換ルール読み込み - {line_number}行目: \'{old.strip()}\' → \'{new.strip()}\'')
+        except ValueError:
+            logging.error(f'置換ファイルの{line_number}行目に無効な行があります: {line}')
+    return replacements
+
+
+def read_replacements(replacements_path: str) -> ReplacementTable:
+    """置換ルールファイルを読み込んでトライ木を構築する。読み込めない場合はOSErrorまたはValueErrorを送出する"""
+    with open(replacements_path, encoding='utf-8') as f:
+        replacements = parse_replacements(f.readlines())
+    logging.info(f'置換ルールの総数: {len(replacements)}')
+    return ReplacementTable(replacements)
+
+
+def load_replacements(replacements_path: str) -> ReplacementTable:
+    """置換ルールファイルを読み込み、置換に使うトライ木を一度だけ構築する。読み込めない場合は空のテーブルを返す"""
+    logging.info(f'置換ルールファイルのパス: {replacements_path}')
+
+    try:
+        return read_replacements(replacements_path)
+    except IOError as e:
+        logging.error(f'置換ファイルの読み込み中にエラーが発生しました: {e}')
     except Exception as e:
-        logging.error(f'テキスト置換中にエラーが発生: {str(e)}', exc_info=True)
-        return text
+        logging.error(f'予期せぬエラーが発生しました: {e}', exc_info=True)
+    return ReplacementTable({})
+
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Iterable, Optional
+
+from service.audio_buffer import AudioChunk
+
+_CACHE_VERSION = 1
+_READ_BLOCK_SIZE = 1024 * 1024
+
+
+def make_cache_key(
+        audio_chunks: Iterable[AudioChunk],
+        model: str,
+        language: str,
+        tag_audio_events: bool
+) -> str:
+    """音声内容と認識設定からキャッシュキーを求める"""
+    hasher = hashlib.sha256(f'v{_CACHE_VERSION}|{model}|{language}|{tag_audio_events}|'.encode())
+    for chunk in audio_chunks:
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def iter_file_blocks(file_path: str) -> Iterable[bytes]:
+    with open(file_path, 'rb') as f:
+        while block := f.read(_READ_BLOCK_SIZE):
+            yield block
+
+
+class TranscriptionCache:
+    """文字起こし結果をキーごとのファイルとして保存し、件数と容量の上限で古いものから削除する"""
+
+    def __init__(self, cache_dir: str, max_entries: int, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = json.load(f)['text']
+            # 参照時刻を更新してLRUの順序に反映する
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f'文字起こしキャッシュの読み込みに失敗しました: {e}')
+            self.misses += 1
+            return None
+        self.hits += 1
+        logging.info(f'文字起こしキャッシュにヒットしました: {key[:12]}')
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        entry = json.dumps({'text': text, 'created': time.time()}, ensure_ascii=False)
+        try:
+            with self._lock:
+                fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(entry)
+                os.replace(temp_path, self._entry_path(key))
+                self._evict()
+        except OSError as e:
+            logging.error(f'文字起こしキャッシュの保存に失敗しました: {e}')
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        total_bytes = sum(size for _, size, _ in entries)
+        removed = 0
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except OSError as e:
+                logging.warning(f'文字起こしキャッシュの削除に失敗しました: {path}, {e}')
+            total_bytes -= size
+            removed += 1
+        if removed:
+            logging.info(f'文字起こしキャッシュから{removed}件を削除しました')
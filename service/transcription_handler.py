@@ -1,12 +1,26 @@
+import asyncio
+import functools
 import logging
-import threading
+import time
 import traceback
-from typing import Any, Callable, List, Optional
+from typing import Any, Awaitable, Callable, Optional, Sequence, Union
 
 from app.ui_queue_processor import UIQueueProcessor
-from external_service.elevenlabs_api import transcribe_audio
+from external_service.elevenlabs_api import TranscriptionNetworkError
+from external_service.http_connection import ConnectionCanceller
+from external_service.stt_backend import SpeechToTextBackend
+from service.async_engine import AsyncTranscriptionEngine
+from service.audio_buffer import AudioChunk, join_frames
 from service.audio_file_manager import AudioFileManager
-from service.text_transformer import process_punctuation
+from service.audio_recorder import SAMPLE_WIDTH
+from service.backend_chain import BackendChain
+from service.paste_backend import get_foreground_window
+from service.retry_queue import RetryResultCallback, TranscriptionRetryQueue
+from service.segment_pipeline import SegmentPipeline
+from service.transcription_cache import TranscriptionCache, iter_file_blocks, make_cache_key
+from service.transcription_queue import CompletionSequencer, TranscriptionJobQueue
+from service.upload_encoder import UploadEncoder
+from service.wav_io import build_wav_header
 from utils.app_config import AppConfig
 
 
@@ -18,26 +32,190 @@ class TranscriptionHandler:
             client: Any,
             audio_file_manager: AudioFileManager,
             ui_processor: UIQueueProcessor,
-            use_punctuation: bool
+            async_client: Any = None,
+            connection_canceller: Optional[ConnectionCanceller] = None,
+            backend: Optional[SpeechToTextBackend] = None
     ):
         self.config = config
         self.client = client
+        self.async_client = async_client
+        self.connection_canceller = connection_canceller
         self.audio_file_manager = audio_file_manager
         self.ui_processor = ui_processor
-        self.use_punctuation = use_punctuation
 
         self.cancel_processing = False
-        self.processing_thread: Optional[threading.Thread] = None
-        self.transcribe_audio_func = transcribe_audio
+        self._async_engine: Optional[AsyncTranscriptionEngine] = None
+        self.job_queue: Union[TranscriptionJobQueue, AsyncTranscriptionEngine]
+        if config.transcription_engine == 'asyncio' and async_client is not None:
+            self._async_engine = AsyncTranscriptionEngine(config.transcription_workers, config.max_pending_jobs)
+            self.job_queue = self._async_engine
+        else:
+            self.job_queue = TranscriptionJobQueue(config.transcription_workers, config.max_pending_jobs)
+        self._sequencer = CompletionSequencer()
+        self.backend_chain = BackendChain(config, client, async_client, backend, lambda: self.cancel_processing)
+        self.upload_encoder = UploadEncoder(config)
+        self.segment_pipeline: Optional[SegmentPipeline] = None
+        self.cache = self._create_cache(config)
+        self.retry_queue = self._create_retry_queue(config)
 
-    def transcribe_frames(
+    @staticmethod
+    def _create_cache(config: AppConfig) -> Optional[TranscriptionCache]:
+        if not config.cache_enabled:
+            return None
+        try:
+            return TranscriptionCache(
+                config.transcription_cache_dir,
+                config.cache_max_entries,
+                config.cache_max_mb * 1024 * 1024
+            )
+        except OSError as e:
+            logging.error(f'文字起こしキャッシュを使用できません: {str(e)}')
+            return None
+
+    def _create_retry_queue(self, config: AppConfig) -> Optional[TranscriptionRetryQueue]:
+        if not config.retry_enabled:
+            return None
+        try:
+            return TranscriptionRetryQueue.from_config(config, self.transcribe_retry)
+        except OSError as e:
+            logging.error(f'再送信キューを使用できません: {str(e)}')
+            return None
+
+    def start_retry_queue(self, on_result: RetryResultCallback) -> None:
+        """前回までに保存された分を含め、再送信待ちの処理を開始する"""
+        if self.retry_queue is not None:
+            self.retry_queue.start(on_result)
+
+    def stop_retry_queue(self) -> None:
+        """再送信と、送信再開のための接続確認を止める"""
+        if self.retry_queue is not None:
+            self.retry_queue.stop()
+        self.backend_chain.stop()
+
+    @property
+    def backend(self) -> SpeechToTextBackend:
+        """同期の送信に使う送信先。追加送信・回路遮断・ローカル音声認識への切り替えを含む"""
+        return self.backend_chain.backend
+
+    @property
+    def async_engine(self) -> Optional[AsyncTranscriptionEngine]:
+        """asyncio方式の場合に文字起こしを実行するイベントループのエンジン"""
+        return self._async_engine
+
+    @property
+    def is_processing(self) -> bool:
+        return self.job_queue.pending_count > 0
+
+    def can_accept_job(self) -> bool:
+        return not self.job_queue.is_full()
+
+    def submit_frames(
             self,
-            frames: List[bytes],
+            frames: Sequence[AudioChunk],
             sample_rate: int,
             on_complete: Callable[[str], None],
+            on_error: Callable[[str], None],
+            audio_path: Optional[str] = None
+    ) -> int:
+        """録音の文字起こしをジョブキューに登録する"""
+        if self._async_engine is not None:
+            return self._submit_async(
+                lambda done, failed: self.transcribe_frames_async(frames, sample_rate, done, failed, audio_path),
+                on_complete,
+                on_error
+            )
+        return self._submit(
+            lambda done, failed: self.transcribe_frames(frames, sample_rate, done, failed, audio_path),
+            on_complete,
+            on_error
+        )
+
+    def submit_segments(
+            self,
+            pipeline: SegmentPipeline,
+            frames: Sequence[AudioChunk],
+            sample_rate: int,
+            on_complete: Callable[[str], None],
+            on_error: Callable[[str], None],
+            audio_path: Optional[str] = None
+    ) -> int:
+        """区間文字起こしの残りの処理をジョブキューに登録する"""
+        if self._async_engine is not None:
+            # 区間ごとの送信は同期クライアントのパイプラインで行うため、スレッドに逃がして待つ
+            return self._submit_async(
+                lambda done, failed: asyncio.to_thread(
+                    self.transcribe_segments, pipeline, frames, sample_rate, done, failed, audio_path
+                ),
+                on_complete,
+                on_error
+            )
+        return self._submit(
+            lambda done, failed: self.transcribe_segments(pipeline, frames, sample_rate, done, failed, audio_path),
+            on_complete,
+            on_error
+        )
+
+    def _submit(
+            self,
+            run: Callable[[Callable[[str], None], Callable[[str], None]], None],
+            on_complete: Callable[[str], None],
+            on_error: Callable[[str], None]
+    ) -> int:
+        """結果の通知を受付順に並べ替えるようにコールバックを包んでジョブを登録する"""
+        def job(sequence: int) -> None:
+            try:
+                run(
+                    functools.partial(self._sequencer.deliver, sequence, on_complete),
+                    functools.partial(self._sequencer.deliver, sequence, on_error)
+                )
+            finally:
+                self.ui_processor.schedule_callback(self._sequencer.finish, sequence)
+
+        assert isinstance(self.job_queue, TranscriptionJobQueue)
+        return self.job_queue.submit(job)
+
+    def _submit_async(
+            self,
+            run: Callable[[Callable[[str], None], Callable[[str], None]], Awaitable[None]],
+            on_complete: Callable[[str], None],
             on_error: Callable[[str], None]
+    ) -> int:
+        """イベントループのエンジンにジョブを登録する。上限時間を過ぎたジョブは送信ごと中断する"""
+        timeout = self.config.job_timeout_seconds
+
+        async def job(sequence: int) -> None:
+            done = functools.partial(self._sequencer.deliver, sequence, on_complete)
+            failed = functools.partial(self._sequencer.deliver, sequence, on_error)
+            try:
+                await asyncio.wait_for(run(done, failed), timeout if timeout > 0 else None)
+            except asyncio.TimeoutError:
+                logging.error(f'文字起こしが{timeout:g}秒以内に完了しなかったため中断しました')
+                self.ui_processor.schedule_callback(failed, '文字起こしがタイムアウトしました')
+
+        def finish(sequence: int) -> None:
+            # 実行枠を待つ間にキャンセルされたジョブも順番待ちから外し、後続の結果を止めない
+            self.ui_processor.schedule_callback(self._sequencer.finish, sequence)
+
+        assert self._async_engine is not None
+        return self._async_engine.submit(job, finish)
+
+    def queue_metrics(self) -> dict[str, float]:
+        """ジョブキューの深さ・待ち時間と、順番待ちで保留中の結果数、追加送信・タイムアウト・回路遮断・ローカル音声認識の状況を返す"""
+        metrics = self.job_queue.metrics()
+        metrics['held_results'] = float(self._sequencer.held_count)
+        metrics.update(self.backend_chain.metrics())
+        return metrics
+
+    def transcribe_frames(
+            self,
+            frames: Sequence[AudioChunk],
+            sample_rate: int,
+            on_complete: Callable[[str], None],
+            on_error: Callable[[str], None],
+            audio_path: Optional[str] = None
     ) -> None:
-        """音声フレームを文字起こし処理"""
+        """音声フレームを文字起こし処理。録音中に保存済みのファイルがあれば、無音を除去しても再保存しない"""
+        trimmed = frames
         try:
             logging.info('音声フレーム処理開始')
 
@@ -45,40 +223,220 @@ class TranscriptionHandler:
                 logging.info('処理がキャンセルされました')
                 return
 
-            temp_audio_file = self.audio_file_manager.save_audio(frames, sample_rate)
-            if not temp_audio_file:
-                raise ValueError('音声ファイルの保存に失敗しました')
+            trimmed = self.upload_encoder.trim_silence(frames, sample_rate)
+            cache_key = self._frames_cache_key(frames if audio_path else trimmed, sample_rate)
+            transcription = self._lookup_cache(cache_key)
+            if transcription:
+                if audio_path is None:
+                    self.audio_file_manager.save_audio_in_background(trimmed, sample_rate)
+            elif self.upload_encoder.upload_from_memory or (audio_path and trimmed is not frames):
+                # 録音中に保存したファイルは無音除去前のまま再読込用に残し、除去後の音声はメモリから送信する
+                transcription = self._transcribe_from_memory(trimmed, sample_rate, audio_path)
+                self._store_cache(cache_key, transcription)
+            else:
+                transcription = self._transcribe_from_file(trimmed, sample_rate, audio_path)
+                self._store_cache(cache_key, transcription)
+
+            self._deliver_transcription(transcription, on_complete)
+
+        except Exception as e:
+            self._report_failure(e, on_error, trimmed, sample_rate)
+
+    async def transcribe_frames_async(
+            self,
+            frames: Sequence[AudioChunk],
+            sample_rate: int,
+            on_complete: Callable[[str], None],
+            on_error: Callable[[str], None],
+            audio_path: Optional[str] = None
+    ) -> None:
+        """イベントループ上で音声フレームを文字起こしする。常にメモリ上のデータを送信する"""
+        trimmed = frames
+        try:
+            logging.info('音声フレーム処理開始')
 
             if self.cancel_processing:
                 logging.info('処理がキャンセルされました')
                 return
 
-            logging.info('文字起こし開始')
-            transcription = self.transcribe_audio_func(
-                temp_audio_file,
-                self.config,
-                self.client
+            trimmed = self.upload_encoder.trim_silence(frames, sample_rate)
+            cache_key = self._frames_cache_key(frames if audio_path else trimmed, sample_rate)
+            transcription = self._lookup_cache(cache_key)
+            if transcription:
+                if audio_path is None:
+                    self.audio_file_manager.save_audio_in_background(trimmed, sample_rate)
+            else:
+                audio, file_name = self._encode_for_upload(trimmed, sample_rate, audio_path)
+                transcription, used_fallback = await self.backend_chain.transcribe_data_async(audio, file_name)
+                # ローカル音声認識の結果は精度が異なるため、音声再読込でAPIに送り直せるよう保存しない
+                self._store_cache(None if used_fallback else cache_key, transcription)
+
+            self._deliver_transcription(transcription, on_complete)
+
+        except asyncio.CancelledError:
+            logging.info('送信中の文字起こしをキャンセルしました')
+            raise
+        except Exception as e:
+            self._report_failure(e, on_error, trimmed, sample_rate)
+
+    def api_status(self) -> Optional[str]:
+        """送信を停止中または再開を確認中ならステータス表示に添える説明を返す"""
+        return self.backend_chain.api_status(self.retry_queue is not None)
+
+    def add_api_status_listener(self, listener: Callable[[], None]) -> None:
+        """送信の停止・再開時に呼ばれる。送信したスレッドや接続確認のスレッドから呼ばれる"""
+        self.backend_chain.add_status_listener(listener)
+
+    def _deliver_transcription(self, transcription: Optional[str], on_complete: Callable[[str], None]) -> None:
+        """UIスレッドへ結果を渡す。句読点と辞書置換は貼り付け時にまとめて処理する"""
+        if transcription is None and self.cancel_processing:
+            logging.info('処理がキャンセルされました')
+            return
+
+        if not transcription:
+            raise ValueError('音声ファイルの文字起こしに失敗しました')
+
+        if self.cancel_processing:
+            logging.info('処理がキャンセルされました')
+            return
+
+        logging.debug('UI更新をスケジュール')
+        self.ui_processor.schedule_callback(on_complete, transcription)
+        logging.debug('UI更新スケジュール完了')
+
+    def _report_failure(
+            self,
+            error: Exception,
+            on_error: Callable[[str], None],
+            frames: Sequence[AudioChunk],
+            sample_rate: int
+    ) -> None:
+        """通信障害なら再送信待ちに保存し、それ以外はエラーとして通知する"""
+        if self.cancel_processing:
+            # キャンセルで接続を閉じた場合の通信エラーは再送信もエラー通知もしない
+            logging.info(f'処理がキャンセルされました: {str(error)}')
+            return
+        if isinstance(error, TranscriptionNetworkError):
+            self._defer_to_retry(
+                error, on_error,
+                lambda retry_queue, window: retry_queue.enqueue_audio(
+                    join_frames(frames), sample_rate, self.config.audio_channels, window
+                )
             )
+            return
+        logging.error(f'文字起こし処理中にエラー: {str(error)}')
+        logging.debug(f'詳細: {traceback.format_exc()}')
+        self.ui_processor.schedule_callback(on_error, str(error))
 
-            if not transcription:
-                raise ValueError('音声ファイルの文字起こしに失敗しました')
+    def create_segment_pipeline(self) -> SegmentPipeline:
+        """録音中の区間文字起こし用パイプラインを作成する"""
+        self.segment_pipeline = SegmentPipeline.from_config(self.config, self.transcribe_segment)
+        return self.segment_pipeline
+
+    def transcribe_segment(self, pcm: AudioChunk, index: int) -> Optional[str]:
+        """録音中に区切った区間を1つ文字起こしする"""
+        if self.cancel_processing:
+            return None
+        return self.backend.transcribe_data(*self.upload_encoder.encode_segment(pcm, index))
+
+    def transcribe_segments(
+            self,
+            pipeline: SegmentPipeline,
+            frames: Sequence[AudioChunk],
+            sample_rate: int,
+            on_complete: Callable[[str], None],
+            on_error: Callable[[str], None],
+            audio_path: Optional[str] = None
+    ) -> None:
+        """末尾の区間を送信し、録音中に送信済みの区間と録音順に連結する"""
+        try:
+            stopped_at = time.perf_counter()
+            pipeline.finish(join_frames(frames))
+            if audio_path is None:
+                self.audio_file_manager.save_audio_in_background(frames, sample_rate)
 
-            logging.debug(f'句読点処理開始: use_punctuation={self.use_punctuation}')
-            transcription = process_punctuation(transcription, self.use_punctuation)
-            logging.debug('句読点処理完了')
+            transcription = pipeline.result()
+            logging.info(
+                f'区間文字起こし完了: {pipeline.segment_count}区間 / '
+                f'停止後の待ち時間 {(time.perf_counter() - stopped_at) * 1000:.0f} ms'
+            )
 
             if self.cancel_processing:
                 logging.info('処理がキャンセルされました')
                 return
 
-            logging.debug('UI更新をスケジュール')
+            if not transcription:
+                raise ValueError('音声ファイルの文字起こしに失敗しました')
+
             self.ui_processor.schedule_callback(on_complete, transcription)
-            logging.debug('UI更新スケジュール完了')
 
         except Exception as e:
-            logging.error(f'文字起こし処理中にエラー: {str(e)}')
-            logging.debug(f'詳細: {traceback.format_exc()}')
-            self.ui_processor.schedule_callback(on_error, str(e))
+            self._report_failure(e, on_error, frames, sample_rate)
+
+    def _transcribe_from_file(
+            self,
+            frames: Sequence[AudioChunk],
+            sample_rate: int,
+            saved_path: Optional[str]
+    ) -> Optional[str]:
+        temp_audio_file = saved_path or self.audio_file_manager.save_audio(frames, sample_rate)
+        if not temp_audio_file:
+            raise ValueError('音声ファイルの保存に失敗しました')
+
+        if self.cancel_processing:
+            return None
+
+        logging.info('文字起こし開始')
+        return self.backend.transcribe_file(temp_audio_file)
+
+    def _transcribe_from_memory(
+            self,
+            frames: Sequence[AudioChunk],
+            sample_rate: int,
+            saved_path: Optional[str]
+    ) -> Optional[str]:
+        """設定形式でメモリ上にエンコードして送信し、再読込用のWAVは並行して保存する"""
+        audio, file_name = self._encode_for_upload(frames, sample_rate, saved_path)
+        return self.backend.transcribe_data(audio, file_name)
+
+    def _encode_for_upload(
+            self,
+            frames: Sequence[AudioChunk],
+            sample_rate: int,
+            saved_path: Optional[str]
+    ) -> tuple[Any, str]:
+        """送信データとファイル名を作成する。未保存なら再読込用のWAVを並行して保存する"""
+        if saved_path is None:
+            self.audio_file_manager.save_audio_in_background(frames, sample_rate)
+        return self.upload_encoder.encode(frames, sample_rate, saved_path)
+
+    def _frames_cache_key(self, frames: Sequence[AudioChunk], sample_rate: int) -> Optional[str]:
+        """保存されるWAVファイルと同じ内容のハッシュをキーにして、再読込時もキャッシュを共有する"""
+        if self.cache is None:
+            return None
+        data_size = sum(len(memoryview(frame).cast('B')) for frame in frames)
+        header = build_wav_header(data_size, sample_rate, self.config.audio_channels, SAMPLE_WIDTH)
+        return self._cache_key([header, *frames])
+
+    def _cache_key(self, chunks) -> str:
+        return make_cache_key(
+            chunks,
+            self.config.elevenlabs_model,
+            self.config.elevenlabs_language,
+            self.config.tag_audio_events
+        )
+
+    def _lookup_cache(self, key: Optional[str]) -> Optional[str]:
+        if self.cache is None or key is None:
+            return None
+        return self.cache.get(key)
+
+    def _store_cache(self, key: Optional[str], transcription: Optional[str]) -> None:
+        if self.backend_chain.used_fallback:
+            # ローカル音声認識の結果は精度が異なるため、音声再読込でAPIに送り直せるよう保存しない
+            return
+        if self.cache is not None and key is not None and transcription:
+            self.cache.put(key, transcription)
 
     def handle_audio_file(
             self,
@@ -88,30 +446,66 @@ class TranscriptionHandler:
     ) -> None:
         """保存した音声ファイルを文字起こしする"""
         try:
-            transcription = self.transcribe_audio_func(
-                file_path,
-                self.config,
-                self.client
-            )
+            transcription = self._transcribe_file_cached(file_path)
             if transcription:
-                transcription = process_punctuation(transcription, self.use_punctuation)
                 on_complete(transcription)
             else:
                 raise ValueError('音声ファイルの処理に失敗しました')
+        except TranscriptionNetworkError as e:
+            self._defer_to_retry(
+                e, on_error,
+                lambda retry_queue, window: retry_queue.enqueue_file(file_path, window),
+                notify_directly=True
+            )
         except Exception as e:
             on_error(str(e))
 
+    def transcribe_retry(self, audio_path: str) -> Optional[str]:
+        """再送信キューから呼ばれ、保存した音声を文字起こしする"""
+        return self._transcribe_file_cached(audio_path) or None
+
+    def _transcribe_file_cached(self, file_path: str) -> Optional[str]:
+        cache_key = self._cache_key(iter_file_blocks(file_path)) if self.cache is not None else None
+        transcription = self._lookup_cache(cache_key)
+        if not transcription:
+            transcription = self.backend.transcribe_file(file_path)
+            self._store_cache(cache_key, transcription)
+        return transcription
+
+    def _defer_to_retry(
+            self,
+            error: TranscriptionNetworkError,
+            on_error: Callable[[str], None],
+            enqueue: Callable[[TranscriptionRetryQueue, Optional[int]], Any],
+            notify_directly: bool = False
+    ) -> None:
+        """通信障害で失敗した音声を再送信キューに保存し、保留したことを通知する"""
+        logging.error(f'文字起こし処理中に通信エラー: {str(error)}')
+        message = str(error)
+        if self.retry_queue is not None and not self.cancel_processing:
+            if enqueue(self.retry_queue, get_foreground_window()) is not None:
+                message = '通信エラーのため文字起こしを保留しました。接続が回復したら自動で再送信します'
+        if notify_directly:
+            on_error(message)
+        else:
+            self.ui_processor.schedule_callback(on_error, message)
+
     def wait_for_processing(self, timeout: float = 5.0) -> bool:
-        """処理スレッドの完了を待機する"""
-        if self.processing_thread and self.processing_thread.is_alive():
-            logging.info('処理スレッドの完了を待機中...')
-            self.processing_thread.join(timeout=timeout)
-            return not self.processing_thread.is_alive()
-        return True
+        """登録済みのジョブの完了を待機する"""
+        if self.is_processing:
+            logging.info('文字起こしジョブの完了を待機中...')
+        return self.job_queue.join(timeout)
 
     def cancel(self) -> None:
-        """処理をキャンセルする"""
+        """処理をキャンセルする。送信中のリクエストは接続ごと中断する"""
         self.cancel_processing = True
+        if self.segment_pipeline is not None:
+            self.segment_pipeline.cancel()
+        if self._async_engine is not None:
+            self._async_engine.cancel_all()
+        if self.connection_canceller is not None:
+            # 送信中のリクエストがなければ接続を残すため、処理中かを判定せずに呼ぶ
+            self.connection_canceller.cancel_all()
 
     def reset_cancel(self) -> None:
         """キャンセルフラグをリセットする"""
@@ -0,0 +1,141 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+TranscriptionJob = Callable[[int], object]
+
+
+class CompletionSequencer:
+    """ジョブの完了順に関わらず、結果の通知を受付順に並べ替えて実行する"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._next_sequence = 0
+        self._deliveries: Dict[int, List[Tuple[Callable, tuple]]] = {}
+        self._finished: set[int] = set()
+
+    @property
+    def held_count(self) -> int:
+        """先行するジョブの完了を待って保留中のジョブ数"""
+        with self._lock:
+            return len(self._finished)
+
+    def deliver(self, sequence: int, callback: Callable, *args) -> None:
+        """通知を登録する。先行するジョブがすべて完了していればすぐに実行される"""
+        with self._lock:
+            self._deliveries.setdefault(sequence, []).append((callback, args))
+            self._flush()
+
+    def finish(self, sequence: int) -> None:
+        """ジョブの完了を記録し、順番が来た通知を実行する"""
+        with self._lock:
+            self._finished.add(sequence)
+            self._flush()
+
+    def _flush(self) -> None:
+        # 先頭のジョブの通知は完了を待たずに実行し、完了したら次のジョブへ進む
+        while True:
+            for callback, args in self._deliveries.pop(self._next_sequence, []):
+                try:
+                    callback(*args)
+                except Exception as e:
+                    logging.error(f'文字起こし結果の通知中にエラー: {str(e)}')
+            if self._next_sequence not in self._finished:
+                return
+            self._finished.remove(self._next_sequence)
+            self._next_sequence += 1
+
+
+class TranscriptionJobQueue:
+    """文字起こしジョブを上限付きのキューで受け付け、ワーカースレッドで並行処理する"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(workers, 1)
+        self.max_pending = max(max_pending, 1)
+        self._threads: List[threading.Thread] = []
+        self._queue: queue.Queue[Tuple[int, float, TranscriptionJob]] = queue.Queue()
+        self._condition = threading.Condition()
+        self._next_sequence = 0
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    @property
+    def pending_count(self) -> int:
+        """待機中と処理中のジョブ数"""
+        with self._condition:
+            return self._pending
+
+    def is_full(self) -> bool:
+        with self._condition:
+            return self._pending >= self.max_pending
+
+    def submit(self, job: TranscriptionJob) -> int:
+        """ジョブを登録して受付番号を返す。上限に達している場合はRuntimeError"""
+        with self._condition:
+            if self._pending >= self.max_pending:
+                raise RuntimeError('文字起こし待ちが上限に達しています')
+            sequence = self._next_sequence
+            self._next_sequence += 1
+            self._pending += 1
+            self._ensure_workers()
+            self._queue.put((sequence, time.perf_counter(), job))
+        return sequence
+
+    def _ensure_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._worker,
+                daemon=True,
+                name=f'TranscriptionWorker-{len(self._threads) + 1}'
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self, timeout: float) -> bool:
+        """すべてのジョブの完了を待機し、完了したかを返す"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending == 0, timeout)
+
+    def metrics(self) -> dict[str, float]:
+        """キューの深さと待ち時間を返す"""
+        with self._condition:
+            completed = self._completed
+            return {
+                'queue_depth': float(self._pending - self._running),
+                'in_flight': float(self._running),
+                'completed': float(completed),
+                'avg_wait_ms': self._total_wait / completed * 1000 if completed else 0.0,
+                'max_wait_ms': self._max_wait * 1000,
+                'last_wait_ms': self._last_wait * 1000,
+            }
+
+    def _worker(self) -> None:
+        while True:
+            sequence, enqueued_at, job = self._queue.get()
+            wait = time.perf_counter() - enqueued_at
+            with self._condition:
+                self._running += 1
+                depth = self._pending - self._running
+            logging.info(f'文字起こしジョブ#{sequence + 1} 開始: 待ち時間 {wait * 1000:.0f} ms / 待機中 {depth}件')
+            started_at = time.perf_counter()
+            try:
+                job(sequence)
+            except Exception as e:
+                logging.error(f'文字起こしジョブ#{sequence + 1} でエラー: {str(e)}')
+            finally:
+                elapsed = time.perf_counter() - started_at
+                with self._condition:
+                    self._running -= 1
+                    self._pending -= 1
+                    self._completed += 1
+                    self._total_wait += wait
+                    self._max_wait = max(self._max_wait, wait)
+                    self._last_wait = wait
+                    self._condition.notify_all()
+                logging.info(f'文字起こしジョブ#{sequence + 1} 完了: 処理 {elapsed * 1000:.0f} ms')
@@ -0,0 +1,73 @@
+import logging
+import os
+import time
+from typing import Any, Optional, Sequence
+
+from service.audio_buffer import AudioChunk, join_frames
+from service.audio_encoder import get_encoder
+from service.voice_activity import TrimResult, trim_silence
+from utils.app_config import AppConfig
+
+
+class UploadEncoder:
+    """録音の先頭・末尾の無音を除去し、設定の送信形式にエンコードして送信データとファイル名を作る"""
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+        self.encode_audio = get_encoder(config.upload_format)
+        self.upload_from_memory = config.in_memory_upload or config.upload_format.strip().lower() != 'wav'
+        self.last_trim_result: Optional[TrimResult] = None
+
+    def trim_silence(self, frames: Sequence[AudioChunk], sample_rate: int) -> Sequence[AudioChunk]:
+        """設定に応じて録音の先頭・末尾の無音を除去する。除去しなかった場合は引数をそのまま返す"""
+        if not self.config.vad_enabled or not frames:
+            return frames
+
+        try:
+            result = trim_silence(
+                join_frames(frames),
+                sample_rate,
+                self.config.audio_channels,
+                self.config.vad_threshold_db,
+                self.config.vad_frame_ms,
+                self.config.vad_padding_ms,
+                self.config.vad_min_speech_ms,
+                self.config.vad_max_pause_ms
+            )
+        except Exception as e:
+            logging.error(f'無音除去中にエラーが発生しました: {str(e)}')
+            return frames
+
+        self.last_trim_result = result
+        if result.removed_ms <= 0:
+            return frames
+        removed_ratio = result.removed_ms / result.original_ms * 100 if result.original_ms else 0.0
+        logging.info(
+            f'無音除去: {result.original_ms:.0f} ms → {result.original_ms - result.removed_ms:.0f} ms '
+            f'({result.removed_ms:.0f} ms / {removed_ratio:.1f}% 削除)'
+        )
+        return [result.audio]
+
+    def encode(
+            self,
+            frames: Sequence[AudioChunk],
+            sample_rate: int,
+            saved_path: Optional[str] = None
+    ) -> tuple[Any, str]:
+        """送信データとファイル名を作成する。保存済みのファイルがあれば拡張子だけを送信形式に変えた名前で送る"""
+        pcm = join_frames(frames)
+        started_at = time.perf_counter()
+        encoded = self.encode_audio(pcm, sample_rate, self.config.audio_channels)
+        encode_ms = (time.perf_counter() - started_at) * 1000
+        logging.info(
+            f'文字起こし開始: {encoded.extension[1:].upper()} {encoded.size} bytes '
+            f'(PCM {len(pcm)} bytes / エンコード {encode_ms:.1f} ms)'
+        )
+
+        stem = os.path.splitext(os.path.basename(saved_path))[0] if saved_path else 'audio'
+        return encoded.data, stem + encoded.extension
+
+    def encode_segment(self, pcm: AudioChunk, index: int) -> tuple[Any, str]:
+        """録音中に区切った区間の送信データと、連番のファイル名を作成する"""
+        encoded = self.encode_audio(pcm, self.config.audio_sample_rate, self.config.audio_channels)
+        return encoded.data, f'segment_{index + 1:03d}{encoded.extension}'
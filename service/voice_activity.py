@@ -0,0 +1,174 @@
+import logging
+from typing import NamedTuple
+
+import numpy as np
+
+from service.audio_buffer import AudioChunk
+
+FULL_SCALE = 32768.0
+_ENERGY_FLOOR = 1e-12
+
+
+class TrimResult(NamedTuple):
+    audio: AudioChunk
+    original_ms: float
+    removed_ms: float
+
+
+def frame_energy_db(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """フレームごとの平均エネルギーをdBFSで返す。末尾の端数サンプルは含めない"""
+    frame_count = samples.shape[0] // frame_length
+    if frame_count == 0:
+        return np.empty(0, dtype=np.float64)
+    framed = samples[:frame_count * frame_length].astype(np.float64) / FULL_SCALE
+    power = np.square(framed).reshape(frame_count, -1).mean(axis=1)
+    return 10.0 * np.log10(power + _ENERGY_FLOOR)
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Trueが連続する区間の開始位置と終了位置(終端を含まない)を返す"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def detect_voiced_frames(
+        energy_db: np.ndarray,
+        threshold_db: float,
+        min_speech_frames: int,
+        padding_frames: int
+) -> np.ndarray:
+    """閾値を超えるフレームから短いクリック音を除き、前後に余白を付けた発話マスクを返す"""
+    voiced = energy_db > threshold_db
+    starts, ends = _runs(voiced)
+    short = (ends - starts) < min_speech_frames
+    for start, end in zip(starts[short], ends[short]):
+        voiced[start:end] = False
+
+    if padding_frames > 0 and voiced.any():
+        kernel = np.ones(2 * padding_frames + 1, dtype=np.int32)
+        voiced = np.convolve(voiced.astype(np.int32), kernel, mode='same') > 0
+    return voiced
+
+
+def _collapse_pauses(voiced: np.ndarray, first: int, last: int, max_pause_frames: int) -> np.ndarray:
+    """発話区間内の長い無音を先頭と末尾の一部だけ残して短縮したフレームマスクを返す"""
+    keep = np.zeros_like(voiced)
+    keep[first:last] = True
+    silent_starts, silent_ends = _runs(~voiced[first:last])
+    for start, end in zip(silent_starts + first, silent_ends + first):
+        if end - start > max_pause_frames:
+            head = (max_pause_frames + 1) // 2
+            tail = max_pause_frames - head
+            keep[start + head:end - tail] = False
+    return keep
+
+
+def trim_silence(
+        pcm: AudioChunk,
+        sample_rate: int,
+        channels: int,
+        threshold_db: float,
+        frame_ms: int,
+        padding_ms: int,
+        min_speech_ms: int,
+        max_pause_ms: int
+) -> TrimResult:
+    """16bit PCMの先頭・末尾の無音を除去し、必要に応じて発話間の長い無音を短縮する"""
+    bytes_per_frame = channels * 2
+    samples = np.frombuffer(pcm, dtype='<i2')
+    original_ms = samples.shape[0] / channels / sample_rate * 1000
+    frame_length = max(int(sample_rate * frame_ms / 1000), 1)
+
+    if channels > 1:
+        usable = samples.shape[0] - samples.shape[0] % channels
+        mono = samples[:usable].reshape(-1, channels).mean(axis=1)
+    else:
+        mono = samples
+    energy_db = frame_energy_db(mono, frame_length)
+    voiced = detect_voiced_frames(
+        energy_db,
+        threshold_db,
+        max(min_speech_ms // frame_ms, 1),
+        padding_ms // frame_ms
+    )
+
+    voiced_indices = np.flatnonzero(voiced)
+    if voiced_indices.size == 0:
+        logging.warning('発話区間を検出できなかったため音声をそのまま使用します')
+        return TrimResult(pcm, original_ms, 0.0)
+
+    first, last = int(voiced_indices[0]), int(voiced_indices[-1]) + 1
+    step = frame_length * bytes_per_frame
+    # 末尾の発話フレームに続く端数サンプルは切り捨てない
+    end_byte = len(memoryview(pcm).cast('B')) if last == energy_db.size else last * step
+
+    max_pause_frames = max_pause_ms // frame_ms
+    if max_pause_ms <= 0 or not (~voiced[first:last]).any():
+        audio: AudioChunk = memoryview(pcm).cast('B')[first * step:end_byte]
+    else:
+        keep = _collapse_pauses(voiced, first, last, max_pause_frames)
+        starts, ends = _runs(keep)
+        view = memoryview(pcm).cast('B')
+        audio = b''.join(
+            view[start * step:(end_byte if end == last else end * step)]
+            for start, end in zip(starts, ends)
+        )
+
+    kept_ms = len(audio) / bytes_per_frame / sample_rate * 1000
+    return TrimResult(audio, original_ms, original_ms - kept_ms)
+
+
+class StreamingEndpointDetector:
+    """録音中のチャンクを逐次評価し、発話後の無音が一定時間続いたら終話と判定する"""
+
+    def __init__(
+            self,
+            sample_rate: int,
+            channels: int,
+            threshold_db: float,
+            min_speech_ms: int,
+            silence_ms: int
+    ):
+        self._bytes_per_ms = sample_rate * channels * 2 / 1000
+        self._threshold_db = threshold_db
+        self._min_speech_ms = min_speech_ms
+        self._silence_ms = silence_ms
+        self.reset()
+
+    def reset(self) -> None:
+        self._speech_ms = 0.0
+        self._trailing_silence_ms = 0.0
+        self._armed = False
+        self._triggered = False
+
+    @property
+    def triggered(self) -> bool:
+        return self._triggered
+
+    def feed(self, chunk: AudioChunk) -> bool:
+        """チャンクを評価し、終話を検出した最初の呼び出しでのみTrueを返す"""
+        if self._triggered or not chunk:
+            return False
+
+        samples = np.frombuffer(chunk, dtype='<i2')
+        chunk_ms = len(samples) * 2 / self._bytes_per_ms
+        power = float(np.mean(np.square(samples.astype(np.float64) / FULL_SCALE)))
+        is_voiced = 10.0 * np.log10(power + _ENERGY_FLOOR) > self._threshold_db
+
+        if is_voiced:
+            self._speech_ms += chunk_ms
+            self._trailing_silence_ms = 0.0
+            if self._speech_ms >= self._min_speech_ms:
+                self._armed = True
+            return False
+
+        if not self._armed:
+            # 発話とみなす長さに届かなかった音はクリック音などとして捨てる
+            self._speech_ms = 0.0
+            return False
+
+        self._trailing_silence_ms += chunk_ms
+        if self._trailing_silence_ms >= self._silence_ms:
+            self._triggered = True
+            return True
+        return False
@@ -0,0 +1,161 @@
+import io
+import logging
+import queue
+import struct
+import threading
+import time
+from typing import BinaryIO, Optional
+
+from service.audio_buffer import AudioChunk
+
+WAV_HEADER_SIZE = 44
+_RIFF_SIZE_OFFSET = 4
+_DATA_SIZE_OFFSET = 40
+
+
+def build_wav_header(data_size: int, sample_rate: int, channels: int, sample_width: int) -> bytes:
+    """PCM形式のWAVヘッダー(44バイト)を生成する"""
+    block_align = channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', WAV_HEADER_SIZE - 8 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b'data', data_size
+    )
+
+
+class StreamingWavWriter:
+    """録音中のチャンクを専用スレッドで逐次WAVファイルへ追記する"""
+
+    def __init__(
+            self,
+            path: str,
+            sample_rate: int,
+            channels: int,
+            sample_width: int,
+            header_interval: float = 1.0
+    ):
+        self.path = path
+        self.bytes_written = 0
+        self._header_interval = header_interval
+        self._queue: queue.SimpleQueue[Optional[bytes]] = queue.SimpleQueue()
+        self._error: Optional[Exception] = None
+        self._closed = False
+
+        self._file: BinaryIO = open(path, 'wb')
+        self._file.write(build_wav_header(0, sample_rate, channels, sample_width))
+        self._file.flush()
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name='WavWriter')
+        self._thread.start()
+
+    def write(self, chunk: AudioChunk) -> None:
+        """録音スレッドから呼ばれ、チャンクを書き込みキューへ渡す"""
+        if self._closed or not chunk:
+            return
+        self._queue.put(bytes(chunk))
+
+    def _run(self) -> None:
+        last_patched = time.monotonic()
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            if self._error is not None:
+                continue
+            try:
+                self._file.write(chunk)
+                self.bytes_written += len(chunk)
+                if time.monotonic() - last_patched >= self._header_interval:
+                    # 異常終了しても途中までを再生できるよう定期的にサイズを確定させる
+                    self._patch_header()
+                    last_patched = time.monotonic()
+            except Exception as e:
+                self._error = e
+                logging.error(f'音声ファイルの書き込み中にエラーが発生しました: {e}')
+
+    def _patch_header(self) -> None:
+        self._file.seek(_RIFF_SIZE_OFFSET)
+        self._file.write(struct.pack('<I', WAV_HEADER_SIZE - 8 + self.bytes_written))
+        self._file.seek(_DATA_SIZE_OFFSET)
+        self._file.write(struct.pack('<I', self.bytes_written))
+        self._file.seek(0, 2)
+        self._file.flush()
+
+    def close(self) -> Optional[str]:
+        """残りのチャンクを書き出してヘッダーを確定し、成功時はパスを返す"""
+        if self._closed:
+            return None if self._error else self.path
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            if self._error is None:
+                self._patch_header()
+        except Exception as e:
+            self._error = e
+            logging.error(f'音声ファイルのヘッダー更新中にエラーが発生しました: {e}')
+        finally:
+            self._file.close()
+
+        if self._error is not None:
+            return None
+        logging.info(f'音声ファイル保存完了: {self.path} ({self.bytes_written} bytes)')
+        return self.path
+
+
+class WavPayload(io.RawIOBase):
+    """ヘッダーとPCMのmemoryviewを連結せずに1つのWAVとして読み出すストリーム"""
+
+    def __init__(self, pcm: AudioChunk, sample_rate: int, channels: int, sample_width: int):
+        super().__init__()
+        self._data = memoryview(pcm).cast('B')
+        self._format = (sample_rate, channels, sample_width)
+        self._header = build_wav_header(len(self._data), sample_rate, channels, sample_width)
+        self._size = len(self._header) + len(self._data)
+        self._position = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def duration_seconds(self) -> float:
+        sample_rate, channels, sample_width = self._format
+        return len(self._data) / (sample_rate * channels * sample_width)
+
+    def clone(self) -> 'WavPayload':
+        """同じ音声を先頭から読み出す別のストリームを返す。PCMはコピーしない"""
+        return WavPayload(self._data, *self._format)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = min(max(offset, 0), self._size)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        target = memoryview(buffer).cast('B')
+        written = 0
+        header_size = len(self._header)
+        if self._position < header_size:
+            part = self._header[self._position:self._position + len(target)]
+            target[:len(part)] = part
+            written = len(part)
+        data_start = self._position + written - header_size
+        if written < len(target) and data_start < len(self._data):
+            part = self._data[data_start:data_start + len(target) - written]
+            target[written:written + len(part)] = part
+            written += len(part)
+        self._position += written
+        return written
@@ -1,13 +1,32 @@
-from unittest.mock import Mock, mock_open, patch
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, Mock, mock_open, patch
 
 import pytest
 
 from external_service.elevenlabs_api import (
+    AdaptiveTimeout,
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgingPolicy,
+    LatencyHistogram,
+    TranscriptionNetworkError,
+    api_address,
+    check_connectivity,
     convert_response_to_text,
+    estimate_audio_seconds,
+    setup_async_elevenlabs_client,
     setup_elevenlabs_client,
     transcribe_audio,
+    transcribe_audio_data,
+    transcribe_audio_data_async,
     validate_audio_file,
 )
+from external_service.http_connection import create_async_httpx_client
+from external_service.mock_stt_server import MockSttServer
+from service.async_engine import AsyncTranscriptionEngine
+from service.wav_io import WavPayload, build_wav_header
 from tests.conftest import dict_to_app_config
 
 
@@ -46,6 +65,60 @@ class TestSetupElevenLabsClient:
         with pytest.raises(ValueError, match="ELEVENLABS_API_KEYが未設定です"):
             setup_elevenlabs_client()
 
+    @patch('external_service.elevenlabs_api.load_env_variables')
+    @patch('external_service.elevenlabs_api.ElevenLabs')
+    def test_setup_client_with_base_url(self, mock_elevenlabs, mock_load_env):
+        """正常系: base_urlを指定するとAPIキーがなくてもその送信先で作成する"""
+        mock_load_env.return_value = {}
+        http_client = Mock()
+
+        setup_elevenlabs_client(http_client, 'http://127.0.0.1:8765')
+
+        mock_elevenlabs.assert_called_once_with(
+            api_key='local', base_url='http://127.0.0.1:8765', httpx_client=http_client
+        )
+
+
+class TestApiAddress:
+    """api_address()のテストクラス"""
+
+    def test_default(self):
+        """正常系: 未指定ならElevenLabsのAPIサーバー"""
+        assert api_address() == ('api.elevenlabs.io', 443)
+
+    def test_base_url_with_port(self):
+        """正常系: base_urlのホストとポートを返す"""
+        assert api_address('http://127.0.0.1:8765') == ('127.0.0.1', 8765)
+
+    def test_base_url_without_port(self):
+        """正常系: ポートを省略した場合はスキームの既定ポート"""
+        assert api_address('http://stt.local') == ('stt.local', 80)
+        assert api_address('https://stt.local') == ('stt.local', 443)
+
+
+class TestSetupAsyncElevenLabsClient:
+    """非同期ElevenLabsクライアント設定のテストクラス"""
+
+    @patch('external_service.elevenlabs_api.load_env_variables')
+    @patch('external_service.elevenlabs_api.AsyncElevenLabs')
+    def test_setup_async_client(self, mock_async_elevenlabs, mock_load_env):
+        """正常系: 渡した非同期HTTPクライアントで作成する"""
+        mock_load_env.return_value = {"ELEVENLABS_API_KEY": "test_api_key"}
+        http_client = Mock()
+
+        result = setup_async_elevenlabs_client(http_client)
+
+        assert result == mock_async_elevenlabs.return_value
+        mock_async_elevenlabs.assert_called_once_with(api_key="test_api_key", httpx_client=http_client)
+
+    @patch('external_service.elevenlabs_api.load_env_variables')
+    def test_setup_async_client_no_api_key(self, mock_load_env):
+        """異常系: APIキーが未設定の場合"""
+        mock_load_env.return_value = {}
+
+        with pytest.raises(ValueError, match="ELEVENLABS_API_KEYが未設定です"):
+            setup_async_elevenlabs_client()
+
 
 class TestValidateAudioFile:
     """音声ファイル検証のテストクラス"""
@@ -286,3 +359,547 @@ class TestTranscribeAudio:
         result = transcribe_audio("/test/audio.wav", self.mock_config, self.mock_client)
 
         assert result is None
+
+
+class TestTranscribeAudioData:
+    """メモリ上の音声データの文字起こしのテストクラス"""
+
+    def setup_method(self):
+        self.mock_config = dict_to_app_config({
+            'ELEVENLABS': {'MODEL': 'scribe_v2', 'LANGUAGE': 'jpn'}
+        })
+        self.mock_client = Mock()
+
+    def test_transcribe_data_success(self):
+        """正常系: ファイルを開かずにそのまま送信する"""
+        payload = Mock()
+        self.mock_client.speech_to_text.convert.return_value = Mock(text="文字起こし結果")
+
+        result = transcribe_audio_data(payload, 'audio.wav', self.mock_config, self.mock_client)
+
+        assert result == "文字起こし結果"
+        kwargs = self.mock_client.speech_to_text.convert.call_args.kwargs
+        assert kwargs['file'] == ('audio.wav', payload)
+        assert kwargs['model_id'] == 'scribe_v2'
+
+    def test_transcribe_data_timeout(self, caplog):
+        """異常系: 通信タイムアウト時は再送信対象の例外を送出しログに記録する"""
+        import httpx
+        self.mock_client.speech_to_text.convert.side_effect = httpx.ReadTimeout("timed out")
+
+        with pytest.raises(TranscriptionNetworkError):
+            transcribe_audio_data(b'RIFF', 'audio.wav', self.mock_config, self.mock_client)
+
+        assert "API通信タイムアウト: timed out" in caplog.text
+
+    def test_transcribe_data_connect_error(self):
+        """異常系: 接続できない場合は再送信対象の例外を送出する"""
+        import httpx
+        self.mock_client.speech_to_text.convert.side_effect = httpx.ConnectError("refused")
+
+        with pytest.raises(TranscriptionNetworkError, match='refused'):
+            transcribe_audio_data(b'RIFF', 'audio.wav', self.mock_config, self.mock_client)
+
+    def test_transcribe_data_api_error(self):
+        """異常系: 通信以外のエラーはNoneを返す"""
+        self.mock_client.speech_to_text.convert.side_effect = ValueError("invalid")
+
+        assert transcribe_audio_data(b'RIFF', 'audio.wav', self.mock_config, self.mock_client) is None
+
+
+class TestTranscribeAudioDataAsync:
+    """非同期クライアントでの文字起こしのテストクラス"""
+
+    def setup_method(self):
+        self.mock_config = dict_to_app_config({
+            'ELEVENLABS': {'MODEL': 'scribe_v2', 'LANGUAGE': 'jpn'}
+        })
+        self.mock_client = Mock()
+        self.mock_client.speech_to_text.convert = AsyncMock()
+
+    def test_transcribe_success(self):
+        """正常系: 結果のテキストを返す"""
+        payload = Mock()
+        self.mock_client.speech_to_text.convert.return_value = Mock(text="文字起こし結果")
+
+        result = asyncio.run(
+            transcribe_audio_data_async(payload, 'audio.wav', self.mock_config, self.mock_client)
+        )
+
+        assert result == "文字起こし結果"
+        kwargs = self.mock_client.speech_to_text.convert.call_args.kwargs
+        assert kwargs['file'] == ('audio.wav', payload)
+        assert kwargs['model_id'] == 'scribe_v2'
+
+    def test_transcribe_connect_error(self):
+        """異常系: 接続できない場合は再送信対象の例外を送出する"""
+        import httpx
+        self.mock_client.speech_to_text.convert.side_effect = httpx.ConnectError("refused")
+
+        with pytest.raises(TranscriptionNetworkError, match='refused'):
+            asyncio.run(transcribe_audio_data_async(b'RIFF', 'audio.wav', self.mock_config, self.mock_client))
+
+    def test_transcribe_api_error(self):
+        """異常系: 通信以外のエラーはNoneを返す"""
+        self.mock_client.speech_to_text.convert.side_effect = ValueError("invalid")
+
+        assert asyncio.run(
+            transcribe_audio_data_async(b'RIFF', 'audio.wav', self.mock_config, self.mock_client)
+        ) is None
+
+    def test_transcribe_with_mock_server(self):
+        """正常系: 非同期SDKクライアントでモックサーバーに送信できる"""
+        from elevenlabs.client import AsyncElevenLabs
+        audio = build_wav_header(32000, 16000, 1, 2) + bytes(32000)
+
+        async def run(base_url):
+            http_client = create_async_httpx_client()
+            try:
+                client = AsyncElevenLabs(api_key='test', base_url=base_url, httpx_client=http_client)
+                return await transcribe_audio_data_async(audio, 'audio.wav', self.mock_config, client)
+            finally:
+                await http_client.aclose()
+
+        with MockSttServer(base_latency_ms=0, latency_per_audio_second_ms=0) as server:
+            assert asyncio.run(run(server.base_url)) == '[1.0秒]'
+
+    def test_cancel_aborts_request_to_mock_server(self):
+        """正常系: 送信中のジョブのタスクをキャンセルすると、応答を待たずに通信を中断する"""
+        from elevenlabs.client import AsyncElevenLabs
+        audio = build_wav_header(32000, 16000, 1, 2) + bytes(32000)
+        engine = AsyncTranscriptionEngine(max_concurrency=1, max_pending=1)
+        http_client = create_async_httpx_client()
+        results = []
+
+        with MockSttServer(base_latency_ms=10000, latency_per_audio_second_ms=0) as server:
+            client = AsyncElevenLabs(api_key='test', base_url=server.base_url, httpx_client=http_client)
+
+            async def job(sequence):
+                results.append(await transcribe_audio_data_async(audio, 'audio.wav', self.mock_config, client))
+
+            try:
+                engine.submit(job)
+                time.sleep(0.3)
+                started_at = time.perf_counter()
+
+                engine.cancel_all()
+
+                assert engine.join(timeout=5) is True
+                assert time.perf_counter() - started_at < 1.0
+                assert engine.metrics()['cancelled'] == 1
+                assert results == []
+            finally:
+                engine.run_coroutine(http_client.aclose()).result(5)
+                engine.close()
+
+
+class TestCheckConnectivity:
+    """check_connectivity()のテストクラス"""
+
+    @patch('external_service.elevenlabs_api.socket.create_connection')
+    def test_reachable(self, mock_connect):
+        """正常系: 接続できればTrue"""
+        assert check_connectivity('example.com', 443, 1.0) is True
+        mock_connect.assert_called_once_with(('example.com', 443), timeout=1.0)
+
+    @patch('external_service.elevenlabs_api.socket.create_connection', side_effect=OSError('unreachable'))
+    def test_unreachable(self, _mock_connect):
+        """異常系: 接続できなければFalse"""
+        assert check_connectivity('example.com', 443, 1.0) is False
+
+
+class TestLatencyHistogram:
+    """LatencyHistogramのテストクラス"""
+
+    def test_percentile(self):
+        """正常系: 直近の応答時間からパーセンタイルを求める"""
+        histogram = LatencyHistogram()
+        for seconds in range(1, 11):
+            histogram.record(float(seconds))
+
+        assert histogram.percentile(50) == 6.0
+        assert histogram.percentile(90) == 10.0
+        assert histogram.percentile(100) == 10.0
+
+    def test_empty(self):
+        """正常系: 記録がなければNone"""
+        assert LatencyHistogram().percentile(50) is None
+
+    def test_keeps_recent_samples(self):
+        """正常系: 上限を超えた古い記録は使わない"""
+        histogram = LatencyHistogram(max_samples=2)
+        for seconds in (100.0, 1.0, 2.0):
+            histogram.record(seconds)
+
+        assert histogram.count == 2
+        assert histogram.percentile(100) == 2.0
+
+    def test_buckets(self):
+        """正常系: 上限秒数ごとの件数を数える"""
+        histogram = LatencyHistogram()
+        for seconds in (0.3, 0.9, 1.0, 100.0):
+            histogram.record(seconds)
+
+        buckets = histogram.buckets()
+        assert buckets['<=0.5s'] == 1
+        assert buckets['<=1s'] == 2
+        assert buckets['>64s'] == 1
+
+
+class TestEstimateAudioSeconds:
+    """estimate_audio_secondsのテストクラス"""
+
+    def test_wav(self):
+        """正常系: WAVヘッダーから長さを求める"""
+        assert estimate_audio_seconds(build_wav_header(64000, 16000, 1, 2) + bytes(64000)) == 2.0
+
+    def test_wav_payload(self):
+        """正常系: メモリ上のWAVは読み出さずに長さを求める"""
+        payload = WavPayload(bytes(48000), 16000, 1, 2)
+
+        assert estimate_audio_seconds(payload) == 1.5
+        assert payload.tell() == 0
+
+    def test_flac(self):
+        """正常系: FLACはSTREAMINFOの総サンプル数から長さを求める"""
+        pytest.importorskip('soundfile')
+        from service.audio_encoder import encode_flac
+
+        encoded = encode_flac(bytes(16000 * 2 * 3), 16000, 1)
+
+        assert estimate_audio_seconds(encoded.data) == 3.0
+
+    def test_unknown_format(self):
+        """正常系: それ以外は16kHzモノラル相当として概算する"""
+        assert estimate_audio_seconds(b'fLaC' + bytes(15996)) == 0.5
+
+
+class TestAdaptiveTimeout:
+    """AdaptiveTimeoutのテストクラス"""
+
+    def test_short_clip_uses_minimum(self):
+        """正常系: 短い音声は下限の秒数で打ち切る"""
+        timeouts = AdaptiveTimeout(min_seconds=10.0, max_seconds=240.0, margin=3.0)
+
+        assert timeouts.timeout_for(2.0, 64 * 1024) == 10.0
+
+    def test_long_clip_scales_with_duration_and_size(self):
+        """正常系: 長い音声は長さとサイズに比例し、上限で頭打ちにする"""
+        timeouts = AdaptiveTimeout(min_seconds=10.0, max_seconds=240.0, margin=3.0,
+                                   upload_bytes_per_second=64 * 1024)
+
+        assert timeouts.timeout_for(20.0, 64 * 1024 * 5) == 75.0
+        assert timeouts.timeout_for(600.0, 0) == 240.0
+
+    def test_learns_from_observed_speed(self):
+        """正常系: 記録が揃うと直近の処理速度の90パーセンタイルを使う"""
+        timeouts = AdaptiveTimeout(min_seconds=1.0, margin=2.0, min_samples=5)
+        for _ in range(4):
+            timeouts.record_success(10.0, 2.0)
+        assert timeouts.seconds_per_audio_second() == 1.0
+
+        timeouts.record_success(10.0, 2.0)
+
+        assert timeouts.seconds_per_audio_second() == pytest.approx(0.2)
+        assert timeouts.timeout_for(10.0, 0) == pytest.approx(4.0)
+
+    def test_timeouts_are_counted_by_kind(self, caplog):
+        """正常系: 発生したタイムアウトを種類ごとに数える"""
+        import httpx
+        timeouts = AdaptiveTimeout()
+        timeouts.timeout_for(3.0, 0)
+
+        timeouts.record_timeout(httpx.ReadTimeout('timed out'))
+        timeouts.record_timeout(httpx.ReadTimeout('timed out'))
+        timeouts.record_timeout(httpx.ConnectTimeout('timed out'))
+
+        metrics = timeouts.metrics()
+        assert metrics['read_fired'] == 2
+        assert metrics['connect_fired'] == 1
+        assert metrics['write_fired'] == 0
+        assert metrics['requests'] == 1
+        assert metrics['last_seconds'] == 10.0
+        assert '文字起こしのreadタイムアウトが発生しました: 上限 10.0秒' in caplog.text
+
+
+class TestTranscribeAudioDataTimeout:
+    """リクエストごとのタイムアウトのテストクラス"""
+
+    def setup_method(self):
+        self.config = dict_to_app_config({'ELEVENLABS': {'MODEL': 'scribe_v2', 'LANGUAGE': 'jpn'}})
+        self.client = Mock()
+        self.timeouts = AdaptiveTimeout(min_seconds=5.0, margin=2.0)
+
+    def test_timeout_is_passed_to_sdk(self):
+        """正常系: 音声から求めたタイムアウトをSDKのリクエスト設定で渡し、処理速度を記録する"""
+        self.client.speech_to_text.convert.return_value = Mock(text='結果')
+        audio = build_wav_header(16000 * 2 * 30, 16000, 1, 2)
+
+        result = transcribe_audio_data(audio, 'audio.wav', self.config, self.client, timeouts=self.timeouts)
+
+        assert result == '結果'
+        options = self.client.speech_to_text.convert.call_args.kwargs['request_options']
+        assert options['timeout_in_seconds'] == pytest.approx(60.0, abs=0.01)
+        assert self.timeouts.rates.count == 1
+
+    def test_without_policy(self):
+        """正常系: 設定がなければSDKの既定のタイムアウトを使う"""
+        self.client.speech_to_text.convert.return_value = Mock(text='結果')
+
+        transcribe_audio_data(b'RIFF', 'audio.wav', self.config, self.client)
+
+        assert self.client.speech_to_text.convert.call_args.kwargs['request_options'] is None
+
+    def test_timeout_is_recorded(self):
+        """異常系: タイムアウト時は種類を記録して再送信対象の例外を送出する"""
+        import httpx
+        self.client.speech_to_text.convert.side_effect = httpx.WriteTimeout('timed out')
+
+        with pytest.raises(TranscriptionNetworkError):
+            transcribe_audio_data(b'RIFF', 'audio.wav', self.config, self.client, timeouts=self.timeouts)
+
+        assert self.timeouts.metrics()['write_fired'] == 1
+        assert self.timeouts.rates.count == 0
+
+    def test_stuck_request_fails_fast(self):
+        """異常系: 応答が止まった短い音声はタイムアウトの秒数で打ち切る"""
+        from elevenlabs.client import ElevenLabs
+        timeouts = AdaptiveTimeout(min_seconds=0.5, max_seconds=0.5)
+        audio = build_wav_header(32000, 16000, 1, 2) + bytes(32000)
+
+        with MockSttServer(base_latency_ms=10000, latency_per_audio_second_ms=0) as server:
+            client = ElevenLabs(api_key='test', base_url=server.base_url)
+            started_at = time.perf_counter()
+            with pytest.raises(TranscriptionNetworkError):
+                transcribe_audio_data(audio, 'audio.wav', self.config, client, timeouts=timeouts)
+
+        assert time.perf_counter() - started_at < 5.0
+        assert timeouts.metrics()['read_fired'] == 1
+
+
+class TestHedgingPolicy:
+    """HedgingPolicyのテストクラス"""
+
+    def test_no_delay_until_enough_samples(self):
+        """正常系: 応答時間の記録が少ないうちは追加送信しない"""
+        policy = HedgingPolicy(percentile=90, min_samples=3, min_delay_seconds=0.0)
+        policy.histogram.record(1.0)
+
+        assert policy.hedge_delay() is None
+
+    def test_delay_from_percentile(self):
+        """正常系: 待ち時間は直近の応答時間のパーセンタイルで、下限を下回らない"""
+        policy = HedgingPolicy(percentile=90, min_samples=2, min_delay_seconds=0.5)
+        for seconds in (0.1, 0.2, 3.0):
+            policy.histogram.record(seconds)
+        assert policy.hedge_delay() == 3.0
+
+        low = HedgingPolicy(percentile=50, min_samples=1, min_delay_seconds=0.5)
+        low.histogram.record(0.1)
+        assert low.hedge_delay() == 0.5
+
+    def test_hedges_per_minute_cap(self):
+        """正常系: 1分あたりの追加送信数を制限する"""
+        policy = HedgingPolicy(max_hedges_per_minute=2)
+
+        assert policy.try_acquire(now=0.0) is True
+        assert policy.try_acquire(now=1.0) is True
+        assert policy.try_acquire(now=2.0) is False
+        assert policy.try_acquire(now=60.5) is True
+        assert policy.metrics()['hedges_skipped'] == 1
+
+
+class TestTranscribeAudioDataHedged:
+    """追加送信付きの文字起こしのテストクラス"""
+
+    def setup_method(self):
+        self.config = dict_to_app_config({'ELEVENLABS': {'MODEL': 'scribe_v2', 'LANGUAGE': 'jpn'}})
+        self.client = Mock()
+        self.policy = HedgingPolicy(percentile=50, min_samples=1, min_delay_seconds=0.05)
+        self.policy.histogram.record(0.05)
+
+    def test_fast_response_is_not_hedged(self):
+        """正常系: 待ち時間内に応答があれば追加送信しない"""
+        self.client.speech_to_text.convert.return_value = Mock(text='結果')
+
+        result = transcribe_audio_data(b'RIFF', 'audio.wav', self.config, self.client, self.policy)
+
+        assert result == '結果'
+        assert self.client.speech_to_text.convert.call_count == 1
+        assert self.policy.hedges_fired == 0
+
+    def test_slow_response_is_hedged(self):
+        """正常系: 応答が遅ければ追加送信し、先に返った応答を採用する"""
+        release = threading.Event()
+        calls = []
+
+        def convert(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                release.wait(5)
+                return Mock(text='遅い応答')
+            return Mock(text='追加送信の応答')
+
+        self.client.speech_to_text.convert.side_effect = convert
+        try:
+            result = transcribe_audio_data(b'RIFF', 'audio.wav', self.config, self.client, self.policy)
+        finally:
+            release.set()
+
+        assert result == '追加送信の応答'
+        assert self.policy.hedges_fired == 1
+        assert self.policy.hedges_won == 1
+
+    def test_hedge_uses_separate_payload_stream(self):
+        """正常系: ストリームを送信する場合は読み出し位置が干渉しないよう複製する"""
+        release = threading.Event()
+        files = []
+
+        def convert(file, **kwargs):
+            files.append(file[1])
+            if len(files) == 1:
+                release.wait(5)
+            return Mock(text='結果')
+
+        self.client.speech_to_text.convert.side_effect = convert
+        payload = WavPayload(b'\x00\x00' * 10, 16000, 1, 2)
+        try:
+            transcribe_audio_data(payload, 'audio.wav', self.config, self.client, self.policy)
+        finally:
+            release.set()
+
+        assert len(files) == 2
+        assert files[0] is not files[1]
+
+    def test_failure_waits_for_other_request(self):
+        """異常系: 先に返った側が失敗しても、もう一方が成功すればその応答を使う"""
+        import httpx
+        calls = []
+
+        def convert(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                time.sleep(0.2)
+                raise httpx.ReadTimeout('timed out')
+            time.sleep(0.3)
+            return Mock(text='結果')
+
+        self.client.speech_to_text.convert.side_effect = convert
+
+        result = transcribe_audio_data(b'RIFF', 'audio.wav', self.config, self.client, self.policy)
+
+        assert result == '結果'
+
+    def test_all_requests_fail(self):
+        """異常系: すべて通信エラーなら再送信対象の例外を送出する"""
+        import httpx
+        self.client.speech_to_text.convert.side_effect = httpx.ConnectError('refused')
+
+        with pytest.raises(TranscriptionNetworkError):
+            transcribe_audio_data(b'RIFF', 'audio.wav', self.config, self.client, self.policy)
+
+
+class TestCircuitBreaker:
+    """CircuitBreakerのテストクラス"""
+
+    def test_opens_after_consecutive_failures(self):
+        """正常系: 時間枠内に閾値まで通信障害が続くと送信を止める"""
+        breaker = CircuitBreaker(failure_threshold=2, window_seconds=60, reset_seconds=30)
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        assert breaker.metrics()['rejected'] == 1
+        assert breaker.metrics()['opened'] == 1
+
+    def test_old_failures_expire(self):
+        """正常系: 時間枠より前の通信障害は数えない"""
+        breaker = CircuitBreaker(failure_threshold=2, window_seconds=10)
+        breaker.record_failure(now=100.0)
+        breaker.record_failure(now=111.0)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_success_resets_failures(self):
+        """正常系: 成功すると障害の記録を消す"""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_circuit_open_error_is_network_error(self):
+        """正常系: 送信停止中の失敗は通信障害として再送信やローカル音声認識の対象になる"""
+        assert issubclass(CircuitOpenError, TranscriptionNetworkError)
+
+    def test_half_open_allows_single_trial(self):
+        """正常系: 待機時間の経過後は1件だけ送信を試し、成功したら再開する"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_request()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        breaker.record_success()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_failure_reopens(self):
+        """異常系: 試した送信が失敗したら再び停止する"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        breaker.record_failure()
+        breaker._set_state(CircuitBreaker.HALF_OPEN)
+        breaker.before_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.metrics()['opened'] == 2
+
+    def test_release_returns_trial(self):
+        """正常系: キャンセルした送信の枠を返すと次の送信で再び試せる"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.release()
+
+        breaker.before_request()
+
+    def test_probe_moves_to_half_open(self):
+        """正常系: 停止中はバックグラウンドで接続を確認し、つながったら再開を試す状態にする"""
+        states = []
+        probed = threading.Event()
+
+        def probe():
+            probed.set()
+            return True
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.01, probe=probe)
+        breaker.add_listener(states.append)
+        breaker.record_failure()
+
+        assert probed.wait(5)
+        deadline = time.monotonic() + 5
+        while breaker.state != CircuitBreaker.HALF_OPEN and time.monotonic() < deadline:
+            time.sleep(0.01)
+        breaker.stop()
+        assert states == [CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN]
+
+    def test_probe_failure_stays_open(self):
+        """異常系: 接続できない間は停止したまま"""
+        probed = threading.Event()
+
+        def probe():
+            probed.set()
+            return False
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.01, probe=probe)
+        breaker.record_failure()
+
+        assert probed.wait(5)
+        breaker.stop()
+        assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,194 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from external_service.http_connection import (
+    ConnectionCanceller,
+    ConnectionMetrics,
+    ConnectionWarmer,
+    create_async_httpx_client,
+    create_httpx_client,
+)
+from external_service.mock_stt_server import SPEECH_TO_TEXT_PATH, MockSttServer
+from service.async_engine import AsyncTranscriptionEngine
+
+
+@pytest.fixture
+def server():
+    with MockSttServer(base_latency_ms=0, latency_per_audio_second_ms=0) as mock_server:
+        yield mock_server
+
+
+def _post(client: httpx.Client, base_url: str) -> None:
+    client.post(base_url + SPEECH_TO_TEXT_PATH, files={'file': ('audio.wav', b'RIFF')})
+
+
+class TestCreateHttpxClient:
+    """create_httpx_client()のテストクラス"""
+
+    def test_timeouts_and_keepalive(self):
+        """正常系: 従来のタイムアウトを保ち、待機接続の保持時間を設定する"""
+        client = create_httpx_client(keepalive_expiry=30.0)
+        try:
+            assert client.timeout.read == 240.0
+            assert client.timeout.connect == 15.0
+            transport = client._transport
+            assert isinstance(transport, httpx.HTTPTransport)
+            assert transport._pool._keepalive_expiry == 30.0
+        finally:
+            client.close()
+
+
+class TestConnectionMetrics:
+    """ConnectionMetricsのテストクラス"""
+
+    def test_new_then_reused_connection(self, server):
+        """正常系: 最初のリクエストは新規接続、続くリクエストは既存接続の再利用として記録する"""
+        metrics = ConnectionMetrics()
+        with create_httpx_client(metrics) as client:
+            _post(client, server.base_url)
+            _post(client, server.base_url)
+
+        result = metrics.metrics()
+        assert result['requests'] == 2
+        assert result['new_connections'] == 1
+        assert result['reused_connections'] == 1
+        assert result['last_connect_ms'] == 0.0
+
+
+class TestConnectionWarmer:
+    """ConnectionWarmerのテストクラス"""
+
+    def test_warm_up_removes_connect_from_request(self, server):
+        """正常系: 事前確立した接続を文字起こしのリクエストが再利用する"""
+        metrics = ConnectionMetrics()
+        with create_httpx_client(metrics) as client:
+            warmer = ConnectionWarmer(client, server.base_url)
+            assert warmer.warm() is True
+            _post(client, server.base_url)
+
+        assert warmer.last_warmup_ms is not None
+        assert metrics.metrics()['new_connections'] == 0
+        assert metrics.metrics()['reused_connections'] == 1
+
+    def test_warm_up_async_client(self, server):
+        """正常系: 非同期クライアントは送信と同じイベントループで接続を確立する"""
+        metrics = ConnectionMetrics()
+        engine = AsyncTranscriptionEngine(max_concurrency=1, max_pending=1)
+        client = create_async_httpx_client(metrics)
+        try:
+            warmer = ConnectionWarmer(client, server.base_url, run_coroutine=engine.run_coroutine)
+            assert warmer.warm() is True
+            response = engine.run_coroutine(
+                client.post(server.base_url + SPEECH_TO_TEXT_PATH, files={'file': ('audio.wav', b'RIFF')})
+            ).result(timeout=5)
+            engine.run_coroutine(client.aclose()).result(timeout=5)
+        finally:
+            engine.close()
+
+        assert response.status_code == 200
+        assert metrics.metrics()['new_connections'] == 0
+        assert metrics.metrics()['reused_connections'] == 1
+
+    def test_warm_up_failure(self):
+        """異常系: 接続できなくても例外を送出しない"""
+        http_client = Mock()
+        http_client.head.side_effect = httpx.ConnectError('refused')
+
+        assert ConnectionWarmer(http_client, 'https://example.invalid').warm() is False
+
+    def test_warm_async(self):
+        """正常系: 別スレッドで接続を確立する"""
+        http_client = Mock()
+        warmer = ConnectionWarmer(http_client, 'https://example.invalid')
+
+        warmer.warm_async().join(5)
+
+        http_client.head.assert_called_once_with('https://example.invalid', timeout=5.0)
+
+    def test_keepalive(self):
+        """正常系: 一定間隔で接続を使い、停止すると終了する"""
+        http_client = Mock()
+        warmer = ConnectionWarmer(http_client, 'https://example.invalid')
+
+        warmer.start_keepalive(0.01)
+        thread = warmer._keepalive_thread
+        assert thread is not None
+        deadline = time.monotonic() + 5
+        while http_client.head.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        warmer.stop()
+        thread.join(5)
+
+        assert http_client.head.call_count >= 2
+        assert not thread.is_alive()
+
+    def test_keepalive_disabled(self):
+        """正常系: 間隔が0なら維持しない"""
+        warmer = ConnectionWarmer(Mock(), 'https://example.invalid')
+
+        warmer.start_keepalive(0)
+
+        assert warmer._keepalive_thread is None
+
+
+class TestConnectionCanceller:
+    """ConnectionCancellerのテストクラス"""
+
+    def test_cancel_closes_in_flight_request(self):
+        """正常系: 応答待ちのリクエストの接続プールを閉じて通信エラーにし、次のリクエストは新しい接続で送信する"""
+        metrics = ConnectionMetrics()
+        canceller = ConnectionCanceller()
+        errors = []
+
+        def post(client, base_url):
+            try:
+                _post(client, base_url)
+            except httpx.TransportError as e:
+                errors.append(e)
+
+        with MockSttServer(base_latency_ms=1000, latency_per_audio_second_ms=0) as server:
+            with create_httpx_client(metrics, canceller=canceller) as client:
+                thread = threading.Thread(target=post, args=(client, server.base_url), daemon=True)
+                thread.start()
+                time.sleep(0.3)
+
+                assert canceller.cancel_all() == 1
+                thread.join(timeout=5)
+
+                assert not thread.is_alive()
+                assert len(errors) == 1
+                _post(client, server.base_url)
+
+        # 中断したリクエストは応答がないため計測されず、続くリクエストが新しい接続として記録される
+        assert metrics.metrics()['requests'] == 1
+        assert metrics.metrics()['new_connections'] == 1
+
+    def test_idle_connection_is_kept(self, server):
+        """正常系: 送信中のリクエストがなければ、待機中の接続を次の送信で再利用できるよう残す"""
+        metrics = ConnectionMetrics()
+        canceller = ConnectionCanceller()
+        with create_httpx_client(metrics, canceller=canceller) as client:
+            _post(client, server.base_url)
+
+            assert canceller.cancel_all() == 0
+            _post(client, server.base_url)
+
+        assert metrics.metrics()['new_connections'] == 1
+        assert metrics.metrics()['reused_connections'] == 1
+
+    def test_cancel_without_connections(self):
+        """正常系: 送信中のリクエストがなければ何もしない"""
+        assert ConnectionCanceller().cancel_all() == 0
+
+    def test_keeps_keepalive_setting(self):
+        """正常系: キャンセル用のトランスポートでも待機接続の保持時間を設定する"""
+        with patch('external_service.http_connection.httpx.HTTPTransport', wraps=httpx.HTTPTransport) as transport:
+            client = create_httpx_client(keepalive_expiry=30.0, canceller=ConnectionCanceller())
+        try:
+            assert transport.call_args.kwargs['limits'].keepalive_expiry == 30.0
+        finally:
+            client.close()
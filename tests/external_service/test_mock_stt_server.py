@@ -0,0 +1,84 @@
+import httpx
+import pytest
+
+from external_service.mock_stt_server import SPEECH_TO_TEXT_PATH, MockSttServer, load_transcripts
+from service.wav_io import build_wav_header
+
+
+AUDIO = build_wav_header(32000, 16000, 1, 2) + bytes(32000)
+
+
+def _post(server: MockSttServer) -> httpx.Response:
+    return httpx.post(
+        server.base_url + SPEECH_TO_TEXT_PATH,
+        data={'model_id': 'scribe_v2'},
+        files={'file': ('audio.wav', AUDIO)}
+    )
+
+
+class TestMockSttServer:
+    """MockSttServerのテストクラス"""
+
+    def test_speech_to_text(self):
+        """正常系: multipartで送信した音声の長さを返す"""
+        with MockSttServer(base_latency_ms=0, latency_per_audio_second_ms=0) as server:
+            response = _post(server)
+
+            assert response.status_code == 200
+            assert response.json()['text'] == '[1.0秒]'
+            assert server.request_count == 1
+
+    def test_unknown_path(self):
+        """異常系: 未対応のパスは404"""
+        with MockSttServer(base_latency_ms=0) as server:
+            response = httpx.post(server.base_url + '/v1/unknown', content=b'')
+
+        assert response.status_code == 404
+
+    def test_canned_transcripts_cycle(self):
+        """正常系: 用意した文字起こし結果を受信順に繰り返し返す"""
+        with MockSttServer(base_latency_ms=0, latency_per_audio_second_ms=0, transcripts=['一', '二']) as server:
+            texts = [_post(server).json()['text'] for _ in range(3)]
+
+        assert texts == ['一', '二', '一']
+
+    def test_error_injection(self):
+        """異常系: error_rateの割合でHTTP 500を返す"""
+        with MockSttServer(base_latency_ms=0, latency_per_audio_second_ms=0, error_rate=1.0) as server:
+            response = _post(server)
+
+            assert response.status_code == 500
+            assert server.error_count == 1
+            assert server.request_count == 0
+
+    def test_disconnect_injection(self):
+        """異常系: disconnect_rateの割合で応答せずに接続を切る"""
+        with MockSttServer(base_latency_ms=0, latency_per_audio_second_ms=0, disconnect_rate=1.0) as server:
+            with pytest.raises(httpx.RemoteProtocolError):
+                _post(server)
+
+            assert server.disconnect_count == 1
+
+    def test_jitter_is_reproducible_with_seed(self):
+        """正常系: 同じseedなら同じゆらぎになり、遅延は基本遅延からjitter_msの範囲に収まる"""
+        first = MockSttServer(base_latency_ms=100, latency_per_audio_second_ms=0, jitter_ms=50, seed=1)
+        second = MockSttServer(base_latency_ms=100, latency_per_audio_second_ms=0, jitter_ms=50, seed=1)
+        try:
+            latencies = [first._plan(AUDIO)[0] for _ in range(5)]
+
+            assert latencies == [second._plan(AUDIO)[0] for _ in range(5)]
+            assert all(0.1 <= latency <= 0.15 for latency in latencies)
+        finally:
+            first.stop()
+            second.stop()
+
+
+class TestLoadTranscripts:
+    """load_transcripts()のテストクラス"""
+
+    def test_skips_blank_lines(self, tmp_path):
+        """正常系: 1行1件で読み込み、空行は無視する"""
+        path = tmp_path / 'transcripts.txt'
+        path.write_text('こんにちは\n\nさようなら\n', encoding='utf-8')
+
+        assert load_transcripts(str(path)) == ['こんにちは', 'さようなら']
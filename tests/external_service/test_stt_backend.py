@@ -0,0 +1,258 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+from elevenlabs.client import ElevenLabs
+
+from external_service.elevenlabs_api import (
+    AdaptiveTimeout,
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgingPolicy,
+    TranscriptionNetworkError,
+)
+from external_service.mock_stt_server import MockSttServer
+from external_service.stt_backend import (
+    CircuitBreakerBackend,
+    ElevenLabsBackend,
+    FallbackBackend,
+    LocalWhisperBackend,
+)
+from service.wav_io import WavPayload, build_wav_header
+from tests.conftest import dict_to_app_config
+
+
+@pytest.fixture
+def config():
+    return dict_to_app_config({
+        'ELEVENLABS': {'MODEL': 'scribe_v2', 'LANGUAGE': 'jpn'},
+        'PATHS': {'replacements_file': 'replacements.txt'},
+    })
+
+
+class TestElevenLabsBackend:
+    """ElevenLabsBackendのテストクラス"""
+
+    @patch('external_service.stt_backend.transcribe_audio_data')
+    @patch('external_service.stt_backend.transcribe_audio')
+    def test_passes_config_and_client(self, mock_file, mock_data, config):
+        """正常系: 設定とクライアントを付けて送信する"""
+        client = Mock()
+        backend = ElevenLabsBackend(config, client)
+
+        backend.transcribe_file('audio.wav')
+        backend.transcribe_data(b'audio', 'audio.wav')
+
+        mock_file.assert_called_once_with('audio.wav', config, client)
+        mock_data.assert_called_once_with(b'audio', 'audio.wav', config, client)
+
+    @patch('external_service.stt_backend.transcribe_audio_data')
+    def test_binds_policies(self, mock_data, config):
+        """正常系: ヘッジとタイムアウトの方針を送信に渡す"""
+        client = Mock()
+        hedging = Mock(spec=HedgingPolicy)
+        timeouts = Mock(spec=AdaptiveTimeout)
+        backend = ElevenLabsBackend(config, client, hedging, timeouts)
+
+        backend.transcribe_data(b'audio', 'audio.wav')
+
+        mock_data.assert_called_once_with(
+            b'audio', 'audio.wav', config, client, hedging=hedging, timeouts=timeouts
+        )
+
+    def test_mock_server_round_trip(self, config):
+        """正常系: base_urlをモックサーバーに向けたSDKクライアントで文字起こしできる"""
+        audio = build_wav_header(32000, 16000, 1, 2) + bytes(32000)
+        with MockSttServer(base_latency_ms=0, latency_per_audio_second_ms=0, transcripts=['テスト']) as server:
+            with httpx.Client() as http_client:
+                client = ElevenLabs(api_key='local', base_url=server.base_url, httpx_client=http_client)
+
+                assert ElevenLabsBackend(config, client).transcribe_data(audio, 'audio.wav') == 'テスト'
+
+    def test_mock_server_disconnect(self, config):
+        """異常系: 接続が切れた場合は通信障害として送出する"""
+        audio = build_wav_header(32000, 16000, 1, 2) + bytes(32000)
+        with MockSttServer(base_latency_ms=0, latency_per_audio_second_ms=0, disconnect_rate=1.0) as server:
+            with httpx.Client() as http_client:
+                client = ElevenLabs(api_key='local', base_url=server.base_url, httpx_client=http_client)
+
+                with pytest.raises(TranscriptionNetworkError):
+                    ElevenLabsBackend(config, client).transcribe_data(audio, 'audio.wav')
+
+
+class _FakeWhisperModel:
+    def __init__(self, text: str = 'ローカル', duration: float = 2.0, delay: float = 0.0):
+        self.text = text
+        self.duration = duration
+        self.delay = delay
+        self.inputs = []
+
+    def transcribe(self, audio, language):
+        self.inputs.append((audio.read() if hasattr(audio, 'read') else audio, language))
+        time.sleep(self.delay)
+        return iter([SimpleNamespace(text=self.text)]), SimpleNamespace(duration=self.duration)
+
+
+class TestLocalWhisperBackend:
+    """LocalWhisperBackendのテストクラス"""
+
+    def test_transcribe_reports_rtf(self):
+        """正常系: 文字起こし結果を返し、処理時間と実時間比を記録する"""
+        model = _FakeWhisperModel(duration=2.0, delay=0.05)
+        backend = LocalWhisperBackend('small', load_model=lambda *args: model)
+
+        assert backend.transcribe_file('audio.wav') == 'ローカル'
+
+        metrics = backend.metrics()
+        assert metrics['requests'] == 1.0
+        assert metrics['last_latency_ms'] >= 50
+        assert metrics['last_rtf'] == pytest.approx(metrics['last_latency_ms'] / 1000 / 2.0)
+        assert model.inputs == [('audio.wav', 'ja')]
+
+    def test_transcribe_data_rereads_stream(self):
+        """正常系: 送信で読み出し済みのWAVストリームも先頭から読み直す"""
+        model = _FakeWhisperModel()
+        backend = LocalWhisperBackend(load_model=lambda *args: model)
+        payload = WavPayload(bytes(3200), 16000, 1, 2)
+        payload.read()
+
+        backend.transcribe_data(payload, 'audio.wav')
+        backend.transcribe_data(b'flac', 'audio.flac')
+
+        assert model.inputs[0][0] == build_wav_header(3200, 16000, 1, 2) + bytes(3200)
+        assert model.inputs[1][0] == b'flac'
+
+    def test_empty_result(self):
+        """異常系: 何も認識できなければNone"""
+        backend = LocalWhisperBackend(load_model=lambda *args: _FakeWhisperModel(text='  '))
+
+        assert backend.transcribe_file('audio.wav') is None
+
+    def test_load_in_background(self):
+        """正常系: モデルは初回の利用前に別スレッドで一度だけ読み込む"""
+        load_model = Mock(return_value=_FakeWhisperModel())
+        backend = LocalWhisperBackend('small', 'int8', 4, load_model=load_model)
+
+        assert backend.is_loaded is False
+        backend.load_in_background().join(5)
+        backend.transcribe_file('audio.wav')
+
+        assert backend.is_loaded is True
+        load_model.assert_called_once_with('small', 'int8', 4)
+
+    def test_load_failure_is_logged(self, caplog):
+        """異常系: バックグラウンドでの読み込み失敗は記録し、利用時に例外を送出する"""
+        backend = LocalWhisperBackend(load_model=Mock(side_effect=RuntimeError('no model')))
+
+        backend.load_in_background().join(5)
+
+        assert 'ローカル音声認識のモデルを読み込めません: no model' in caplog.text
+        with pytest.raises(RuntimeError, match='no model'):
+            backend.transcribe_file('audio.wav')
+
+
+class TestFallbackBackend:
+    """FallbackBackendのテストクラス"""
+
+    def setup_method(self):
+        self.primary = Mock(name='primary')
+        self.primary.name = 'elevenlabs'
+        self.fallback = Mock(name='fallback')
+        self.fallback.name = 'local'
+        self.fallback.transcribe_data.return_value = 'ローカル'
+
+    def test_primary_success(self):
+        """正常系: 主の送信先で文字起こしできれば代わりの送信先は使わない"""
+        self.primary.transcribe_data.return_value = 'API'
+        backend = FallbackBackend(self.primary, self.fallback)
+
+        assert backend.transcribe_data(b'audio', 'audio.wav') == 'API'
+        assert backend.used_fallback is False
+        self.fallback.transcribe_data.assert_not_called()
+
+    def test_network_error_falls_back(self):
+        """正常系: 通信障害なら代わりの送信先で文字起こしする"""
+        self.primary.transcribe_data.side_effect = TranscriptionNetworkError('offline')
+        backend = FallbackBackend(self.primary, self.fallback)
+
+        assert backend.transcribe_data(b'audio', 'audio.wav') == 'ローカル'
+        assert backend.used_fallback is True
+        assert backend.fallback_count == 1
+
+    def test_other_errors_propagate(self):
+        """異常系: 通信障害以外の例外は代わりの送信先を使わずに送出する"""
+        self.primary.transcribe_file.side_effect = ValueError('bad audio')
+        backend = FallbackBackend(self.primary, self.fallback)
+
+        with pytest.raises(ValueError):
+            backend.transcribe_file('audio.wav')
+        self.fallback.transcribe_file.assert_not_called()
+
+    def test_fallback_failure_raises_network_error(self, caplog):
+        """異常系: 代わりの送信先でも失敗した場合は、再送信できるよう主の送信先の通信障害を送出する"""
+        network_error = TranscriptionNetworkError('offline')
+        self.primary.transcribe_data.side_effect = network_error
+        self.fallback.transcribe_data.side_effect = RuntimeError('model not loaded')
+        backend = FallbackBackend(self.primary, self.fallback)
+
+        with pytest.raises(TranscriptionNetworkError) as exc_info:
+            backend.transcribe_data(b'audio', 'audio.wav')
+
+        assert exc_info.value is network_error
+        assert isinstance(exc_info.value.__cause__, RuntimeError)
+        assert 'model not loaded' in caplog.text
+
+
+class TestCircuitBreakerBackend:
+    """CircuitBreakerBackendのテストクラス"""
+
+    def setup_method(self):
+        self.inner = Mock()
+        self.inner.name = 'elevenlabs'
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+
+    def test_fails_fast_when_open(self):
+        """正常系: 通信障害が続いた後は送信せずに即座に失敗する"""
+        self.inner.transcribe_data.side_effect = TranscriptionNetworkError('timeout')
+        backend = CircuitBreakerBackend(self.inner, self.breaker)
+        for _ in range(2):
+            with pytest.raises(TranscriptionNetworkError):
+                backend.transcribe_data(b'audio', 'audio.wav')
+
+        with pytest.raises(CircuitOpenError):
+            backend.transcribe_data(b'audio', 'audio.wav')
+        assert self.inner.transcribe_data.call_count == 2
+
+    def test_response_errors_are_not_failures(self):
+        """正常系: 応答があった失敗は通信障害として数えない"""
+        self.inner.transcribe_file.side_effect = ValueError('bad request')
+        backend = CircuitBreakerBackend(self.inner, self.breaker)
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                backend.transcribe_file('audio.wav')
+
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    def test_cancelled_errors_are_not_failures(self):
+        """正常系: キャンセルで接続を閉じた通信エラーは障害に数えない"""
+        self.inner.transcribe_data.side_effect = TranscriptionNetworkError('aborted')
+        backend = CircuitBreakerBackend(self.inner, self.breaker, is_cancelled=lambda: True)
+        for _ in range(3):
+            with pytest.raises(TranscriptionNetworkError):
+                backend.transcribe_data(b'audio', 'audio.wav')
+
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    def test_open_circuit_routes_to_fallback(self):
+        """正常系: 送信停止中はローカル音声認識へ切り替える"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        fallback = Mock()
+        fallback.name = 'local'
+        fallback.transcribe_data.return_value = 'ローカル'
+        backend = FallbackBackend(CircuitBreakerBackend(self.inner, self.breaker), fallback)
+
+        assert backend.transcribe_data(b'audio', 'audio.wav') == 'ローカル'
+        self.inner.transcribe_data.assert_not_called()
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+import pytest
+
+from service.async_engine import AsyncTranscriptionEngine
+
+
+class TestAsyncTranscriptionEngine:
+    """AsyncTranscriptionEngineのテストクラス"""
+
+    def setup_method(self):
+        self.engine = AsyncTranscriptionEngine(max_concurrency=2, max_pending=3)
+
+    def teardown_method(self):
+        self.engine.close()
+
+    def test_jobs_run_concurrently(self):
+        """正常系: 同時実行数までのジョブを並行して処理する"""
+        started = []
+        both_started = threading.Event()
+
+        async def job(sequence):
+            started.append(sequence)
+            if len(started) == 2:
+                both_started.set()
+            while not both_started.is_set():
+                await asyncio.sleep(0.01)
+
+        self.engine.submit(job)
+        self.engine.submit(job)
+
+        assert self.engine.join(timeout=5) is True
+        assert sorted(started) == [0, 1]
+        assert self.engine.metrics()['completed'] == 2
+
+    def test_concurrency_limit(self):
+        """正常系: 同時実行数を超えたジョブは先行ジョブの完了まで待機する"""
+        release = threading.Event()
+        started = []
+
+        async def job(sequence):
+            started.append(sequence)
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+
+        for _ in range(3):
+            self.engine.submit(job)
+
+        assert self.engine.join(timeout=0.2) is False
+        assert sorted(started) == [0, 1]
+        assert self.engine.metrics()['queue_depth'] == 1
+        release.set()
+
+        assert self.engine.join(timeout=5) is True
+        assert sorted(started) == [0, 1, 2]
+
+    def test_pending_limit(self):
+        """異常系: 上限に達すると新しいジョブを受け付けない"""
+        release = threading.Event()
+
+        async def job(sequence):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+
+        for _ in range(3):
+            self.engine.submit(job)
+
+        assert self.engine.is_full() is True
+        try:
+            with pytest.raises(RuntimeError, match='文字起こし待ちが上限に達しています'):
+                self.engine.submit(job)
+        finally:
+            release.set()
+
+    def test_cancel_all(self):
+        """正常系: 実行中と待機中のジョブをキャンセルする"""
+        started = threading.Event()
+
+        async def job(sequence):
+            started.set()
+            await asyncio.sleep(60)
+
+        for _ in range(3):
+            self.engine.submit(job)
+        assert started.wait(5)
+
+        self.engine.cancel_all()
+
+        assert self.engine.join(timeout=5) is True
+        assert self.engine.metrics()['cancelled'] == 3
+        assert self.engine.pending_count == 0
+
+    def test_on_finished_after_cancel_while_waiting(self):
+        """正常系: 実行枠を待つ間にキャンセルされたジョブも終了を通知する"""
+        started = threading.Event()
+        finished = []
+
+        async def job(sequence):
+            started.set()
+            await asyncio.sleep(60)
+
+        for _ in range(3):
+            self.engine.submit(job, finished.append)
+        assert started.wait(5)
+
+        self.engine.cancel_all()
+
+        assert self.engine.join(timeout=5) is True
+        assert sorted(finished) == [0, 1, 2]
+
+    def test_job_error_is_logged(self, caplog):
+        """異常系: ジョブの例外は記録され、エンジンは処理を続ける"""
+        async def failing(sequence):
+            raise ValueError('boom')
+
+        async def succeeding(sequence):
+            return None
+
+        self.engine.submit(failing)
+        self.engine.submit(succeeding)
+
+        assert self.engine.join(timeout=5) is True
+        assert self.engine.metrics()['completed'] == 2
+        assert '文字起こしジョブ#1 でエラー: boom' in caplog.text
+
+    def test_run_coroutine(self):
+        """正常系: 他のスレッドからイベントループ上のコルーチンの結果を待てる"""
+        async def answer():
+            return 42
+
+        assert self.engine.run_coroutine(answer()).result(timeout=5) == 42
+
+    def test_close_without_jobs(self):
+        """正常系: イベントループを開始していなくても終了できる"""
+        engine = AsyncTranscriptionEngine(max_concurrency=1, max_pending=1)
+
+        engine.close()
+
+        assert engine.pending_count == 0
@@ -0,0 +1,108 @@
+from service.audio_buffer import GrowableAudioBuffer, PrerollRingBuffer, join_frames
+
+
+class TestGrowableAudioBuffer:
+    """GrowableAudioBufferのテストクラス"""
+
+    def test_write_within_capacity(self):
+        """正常系: 事前確保した容量内での書き込み"""
+        buffer = GrowableAudioBuffer(16)
+        buffer.write(b'abcd')
+        buffer.write(b'efgh')
+
+        assert len(buffer) == 8
+        assert buffer.capacity == 16
+        assert bytes(buffer.detach()) == b'abcdefgh'
+
+    def test_write_grows_buffer(self):
+        """正常系: 容量不足時に拡張して既存データを保持する"""
+        buffer = GrowableAudioBuffer(4)
+        buffer.write(b'1234')
+        buffer.write(b'56789')
+
+        assert buffer.capacity >= 9
+        assert bytes(buffer.detach()) == b'123456789'
+
+    def test_detach_returns_memoryview_without_copy(self):
+        """正常系: detachはmemoryviewを返しバッファを空にする"""
+        buffer = GrowableAudioBuffer(8)
+        buffer.write(b'data')
+
+        view = buffer.detach()
+
+        assert isinstance(view, memoryview)
+        assert view.tobytes() == b'data'
+        assert len(buffer) == 0
+
+    def test_write_after_detach(self):
+        """境界値: 引き渡し後も新しいデータを書き込める"""
+        buffer = GrowableAudioBuffer(8)
+        buffer.write(b'old')
+        view = buffer.detach()
+        buffer.write(b'new')
+
+        assert view.tobytes() == b'old'
+        assert bytes(buffer.detach()) == b'new'
+
+    def test_zero_capacity(self):
+        """境界値: 容量0を指定しても書き込める"""
+        buffer = GrowableAudioBuffer(0)
+        buffer.write(b'xyz')
+
+        assert bytes(buffer.detach()) == b'xyz'
+
+
+class TestJoinFrames:
+    """join_framesのテストクラス"""
+
+    def test_join_multiple_frames(self):
+        """正常系: 複数フレームを連結する"""
+        assert join_frames([b'ab', b'cd']) == b'abcd'
+
+    def test_single_frame_is_not_copied(self):
+        """正常系: 単一フレームはそのまま返す"""
+        view = memoryview(bytearray(b'abcd'))
+        assert join_frames([view]) is view
+
+    def test_empty_frames(self):
+        """境界値: 空のフレーム列"""
+        assert join_frames([]) == b''
+
+
+class TestPrerollRingBuffer:
+    """PrerollRingBufferのテストクラス"""
+
+    def test_snapshot_before_full(self):
+        """正常系: 容量未満の場合は書き込み順に返す"""
+        ring = PrerollRingBuffer(8)
+        ring.write(b'abc')
+        ring.write(b'de')
+
+        assert ring.snapshot() == b'abcde'
+        assert len(ring) == 5
+
+    def test_wraps_and_keeps_latest(self):
+        """正常系: 容量を超えると古いデータから上書きする"""
+        ring = PrerollRingBuffer(6)
+        ring.write(b'1234')
+        ring.write(b'5678')
+
+        assert ring.snapshot() == b'345678'
+        assert len(ring) == 6
+
+    def test_chunk_larger_than_capacity(self):
+        """境界値: 容量以上のチャンクは末尾のみ保持する"""
+        ring = PrerollRingBuffer(4)
+        ring.write(b'ab')
+        ring.write(b'123456')
+
+        assert ring.snapshot() == b'3456'
+
+    def test_clear(self):
+        """正常系: clearで空になる"""
+        ring = PrerollRingBuffer(4)
+        ring.write(b'abcd')
+        ring.clear()
+
+        assert ring.snapshot() == b''
+        assert ring.capacity == 4
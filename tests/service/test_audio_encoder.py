@@ -0,0 +1,82 @@
+import io
+import wave
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from service.audio_encoder import encode_flac, encode_wav, get_encoder
+from service.wav_io import WavPayload
+
+PCM = (np.sin(np.arange(1600) * 0.05) * 8000).astype('<i2').tobytes()
+
+
+class TestEncodeWav:
+    """encode_wavのテストクラス"""
+
+    def test_encode_wav(self):
+        """正常系: PCMをそのままWAVとして読み出せる"""
+        encoded = encode_wav(memoryview(PCM), 16000, 1)
+
+        assert encoded.extension == '.wav'
+        assert encoded.size == len(PCM) + 44
+        assert isinstance(encoded.data, WavPayload)
+        with wave.open(io.BytesIO(encoded.data.read()), 'rb') as wf:
+            assert wf.readframes(wf.getnframes()) == PCM
+
+
+class TestEncodeFlac:
+    """encode_flacのテストクラス"""
+
+    def test_encode_flac_is_lossless(self):
+        """正常系: 可逆圧縮で元のPCMに復元できる"""
+        soundfile = pytest.importorskip('soundfile')
+
+        encoded = encode_flac(PCM, 16000, 1)
+
+        assert encoded.extension == '.flac'
+        assert isinstance(encoded.data, bytes)
+        assert encoded.size == len(encoded.data) < len(PCM)
+        samples, sample_rate = soundfile.read(io.BytesIO(encoded.data), dtype='int16')
+        assert sample_rate == 16000
+        assert samples.tobytes() == PCM
+
+    def test_encode_flac_stereo(self):
+        """正常系: ステレオはチャンネルを分けてエンコードする"""
+        soundfile = pytest.importorskip('soundfile')
+
+        encoded = encode_flac(PCM, 16000, 2)
+
+        assert isinstance(encoded.data, bytes)
+        samples, _ = soundfile.read(io.BytesIO(encoded.data), dtype='int16')
+        assert samples.shape == (len(PCM) // 4, 2)
+
+    @patch('service.audio_encoder.soundfile', None)
+    def test_encode_flac_without_soundfile(self):
+        """異常系: soundfileがない場合はRuntimeError"""
+        with pytest.raises(RuntimeError, match="soundfileが必要です"):
+            encode_flac(PCM, 16000, 1)
+
+
+class TestGetEncoder:
+    """get_encoderのテストクラス"""
+
+    def test_get_encoder_by_name(self):
+        """正常系: 大文字や空白を含む設定値でも選択できる"""
+        assert get_encoder(' WAV ') is encode_wav
+
+    @patch('service.audio_encoder.soundfile', object())
+    def test_get_flac_encoder(self):
+        """正常系: soundfileがあればFLACを返す"""
+        assert get_encoder('flac') is encode_flac
+
+    def test_unknown_format_falls_back(self, caplog):
+        """異常系: 未対応の形式はWAVにフォールバックする"""
+        assert get_encoder('mp3') is encode_wav
+        assert "未対応のアップロード形式のためWAVを使用します: mp3" in caplog.text
+
+    @patch('service.audio_encoder.soundfile', None)
+    def test_unavailable_flac_falls_back(self, caplog):
+        """異常系: soundfileがない場合はWAVにフォールバックする"""
+        assert get_encoder('flac') is encode_wav
+        assert "flacエンコーダーが利用できないためWAVを使用します" in caplog.text
@@ -24,18 +24,16 @@ class TestAudioFileManagerSaveAudio:
 
     @patch('service.audio_file_manager.os.makedirs')
     @patch('service.audio_file_manager.wave.open')
-    @patch('service.audio_file_manager.pyaudio.PyAudio')
+    @patch('service.audio_file_manager.pyaudio.get_sample_size')
     @patch('service.audio_file_manager.datetime')
-    def test_save_audio_success(self, mock_datetime, mock_pyaudio_class, mock_wave_open, mock_makedirs):
+    def test_save_audio_success(self, mock_datetime, mock_get_sample_size, mock_wave_open, mock_makedirs):
         """正常系: 音声ファイル保存成功"""
         mock_datetime.now.return_value.strftime.return_value = "20240101_120000"
 
         mock_wave_file = Mock()
         mock_wave_open.return_value.__enter__.return_value = mock_wave_file
 
-        mock_pyaudio_instance = Mock()
-        mock_pyaudio_class.return_value = mock_pyaudio_instance
-        mock_pyaudio_instance.get_sample_size.return_value = 2
+        mock_get_sample_size.return_value = 2
 
         manager = AudioFileManager(dict_to_app_config(self.mock_config))
         result = manager.save_audio(self.test_frames, self.sample_rate)
@@ -49,18 +47,16 @@ class TestAudioFileManagerSaveAudio:
 
     @patch('service.audio_file_manager.os.makedirs')
     @patch('service.audio_file_manager.wave.open')
-    @patch('service.audio_file_manager.pyaudio.PyAudio')
+    @patch('service.audio_file_manager.pyaudio.get_sample_size')
     @patch('service.audio_file_manager.datetime')
-    def test_save_audio_empty_frames(self, mock_datetime, mock_pyaudio_class, mock_wave_open, mock_makedirs):
+    def test_save_audio_empty_frames(self, mock_datetime, mock_get_sample_size, mock_wave_open, mock_makedirs):
         """境界値: 空のフレームデータ"""
         mock_datetime.now.return_value.strftime.return_value = "20240101_120000"
 
         mock_wave_file = Mock()
         mock_wave_open.return_value.__enter__.return_value = mock_wave_file
 
-        mock_pyaudio_instance = Mock()
-        mock_pyaudio_class.return_value = mock_pyaudio_instance
-        mock_pyaudio_instance.get_sample_size.return_value = 2
+        mock_get_sample_size.return_value = 2
 
         manager = AudioFileManager(dict_to_app_config(self.mock_config))
         result = manager.save_audio([], self.sample_rate)
@@ -70,9 +66,9 @@ class TestAudioFileManagerSaveAudio:
 
     @patch('service.audio_file_manager.os.makedirs')
     @patch('service.audio_file_manager.wave.open')
-    @patch('service.audio_file_manager.pyaudio.PyAudio')
+    @patch('service.audio_file_manager.pyaudio.get_sample_size')
     @patch('service.audio_file_manager.datetime')
-    def test_save_audio_stereo_channels(self, mock_datetime, mock_pyaudio_class, mock_wave_open, mock_makedirs):
+    def test_save_audio_stereo_channels(self, mock_datetime, mock_get_sample_size, mock_wave_open, mock_makedirs):
         """正常系: ステレオ音声の保存"""
         stereo_config = {
             'PATHS': {'TEMP_DIR': '/test/temp'},
@@ -83,9 +79,7 @@ class TestAudioFileManagerSaveAudio:
         mock_wave_file = Mock()
         mock_wave_open.return_value.__enter__.return_value = mock_wave_file
 
-        mock_pyaudio_instance = Mock()
-        mock_pyaudio_class.return_value = mock_pyaudio_instance
-        mock_pyaudio_instance.get_sample_size.return_value = 2
+        mock_get_sample_size.return_value = 2
 
         manager = AudioFileManager(dict_to_app_config(stereo_config))
         result = manager.save_audio(self.test_frames, self.sample_rate)
@@ -95,18 +89,16 @@ class TestAudioFileManagerSaveAudio:
 
     @patch('service.audio_file_manager.os.makedirs')
     @patch('service.audio_file_manager.wave.open')
-    @patch('service.audio_file_manager.pyaudio.PyAudio')
+    @patch('service.audio_file_manager.pyaudio.get_sample_size')
     @patch('service.audio_file_manager.datetime')
-    def test_save_audio_different_sample_rates(self, mock_datetime, mock_pyaudio_class, mock_wave_open, mock_makedirs):
+    def test_save_audio_different_sample_rates(self, mock_datetime, mock_get_sample_size, mock_wave_open, mock_makedirs):
         """正常系: 異なるサンプルレート"""
         mock_datetime.now.return_value.strftime.return_value = "20240101_120000"
 
         mock_wave_file = Mock()
         mock_wave_open.return_value.__enter__.return_value = mock_wave_file
 
-        mock_pyaudio_instance = Mock()
-        mock_pyaudio_class.return_value = mock_pyaudio_instance
-        mock_pyaudio_instance.get_sample_size.return_value = 2
+        mock_get_sample_size.return_value = 2
 
         manager = AudioFileManager(dict_to_app_config(self.mock_config))
         result = manager.save_audio(self.test_frames, 44100)
@@ -129,9 +121,9 @@ class TestAudioFileManagerSaveAudio:
 
     @patch('service.audio_file_manager.os.makedirs')
     @patch('service.audio_file_manager.wave.open')
-    @patch('service.audio_file_manager.pyaudio.PyAudio')
+    @patch('service.audio_file_manager.pyaudio.get_sample_size')
     @patch('service.audio_file_manager.datetime')
-    def test_save_audio_logging(self, mock_datetime, mock_pyaudio_class, mock_wave_open, mock_makedirs, caplog):
+    def test_save_audio_logging(self, mock_datetime, mock_get_sample_size, mock_wave_open, mock_makedirs, caplog):
         """ログ出力の確認"""
         caplog.set_level(logging.INFO)
         mock_datetime.now.return_value.strftime.return_value = "20240101_120000"
@@ -139,9 +131,7 @@ class TestAudioFileManagerSaveAudio:
         mock_wave_file = Mock()
         mock_wave_open.return_value.__enter__.return_value = mock_wave_file
 
-        mock_pyaudio_instance = Mock()
-        mock_pyaudio_class.return_value = mock_pyaudio_instance
-        mock_pyaudio_instance.get_sample_size.return_value = 2
+        mock_get_sample_size.return_value = 2
 
         manager = AudioFileManager(dict_to_app_config(self.mock_config))
         result = manager.save_audio(self.test_frames, self.sample_rate)
@@ -155,9 +145,9 @@ class TestAudioFileManagerPerformance:
 
     @patch('service.audio_file_manager.os.makedirs')
     @patch('service.audio_file_manager.wave.open')
-    @patch('service.audio_file_manager.pyaudio.PyAudio')
+    @patch('service.audio_file_manager.pyaudio.get_sample_size')
     @patch('service.audio_file_manager.datetime')
-    def test_large_audio_data_performance(self, mock_datetime, mock_pyaudio_class, mock_wave_open, mock_makedirs):
+    def test_large_audio_data_performance(self, mock_datetime, mock_get_sample_size, mock_wave_open, mock_makedirs):
         """大量音声データの処理性能テスト"""
         mock_datetime.now.return_value.strftime.return_value = "20240101_120000"
 
@@ -166,9 +156,7 @@ class TestAudioFileManagerPerformance:
         mock_wave_file = Mock()
         mock_wave_open.return_value.__enter__.return_value = mock_wave_file
 
-        mock_pyaudio_instance = Mock()
-        mock_pyaudio_class.return_value = mock_pyaudio_instance
-        mock_pyaudio_instance.get_sample_size.return_value = 2
+        mock_get_sample_size.return_value = 2
 
         config = {
             'PATHS': {'TEMP_DIR': '/test/temp'},
@@ -185,6 +173,45 @@ class TestAudioFileManagerPerformance:
         assert (end_time - start_time) < 1.0
 
 
+class TestAudioFileManagerSaveInBackground:
+    """AudioFileManager.save_audio_in_backgroundのテストクラス"""
+
+    def test_save_in_background(self):
+        """正常系: 別スレッドでsave_audioを実行する"""
+        manager = AudioFileManager(dict_to_app_config({'PATHS': {'TEMP_DIR': '/test/temp'}}))
+        frames = [b'frame']
+
+        with patch.object(manager, 'save_audio') as mock_save:
+            thread = manager.save_audio_in_background(frames, 16000)
+            thread.join(1.0)
+
+        mock_save.assert_called_once_with(frames, 16000)
+        assert thread.daemon is True
+
+
+class TestAudioFileManagerStreamWriter:
+    """AudioFileManager.open_stream_writerのテストクラス"""
+
+    def test_open_stream_writer(self, tmp_path):
+        """正常系: 一時フォルダにWAVファイルを開く"""
+        config = dict_to_app_config({'PATHS': {'TEMP_DIR': str(tmp_path)}, 'AUDIO': {'CHANNELS': '1'}})
+        writer = AudioFileManager(config).open_stream_writer(16000)
+
+        assert writer is not None
+        path = writer.close()
+        assert path is not None
+        assert os.path.dirname(path) == str(tmp_path)
+        assert os.path.basename(path).startswith('recording_')
+
+    @patch('service.audio_file_manager.StreamingWavWriter', side_effect=OSError('permission denied'))
+    def test_open_stream_writer_error(self, mock_writer_class, tmp_path, caplog):
+        """異常系: ファイルを開けない場合はNoneを返す"""
+        config = dict_to_app_config({'PATHS': {'TEMP_DIR': str(tmp_path)}})
+
+        assert AudioFileManager(config).open_stream_writer(16000) is None
+        assert "音声ファイル作成エラー: permission denied" in caplog.text
+
+
 class TestAudioFileManagerCleanup:
     """AudioFileManager.cleanup_temp_filesのテストクラス"""
 
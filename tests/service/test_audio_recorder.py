@@ -436,3 +436,272 @@ class TestErrorHandling:
 
         assert recorder.is_recording is False
         assert "音声入力中に予期せぬエラーが発生しました" in caplog.text
+
+
+class TestAudioRecorderCallbackMode:
+    """コールバック方式の録音テストクラス"""
+
+    def setup_method(self):
+        self.mock_config = {
+            'AUDIO': {'SAMPLE_RATE': '16000', 'CHANNELS': '1', 'CHUNK': '1024', 'CAPTURE_MODE': 'callback'},
+            'PATHS': {'TEMP_DIR': '/test/temp'},
+            'RECORDING': {'AUTO_STOP_TIMER': '2'},
+        }
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_start_recording_registers_callback(self, mock_pyaudio_class, mock_makedirs):
+        """正常系: ストリームコールバックを登録して開始する"""
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.start_recording()
+
+        kwargs = mock_pyaudio_class.return_value.open.call_args.kwargs
+        assert kwargs['stream_callback'] == recorder._stream_callback
+        assert recorder._capture_buffer is not None
+        assert recorder._capture_buffer.capacity == 16000 * 2 * 2
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_callback_writes_to_single_buffer(self, mock_pyaudio_class, mock_makedirs):
+        """正常系: コールバックのチャンクが1つの連続バッファとして返る"""
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.start_recording()
+
+        assert recorder._stream_callback(b'chunk1', 3, {}, 0) == (None, pyaudio.paContinue)
+        recorder._stream_callback(b'chunk2', 3, {}, 0)
+        frames, sample_rate = recorder.stop_recording()
+
+        assert len(frames) == 1
+        assert bytes(frames[0]) == b'chunk1chunk2'
+        assert sample_rate == 16000
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_callback_completes_after_stop(self, mock_pyaudio_class, mock_makedirs):
+        """境界値: 停止後のコールバックはストリームを完了させる"""
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.start_recording()
+        recorder.stop_recording()
+
+        assert recorder._stream_callback(b'late', 2, {}, 0) == (None, pyaudio.paComplete)
+
+    @patch('service.audio_recorder.os.makedirs')
+    def test_record_waits_until_stop(self, mock_makedirs):
+        """正常系: recordは停止イベントまで待機する"""
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.stream = Mock()
+        recorder.stream.is_active.return_value = True
+        recorder.is_recording = True
+
+        threading.Timer(0.05, recorder._stop_event.set).start()
+        recorder.record()
+
+        assert recorder.is_recording is True
+        recorder.stream.read.assert_not_called()
+
+    @patch('service.audio_recorder.os.makedirs')
+    def test_record_detects_inactive_stream(self, mock_makedirs, caplog):
+        """異常系: ストリームが停止した場合はエラーとして終了する"""
+        caplog.set_level(logging.ERROR)
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.stream = Mock()
+        recorder.stream.is_active.return_value = False
+        recorder.is_recording = True
+
+        recorder.record()
+
+        assert recorder.is_recording is False
+        assert "音声入力中に予期せぬエラーが発生しました" in caplog.text
+
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_chunk_listeners_receive_chunks(self, mock_pyaudio_class, mock_makedirs):
+        """正常系: 登録したリスナーにチャンクが通知され、解除後は通知されない"""
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        listener = Mock()
+        recorder.add_chunk_listener(listener)
+        recorder.start_recording()
+
+        recorder._stream_callback(b'chunk1', 3, {}, 0)
+        recorder.remove_chunk_listener(listener)
+        recorder._stream_callback(b'chunk2', 3, {}, 0)
+
+        listener.assert_called_once_with(b'chunk1')
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_chunk_listener_error_does_not_stop_capture(self, mock_pyaudio_class, mock_makedirs, caplog):
+        """異常系: リスナーの例外は記録され、録音は継続する"""
+        caplog.set_level(logging.ERROR)
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.add_chunk_listener(Mock(side_effect=ValueError('boom')))
+        recorder.start_recording()
+
+        assert recorder._stream_callback(b'chunk1', 3, {}, 0) == (None, pyaudio.paContinue)
+        frames, _ = recorder.stop_recording()
+
+        assert bytes(frames[0]) == b'chunk1'
+        assert "録音チャンクの通知中にエラーが発生しました: boom" in caplog.text
+
+
+class TestAudioRecorderWarmEngine:
+    """音声エンジン保持モードのテストクラス"""
+
+    def setup_method(self):
+        self.mock_config = {
+            'AUDIO': {'SAMPLE_RATE': '16000', 'CHANNELS': '1', 'CHUNK': '1024', 'KEEP_ENGINE_WARM': 'True'},
+            'PATHS': {'TEMP_DIR': '/test/temp'},
+        }
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_engine_reused_across_sessions(self, mock_pyaudio_class, mock_makedirs):
+        """正常系: 複数回の録音でPyAudioを再初期化しない"""
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.warm_up()
+
+        recorder.start_recording()
+        recorder.stop_recording()
+        recorder.start_recording()
+        recorder.stop_recording()
+
+        mock_pyaudio_class.assert_called_once()
+        mock_pyaudio_class.return_value.terminate.assert_not_called()
+        assert mock_pyaudio_class.return_value.open.call_count == 2
+        assert recorder.last_start_latency_ms is not None
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_warm_stream_is_restarted(self, mock_pyaudio_class, mock_makedirs):
+        """正常系: 一時停止中のストリームを再開して録音する"""
+        config = dict(self.mock_config)
+        config['AUDIO'] = dict(config['AUDIO'], KEEP_STREAM_WARM='True')
+        mock_stream = Mock()
+        mock_pyaudio_class.return_value.open.return_value = mock_stream
+
+        recorder = AudioRecorder(dict_to_app_config(config))
+        recorder.warm_up()
+        assert mock_pyaudio_class.return_value.open.call_args.kwargs['start'] is False
+
+        recorder.start_recording()
+        recorder.stop_recording()
+        recorder.start_recording()
+
+        mock_pyaudio_class.return_value.open.assert_called_once()
+        assert mock_stream.start_stream.call_count == 2
+        mock_stream.stop_stream.assert_called_once()
+        mock_stream.close.assert_not_called()
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_stale_engine_is_recreated(self, mock_pyaudio_class, mock_makedirs, caplog):
+        """異常系: 保持中のエンジンでストリームを開けない場合は作り直す"""
+        caplog.set_level(logging.WARNING)
+        stale_engine = Mock()
+        stale_engine.open.side_effect = OSError("Invalid device")
+        fresh_engine = Mock()
+        mock_pyaudio_class.side_effect = [stale_engine, fresh_engine]
+
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.warm_up()
+        recorder.start_recording()
+
+        stale_engine.terminate.assert_called_once()
+        assert recorder.p is fresh_engine
+        assert recorder.stream == fresh_engine.open.return_value
+        assert "保持中の音声エンジンを再初期化します" in caplog.text
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_close_releases_engine(self, mock_pyaudio_class, mock_makedirs):
+        """正常系: closeでストリームとエンジンを解放する"""
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.start_recording()
+        recorder.stop_recording()
+
+        recorder.close()
+
+        mock_pyaudio_class.return_value.terminate.assert_called_once()
+        assert recorder.p is None
+        assert recorder.stream is None
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_warm_up_disabled(self, mock_pyaudio_class, mock_makedirs):
+        """境界値: 保持モード無効時はwarm_upで初期化しない"""
+        recorder = AudioRecorder(dict_to_app_config({'PATHS': {'TEMP_DIR': '/test/temp'}}))
+        recorder.warm_up()
+
+        mock_pyaudio_class.assert_not_called()
+
+
+class TestAudioRecorderPreroll:
+    """プリロールモードのテストクラス"""
+
+    def setup_method(self):
+        self.mock_config = {
+            'AUDIO': {'SAMPLE_RATE': '1000', 'CHANNELS': '1', 'CHUNK': '4', 'PREROLL_SECONDS': '0.004'},
+            'PATHS': {'TEMP_DIR': '/test/temp'},
+        }
+
+    @patch('service.audio_recorder.os.makedirs')
+    def test_preroll_forces_callback_and_warm_stream(self, mock_makedirs, caplog):
+        """正常系: プリロール有効時はコールバック方式とストリーム保持になる"""
+        caplog.set_level(logging.WARNING)
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+
+        assert recorder.preroll_enabled is True
+        assert recorder.uses_callback is True
+        assert recorder.keep_engine_warm is True
+        assert recorder.keep_stream_warm is True
+        assert "録音方式をcallbackに切り替えます" in caplog.text
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_preroll_is_prepended(self, mock_pyaudio_class, mock_makedirs):
+        """正常系: 待機中の直近音声が録音の先頭に付加される"""
+        mock_stream = Mock()
+        mock_stream.is_active.return_value = True
+        mock_pyaudio_class.return_value.open.return_value = mock_stream
+
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.warm_up()
+        assert 'start' not in mock_pyaudio_class.return_value.open.call_args.kwargs
+
+        recorder._stream_callback(b'old_', 2, {}, 0)
+        recorder._stream_callback(b'idle', 2, {}, 0)
+        recorder.start_recording()
+        recorder._stream_callback(b'voice', 2, {}, 0)
+        frames, _ = recorder.stop_recording()
+
+        assert bytes(frames[0]) == b'old_idlevoice'
+        mock_stream.start_stream.assert_not_called()
+        mock_stream.stop_stream.assert_not_called()
+
+    @patch('service.audio_recorder.os.makedirs')
+    @patch('service.audio_recorder.pyaudio.PyAudio')
+    def test_stream_keeps_running_after_stop(self, mock_pyaudio_class, mock_makedirs):
+        """正常系: 停止後もコールバックは循環バッファへ書き込み続ける"""
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+        recorder.warm_up()
+        recorder.start_recording()
+        recorder.stop_recording()
+
+        result = recorder._stream_callback(b'next', 2, {}, 0)
+
+        assert result == (None, pyaudio.paContinue)
+        assert recorder._preroll is not None
+        assert recorder._preroll.snapshot() == b'next'
+        assert recorder.preroll_stats()['idle_callbacks'] == 1
+        mock_pyaudio_class.return_value.terminate.assert_not_called()
+
+    @patch('service.audio_recorder.os.makedirs')
+    def test_preroll_stats_report_memory(self, mock_makedirs):
+        """正常系: 統計にバッファサイズが含まれる"""
+        recorder = AudioRecorder(dict_to_app_config(self.mock_config))
+
+        stats = recorder.preroll_stats()
+
+        assert stats['buffer_bytes'] == 8
+        assert stats['avg_callback_us'] == 0.0
@@ -0,0 +1,111 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from external_service.elevenlabs_api import CircuitBreaker, TranscriptionNetworkError
+from external_service.stt_backend import CircuitBreakerBackend, ElevenLabsBackend, FallbackBackend
+from service.backend_chain import BackendChain
+from tests.conftest import dict_to_app_config
+
+
+def _make_chain(elevenlabs: dict | None = None, offline_backend=None, is_cancelled=lambda: False) -> BackendChain:
+    config = dict_to_app_config({'ELEVENLABS': elevenlabs or {}})
+    with patch.object(BackendChain, '_create_offline_backend', return_value=offline_backend):
+        return BackendChain(config, Mock(), Mock(), is_cancelled=is_cancelled)
+
+
+class TestBackendChain:
+    """BackendChainのテストクラス"""
+
+    def test_defaults_to_api_backend(self):
+        """正常系: 既定の設定ではAPIへ直接送信し、状況の数値も状態の説明も持たない"""
+        chain = _make_chain()
+
+        assert isinstance(chain.backend, ElevenLabsBackend)
+        assert chain.circuit_breaker is None
+        assert chain.metrics() == {}
+        assert chain.api_status(retry_enabled=True) is None
+        assert chain.used_fallback is False
+
+    def test_wraps_backend_in_order(self):
+        """正常系: 回路遮断器の外側をローカル音声認識への切り替えで包む"""
+        chain = _make_chain({'CIRCUIT_BREAKER': 'True'}, offline_backend=Mock())
+
+        assert isinstance(chain.backend, FallbackBackend)
+        assert isinstance(chain.backend.primary, CircuitBreakerBackend)
+
+    def test_metrics_are_prefixed(self):
+        """正常系: 追加送信・タイムアウト・回路遮断の数値に接頭辞を付けて返す"""
+        chain = _make_chain({'HEDGE_ENABLED': 'True', 'ADAPTIVE_TIMEOUT': 'True', 'CIRCUIT_BREAKER': 'True'})
+
+        metrics = chain.metrics()
+
+        assert 'hedge_requests' in metrics
+        assert 'timeout_requests' in metrics
+        assert metrics['breaker_open'] == 0.0
+
+    def test_api_status_while_open(self):
+        """正常系: 送信停止中は再送信の有無に応じた説明を返す"""
+        chain = _make_chain({'CIRCUIT_BREAKER': 'True'})
+        assert chain.circuit_breaker is not None
+
+        with patch.object(CircuitBreaker, 'state', CircuitBreaker.OPEN):
+            assert chain.api_status(retry_enabled=True) == 'API停止中: 回復後に自動で再送信'
+            assert chain.api_status(retry_enabled=False) == 'API停止中'
+
+
+class TestBackendChainAsync:
+    """BackendChainの非同期送信のテストクラス"""
+
+    def test_network_error_is_recorded_as_failure(self):
+        """異常系: 通信エラーは回路遮断器の障害として記録する"""
+        chain = _make_chain({'CIRCUIT_BREAKER': 'True'})
+        assert chain.circuit_breaker is not None
+        failing = AsyncMock(side_effect=TranscriptionNetworkError('timeout'))
+
+        with patch.object(chain, 'transcribe_audio_data_async_func', failing), \
+                patch.object(chain.circuit_breaker, 'record_failure') as mock_failure:
+            with pytest.raises(TranscriptionNetworkError):
+                asyncio.run(chain.send_async(b'data', 'audio.wav'))
+
+        mock_failure.assert_called_once()
+
+    def test_cancelled_error_is_released(self):
+        """正常系: キャンセルによる遮断は障害に数えない"""
+        chain = _make_chain({'CIRCUIT_BREAKER': 'True'}, is_cancelled=lambda: True)
+        assert chain.circuit_breaker is not None
+        failing = AsyncMock(side_effect=TranscriptionNetworkError('cancelled'))
+
+        with patch.object(chain, 'transcribe_audio_data_async_func', failing), \
+                patch.object(chain.circuit_breaker, 'record_failure') as mock_failure:
+            with pytest.raises(TranscriptionNetworkError):
+                asyncio.run(chain.send_async(b'data', 'audio.wav'))
+
+        mock_failure.assert_not_called()
+
+    def test_falls_back_to_offline_backend(self):
+        """正常系: APIに接続できなければローカル音声認識の結果と切り替えたことを返す"""
+        offline = Mock()
+        offline.transcribe_data.return_value = 'ローカル'
+        chain = _make_chain(offline_backend=offline)
+        failing = AsyncMock(side_effect=TranscriptionNetworkError('offline'))
+
+        with patch.object(chain, 'transcribe_audio_data_async_func', failing):
+            result = asyncio.run(chain.transcribe_data_async(b'data', 'audio.wav'))
+
+        assert result == ('ローカル', True)
+        offline.transcribe_data.assert_called_once_with(b'data', 'audio.wav')
+
+    def test_offline_failure_raises_network_error(self):
+        """異常系: ローカル音声認識でも失敗した場合は元の通信エラーを送出する"""
+        offline = Mock()
+        offline.transcribe_data.side_effect = RuntimeError('model')
+        chain = _make_chain(offline_backend=offline)
+        error = TranscriptionNetworkError('offline')
+
+        with patch.object(chain, 'transcribe_audio_data_async_func', AsyncMock(side_effect=error)):
+            with pytest.raises(TranscriptionNetworkError) as exc_info:
+                asyncio.run(chain.transcribe_data_async(b'data', 'audio.wav'))
+
+        assert exc_info.value is error
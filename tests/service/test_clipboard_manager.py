@@ -95,30 +95,58 @@ class TestClipboardManagerCopyAndPaste:
             _make_manager().copy_and_paste("")
             mock_thread_class.assert_not_called()
 
-    @patch('service.clipboard_manager.replace_text')
+    @patch('service.clipboard_manager.TextPipeline.run')
     @patch('service.clipboard_manager.safe_clipboard_copy')
     @patch('service.clipboard_manager.safe_paste_text')
     @patch('service.clipboard_manager.time.sleep')
-    def test_paste_in_thread_success(self, mock_sleep, mock_paste, mock_copy, mock_replace):
+    def test_paste_in_thread_success(self, mock_sleep, mock_paste, mock_copy, mock_run):
         """正常系: スレッド内の処理が成功"""
-        mock_replace.return_value = "試験文字列"
+        mock_run.return_value = "試験文字列"
         mock_copy.return_value = True
         mock_paste.return_value = True
 
         manager = _make_manager({"テスト": "試験"})
         manager._paste_in_thread("テスト文字列")
 
-        mock_replace.assert_called_once_with("テスト文字列", {"テスト": "試験"})
+        mock_run.assert_called_once_with("テスト文字列")
         mock_copy.assert_called_once_with("試験文字列")
         mock_sleep.assert_called_once_with(0.1)
         mock_paste.assert_called_once()
 
-    @patch('service.clipboard_manager.replace_text')
     @patch('service.clipboard_manager.safe_clipboard_copy')
-    def test_paste_in_thread_copy_failure(self, mock_copy, mock_replace, caplog):
+    @patch('service.clipboard_manager.safe_paste_text')
+    @patch('service.clipboard_manager.time.sleep')
+    def test_update_replacements(self, mock_sleep, mock_paste, mock_copy):
+        """正常系: 差し替え後のペーストは新しい置換ルールを使う"""
+        mock_copy.return_value = True
+        manager = _make_manager({"テスト": "試験"})
+
+        manager.update_replacements({"テスト": "検査"})
+        manager._paste_in_thread("テスト文字列")
+
+        assert manager.replacements == {"テスト": "検査"}
+        mock_copy.assert_called_once_with("検査文字列")
+
+    @patch('service.clipboard_manager.safe_clipboard_copy')
+    @patch('service.clipboard_manager.safe_paste_text')
+    @patch('service.clipboard_manager.time.sleep')
+    def test_use_punctuation(self, mock_sleep, mock_paste, mock_copy):
+        """正常系: 句読点なしに切り替えると、句読点を除いてから置換ルールを適用する"""
+        mock_copy.return_value = True
+        manager = _make_manager({"血圧": "BP"})
+
+        manager.use_punctuation = False
+        manager._paste_in_thread("血、圧は正常。")
+
+        assert manager.use_punctuation is False
+        mock_copy.assert_called_once_with("BPは正常")
+
+    @patch('service.clipboard_manager.TextPipeline.run')
+    @patch('service.clipboard_manager.safe_clipboard_copy')
+    def test_paste_in_thread_copy_failure(self, mock_copy, mock_run, caplog):
         """異常系: クリップボードコピー失敗"""
         caplog.set_level(logging.ERROR)
-        mock_replace.return_value = "置換後テキスト"
+        mock_run.return_value = "置換後テキスト"
         mock_copy.return_value = False
 
         manager = _make_manager()
@@ -126,16 +154,16 @@ class TestClipboardManagerCopyAndPaste:
 
         assert "_paste_in_thread中にエラー" in caplog.text
 
-    @patch('service.clipboard_manager.replace_text')
+    @patch('service.clipboard_manager.TextPipeline.run')
     @patch('service.clipboard_manager.safe_clipboard_copy')
     @patch('service.clipboard_manager.safe_paste_text')
     @patch('service.clipboard_manager.time.sleep', new=Mock())
     def test_paste_in_thread_paste_failure_logs_error(
-        self, mock_paste, mock_copy, mock_replace, caplog
+        self, mock_paste, mock_copy, mock_run, caplog
     ):
         """異常系: ペースト実行失敗時にエラーログが出力される"""
         caplog.set_level(logging.ERROR)
-        mock_replace.return_value = "置換後テキスト"
+        mock_run.return_value = "置換後テキスト"
         mock_copy.return_value = True
         mock_paste.return_value = False  # ペースト失敗
 
@@ -144,11 +172,11 @@ class TestClipboardManagerCopyAndPaste:
 
         assert "貼り付け実行に失敗しました" in caplog.text
 
-    @patch('service.clipboard_manager.replace_text')
-    def test_paste_in_thread_empty_replaced_text(self, mock_replace, caplog):
+    @patch('service.clipboard_manager.TextPipeline.run')
+    def test_paste_in_thread_empty_replaced_text(self, mock_run, caplog):
         """境界値: 置換結果が空文字列"""
         caplog.set_level(logging.ERROR)
-        mock_replace.return_value = ""
+        mock_run.return_value = ""
 
         manager = _make_manager()
         manager._paste_in_thread("テスト")
@@ -156,6 +184,28 @@ class TestClipboardManagerCopyAndPaste:
         assert "テキスト置換結果が空です" in caplog.text
 
 
+class TestClipboardManagerCopy:
+    """ClipboardManager.copy()のテストクラス"""
+
+    @patch('service.clipboard_manager.safe_paste_text')
+    @patch('service.clipboard_manager.safe_clipboard_copy', return_value=True)
+    def test_copy_without_paste(self, mock_copy, mock_paste):
+        """正常系: 後処理したテキストをコピーし、貼り付けは行わない"""
+        manager = _make_manager({"テスト": "試験"})
+
+        assert manager.copy("テスト文字列") is True
+
+        mock_copy.assert_called_once_with("試験文字列")
+        mock_paste.assert_not_called()
+
+    @patch('service.clipboard_manager.safe_clipboard_copy')
+    def test_copy_empty_text(self, mock_copy):
+        """境界値: 後処理の結果が空ならコピーしない"""
+        assert _make_manager().copy("") is False
+
+        mock_copy.assert_not_called()
+
+
 class TestClipboardManagerEmergencyRecovery:
     """ClipboardManager.emergency_recovery()のテストクラス"""
 
@@ -1,13 +1,14 @@
 import logging
 import time
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 
 from service.paste_backend import (
     safe_clipboard_copy,
     safe_paste_text,
-    is_paste_available
+    is_paste_available,
+    get_foreground_window
 )
 
 
@@ -637,3 +638,21 @@ class TestEdgeCases:
         # Assert
         assert result is True
         mock_copy.assert_called_once_with(text)
+
+
+class TestGetForegroundWindow:
+    """get_foreground_window()のテストクラス"""
+
+    def test_returns_handle(self):
+        """正常系: 最前面のウィンドウハンドルを返す"""
+        windll = Mock()
+        windll.user32.GetForegroundWindow.return_value = 1234
+        with patch('service.paste_backend.ctypes.windll', windll, create=True):
+            assert get_foreground_window() == 1234
+
+    def test_no_foreground_window(self):
+        """正常系: 最前面のウィンドウがなければNone"""
+        windll = Mock()
+        windll.user32.GetForegroundWindow.return_value = 0
+        with patch('service.paste_backend.ctypes.windll', windll, create=True):
+            assert get_foreground_window() is None
@@ -1,13 +1,15 @@
-import threading
 import tkinter as tk
 from unittest.mock import Mock, patch
 
+import numpy as np
 import pytest
 
+from external_service.http_connection import ConnectionWarmer
 from service.audio_file_manager import AudioFileManager
 from service.audio_recorder import AudioRecorder
 from service.clipboard_manager import ClipboardManager
 from service.recording_lifecycle import RecordingLifecycle
+from service.retry_queue import RetryJob
 from service.transcription_handler import TranscriptionHandler
 from app.ui_queue_processor import UIQueueProcessor
 from tests.conftest import dict_to_app_config
@@ -30,8 +32,9 @@ def _make_lifecycle(config_dict: dict | None = None):
 
     audio_file_manager = Mock(spec=AudioFileManager)
     transcription_handler = Mock(spec=TranscriptionHandler)
-    transcription_handler.processing_thread = None
-    transcription_handler.use_punctuation = True
+    transcription_handler.is_processing = False
+    transcription_handler.can_accept_job.return_value = True
+    transcription_handler.api_status.return_value = None
 
     clipboard_manager = Mock(spec=ClipboardManager)
     ui_processor = Mock(spec=UIQueueProcessor)
@@ -76,6 +79,7 @@ class TestRecordingLifecycleInit:
         assert lifecycle.ui_processor == ui
 
         afm.cleanup_temp_files.assert_called_once()
+        th.start_retry_queue.assert_called_once_with(lifecycle._on_retry_result)
 
     def test_wire_ui_callbacks(self):
         """正常系: UIコールバックの接続"""
@@ -139,14 +143,62 @@ class TestRecordingLifecycleStartRecording:
         mock_thread.start.assert_called_once()
         self.lifecycle.recording_timer.start.assert_called()  # type: ignore[attr-defined]
 
-    def test_start_recording_raises_if_thread_alive(self):
-        """異常系: 処理スレッドが実行中の場合はRuntimeError"""
-        mock_thread = Mock()
-        mock_thread.is_alive.return_value = True
-        self.th.processing_thread = mock_thread
+    @patch('service.recording_lifecycle.threading.Thread')
+    def test_start_recording_while_processing(self, mock_thread_class):
+        """正常系: 前回の文字起こしが処理中でも録音を開始できる"""
+        self.th.is_processing = True
+
+        self.lifecycle.start_recording()
+
+        self.recorder.start_recording.assert_called_once()
 
-        with pytest.raises(RuntimeError, match="前回の処理が完了していません"):
+    def test_start_recording_raises_if_queue_full(self):
+        """異常系: 文字起こし待ちが上限に達している場合はRuntimeError"""
+        self.th.can_accept_job.return_value = False
+
+        with pytest.raises(RuntimeError, match="文字起こし待ちが上限に達しています"):
             self.lifecycle.start_recording()
+        self.recorder.start_recording.assert_not_called()
+
+
+class TestRecordingLifecycleConnectionWarmUp:
+    """録音開始時の接続事前確立のテストクラス"""
+
+    def _make(self, warmup: bool) -> tuple[RecordingLifecycle, Mock]:
+        lifecycle, *_ = _make_lifecycle({
+            'ELEVENLABS': {'WARMUP_ON_RECORD': str(warmup)},
+            'PATHS': {'TEMP_DIR': '/test/temp'}
+        })
+        warmer = Mock(spec=ConnectionWarmer)
+        lifecycle.connection_warmer = warmer
+        _wire_callbacks(lifecycle)
+        return lifecycle, warmer
+
+    def test_start_recording_warms_connection(self):
+        """正常系: 録音開始時に別スレッドで接続を確立する"""
+        lifecycle, warmer = self._make(warmup=True)
+
+        with patch('service.recording_lifecycle.threading.Thread'):
+            lifecycle.start_recording()
+
+        warmer.warm_async.assert_called_once()
+
+    def test_warm_up_disabled(self):
+        """正常系: 設定が無効なら接続を確立しない"""
+        lifecycle, warmer = self._make(warmup=False)
+
+        with patch('service.recording_lifecycle.threading.Thread'):
+            lifecycle.start_recording()
+
+        warmer.warm_async.assert_not_called()
+
+    def test_cleanup_stops_keepalive(self):
+        """正常系: 終了時に接続の維持を停止する"""
+        lifecycle, warmer = self._make(warmup=True)
+
+        lifecycle.cleanup()
+
+        warmer.stop.assert_called_once()
 
 
 class TestRecordingLifecycleStopRecording:
@@ -163,21 +215,29 @@ class TestRecordingLifecycleStopRecording:
             self.lifecycle.recording_timer.cancel.assert_called()  # type: ignore[attr-defined]
             mock_process.assert_called_once()
 
-    @patch('service.recording_lifecycle.threading.Thread')
-    def test_stop_recording_process(self, mock_thread_class):
+    def test_stop_recording_process(self):
         """正常系: 録音停止処理の詳細"""
         test_frames = [b'frame1', b'frame2']
         self.recorder.stop_recording.return_value = (test_frames, 16000)
 
-        mock_thread = Mock()
-        mock_thread_class.return_value = mock_thread
-
         self.lifecycle._stop_recording_process()
 
         self.recorder.stop_recording.assert_called_once()
         self.update_btn.assert_called_once_with(False)
         self.update_label.assert_called_once_with("テキスト出力中...")
-        mock_thread.start.assert_called_once()
+        self.th.submit_frames.assert_called_once_with(
+            test_frames, 16000, self.lifecycle._safe_ui_update, self.lifecycle._safe_error_handler, None
+        )
+        self.master.after.assert_called_once_with(100, self.lifecycle._check_processing)
+
+    def test_stop_recording_queue_full(self):
+        """異常系: ジョブを登録できない場合はエラーを通知する"""
+        self.recorder.stop_recording.return_value = ([b'frame'], 16000)
+        self.th.submit_frames.side_effect = RuntimeError('文字起こし待ちが上限に達しています')
+
+        with patch.object(self.lifecycle, '_safe_error_handler') as mock_handler:
+            self.lifecycle._stop_recording_process()
+            mock_handler.assert_called_once()
 
     def test_stop_recording_recorder_error(self):
         """異常系: 録音停止時のエラー"""
@@ -188,6 +248,204 @@ class TestRecordingLifecycleStopRecording:
             mock_handler.assert_called_once()
 
 
+class TestRecordingLifecycleEndpoint:
+    """無音による自動停止のテストクラス"""
+
+    def setup_method(self):
+        config_dict = {
+            'KEYS': {'TOGGLE_RECORDING': 'Pause'},
+            'AUDIO': {'SAMPLE_RATE': '1000', 'CHANNELS': '1'},
+            'RECORDING': {'AUTO_STOP_TIMER': '60', 'ENDPOINT_SILENCE_MS': '50', 'ENDPOINT_MIN_SPEECH_MS': '30'},
+            'VAD': {'THRESHOLD_DB': '-40'},
+            'PATHS': {'TEMP_DIR': '/test/temp'},
+        }
+        self.lifecycle, _, self.recorder, _, _, _, self.ui = _make_lifecycle(config_dict)
+        _wire_callbacks(self.lifecycle)
+
+    def test_disabled_by_default(self):
+        """正常系: 設定が0の場合はリスナーを登録しない"""
+        lifecycle, _, recorder, *_ = _make_lifecycle()
+        _wire_callbacks(lifecycle)
+
+        with patch('service.recording_lifecycle.threading.Thread'):
+            lifecycle.start_recording()
+
+        recorder.add_chunk_listener.assert_not_called()
+
+    @patch('service.recording_lifecycle.threading.Thread')
+    def test_start_registers_listener(self, mock_thread_class):
+        """正常系: 録音開始時にチャンクリスナーを登録する"""
+        self.lifecycle.start_recording()
+
+        self.recorder.add_chunk_listener.assert_called_once_with(self.lifecycle._on_audio_chunk)
+
+    def test_trailing_silence_schedules_stop(self):
+        """正常系: 発話後の無音を検出するとUIスレッドで停止を予約する"""
+        tone = (np.sin(np.arange(10) * 0.3) * 10000).astype('<i2').tobytes()
+        silence = bytes(20)
+
+        for _ in range(5):
+            self.lifecycle._on_audio_chunk(tone)
+        for _ in range(5):
+            self.lifecycle._on_audio_chunk(silence)
+
+        self.ui.schedule_callback.assert_called_once_with(self.lifecycle._stop_on_endpoint)
+
+    def test_stop_on_endpoint_stops_recording(self):
+        """正常系: 録音中であれば停止処理を実行する"""
+        self.recorder.is_recording = True
+
+        with patch.object(self.lifecycle, 'stop_recording') as mock_stop:
+            self.lifecycle._stop_on_endpoint()
+            mock_stop.assert_called_once()
+
+    def test_stop_on_endpoint_skips_when_stopped(self):
+        """正常系: 既に停止済みの場合は何もしない"""
+        self.recorder.is_recording = False
+
+        with patch.object(self.lifecycle, 'stop_recording') as mock_stop:
+            self.lifecycle._stop_on_endpoint()
+            mock_stop.assert_not_called()
+
+    def test_stop_process_removes_listener(self):
+        """正常系: 停止処理でリスナーを解除する"""
+        self.recorder.stop_recording.return_value = ([b'frame'], 1000)
+
+        with patch('service.recording_lifecycle.threading.Thread'):
+            self.lifecycle._stop_recording_process()
+
+        self.recorder.remove_chunk_listener.assert_called_once_with(self.lifecycle._on_audio_chunk)
+
+
+class TestRecordingLifecycleStreamWriter:
+    """録音中のファイル書き込みのテストクラス"""
+
+    def setup_method(self):
+        config_dict = {
+            'KEYS': {'TOGGLE_RECORDING': 'Pause'},
+            'AUDIO': {'SAMPLE_RATE': '16000', 'STREAM_TO_DISK': 'True'},
+            'RECORDING': {'AUTO_STOP_TIMER': '60'},
+            'PATHS': {'TEMP_DIR': '/test/temp'},
+        }
+        self.lifecycle, _, self.recorder, self.afm, self.th, *_ = _make_lifecycle(config_dict)
+        _wire_callbacks(self.lifecycle)
+        self.writer = Mock()
+        self.writer.close.return_value = '/test/temp/recording.wav'
+        self.afm.open_stream_writer.return_value = self.writer
+
+    @patch('service.recording_lifecycle.threading.Thread')
+    def test_writer_is_attached_before_recording(self, mock_thread_class):
+        """正常系: 録音開始前にファイルを開きリスナーとして登録する"""
+        self.lifecycle.start_recording()
+
+        self.afm.open_stream_writer.assert_called_once_with(16000)
+        self.recorder.add_chunk_listener.assert_called_once_with(self.writer.write)
+
+    @patch('service.recording_lifecycle.threading.Thread')
+    def test_stop_passes_streamed_file(self, mock_thread_class):
+        """正常系: 停止時にファイルを確定し文字起こしへ渡す"""
+        self.recorder.stop_recording.return_value = ([b'frame'], 16000)
+        self.lifecycle.start_recording()
+
+        self.lifecycle._stop_recording_process()
+
+        self.writer.close.assert_called_once()
+        self.recorder.remove_chunk_listener.assert_any_call(self.writer.write)
+        assert self.th.submit_frames.call_args[0][-1] == '/test/temp/recording.wav'
+
+    @patch('service.recording_lifecycle.threading.Thread')
+    def test_open_failure_falls_back(self, mock_thread_class):
+        """異常系: ファイルを開けない場合は従来どおり停止後に保存する"""
+        self.afm.open_stream_writer.return_value = None
+        self.recorder.stop_recording.return_value = ([b'frame'], 16000)
+        self.lifecycle.start_recording()
+
+        self.lifecycle._stop_recording_process()
+
+        self.recorder.add_chunk_listener.assert_not_called()
+        assert self.th.submit_frames.call_args[0][-1] is None
+
+
+class TestRecordingLifecycleSegmentTranscription:
+    """録音中の区間文字起こしのテストクラス"""
+
+    def setup_method(self):
+        config_dict = {
+            'KEYS': {'TOGGLE_RECORDING': 'Pause'},
+            'RECORDING': {'AUTO_STOP_TIMER': '60', 'SEGMENT_TRANSCRIPTION': 'True'},
+            'PATHS': {'TEMP_DIR': '/test/temp'},
+        }
+        self.lifecycle, _, self.recorder, _, self.th, *_ = _make_lifecycle(config_dict)
+        _wire_callbacks(self.lifecycle)
+        self.pipeline = Mock()
+        self.th.create_segment_pipeline.return_value = self.pipeline
+
+    @patch('service.recording_lifecycle.threading.Thread')
+    def test_pipeline_receives_chunks(self, mock_thread_class):
+        """正常系: 録音開始時にパイプラインをリスナーとして登録する"""
+        self.lifecycle.start_recording()
+
+        self.recorder.add_chunk_listener.assert_called_once_with(self.pipeline.feed)
+
+    @patch('service.recording_lifecycle.threading.Thread')
+    def test_stop_finishes_pipeline(self, mock_thread_class):
+        """正常系: 停止時は区間文字起こしの完了処理を別スレッドで実行する"""
+        frames = [b'frame']
+        self.recorder.stop_recording.return_value = (frames, 16000)
+        self.lifecycle.start_recording()
+
+        self.lifecycle._stop_recording_process()
+
+        self.recorder.remove_chunk_listener.assert_any_call(self.pipeline.feed)
+        self.th.submit_frames.assert_not_called()
+        assert self.th.submit_segments.call_args[0][:3] == (self.pipeline, frames, 16000)
+
+
+class TestRecordingLifecycleCheckProcessing:
+    """_check_processing()のテストクラス"""
+
+    def setup_method(self):
+        self.lifecycle, self.master, self.recorder, _, self.th, *_ = _make_lifecycle()
+        self.update_btn, self.update_label = _wire_callbacks(self.lifecycle)
+
+    def test_idle_restores_status(self):
+        """正常系: すべてのジョブが完了したら待機中の表示に戻す"""
+        self.th.is_processing = False
+
+        self.lifecycle._check_processing()
+
+        self.update_label.assert_called_once_with('Pauseキーで音声入力開始/停止')
+        self.master.after.assert_not_called()
+
+    def test_idle_status_shows_api_outage(self):
+        """正常系: APIへの送信を停止中なら待機中の表示に添える"""
+        self.th.is_processing = False
+        self.th.api_status.return_value = 'API停止中: 回復後に自動で再送信'
+
+        self.lifecycle._check_processing()
+
+        self.update_label.assert_called_once_with('Pauseキーで音声入力開始/停止\nAPI停止中: 回復後に自動で再送信')
+
+    def test_processing_keeps_polling(self):
+        """正常系: 処理中は表示を更新して監視を続ける"""
+        self.th.is_processing = True
+
+        self.lifecycle._check_processing()
+
+        self.update_label.assert_called_once_with('テキスト出力中...')
+        self.master.after.assert_called_once_with(100, self.lifecycle._check_processing)
+
+    def test_recording_status_is_not_overwritten(self):
+        """正常系: 次の録音中は録音中の表示を上書きしない"""
+        self.th.is_processing = True
+        self.recorder.is_recording = True
+
+        self.lifecycle._check_processing()
+
+        self.update_label.assert_not_called()
+        self.master.after.assert_called_once()
+
+
 class TestRecordingLifecycleUsePunctuation:
     """use_punctuationプロパティのテストクラス"""
 
@@ -197,13 +455,13 @@ class TestRecordingLifecycleUsePunctuation:
         assert lifecycle.use_punctuation is True
 
     def test_use_punctuation_setter(self):
-        """正常系: setterがTranscriptionHandlerも更新"""
-        lifecycle, _, _, _, th, *_ = _make_lifecycle()
+        """正常系: setterが貼り付け時の後処理も更新"""
+        lifecycle, _, _, _, _, clipboard_manager, _ = _make_lifecycle()
 
         lifecycle.use_punctuation = False
 
         assert lifecycle.use_punctuation is False
-        assert th.use_punctuation is False
+        assert clipboard_manager.use_punctuation is False
 
 
 class TestRecordingLifecycleSafeUiUpdate:
@@ -228,6 +486,59 @@ class TestRecordingLifecycleSafeUiUpdate:
         cm.copy_and_paste.assert_not_called()
 
 
+class TestRecordingLifecycleRetryResult:
+    """再送信結果の反映のテストクラス"""
+
+    def _job(self, target_window):
+        return RetryJob('id', '/retry/id.wav', 0.0, 1, 0.0, target_window)
+
+    def test_result_is_scheduled_on_ui_thread(self):
+        """正常系: 再送信スレッドからの結果はUIスレッドで反映する"""
+        lifecycle, *_, ui = _make_lifecycle()
+        job = self._job(None)
+
+        lifecycle._on_retry_result(job, 'テキスト')
+
+        ui.schedule_callback.assert_called_once_with(lifecycle._deliver_retry_result, job, 'テキスト')
+
+    @patch('service.recording_lifecycle.get_foreground_window', return_value=100)
+    def test_pastes_when_target_window_is_foreground(self, _mock_window):
+        """正常系: 録音時のウィンドウが前面にあれば貼り付ける"""
+        lifecycle, _, _, _, _, cm, _ = _make_lifecycle()
+
+        lifecycle._deliver_retry_result(self._job(100), 'テキスト')
+
+        cm.copy_and_paste.assert_called_once_with('テキスト')
+
+    @patch('service.recording_lifecycle.get_foreground_window', return_value=200)
+    def test_copies_when_target_window_is_gone(self, _mock_window):
+        """正常系: 録音時のウィンドウが前面になければ貼り付けずにクリップボードへコピーして通知する"""
+        lifecycle, _, _, _, _, cm, _ = _make_lifecycle()
+        cm.copy.return_value = True
+
+        with patch.object(lifecycle, 'show_notification') as mock_notify:
+            lifecycle._deliver_retry_result(self._job(100), 'テキスト')
+
+        cm.copy_and_paste.assert_not_called()
+        cm.copy.assert_called_once_with('テキスト')
+        mock_notify.assert_called_once_with(
+            '文字起こし再送信', '再送信した文字起こし結果をクリップボードにコピーしました'
+        )
+
+    @patch('service.recording_lifecycle.get_foreground_window', return_value=200)
+    def test_copy_failure_is_reported(self, _mock_window):
+        """異常系: クリップボードにコピーできなければエラーを通知する"""
+        lifecycle, _, _, _, _, cm, _ = _make_lifecycle()
+        cm.copy.return_value = False
+
+        with patch.object(lifecycle, 'show_notification') as mock_notify:
+            lifecycle._deliver_retry_result(self._job(100), 'テキスト')
+
+        mock_notify.assert_called_once_with(
+            'エラー', '再送信した文字起こし結果をクリップボードにコピーできませんでした'
+        )
+
+
 class TestRecordingLifecycleCleanup:
     """cleanup()のテストクラス"""
 
@@ -236,36 +547,66 @@ class TestRecordingLifecycleCleanup:
         lifecycle, _, recorder, _afm, th, _, ui = _make_lifecycle()
         _wire_callbacks(lifecycle)
         recorder.is_recording = False
-        th.processing_thread = None
 
         lifecycle.cleanup()
 
         ui.shutdown.assert_called_once()
         th.cancel.assert_called_once()
+        th.stop_retry_queue.assert_called_once()
         lifecycle.recording_timer.cleanup.assert_called()  # type: ignore[attr-defined]
+        recorder.close.assert_called_once()
         _afm.cleanup_temp_files.assert_called()
 
     def test_cleanup_stops_active_recording(self):
         """正常系: 録音中の場合は停止する"""
-        lifecycle, _, recorder, _, th, _, _ = _make_lifecycle()
+        lifecycle, _, recorder, _, _, _, _ = _make_lifecycle()
         _wire_callbacks(lifecycle)
         recorder.is_recording = True
-        th.processing_thread = None
 
         with patch.object(lifecycle, 'stop_recording') as mock_stop:
             lifecycle.cleanup()
             mock_stop.assert_called_once()
 
-    def test_cleanup_waits_for_processing_thread(self):
-        """正常系: 処理スレッドの完了を待機する"""
+    def test_cleanup_waits_for_processing(self):
+        """正常系: 文字起こしジョブの完了を待機する"""
         lifecycle, _, recorder, _, th, _, _ = _make_lifecycle()
         _wire_callbacks(lifecycle)
         recorder.is_recording = False
-
-        mock_thread = Mock(spec=threading.Thread)
-        mock_thread.is_alive.side_effect = [True] + [False] * 49
-        th.processing_thread = mock_thread
+        th.wait_for_processing.return_value = False
 
         lifecycle.cleanup()
 
-        mock_thread.is_alive.assert_called()
+        th.wait_for_processing.assert_called_once_with(timeout=5.0)
+        recorder.close.assert_called_once()
+
+
+class TestRecordingLifecycleApiStatus:
+    """送信の停止・再開に合わせたステータス表示のテストクラス"""
+
+    def setup_method(self):
+        self.lifecycle, _, self.recorder, _, self.th, _, self.ui = _make_lifecycle()
+        self.update_btn, self.update_label = _wire_callbacks(self.lifecycle)
+
+    def test_listener_schedules_refresh(self):
+        """正常系: 状態の変化はUIスレッドで表示の更新として予約する"""
+        listener = self.th.add_api_status_listener.call_args[0][0]
+
+        listener()
+
+        self.ui.schedule_callback.assert_called_once_with(self.lifecycle._refresh_idle_status)
+
+    def test_refresh_when_idle(self):
+        """正常系: 待機中なら表示を更新する"""
+        self.th.api_status.return_value = 'API接続を確認中'
+
+        self.lifecycle._refresh_idle_status()
+
+        self.update_label.assert_called_once_with('Pauseキーで音声入力開始/停止\nAPI接続を確認中')
+
+    def test_refresh_skipped_while_recording(self):
+        """正常系: 録音中は録音中の表示を上書きしない"""
+        self.recorder.is_recording = True
+
+        self.lifecycle._refresh_idle_status()
+
+        self.update_label.assert_not_called()
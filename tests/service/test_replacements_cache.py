@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+
+import pytest
+
+from service.replacements_cache import ReplacementsCache
+from service.text_transformer import ReplacementTable
+
+
+def _write_rules(path, content: str = 'テスト,試験\n血圧,けつあつ\n') -> None:
+    path.write_text(content, encoding='utf-8')
+
+
+def _load_and_save(cache: ReplacementsCache, source_path: str) -> tuple[ReplacementTable, bool]:
+    result = cache.load(source_path)
+    if cache._save_thread is not None:
+        cache._save_thread.join(5)
+    return result
+
+
+class TestReplacementsCacheLoad:
+    """ReplacementsCache.load()のテストクラス"""
+
+    def test_cold_load_creates_cache(self, tmp_path):
+        """正常系: キャッシュがなければ元ファイルから読み込み、キャッシュを保存する"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source)
+        cache = ReplacementsCache(str(tmp_path / 'cache' / 'replacements_cache.json'))
+
+        table, is_current = _load_and_save(cache, str(source))
+
+        assert is_current is True
+        assert table == {'テスト': '試験', '血圧': 'けつあつ'}
+        assert os.path.exists(cache.cache_path)
+
+    def test_warm_load_uses_cache(self, tmp_path):
+        """正常系: 元ファイルが変わっていなければ解釈せずにキャッシュから復元する"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source)
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+        _load_and_save(cache, str(source))
+
+        with open(cache.cache_path, encoding='utf-8') as f:
+            header = json.loads(f.readline())
+        table, is_current = ReplacementsCache(cache.cache_path).load(str(source))
+
+        assert is_current is True
+        assert isinstance(table, ReplacementTable)
+        assert table.matcher.replace('テストの血圧')[0] == '試験のけつあつ'
+        assert header['size'] == source.stat().st_size
+        assert len(header['sha256']) == 64
+
+    def test_stale_cache_returns_previous_table(self, tmp_path):
+        """正常系: 元ファイルが変更されていれば前回のテーブルを返し、最新ではないことを示す"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source)
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+        _load_and_save(cache, str(source))
+        _write_rules(source, 'テスト,検査\n')
+
+        table, is_current = cache.load(str(source))
+
+        assert is_current is False
+        assert table == {'テスト': '試験', '血圧': 'けつあつ'}
+
+    def test_cache_is_plain_data(self, tmp_path):
+        """正常系: キャッシュはルールとトライ木のJSONで、復元したトライ木で置換できる"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source, '一,1\n1部,一部\n')
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+        _load_and_save(cache, str(source))
+
+        with open(cache.cache_path, encoding='utf-8') as f:
+            f.readline()
+            olds, news, trie = json.loads(f.readline())
+        table, _ = ReplacementsCache(cache.cache_path).load(str(source))
+
+        assert (olds, news) == (['一', '1部'], ['1', '一部'])
+        assert isinstance(trie, dict)
+        assert table.matcher.rule_count == 2
+        assert table.matcher.replace('一部と一')[0] == '一部と1'
+
+    def test_invalid_body_is_ignored(self, tmp_path, caplog):
+        """異常系: 本体の形式が正しくないキャッシュは使わずに元ファイルから読み込む"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source, 'あ,い\n')
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+        _load_and_save(cache, str(source))
+        with open(cache.cache_path, encoding='utf-8') as f:
+            header_line = f.readline()
+        with open(cache.cache_path, 'w', encoding='utf-8') as f:
+            f.write(header_line + json.dumps({'rules': 'あ'}))
+
+        table, _ = ReplacementsCache(cache.cache_path).load(str(source))
+
+        assert table == {'あ': 'い'}
+        assert '置換ルールのキャッシュの形式が正しくありません' in caplog.text
+
+    def test_source_removed_after_caching(self, tmp_path):
+        """異常系: 元ファイルを確認できない場合は前回のテーブルを返し、最新ではないことを示す"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source)
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+        _load_and_save(cache, str(source))
+        source.unlink()
+
+        table, is_current = cache.load(str(source))
+
+        assert is_current is False
+        assert table == {'テスト': '試験', '血圧': 'けつあつ'}
+
+    def test_touched_file_with_same_content(self, tmp_path):
+        """正常系: 更新日時だけが変わった場合は内容のハッシュが一致すればキャッシュを使う"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source)
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+        _load_and_save(cache, str(source))
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert cache.load(str(source))[1] is True
+
+    def test_same_size_different_content(self, tmp_path):
+        """境界値: サイズが同じでも内容が変わっていれば最新ではない"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source, 'あ,い\n')
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+        _load_and_save(cache, str(source))
+        stat = source.stat()
+        _write_rules(source, 'あ,う\n')
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert cache.load(str(source))[1] is False
+
+    def test_different_source_path(self, tmp_path):
+        """異常系: 別の置換ルールファイルのキャッシュは使わない"""
+        first = tmp_path / 'first.txt'
+        second = tmp_path / 'second.txt'
+        _write_rules(first, 'あ,い\n')
+        _write_rules(second, 'か,き\n')
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+        _load_and_save(cache, str(first))
+
+        table, is_current = _load_and_save(cache, str(second))
+
+        assert is_current is True
+        assert table == {'か': 'き'}
+
+    def test_other_version_is_ignored(self, tmp_path):
+        """異常系: 版の異なるキャッシュは使わずに元ファイルから読み込む"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source, 'あ,い\n')
+        cache_path = tmp_path / 'replacements_cache.json'
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': 0, 'path': os.path.abspath(source)}) + '\n')
+            f.write(json.dumps([['あ'], ['古い'], {'あ': {'': '古い'}}]))
+
+        table, is_current = ReplacementsCache(str(cache_path)).load(str(source))
+
+        assert is_current is True
+        assert table == {'あ': 'い'}
+
+    def test_corrupted_cache(self, tmp_path, caplog):
+        """異常系: 壊れたキャッシュは警告して元ファイルから読み込む"""
+        caplog.set_level(logging.WARNING)
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source, 'あ,い\n')
+        cache_path = tmp_path / 'replacements_cache.json'
+        cache_path.write_bytes(b'not json')
+
+        table, is_current = ReplacementsCache(str(cache_path)).load(str(source))
+
+        assert table == {'あ': 'い'}
+        assert is_current is True
+        assert '置換ルールのキャッシュの読み込みに失敗しました' in caplog.text
+
+    def test_missing_source_file(self, tmp_path, caplog):
+        """異常系: 元ファイルがなければ空のルールを返し、キャッシュは作らない"""
+        caplog.set_level(logging.ERROR)
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+
+        table, is_current = _load_and_save(cache, str(tmp_path / 'missing.txt'))
+
+        assert table == {}
+        assert is_current is True
+        assert not os.path.exists(cache.cache_path)
+        assert '置換ファイルの読み込み中にエラーが発生しました' in caplog.text
+
+
+class TestReplacementsCacheRebuild:
+    """ReplacementsCache.rebuild()のテストクラス"""
+
+    def test_rebuild_updates_cache(self, tmp_path):
+        """正常系: 作り直したテーブルをキャッシュに保存し、次回の読み込みで使う"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source)
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+        _load_and_save(cache, str(source))
+        _write_rules(source, 'テスト,検査\n')
+
+        rebuilt = cache.rebuild(str(source))
+        table, is_current = cache.load(str(source))
+
+        assert rebuilt == {'テスト': '検査'}
+        assert is_current is True
+        assert table == {'テスト': '検査'}
+
+    def test_rebuild_unreadable_source_raises(self, tmp_path):
+        """異常系: 元ファイルを読み込めない場合は空のテーブルを返さずに例外を送出する"""
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+
+        with pytest.raises(OSError):
+            cache.rebuild(str(tmp_path / 'missing.txt'))
+        assert not os.path.exists(cache.cache_path)
+
+    def test_rebuild_in_background(self, tmp_path):
+        """正常系: バックグラウンドで作り直して結果を渡す"""
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source, 'あ,い\n')
+        cache = ReplacementsCache(str(tmp_path / 'replacements_cache.json'))
+        received = []
+
+        cache.rebuild_in_background(str(source), received.append).join(5)
+
+        assert received == [{'あ': 'い'}]
+        assert isinstance(received[0], ReplacementTable)
+
+    def test_write_failure_keeps_table(self, tmp_path, caplog):
+        """異常系: キャッシュを保存できなくても読み込んだテーブルは使える"""
+        caplog.set_level(logging.ERROR)
+        source = tmp_path / 'replacements.txt'
+        _write_rules(source, 'あ,い\n')
+        blocker = tmp_path / 'blocker'
+        blocker.write_text('')
+        cache = ReplacementsCache(str(blocker / 'replacements_cache.json'))
+
+        table = cache.rebuild(str(source))
+
+        assert table == {'あ': 'い'}
+        assert '置換ルールのキャッシュの保存に失敗しました' in caplog.text
@@ -0,0 +1,126 @@
+import os
+import threading
+from unittest.mock import Mock
+
+from service.replacements_watcher import ReplacementsWatcher
+from service.text_transformer import ReplacementTable
+
+
+def _write(path, content: str, mtime_ns: int) -> None:
+    path.write_text(content, encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestReplacementsWatcher:
+    """ReplacementsWatcherのテストクラス"""
+
+    def setup_method(self):
+        self.on_reload = Mock()
+
+    def test_unchanged_file_is_not_reloaded(self, tmp_path):
+        """正常系: 変更がなければ読み込み直さない"""
+        path = tmp_path / 'replacements.txt'
+        _write(path, 'テスト,試験\n', 1_000_000_000)
+        watcher = ReplacementsWatcher(str(path), self.on_reload)
+
+        assert watcher.check() is False
+        assert watcher.check() is False
+        self.on_reload.assert_not_called()
+
+    def test_changed_file_is_reloaded_once_stable(self, tmp_path):
+        """正常系: 変更後の状態が次の確認まで続いたら読み込み直して構築済みのテーブルを渡す"""
+        path = tmp_path / 'replacements.txt'
+        _write(path, 'テスト,試験\n', 1_000_000_000)
+        watcher = ReplacementsWatcher(str(path), self.on_reload)
+        _write(path, 'テスト,検査\n追加,ついか\n', 2_000_000_000)
+
+        assert watcher.check() is False
+        assert watcher.check() is True
+        assert watcher.check() is False
+
+        table = self.on_reload.call_args[0][0]
+        assert isinstance(table, ReplacementTable)
+        assert table.matcher.replace('テストを追加')[0] == '検査をついか'
+        assert watcher.reload_count == 1
+
+    def test_file_still_being_written(self, tmp_path):
+        """正常系: 確認のたびに変わっている間は読み込まない"""
+        path = tmp_path / 'replacements.txt'
+        _write(path, 'a,b\n', 1_000_000_000)
+        watcher = ReplacementsWatcher(str(path), self.on_reload)
+
+        _write(path, '', 2_000_000_000)
+        watcher.check()
+        _write(path, 'a,c\n', 3_000_000_000)
+        watcher.check()
+
+        self.on_reload.assert_not_called()
+
+    def test_missing_file_keeps_current_rules(self, tmp_path):
+        """異常系: ファイルが見つからない間は現在のルールを使い続ける"""
+        path = tmp_path / 'replacements.txt'
+        _write(path, 'a,b\n', 1_000_000_000)
+        watcher = ReplacementsWatcher(str(path), self.on_reload)
+        path.unlink()
+
+        assert watcher.check() is False
+        assert watcher.check() is False
+        self.on_reload.assert_not_called()
+
+    def test_changed_during_load(self, tmp_path):
+        """異常系: 読み込み中に書き換えられた場合は反映せず、次の確認に回す"""
+        path = tmp_path / 'replacements.txt'
+        _write(path, 'a,b\n', 1_000_000_000)
+
+        def loader(file_path):
+            _write(path, 'a,d\n', 3_000_000_000)
+            return ReplacementTable({'a': 'c'})
+
+        watcher = ReplacementsWatcher(str(path), self.on_reload, loader=loader)
+        _write(path, 'a,c\n', 2_000_000_000)
+        watcher.check()
+
+        assert watcher.check() is False
+        self.on_reload.assert_not_called()
+
+    def test_unreadable_file_keeps_current_rules(self, tmp_path, caplog):
+        """異常系: 読み込めない間は空のルールに差し替えず、読み込めるようになった次の確認で反映する"""
+        path = tmp_path / 'replacements.txt'
+        _write(path, 'a,b\n', 1_000_000_000)
+        watcher = ReplacementsWatcher(str(path), self.on_reload)
+        path.write_bytes(b'a,\xff\xfe\n')
+        os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+
+        watcher.check()
+        assert watcher.check() is False
+        assert watcher.check() is False
+        self.on_reload.assert_not_called()
+        assert '現在のルールを使い続けます' in caplog.text
+
+        _write(path, 'a,c\n', 3_000_000_000)
+        watcher.check()
+
+        assert watcher.check() is True
+        assert self.on_reload.call_args[0][0] == {'a': 'c'}
+
+    def test_background_polling(self, tmp_path):
+        """正常系: 監視スレッドで変更を検出して反映する"""
+        path = tmp_path / 'replacements.txt'
+        _write(path, 'a,b\n', 1_000_000_000)
+        reloaded = threading.Event()
+        watcher = ReplacementsWatcher(str(path), lambda table: reloaded.set(), interval_seconds=0.01)
+        watcher.start()
+        try:
+            _write(path, 'a,c\n', 2_000_000_000)
+
+            assert reloaded.wait(5)
+        finally:
+            watcher.stop()
+
+    def test_disabled_when_interval_is_zero(self, tmp_path):
+        """正常系: 間隔が0なら監視しない"""
+        watcher = ReplacementsWatcher(str(tmp_path / 'replacements.txt'), self.on_reload, interval_seconds=0)
+
+        watcher.start()
+
+        assert watcher._thread is None
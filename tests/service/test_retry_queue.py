@@ -0,0 +1,198 @@
+import json
+import time
+import wave
+from unittest.mock import Mock, patch
+
+from service.retry_queue import RetryHistory, TranscriptionRetryQueue, backoff_delay
+from tests.conftest import dict_to_app_config
+
+
+def _make_queue(tmp_path, transcribe=None, probe=None, max_attempts: int = 3):
+    return TranscriptionRetryQueue(
+        str(tmp_path / 'retry'),
+        transcribe or Mock(return_value='結果'),
+        probe or Mock(return_value=True),
+        base_seconds=1.0,
+        max_seconds=8.0,
+        max_attempts=max_attempts
+    )
+
+
+class TestBackoffDelay:
+    """backoff_delay()のテストクラス"""
+
+    def test_exponential_with_jitter(self):
+        """正常系: 試行回数に応じて倍増し、ゆらぎは待ち時間の後半に収まる"""
+        assert backoff_delay(0, 1.0, 60.0, jitter=lambda: 1.0) == 1.0
+        assert backoff_delay(3, 1.0, 60.0, jitter=lambda: 1.0) == 8.0
+        assert backoff_delay(3, 1.0, 60.0, jitter=lambda: 0.0) == 4.0
+
+    def test_capped(self):
+        """正常系: 上限を超えない"""
+        assert backoff_delay(20, 1.0, 60.0, jitter=lambda: 1.0) == 60.0
+
+
+class TestTranscriptionRetryQueue:
+    """TranscriptionRetryQueueのテストクラス"""
+
+    def test_enqueue_audio_writes_wav(self, tmp_path):
+        """正常系: 録音データをWAVとして保存し再送信待ちに追加する"""
+        queue = _make_queue(tmp_path)
+
+        job = queue.enqueue_audio(b'\x01\x00' * 160, 16000, 1, target_window=7)
+        assert job is not None
+
+        assert queue.pending_count == 1
+        assert job.target_window == 7
+        with wave.open(job.audio_path, 'rb') as wf:
+            assert wf.getframerate() == 16000
+            assert wf.getnframes() == 160
+
+    def test_enqueue_file_copies_audio(self, tmp_path):
+        """正常系: 元ファイルが削除されても再送信できるよう複製する"""
+        source = tmp_path / 'audio.wav'
+        source.write_bytes(b'RIFFdata')
+        queue = _make_queue(tmp_path)
+
+        job = queue.enqueue_file(str(source))
+        assert job is not None
+        source.unlink()
+
+        assert open(job.audio_path, 'rb').read() == b'RIFFdata'
+
+    def test_survives_restart(self, tmp_path):
+        """正常系: 再送信待ちは再起動後も読み込まれる"""
+        job = _make_queue(tmp_path).enqueue_audio(b'\x00\x00', 16000, 1)
+        assert job is not None
+
+        restored = _make_queue(tmp_path)
+
+        assert restored.jobs() == [job]
+
+    def test_successful_retry(self, tmp_path):
+        """正常系: 再送信に成功したら結果を通知し、履歴に残して音声を削除する"""
+        transcribe = Mock(return_value='再送信結果')
+        queue = _make_queue(tmp_path, transcribe=transcribe)
+        on_result = Mock()
+        queue._on_result = on_result
+        job = queue.enqueue_audio(b'\x00\x00', 16000, 1)
+        assert job is not None
+
+        assert queue.run_pending(now=time.time() + 10) == 1
+
+        transcribe.assert_called_once_with(job.audio_path)
+        on_result.assert_called_once_with(job, '再送信結果')
+        assert queue.pending_count == 0
+        assert queue.history.entries()[0]['text'] == '再送信結果'
+        assert not (tmp_path / 'retry' / f'{job.job_id}.wav').exists()
+
+    def test_not_due_yet(self, tmp_path):
+        """正常系: 再送信時刻前のジョブは処理しない"""
+        transcribe = Mock()
+        queue = _make_queue(tmp_path, transcribe=transcribe)
+        queue.enqueue_audio(b'\x00\x00', 16000, 1)
+
+        assert queue.run_pending(now=0) == 0
+        transcribe.assert_not_called()
+
+    def test_offline_postpones_without_counting_attempt(self, tmp_path):
+        """異常系: 接続を確認できなければ送信せず、試行回数も増やさない"""
+        transcribe = Mock()
+        queue = _make_queue(tmp_path, transcribe=transcribe, probe=Mock(return_value=False))
+        queue.enqueue_audio(b'\x00\x00', 16000, 1)
+        now = time.time() + 10
+
+        queue.run_pending(now=now)
+
+        transcribe.assert_not_called()
+        job = queue.jobs()[0]
+        assert job.attempts == 0
+        assert job.next_attempt_at > now
+
+    def test_failed_retry_backs_off(self, tmp_path):
+        """異常系: 再送信に失敗したら試行回数を増やして待ち時間を延ばす"""
+        queue = _make_queue(tmp_path, transcribe=Mock(side_effect=OSError('network')))
+        queue.enqueue_audio(b'\x00\x00', 16000, 1)
+        now = time.time() + 10
+
+        queue.run_pending(now=now)
+
+        job = queue.jobs()[0]
+        assert job.attempts == 1
+        assert now + 1.0 <= job.next_attempt_at <= now + 2.0
+        saved = json.loads((tmp_path / 'retry' / 'queue.json').read_text(encoding='utf-8'))
+        assert saved[0]['attempts'] == 1
+
+    def test_gives_up_after_max_attempts(self, tmp_path):
+        """異常系: 上限回数に達したら再送信待ちから外し、音声ファイルは残す"""
+        queue = _make_queue(tmp_path, transcribe=Mock(return_value=None), max_attempts=1)
+        job = queue.enqueue_audio(b'\x00\x00', 16000, 1)
+        assert job is not None
+
+        queue.run_pending(now=time.time() + 10)
+
+        assert queue.pending_count == 0
+        assert (tmp_path / 'retry' / f'{job.job_id}.wav').exists()
+
+    def test_missing_audio_is_dropped(self, tmp_path):
+        """異常系: 音声ファイルが失われたジョブは破棄する"""
+        transcribe = Mock()
+        queue = _make_queue(tmp_path, transcribe=transcribe)
+        job = queue.enqueue_audio(b'\x00\x00', 16000, 1)
+        assert job is not None
+        (tmp_path / 'retry' / f'{job.job_id}.wav').unlink()
+
+        queue.run_pending(now=time.time() + 10)
+
+        transcribe.assert_not_called()
+        assert queue.pending_count == 0
+
+    def test_background_thread_delivers_result(self, tmp_path):
+        """正常系: 再送信スレッドが再送信時刻に処理する"""
+        queue = TranscriptionRetryQueue(
+            str(tmp_path), Mock(return_value='結果'), Mock(return_value=True),
+            base_seconds=0.01, max_seconds=0.01, max_attempts=3
+        )
+        delivered = []
+        queue.start(lambda job, text: delivered.append(text))
+        queue.enqueue_audio(b'\x00\x00', 16000, 1)
+
+        deadline = time.time() + 5
+        while not delivered and time.time() < deadline:
+            time.sleep(0.01)
+        queue.stop()
+
+        assert delivered == ['結果']
+
+
+class TestTranscriptionRetryQueueFromConfig:
+    """TranscriptionRetryQueue.from_config()のテストクラス"""
+
+    @patch('service.retry_queue.check_connectivity', return_value=True)
+    def test_uses_config(self, mock_check, tmp_path):
+        """正常系: 設定の保存先と間隔を使い、送信先のAPIサーバーへの接続で回復を確認する"""
+        config = dict_to_app_config({
+            'PATHS': {'RETRY_DIR': str(tmp_path / 'retry')},
+            'ELEVENLABS': {'BASE_URL': 'http://127.0.0.1:8765'},
+            'TRANSCRIPTION': {'RETRY_BASE_SECONDS': '2', 'RETRY_MAX_SECONDS': '30', 'RETRY_MAX_ATTEMPTS': '4'},
+        })
+
+        queue = TranscriptionRetryQueue.from_config(config, Mock())
+
+        assert queue.retry_dir == str(tmp_path / 'retry')
+        assert (queue.base_seconds, queue.max_seconds, queue.max_attempts) == (2.0, 30.0, 4)
+        assert queue._probe() is True
+        mock_check.assert_called_once_with('127.0.0.1', 8765)
+
+
+class TestRetryHistory:
+    """RetryHistoryのテストクラス"""
+
+    def test_keeps_latest_entries(self, tmp_path):
+        """正常系: 新しい順に上限件数まで保持し、ファイルから復元できる"""
+        path = str(tmp_path / 'history.json')
+        history = RetryHistory(path, max_entries=2)
+        for text in ('1', '2', '3'):
+            history.add(text, 0.0)
+
+        assert [entry['text'] for entry in RetryHistory(path).entries()] == ['3', '2']
@@ -0,0 +1,136 @@
+import threading
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from service.segment_pipeline import SegmentPipeline
+from tests.conftest import dict_to_app_config
+
+SAMPLE_RATE = 1000
+CHUNK_MS = 10
+
+
+def _tone(ms: int) -> bytes:
+    t = np.arange(ms * SAMPLE_RATE // 1000)
+    return (10000 * np.sin(2 * np.pi * 50 * t / SAMPLE_RATE)).astype('<i2').tobytes()
+
+
+def _silence(ms: int) -> bytes:
+    return bytes(ms * SAMPLE_RATE // 1000 * 2)
+
+
+def _make_pipeline(transcribe, min_segment_ms: int = 100) -> SegmentPipeline:
+    return SegmentPipeline(
+        transcribe, SAMPLE_RATE, 1, threshold_db=-40.0, split_silence_ms=50,
+        min_segment_ms=min_segment_ms, min_speech_ms=30, max_workers=2
+    )
+
+
+def _feed(pipeline: SegmentPipeline, pcm: bytes) -> None:
+    step = CHUNK_MS * SAMPLE_RATE // 1000 * 2
+    for offset in range(0, len(pcm), step):
+        pipeline.feed(pcm[offset:offset + step])
+
+
+class TestSegmentPipeline:
+    """SegmentPipelineのテストクラス"""
+
+    def test_splits_at_silence_and_stitches_in_order(self):
+        """正常系: 無音で区切った区間を録音順に連結する"""
+        first, second = _tone(150) + _silence(50), _tone(120)
+        transcribe = Mock(side_effect=lambda pcm, index: f'<{index}:{len(pcm)}>')
+        pipeline = _make_pipeline(transcribe)
+
+        _feed(pipeline, first)
+        assert pipeline.segment_count == 1
+        _feed(pipeline, second)
+        pipeline.finish(first + second)
+
+        assert pipeline.result(timeout=5) == f'<0:{len(first)}><1:{len(second)}>'
+        assert pipeline.segment_count == 2
+
+    def test_short_segment_is_not_split(self):
+        """正常系: 最小区間長に満たない場合は区切らない"""
+        pipeline = _make_pipeline(Mock(return_value='text'), min_segment_ms=1000)
+
+        _feed(pipeline, _tone(150) + _silence(100) + _tone(100))
+
+        assert pipeline.segment_count == 0
+
+    def test_silent_tail_is_skipped(self):
+        """正常系: 送信済みの区間の後に無音しか残らない場合は末尾を送信しない"""
+        pcm = _tone(150) + _silence(60)
+        transcribe = Mock(return_value='テキスト')
+        pipeline = _make_pipeline(transcribe)
+
+        _feed(pipeline, pcm)
+        pipeline.finish(pcm + _silence(100))
+
+        assert pipeline.result(timeout=5) == 'テキスト'
+        transcribe.assert_called_once()
+
+    def test_finish_without_recording_uses_buffer(self):
+        """正常系: 区切りがなければ録音全体を1区間として送信する"""
+        pcm = _tone(80)
+        transcribe = Mock(return_value='テキスト')
+        pipeline = _make_pipeline(transcribe)
+
+        _feed(pipeline, pcm)
+        pipeline.finish()
+
+        assert pipeline.result(timeout=5) == 'テキスト'
+        assert bytes(transcribe.call_args[0][0]) == pcm
+
+    def test_failed_segment_returns_none(self):
+        """異常系: いずれかの区間が失敗した場合はNone"""
+        pipeline = _make_pipeline(Mock(side_effect=['前半', None]))
+
+        _feed(pipeline, _tone(150) + _silence(50))
+        pipeline.finish(_tone(150) + _silence(50) + _tone(100))
+
+        assert pipeline.result(timeout=5) is None
+
+    def test_segment_exception_is_raised(self):
+        """異常系: 区間の文字起こしで発生した例外はresultで送出される"""
+        pipeline = _make_pipeline(Mock(side_effect=ValueError('boom')))
+        _feed(pipeline, _tone(80))
+        pipeline.finish()
+
+        with pytest.raises(ValueError, match='boom'):
+            pipeline.result(timeout=5)
+
+    def test_cancel_skips_pending_segments(self):
+        """正常系: キャンセル後に待機中の区間は送信されない"""
+        release = threading.Event()
+        transcribe = Mock(side_effect=lambda pcm, index: release.wait(5) and 'text')
+        pipeline = SegmentPipeline(
+            transcribe, SAMPLE_RATE, 1, threshold_db=-40.0, split_silence_ms=50,
+            min_segment_ms=100, min_speech_ms=30, max_workers=1
+        )
+        _feed(pipeline, (_tone(150) + _silence(50)) * 3)
+
+        pipeline.cancel()
+        release.set()
+        pipeline.feed(_tone(10))
+
+        assert transcribe.call_count <= 1
+        assert pipeline.segment_count == 3
+
+
+class TestSegmentPipelineFromConfig:
+    """SegmentPipeline.from_config()のテストクラス"""
+
+    def test_uses_config(self):
+        """正常系: 設定の録音形式と区切りの条件で作成する"""
+        config = dict_to_app_config({
+            'AUDIO': {'SAMPLE_RATE': str(SAMPLE_RATE), 'CHANNELS': '1'},
+            'RECORDING': {'SEGMENT_MIN_MS': '200', 'SEGMENT_MAX_WORKERS': '2'},
+        })
+        transcribe = Mock()
+
+        pipeline = SegmentPipeline.from_config(config, transcribe)
+
+        assert pipeline._transcribe_segment is transcribe
+        assert pipeline._sample_rate == SAMPLE_RATE
+        assert pipeline._min_segment_bytes == 200 * SAMPLE_RATE // 1000 * 2
@@ -0,0 +1,176 @@
+import logging
+import os
+
+import pytest
+
+from service.text_pipeline import TextPipeline, build_plan
+from service.text_transformer import ReplacementTable, load_replacements, normalize_numerals
+
+SHIPPED_REPLACEMENTS = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'replacements.txt')
+
+
+class TestBuildPlan:
+    """build_plan()のテストクラス"""
+
+    def test_no_processing(self):
+        """正常系: 句読点ありで正規化も辞書もなければ何もしない処理計画になる"""
+        plan = build_plan({}, use_punctuation=True, normalize_width=False)
+
+        assert plan.translate_table is None
+        assert plan.matcher is None
+
+    def test_reuses_table_matcher(self):
+        """正常系: ReplacementTableの構築済みトライ木をそのまま使う"""
+        table = ReplacementTable({'テスト': '試験'})
+
+        plan = build_plan(table, use_punctuation=False, normalize_width=True)
+
+        assert plan.matcher is table.matcher
+        assert plan.translate_table is not None
+        assert plan.translate_table[ord('１')] == ord('1')
+        assert plan.translate_table[ord('。')] is None
+
+
+class TestPunctuation:
+    """句読点の削除のテストクラス"""
+
+    @pytest.mark.parametrize("use_punctuation,input_text,expected", [
+        (True, "これは。テスト、です。", "これは。テスト、です。"),
+        (False, "これは。テスト、です。", "これはテストです"),
+        (False, "一つ目。二つ目、三つ目。最後、です。", "一つ目二つ目三つ目最後です"),
+        (False, "。、。、", ""),
+        (False, "句読点なし", "句読点なし"),
+        (True, "", ""),
+        (False, "", ""),
+    ])
+    def test_punctuation(self, use_punctuation, input_text, expected):
+        """正常系: use_punctuationがFalseの場合だけ句読点を削除する"""
+        assert TextPipeline({}, use_punctuation).run(input_text) == expected
+
+    def test_none_text(self):
+        """異常系: Noneが渡された場合は空文字列を返す"""
+        assert TextPipeline({}, use_punctuation=False).run(None) == ""  # type: ignore
+
+
+class TestReplace:
+    """辞書置換のテストクラス"""
+
+    @pytest.mark.parametrize("text,replacements,expected", [
+        ("これはテストです", {"テスト": "試験"}, "これは試験です"),
+        ("テストとサンプルを実行", {"テスト": "試験", "サンプル": "例", "実行": "処理"}, "試験と例を処理"),
+        ("テストとテストのテスト", {"テスト": "試験"}, "試験と試験の試験"),
+        ("置換されないテキスト", {"存在しない": "置換"}, "置換されないテキスト"),
+        ("置換ルールがないテキスト", {}, "置換ルールがないテキスト"),
+        ("testとTESTとTest", {"test": "試験"}, "試験とTESTとTest"),
+        ("a", {"a": "b"}, "b"),
+        ("abc", {"b": "x"}, "axc"),
+        ("テスト", {"テスト": ""}, ""),
+        ("前置換後", {"置換": "REPLACE"}, "前REPLACE後"),
+    ])
+    def test_replace(self, text, replacements, expected):
+        """正常系: 置換ルールに従ってテキストを変換する"""
+        assert TextPipeline(replacements).run(text) == expected
+
+    def test_table(self):
+        """正常系: ReplacementTableを渡した場合も同じ結果になる"""
+        assert TextPipeline(ReplacementTable({"テスト": "試験"})).run("これはテストです") == "これは試験です"
+
+    def test_empty_text(self):
+        """境界値: 空文字列のテキスト"""
+        assert TextPipeline({"何か": "置換"}).run("") == ""
+
+
+class TestTextPipeline:
+    """TextPipelineのテストクラス"""
+
+    @pytest.mark.parametrize("use_punctuation", [True, False])
+    def test_matches_separate_steps(self, use_punctuation):
+        """正常系: 句読点処理の後に辞書置換した従来の結果と一致する"""
+        replacements = ReplacementTable({'血圧': 'BP', '正常。': '問題なし', '所見': '所見。'})
+        pipeline = TextPipeline(replacements, use_punctuation)
+        text = '血、圧と血圧は正常。所見、なし。'
+
+        punctuated = text if use_punctuation else text.replace('。', '').replace('、', '')
+        expected = replacements.matcher.replace(punctuated)[0]
+
+        assert pipeline.run(text) == expected
+
+    def test_normalize_width(self):
+        """正常系: 全角英数字を半角にしてから辞書置換する"""
+        pipeline = TextPipeline({'CT': 'CT検査'}, normalize_width=True)
+
+        assert pipeline.run('ＣＴで１２ｍｍ（所見）') == 'CT検査で12mm（所見）'
+
+    def test_normalize_width_disabled(self):
+        """正常系: 正規化しない設定では全角英数字をそのまま残す"""
+        assert TextPipeline({}).run('ＣＴ１２') == 'ＣＴ１２'
+
+    def test_normalize_numerals_before_replacements(self):
+        """正常系: 漢数字を変換してから辞書置換するため、変換後の表記を戻すルールが効く"""
+        pipeline = TextPipeline(ReplacementTable({'1部': '一部'}), normalize_numerals=True)
+
+        assert pipeline.run('一部で二千二十五年') == '一部で2025年'
+
+    @pytest.mark.parametrize("normalize_numerals", [True, False])
+    def test_shipped_dictionary_keeps_compound_words(self, normalize_numerals):
+        """正常系: 同梱の辞書で、漢数字を含む熟語を漢数字の変換の有無によらず元の表記に保つ"""
+        pipeline = TextPipeline(load_replacements(SHIPPED_REPLACEMENTS), normalize_numerals=normalize_numerals)
+
+        assert pipeline.run('一部の患者で統一する。一般的に一旦中止') == '一部の患者で統一する。一般的に一旦中止'
+
+    def test_normalize_numerals_with_punctuation_removed(self):
+        """正常系: 句読点の削除・文字の正規化・漢数字の変換・辞書置換をまとめても、段階ごとに行った結果と一致する"""
+        replacements = ReplacementTable({'1部': '一部', 'CT': 'CT検査'})
+        pipeline = TextPipeline(replacements, use_punctuation=False, normalize_width=True, normalize_numerals=True)
+        text = '一部の、ＣＴで二万円。十二時に二〇二五年'
+
+        translated = text.replace('。', '').replace('、', '').translate({ord('Ｃ'): 'C', ord('Ｔ'): 'T'})
+        expected = replacements.matcher.replace(normalize_numerals(translated))[0]
+
+        assert pipeline.run(text) == expected == '一部のCT検査で20000円12時に2025年'
+
+    def test_normalize_numerals_disabled(self):
+        """正常系: 設定しなければ漢数字をそのまま残す"""
+        assert TextPipeline({}).run('二十分') == '二十分'
+
+    def test_toggle_punctuation_keeps_replacements(self):
+        """正常系: 句読点の切り替えと辞書の差し替えは互いの設定を保つ"""
+        pipeline = TextPipeline({'a': 'b'})
+
+        pipeline.update_replacements(ReplacementTable({'a': 'c'}))
+        pipeline.use_punctuation = False
+
+        assert pipeline.run('a。') == 'c'
+        assert pipeline.replacements == {'a': 'c'}
+
+    def test_empty_text(self, caplog):
+        """境界値: 空文字列"""
+        caplog.set_level(logging.ERROR)
+
+        assert TextPipeline({'a': 'b'}).run('') == ''
+        assert '入力テキストが空です' in caplog.text
+
+    def test_only_punctuation(self):
+        """境界値: 句読点だけのテキストは空になる"""
+        assert TextPipeline({'a': 'b'}, use_punctuation=False).run('。、。') == ''
+
+    def test_metrics(self):
+        """正常系: 段階ごとの処理時間を記録する"""
+        pipeline = TextPipeline({'a': 'b'}, use_punctuation=False)
+
+        pipeline.run('aaa。')
+        pipeline.run('a')
+        metrics = pipeline.metrics()
+
+        assert metrics['runs'] == 2
+        for stage in ('translate', 'replace'):
+            assert metrics[f'{stage}_last_ms'] >= 0.0
+            assert metrics[f'{stage}_avg_ms'] >= 0.0
+
+    def test_metrics_before_run(self):
+        """境界値: 実行前は0"""
+        assert TextPipeline({}).metrics() == {
+            'runs': 0,
+            'translate_last_ms': 0.0, 'translate_avg_ms': 0.0,
+            'replace_last_ms': 0.0, 'replace_avg_ms': 0.0,
+        }
@@ -1,61 +1,29 @@
 import logging
+import os
+import random
 import time
-from unittest.mock import Mock, mock_open, patch
+from unittest.mock import mock_open, patch
 
 import pytest
 
-from service.text_transformer import load_replacements, process_punctuation, replace_text
+from service.text_transformer import (
+    ReplacementMatcher,
+    ReplacementTable,
+    load_replacements,
+    normalize_numerals,
+    parse_replacements,
+    read_replacements,
+)
 
+SHIPPED_REPLACEMENTS = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'replacements.txt')
 
-class TestProcessPunctuation:
-    """句読点処理のテストクラス"""
 
-    def test_process_punctuation_with_punctuation_true(self):
-        """正常系: use_punctuation=Trueの場合、句読点をそのまま保持"""
-        result = process_punctuation("これは。テスト、です。", True)
-        assert result == "これは。テスト、です。"
-
-    def test_process_punctuation_with_punctuation_false(self):
-        """正常系: use_punctuation=Falseの場合、句読点を削除"""
-        result = process_punctuation("これは。テスト、です。", False)
-        assert result == "これはテストです"
-        assert "。" not in result
-        assert "、" not in result
-
-    def test_process_punctuation_empty_text(self):
-        """境界値: 空文字列"""
-        assert process_punctuation("", False) == ""
-
-    def test_process_punctuation_only_punctuation(self):
-        """境界値: 句読点のみの文字列"""
-        assert process_punctuation("。、。、", False) == ""
-
-    def test_process_punctuation_no_punctuation(self):
-        """正常系: 句読点を含まない文字列"""
-        assert process_punctuation("これはテストです", False) == "これはテストです"
-
-    def test_process_punctuation_multiple_types(self):
-        """正常系: 複数の句読点を含む"""
-        result = process_punctuation("一つ目。二つ目、三つ目。最後、です。", False)
-        assert result == "一つ目二つ目三つ目最後です"
-
-    def test_process_punctuation_none_text(self, caplog):
-        """異常系: Noneが渡された場合"""
-        caplog.set_level(logging.ERROR)
-        result = process_punctuation(None, False)  # type: ignore
-        assert result is None
-        assert "句読点処理中にタイプエラー" in caplog.text
-
-    @pytest.mark.parametrize("use_punctuation,input_text,expected", [
-        (True, "テスト。文字、起こし", "テスト。文字、起こし"),
-        (False, "テスト。文字、起こし", "テスト文字起こし"),
-        (False, "。、。、", ""),
-        (True, "", ""),
-        (False, "句読点なし", "句読点なし"),
-    ])
-    def test_process_punctuation_parametrized(self, use_punctuation, input_text, expected):
-        """パラメータ化テスト"""
-        assert process_punctuation(input_text, use_punctuation) == expected
+def _apply_in_order(text, rules):
+    """ルールを辞書の順に1つずつ適用する、トライ木を導入する前の置換"""
+    for old, new in rules.items():
+        if old in text:
+            text = text.replace(old, new)
+    return text
 
 
 class TestLoadReplacements:
@@ -104,6 +72,12 @@ class TestLoadReplacements:
         assert result == {}
         assert "置換ファイルの読み込み中にエラーが発生しました" in caplog.text
 
+    def test_read_replacements_file_not_found(self):
+        """異常系: read_replacementsは空のテーブルを返さずに例外を送出する"""
+        with patch('builtins.open', side_effect=FileNotFoundError("File not found")):
+            with pytest.raises(FileNotFoundError):
+                read_replacements('nonexistent.txt')
+
     def test_load_replacements_permission_error(self, caplog):
         """異常系: ファイルアクセス権限エラー"""
         caplog.set_level(logging.ERROR)
@@ -121,6 +95,19 @@ class TestLoadReplacements:
         assert len(result) == 2
         assert "置換ルールの総数: 2" in caplog.text
 
+    def test_load_replacements_debug_log(self, caplog):
+        """正常系: DEBUGレベルのときだけルールごとの内容を記録する"""
+        file_content = "テスト1,結果1\n"
+        caplog.set_level(logging.INFO)
+        with patch('builtins.open', mock_open(read_data=file_content)):
+            load_replacements('test.txt')
+        assert "置換ルール読み込み" not in caplog.text
+
+        caplog.set_level(logging.DEBUG)
+        with patch('builtins.open', mock_open(read_data=file_content)):
+            load_replacements('test.txt')
+        assert "置換ルール読み込み - 1行目" in caplog.text
+
     def test_load_replacements_unicode(self):
         """正常系: Unicode文字を含む置換ルール"""
         file_content = "😀,😊\n漢字,ひらがな\n한글,カタカナ\n"
@@ -129,83 +116,245 @@ class TestLoadReplacements:
         assert result == {'😀': '😊', '漢字': 'ひらがな', '한글': 'カタカナ'}
 
 
-class TestReplaceText:
-    """テキスト置換のテストクラス"""
+class TestReplacementMatcher:
+    """ReplacementMatcherのテストクラス"""
 
-    def test_replace_text_single(self):
-        """正常系: 単一の置換処理"""
-        assert replace_text("これはテストです", {"テスト": "試験"}) == "これは試験です"
+    def test_leftmost_longest(self):
+        """正常系: 同じ位置で始まるルールは長いものを優先する"""
+        matcher = ReplacementMatcher({'高血圧': 'HT', '高血圧症': '本態性高血圧症', '血圧': 'BP'})
 
-    def test_replace_text_multiple(self):
-        """正常系: 複数の置換処理"""
-        result = replace_text("テストとサンプルを実行", {"テスト": "試験", "サンプル": "例", "実行": "処理"})
-        assert result == "試験と例を処理"
+        assert matcher.replace('高血圧症と高血圧の血圧') == ('本態性高血圧症とHTのBP', 3)
 
-    def test_replace_text_multiple_occurrences(self):
-        """正常系: 同じ単語の複数回置換"""
-        assert replace_text("テストとテストのテスト", {"テスト": "試験"}) == "試験と試験の試験"
+    def test_leftmost_wins_over_longer_overlap(self):
+        """正常系: 重なるルールはより左で始まるものを優先する"""
+        matcher = ReplacementMatcher({'bc': 'X', 'abc': 'Y', 'cde': 'Z'})
 
-    def test_replace_text_no_matches(self):
-        """正常系: 置換対象が見つからない場合"""
-        assert replace_text("置換されないテキスト", {"存在しない": "置換"}) == "置換されないテキスト"
+        assert matcher.replace('abcde') == ('Yde', 1)
 
-    def test_replace_text_empty_text(self):
-        """境界値: 空文字列のテキスト"""
-        assert replace_text("", {"何か": "置換"}) == ""
+    def test_independent_of_rule_order(self):
+        """正常系: ルールの並び順によって結果が変わらない"""
+        rules = [('糖尿', 'DM?'), ('糖尿病', 'DM'), ('病', 'disease')]
 
-    def test_replace_text_none_text(self):
-        """異常系: Noneのテキスト"""
-        assert replace_text(None, {"何か": "置換"}) == ""  # type: ignore
+        forward = ReplacementMatcher(dict(rules)).replace('糖尿病の病')
+        backward = ReplacementMatcher(dict(reversed(rules))).replace('糖尿病の病')
 
-    def test_replace_text_empty_replacements(self):
-        """境界値: 空の置換辞書"""
-        assert replace_text("置換ルールがないテキスト", {}) == "置換ルールがないテキスト"
+        assert forward == backward == ('DMのdisease', 2)
 
-    def test_replace_text_none_replacements(self):
-        """異常系: Noneの置換辞書"""
-        assert replace_text("テストテキスト", None) == "テストテキスト"  # type: ignore
+    def test_replacement_is_not_replaced_again(self):
+        """正常系: 置換後の文字列を走査し直さず、同じルールを繰り返し適用しない"""
+        matcher = ReplacementMatcher({'A': 'AA'})
 
-    def test_replace_text_case_sensitive(self):
-        """正常系: 大文字小文字の区別"""
-        assert replace_text("testとTESTとTest", {"test": "試験"}) == "試験とTESTとTest"
+        assert matcher.replace('AB') == ('AAB', 1)
 
-    def test_replace_text_exception_handling(self, caplog):
-        """異常系: 置換処理中の例外"""
-        caplog.set_level(logging.ERROR)
-        mock_replacements = Mock()
-        mock_replacements.items.side_effect = Exception("置換処理エラー")
-        result = replace_text("テストテキスト", mock_replacements)
-        assert result == "テストテキスト"
-        assert "テキスト置換中にエラーが発生" in caplog.text
-
-    @pytest.mark.parametrize("text,replacements,expected", [
-        ("", {}, ""),
-        ("a", {"a": "b"}, "b"),
-        ("abc", {"b": "x"}, "axc"),
-        ("テスト", {"テスト": ""}, ""),
-        ("前置換後", {"置換": "REPLACE"}, "前REPLACE後"),
+    def test_rule_rewriting_previous_output(self):
+        """正常系: 先のルールの置換後全体を置換するルールは、ルールを順に適用した結果と同じになる"""
+        assert ReplacementMatcher({'A': 'B', 'B': 'C'}).replace('AB') == ('CC', 2)
+        assert ReplacementMatcher({'B': 'C', 'A': 'B'}).replace('AB') == ('BC', 2)
+
+    @pytest.mark.parametrize("text,expected", [
+        ("一部の患者", "一部の患者"),
+        ("１部", "一部"),
+        ("統一する", "統一する"),
+        ("一般的には三日", "一般的には3日"),
+        ("十一部", "1一部"),
+    ])
+    def test_rule_containing_previous_output(self, text, expected):
+        """正常系: 先のルールの置換後を含むルールは、ルールを順に適用した結果と同じになる"""
+        rules = {'十一': '11', '一': '1', '三': '3', '１': '1', '1部': '一部', '1般': '一般', '統1': '統一'}
+
+        assert ReplacementMatcher(rules).replace(text)[0] == _apply_in_order(text, rules) == expected
+
+    def test_shipped_dictionary_matches_rules_applied_in_order(self):
+        """正常系: 同梱の辞書（漢数字のルールを含めた旧版を含む）で、ルールを順に適用した結果と同じになる"""
+        with open(SHIPPED_REPLACEMENTS, encoding='utf-8') as f:
+            shipped = parse_replacements(f.read().splitlines())
+        numerals = {'二千二十五': '2025', '十一': '11', '十二': '12'}
+        numerals.update({kanji: str(value) for value, kanji in enumerate('一二三四五六七八九', 1)})
+        sentences = [
+            '一部の患者では統一した基準がない', '一般的には第一に確認する', '１部の検査は一旦中止し一応経過を見る',
+            '二千二十五年十一月に一覧を作成?', 'Ｋ値は一定で一方のエクセルに入力', '小児体と焼死体', '十一部と十二段',
+        ]
+
+        for rules in (shipped, {**numerals, **shipped}):
+            matcher = ReplacementMatcher(rules)
+            for sentence in sentences:
+                assert matcher.replace(sentence)[0] == _apply_in_order(sentence, rules)
+
+    @pytest.mark.parametrize("text", ["一部の患者", "統一二部", "二十一部", "第三十二病日に一般", "一", "", "部"])
+    def test_normalize_numerals_in_same_scan(self, text):
+        """正常系: 漢数字の変換と置換を1回の走査で行っても、変換後のテキストを置換した結果と同じになる"""
+        matcher = ReplacementMatcher({'1部': '一部', '統1': '統一', '1般': '一般', '病日': '病日目'})
+
+        assert matcher.replace(text, normalize_numerals=True) == matcher.replace(normalize_numerals(text))
+
+    def test_empty_rule_is_ignored(self):
+        """境界値: 置換前が空のルールは無視する"""
+        matcher = ReplacementMatcher({'': 'x', 'a': 'b'})
+
+        assert matcher.rule_count == 1
+        assert matcher.replace('aa') == ('bb', 2)
+
+    def test_no_match_returns_same_text(self):
+        """正常系: 一致がなければ元のテキストをそのまま返す"""
+        text = '一致しないテキスト'
+
+        result, count = ReplacementMatcher({'該当': 'なし'}).replace(text)
+
+        assert result is text
+        assert count == 0
+
+    def test_load_replacements_builds_matcher(self):
+        """正常系: 読み込み時にトライ木を構築し、置換ではそれを使う"""
+        with patch('builtins.open', mock_open(read_data="テスト,試験\nテストケース,検査例\n")):
+            result = load_replacements('test.txt')
+
+        assert isinstance(result, ReplacementTable)
+        assert result.matcher.rule_count == 2
+        assert result.matcher.replace('テストケースのテスト') == ('検査例の試験', 2)
+
+
+class TestNormalizeNumerals:
+    """漢数字の変換のテストクラス"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("二千二十五年", "2025年"),
+        ("十一", "11"),
+        ("二十分", "20分"),
+        ("三百", "300"),
+        ("百五十", "150"),
+        ("一万二千", "12000"),
+        ("十二億三千万", "1230000000"),
+        ("二十三万四千五百六十七円", "234567円"),
+        ("二千〇五", "2005"),
+        ("第三十二病日", "第32病日"),
+    ])
+    def test_units(self, text, expected):
+        """正常系: 十・百・千・万・億の単位を含む漢数字"""
+        assert normalize_numerals(text) == expected
+
+    @pytest.mark.parametrize("text", ["1万", "3千", "1万5千", "3万円", "12万", "2025年"])
+    def test_arabic_runs_unchanged(self, text):
+        """正常系: アラビア数字で始まる表記は単位を含んでもそのまま残す"""
+        assert normalize_numerals(text) == text
+
+    @pytest.mark.parametrize("text,expected", [
+        ("三万五", "35000"),
+        ("三万五千", "35000"),
+        ("二億三", "230000000"),
+        ("三万五円", "35000円"),
+        ("三万十五", "30015"),
+    ])
+    def test_trailing_digit_after_large_unit(self, text, expected):
+        """正常系: 万・億の直後で終わる1桁は1つ下の位として扱う"""
+        assert normalize_numerals(text) == expected
+
+    def test_positional(self):
+        """正常系: 位取りの表記は1文字ずつ置き換え、先頭の0も残す"""
+        assert normalize_numerals("二〇二五年") == "2025年"
+        assert normalize_numerals("〇一") == "01"
+
+    @pytest.mark.parametrize("text,expected", [
+        ("零細企業", "零細企業"),
+        ("零下五度", "零下5度"),
+        ("〇〇さん", "〇〇さん"),
+        ("〇×式", "〇×式"),
+    ])
+    def test_standalone_zero(self, text, expected):
+        """正常系: 〇と零は他の数字と続く場合だけ0にする"""
+        assert normalize_numerals(text) == expected
+
+    @pytest.mark.parametrize("text,expected", [
+        ("百万円", "1000000円"),
+        ("千万", "10000000"),
+        ("十億", "1000000000"),
+        ("十万人", "100000人"),
     ])
-    def test_replace_text_parametrized(self, text, replacements, expected):
-        """パラメータ化テスト"""
-        assert replace_text(text, replacements) == expected
+    def test_unit_only(self, text, expected):
+        """正常系: 単位だけでも2文字以上の漢数字は変換する"""
+        assert normalize_numerals(text) == expected
+
+    @pytest.mark.parametrize("text", ["百人力", "千秋楽", "万全", "2025", "患者"])
+    def test_unchanged(self, text):
+        """正常系: 単位1文字だけの語やアラビア数字だけの数は変換しない"""
+        assert normalize_numerals(text) == text
+
+    @pytest.mark.parametrize("text", [
+        "八百屋", "八千代", "一緒", "万一", "十分な", "千葉", "一致", "九州", "三重県", "一石二鳥",
+    ])
+    def test_compound_words(self, text):
+        """正常系: 漢数字を含むが数を表さない語は変換しない"""
+        assert normalize_numerals(text) == text
+
+    @pytest.mark.parametrize("text,expected", [
+        ("八百", "800"),
+        ("二十分", "20分"),
+        ("八百屋で八百円", "八百屋で800円"),
+    ])
+    def test_compound_word_prefix(self, text, expected):
+        """境界値: 同じ文字で始まる数や、語の前の数は変換する"""
+        assert normalize_numerals(text) == expected
+
+    def test_leading_large_unit(self):
+        """境界値: 大きな単位で始まる語は単位を数として扱わない"""
+        assert normalize_numerals("億二千") == "億2000"
 
+    @pytest.mark.parametrize("text", ["十二十", "二二十", "万億"])
+    def test_invalid_order(self, text):
+        """異常系: 単位の並びが正しくなければ変換しない"""
+        assert normalize_numerals(text) == text
 
-class TestReplaceTextPerformance:
+    def test_empty(self):
+        """境界値: 空文字列"""
+        assert normalize_numerals("") == ""
+
+    def test_long_text_performance(self):
+        """長いテキストでも処理時間はテキストの長さに比例する"""
+        text = "患者は二千二十五年十二月三日に来院し、血圧は百二十三。" * 2000
+        start_time = time.time()
+        result = normalize_numerals(text)
+        assert result.startswith("患者は2025年12月3日に来院し、血圧は123。")
+        assert (time.time() - start_time) < 1.0
+
+
+class TestReplacementMatcherPerformance:
     """パフォーマンステスト"""
 
     def test_large_text_performance(self):
         """大きなテキストの置換処理性能"""
         large_text = "テスト " * 10000
         start_time = time.time()
-        result = replace_text(large_text, {"テスト": "試験"})
+        result, _ = ReplacementMatcher({"テスト": "試験"}).replace(large_text)
         assert "試験" in result
         assert (time.time() - start_time) < 1.0
 
+    def test_large_dictionary_performance(self):
+        """1万件の置換ルールでも処理時間がルール数に比例しない"""
+        table = ReplacementTable({f'用語{i:05d}': f'置換{i}' for i in range(10000)})
+        text = '用語00001と用語09999を含む文章。' * 50
+        start_time = time.time()
+        result, _ = table.matcher.replace(text)
+        assert result.startswith('置換1と置換9999を含む文章。')
+        assert (time.time() - start_time) < 0.1
+
+    def test_overlapping_dictionary_build_performance(self, caplog):
+        """1文字だけ変える訂正のように置換後とキーが文字を共有する辞書でも、構築時間がルール数の2乗で増えない"""
+        chars = '医療診断検査投与処方血圧症状心臓肺胃腸肝腎脳骨筋皮膚眼耳鼻'
+        rng = random.Random(0)
+        replacements = {}
+        while len(replacements) < 20000:
+            term = ''.join(rng.choices(chars, k=rng.randint(2, 6)))
+            replacements[term] = term[:-1] + rng.choice(chars.replace(term[-1], ''))
+        start_time = time.time()
+        matcher = ReplacementMatcher(replacements)
+        assert (time.time() - start_time) < 2.0
+        assert matcher.rule_count == len(replacements)
+        assert '先のルールの置換後を含む一致を展開しません' in caplog.text
+
     def test_many_replacements_performance(self):
         """多数の置換ルールの処理性能"""
         text = "文字列1 文字列2 文字列3 " * 100
         replacements = {f"文字列{i}": f"置換{i}" for i in range(1, 101)}
         start_time = time.time()
-        result = replace_text(text, replacements)
+        result, _ = ReplacementMatcher(replacements).replace(text)
         assert "置換1" in result
         assert (time.time() - start_time) < 1.0
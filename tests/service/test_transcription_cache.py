@@ -0,0 +1,90 @@
+import os
+
+from service.transcription_cache import TranscriptionCache, iter_file_blocks, make_cache_key
+
+
+class TestMakeCacheKey:
+    """make_cache_key()のテストクラス"""
+
+    def test_same_audio_and_settings(self):
+        """正常系: 区切り方が違っても同じ内容なら同じキーになる"""
+        key1 = make_cache_key([b'abc', b'def'], 'scribe_v2', 'jpn', False)
+        key2 = make_cache_key([b'abcdef'], 'scribe_v2', 'jpn', False)
+
+        assert key1 == key2
+
+    def test_settings_change_key(self):
+        """正常系: モデル・言語・タグ設定が違えば別のキーになる"""
+        base = make_cache_key([b'abc'], 'scribe_v2', 'jpn', False)
+
+        assert make_cache_key([b'abc'], 'scribe_v1', 'jpn', False) != base
+        assert make_cache_key([b'abc'], 'scribe_v2', 'eng', False) != base
+        assert make_cache_key([b'abc'], 'scribe_v2', 'jpn', True) != base
+        assert make_cache_key([b'abd'], 'scribe_v2', 'jpn', False) != base
+
+    def test_file_blocks_match_memory(self, tmp_path):
+        """正常系: ファイルから求めたキーとメモリ上の内容から求めたキーが一致する"""
+        path = tmp_path / 'audio.wav'
+        path.write_bytes(b'RIFF' + b'\x01' * 100)
+
+        assert make_cache_key(iter_file_blocks(str(path)), 'm', 'jpn', False) == \
+            make_cache_key([b'RIFF', b'\x01' * 100], 'm', 'jpn', False)
+
+
+class TestTranscriptionCache:
+    """TranscriptionCacheのテストクラス"""
+
+    def test_put_and_get(self, tmp_path):
+        """正常系: 保存した結果を取得できる"""
+        cache = TranscriptionCache(str(tmp_path / 'cache'), 10, 1024 * 1024)
+
+        cache.put('key1', '文字起こし結果')
+
+        assert cache.get('key1') == '文字起こし結果'
+        assert cache.hits == 1
+
+    def test_get_missing(self, tmp_path):
+        """正常系: 未保存のキーはNoneを返す"""
+        cache = TranscriptionCache(str(tmp_path), 10, 1024 * 1024)
+
+        assert cache.get('missing') is None
+        assert cache.misses == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        """正常系: 再起動後も保存した結果を取得できる"""
+        TranscriptionCache(str(tmp_path), 10, 1024 * 1024).put('key1', 'テキスト')
+
+        assert TranscriptionCache(str(tmp_path), 10, 1024 * 1024).get('key1') == 'テキスト'
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """正常系: 件数上限を超えると最も参照の古い結果から削除する"""
+        cache = TranscriptionCache(str(tmp_path), 2, 1024 * 1024)
+        cache.put('old', '1')
+        cache.put('used', '2')
+        os.utime(tmp_path / 'old.json', (1000, 1000))
+        os.utime(tmp_path / 'used.json', (2000, 2000))
+        cache.get('old')
+
+        cache.put('new', '3')
+
+        assert cache.get('used') is None
+        assert cache.get('old') == '1'
+        assert cache.get('new') == '3'
+
+    def test_evicts_by_size(self, tmp_path):
+        """正常系: 容量上限を超えると古い結果から削除する"""
+        cache = TranscriptionCache(str(tmp_path), 100, 150)
+        cache.put('first', 'あ' * 20)
+        os.utime(tmp_path / 'first.json', (1000, 1000))
+
+        cache.put('second', 'い' * 20)
+
+        assert cache.get('first') is None
+        assert cache.get('second') == 'い' * 20
+
+    def test_corrupted_entry(self, tmp_path):
+        """異常系: 壊れたファイルはキャッシュなしとして扱う"""
+        cache = TranscriptionCache(str(tmp_path), 10, 1024 * 1024)
+        (tmp_path / 'broken.json').write_text('{', encoding='utf-8')
+
+        assert cache.get('broken') is None
@@ -1,12 +1,27 @@
+import asyncio
+import configparser
+import os
+import threading
+import wave
 from unittest.mock import Mock, patch
 
+import pytest
+
+from service.audio_encoder import EncodedAudio
 from service.audio_file_manager import AudioFileManager
 from service.transcription_handler import TranscriptionHandler
+from service.transcription_queue import TranscriptionJobQueue
 from app.ui_queue_processor import UIQueueProcessor
+from external_service.elevenlabs_api import CircuitBreaker, CircuitOpenError, TranscriptionNetworkError
+from external_service.http_connection import ConnectionCanceller
+from external_service.stt_backend import ElevenLabsBackend, FallbackBackend
 from tests.conftest import dict_to_app_config
+from utils.app_config import AppConfig
+
+SHIPPED_CONFIG = os.path.join(os.path.dirname(__file__), '..', '..', 'utils', 'config.ini')
 
 
-def _make_handler(use_punctuation: bool = False, config_dict: dict | None = None):
+def _make_handler(config_dict: dict | None = None, async_client=None, backend=None):
     if config_dict is None:
         config_dict = {
             'ELEVENLABS': {'MODEL': 'scribe_v2', 'LANGUAGE': 'jpn'},
@@ -18,7 +33,9 @@ def _make_handler(use_punctuation: bool = False, config_dict: dict | None = None
     ui_processor = Mock(spec=UIQueueProcessor)
     ui_processor.is_ui_valid.return_value = True
     ui_processor.is_shutting_down = False
-    handler = TranscriptionHandler(config, client, audio_file_manager, ui_processor, use_punctuation)
+    handler = TranscriptionHandler(
+        config, client, audio_file_manager, ui_processor, async_client, backend=backend
+    )
     return handler, config, client, audio_file_manager, ui_processor
 
 
@@ -27,21 +44,14 @@ class TestTranscriptionHandlerInit:
 
     def test_init_success(self):
         """正常系: TranscriptionHandlerの正常初期化"""
-        handler, config, client, audio_file_manager, ui_processor = _make_handler(use_punctuation=True)
+        handler, config, client, audio_file_manager, ui_processor = _make_handler()
 
         assert handler.config == config
         assert handler.client == client
         assert handler.audio_file_manager == audio_file_manager
         assert handler.ui_processor == ui_processor
-        assert handler.use_punctuation is True
         assert handler.cancel_processing is False
-        assert handler.processing_thread is None
-
-    def test_init_with_punctuation_false(self):
-        """正常系: 句読点処理なしで初期化"""
-        handler, *_ = _make_handler()
-
-        assert handler.use_punctuation is False
+        assert handler.is_processing is False
 
 
 class TestTranscriptionHandlerTranscribeFrames:
@@ -51,17 +61,15 @@ class TestTranscriptionHandlerTranscribeFrames:
         self.mock_on_complete = Mock()
         self.mock_on_error = Mock()
 
-    @patch('service.transcription_handler.transcribe_audio')
-    @patch('service.transcription_handler.process_punctuation')
-    def test_transcribe_frames_success(self, mock_process_punct, mock_transcribe_audio):
+    @patch('external_service.stt_backend.transcribe_audio')
+    def test_transcribe_frames_success(self, mock_transcribe_audio):
         """正常系: 音声フレームの文字起こし成功"""
-        # ハンドラをpatchコンテキスト内で生成し transcribe_audio_func にモックが注入される
+        # ハンドラをpatchコンテキスト内で生成し、既定のバックエンドにモックが注入される
         handler, config, _, audio_file_manager, ui_processor = _make_handler()
         frames = [b'audio_data_1', b'audio_data_2']
         sample_rate = 16000
         audio_file_manager.save_audio.return_value = '/test/temp/audio.wav'
         mock_transcribe_audio.return_value = "文字起こし結果"
-        mock_process_punct.return_value = "文字起こし結果"
 
         handler.transcribe_frames(frames, sample_rate, self.mock_on_complete, self.mock_on_error)
 
@@ -69,7 +77,6 @@ class TestTranscriptionHandlerTranscribeFrames:
         mock_transcribe_audio.assert_called_once_with(
             '/test/temp/audio.wav', config, handler.client
         )
-        mock_process_punct.assert_called_once_with("文字起こし結果", False)
         ui_processor.schedule_callback.assert_called_once_with(
             self.mock_on_complete, "文字起こし結果"
         )
@@ -88,7 +95,7 @@ class TestTranscriptionHandlerTranscribeFrames:
         assert args[0] == self.mock_on_error
         assert "音声ファイルの保存に失敗しました" in args[1]
 
-    @patch('service.transcription_handler.transcribe_audio')
+    @patch('external_service.stt_backend.transcribe_audio')
     def test_transcribe_frames_transcription_fails(self, mock_transcribe_audio):
         """異常系: 文字起こし失敗"""
         handler, _, _, audio_file_manager, ui_processor = _make_handler()
@@ -129,15 +136,11 @@ class TestTranscriptionHandlerTranscribeFrames:
         audio_file_manager.save_audio.assert_not_called()
         ui_processor.schedule_callback.assert_not_called()
 
-    @patch('service.transcription_handler.transcribe_audio')
-    @patch('service.transcription_handler.process_punctuation')
-    def test_transcribe_frames_cancelled_before_ui_update(
-        self, mock_process_punct, mock_transcribe_audio
-    ):
+    @patch('external_service.stt_backend.transcribe_audio')
+    def test_transcribe_frames_cancelled_before_ui_update(self, mock_transcribe_audio):
         """異常系: UI更新前にキャンセル"""
         handler, _, _, audio_file_manager, ui_processor = _make_handler()
         audio_file_manager.save_audio.return_value = '/test/temp/audio.wav'
-        mock_process_punct.return_value = "結果"
 
         def cancel_after_transcribe(*_):
             handler.cancel_processing = True
@@ -172,23 +175,20 @@ class TestTranscriptionHandlerHandleAudioFile:
         self.mock_on_complete = Mock()
         self.mock_on_error = Mock()
 
-    @patch('service.transcription_handler.transcribe_audio')
-    @patch('service.transcription_handler.process_punctuation')
-    def test_handle_audio_file_success(self, mock_process_punct, mock_transcribe_audio):
+    @patch('external_service.stt_backend.transcribe_audio')
+    def test_handle_audio_file_success(self, mock_transcribe_audio):
         """正常系: 音声ファイル処理成功"""
         handler, config, _, _, _ = _make_handler()
         mock_transcribe_audio.return_value = "文字起こし結果"
-        mock_process_punct.return_value = "処理済み結果"
 
         handler.handle_audio_file('/test/audio.wav', self.mock_on_complete, self.mock_on_error)
 
         mock_transcribe_audio.assert_called_once_with(
             '/test/audio.wav', config, handler.client
         )
-        mock_process_punct.assert_called_once_with("文字起こし結果", False)
-        self.mock_on_complete.assert_called_once_with("処理済み結果")
+        self.mock_on_complete.assert_called_once_with("文字起こし結果")
 
-    @patch('service.transcription_handler.transcribe_audio')
+    @patch('external_service.stt_backend.transcribe_audio')
     def test_handle_audio_file_transcription_fails(self, mock_transcribe_audio):
         """異常系: 文字起こし失敗"""
         handler, _, _, _, _ = _make_handler()
@@ -198,7 +198,7 @@ class TestTranscriptionHandlerHandleAudioFile:
 
         self.mock_on_error.assert_called_once_with('音声ファイルの処理に失敗しました')
 
-    @patch('service.transcription_handler.transcribe_audio')
+    @patch('external_service.stt_backend.transcribe_audio')
     def test_handle_audio_file_with_exception(self, mock_transcribe_audio):
         """異常系: 処理中に例外発生"""
         handler, _, _, _, _ = _make_handler()
@@ -215,39 +215,34 @@ class TestTranscriptionHandlerWaitForProcessing:
     def setup_method(self):
         self.handler, *_ = _make_handler()
 
-    def test_wait_for_processing_no_thread(self):
-        """正常系: 処理スレッドなし"""
+    def test_wait_for_processing_no_jobs(self):
+        """正常系: ジョブなし"""
+        assert self.handler.is_processing is False
         assert self.handler.wait_for_processing() is True
 
-    def test_wait_for_processing_thread_completes(self):
-        """正常系: 処理スレッドが完了"""
-        mock_thread = Mock()
-        mock_thread.is_alive.return_value = False
-        self.handler.processing_thread = mock_thread
+    def test_wait_for_processing_job_completes(self):
+        """正常系: 実行中のジョブが完了するまで待機する"""
+        release = threading.Event()
+        job_queue = self.handler.job_queue
+        assert isinstance(job_queue, TranscriptionJobQueue)
+        job_queue.submit(lambda sequence: release.wait(5))
+        assert self.handler.is_processing is True
 
-        assert self.handler.wait_for_processing() is True
-        mock_thread.join.assert_not_called()
+        threading.Timer(0.05, release.set).start()
 
-    def test_wait_for_processing_thread_alive(self):
-        """正常系: 処理スレッドが実行中"""
-        mock_thread = Mock()
-        mock_thread.is_alive.side_effect = [True, False]
-        self.handler.processing_thread = mock_thread
-
-        result = self.handler.wait_for_processing(timeout=1.0)
-
-        mock_thread.join.assert_called_once_with(timeout=1.0)
-        assert result is True
+        assert self.handler.wait_for_processing(timeout=5.0) is True
+        assert self.handler.is_processing is False
 
     def test_wait_for_processing_timeout(self):
         """異常系: タイムアウト"""
-        mock_thread = Mock()
-        mock_thread.is_alive.return_value = True
-        self.handler.processing_thread = mock_thread
+        release = threading.Event()
+        job_queue = self.handler.job_queue
+        assert isinstance(job_queue, TranscriptionJobQueue)
+        job_queue.submit(lambda sequence: release.wait(5))
 
         result = self.handler.wait_for_processing(timeout=0.1)
 
-        mock_thread.join.assert_called_once_with(timeout=0.1)
+        release.set()
         assert result is False
 
 
@@ -269,3 +264,869 @@ class TestTranscriptionHandlerCancelAndReset:
         handler.cancel_processing = True
         handler.reset_cancel()
         assert handler.cancel_processing is False
+
+    def test_cancel_aborts_connections_while_processing(self):
+        """正常系: 処理中のジョブがあれば送信中のリクエストを中断する"""
+        handler, *_ = _make_handler()
+        canceller = Mock(spec=ConnectionCanceller)
+        release = threading.Event()
+
+        with patch.object(handler, 'connection_canceller', canceller), \
+                patch.object(handler, 'transcribe_frames', side_effect=lambda *args: release.wait(5)):
+            handler.submit_frames([b'1'], 16000, Mock(), Mock())
+            try:
+                handler.cancel()
+            finally:
+                release.set()
+            handler.wait_for_processing(5)
+
+        canceller.cancel_all.assert_called_once()
+
+    def test_cancel_aborts_connections_when_idle(self):
+        """正常系: 処理中のジョブがなくても中断を依頼する。送信中のリクエストがなければ接続は残る"""
+        handler, *_ = _make_handler()
+        canceller = Mock(spec=ConnectionCanceller)
+
+        with patch.object(handler, 'connection_canceller', canceller):
+            handler.cancel()
+
+        canceller.cancel_all.assert_called_once()
+
+    def test_aborted_request_is_not_reported(self):
+        """正常系: キャンセルで中断した通信エラーはエラー通知も再送信もしない"""
+        backend = Mock(spec=ElevenLabsBackend)
+        handler, _, _, _, ui = _make_handler(config_dict={
+            'ELEVENLABS': {'IN_MEMORY_UPLOAD': 'True'},
+            'PATHS': {'TEMP_DIR': '/test/temp'}
+        }, backend=backend)
+        handler.retry_queue = Mock()
+
+        def aborted(*args):
+            handler.cancel()
+            raise TranscriptionNetworkError('Server disconnected')
+
+        backend.transcribe_data.side_effect = aborted
+
+        handler.transcribe_frames([b'\x01\x00'], 16000, Mock(), Mock())
+
+        ui.schedule_callback.assert_not_called()
+        handler.retry_queue.enqueue_audio.assert_not_called()
+
+
+class TestTranscriptionHandlerTrimSilence:
+    """無音除去のテストクラス"""
+
+    def _make_vad_handler(self, enabled: bool):
+        return _make_handler(config_dict={
+            'VAD': {'ENABLED': str(enabled), 'THRESHOLD_DB': '-40', 'FRAME_MS': '10', 'PADDING_MS': '0'},
+            'PATHS': {'TEMP_DIR': '/test/temp'}
+        })
+
+    def test_trimmed_audio_is_saved(self):
+        """正常系: 無音除去後の音声を保存する"""
+        handler, _, _, audio_file_manager, _ = self._make_vad_handler(True)
+        audio_file_manager.save_audio.return_value = None
+        voiced = (b'\x00\x40' * 1600)
+        silence = b'\x00\x00' * 3200
+
+        handler.transcribe_frames([silence, voiced, silence], 16000, Mock(), Mock())
+
+        saved_frames = audio_file_manager.save_audio.call_args[0][0]
+        assert bytes(saved_frames[0]) == voiced
+        assert handler.upload_encoder.last_trim_result is not None
+        assert handler.upload_encoder.last_trim_result.removed_ms == 400
+
+    def test_disabled_keeps_frames(self):
+        """正常系: 無効時はフレームをそのまま保存する"""
+        handler, _, _, audio_file_manager, _ = self._make_vad_handler(False)
+        audio_file_manager.save_audio.return_value = None
+        frames = [b'\x00\x00' * 100]
+
+        handler.transcribe_frames(frames, 16000, Mock(), Mock())
+
+        audio_file_manager.save_audio.assert_called_once_with(frames, 16000)
+        assert handler.upload_encoder.last_trim_result is None
+
+    @patch('service.upload_encoder.trim_silence')
+    def test_trim_error_keeps_frames(self, mock_trim):
+        """異常系: 無音除去に失敗した場合は元のフレームを使う"""
+        mock_trim.side_effect = ValueError("bad buffer")
+        handler, _, _, audio_file_manager, _ = self._make_vad_handler(True)
+        audio_file_manager.save_audio.return_value = None
+        frames = [b'\x00\x00' * 100]
+
+        handler.transcribe_frames(frames, 16000, Mock(), Mock())
+
+        audio_file_manager.save_audio.assert_called_once_with(frames, 16000)
+
+
+class TestTranscriptionHandlerStreamedFile:
+    """録音中に保存済みのファイルを使う場合のテストクラス"""
+
+    def test_streamed_file_is_used_without_saving(self):
+        """正常系: 保存済みファイルがあれば再保存せずに文字起こしする"""
+        backend = Mock(spec=ElevenLabsBackend)
+        backend.transcribe_file.return_value = 'テキスト'
+        handler, _, _, audio_file_manager, _ = _make_handler(backend=backend)
+
+        handler.transcribe_frames([b'audio'], 16000, Mock(), Mock(), audio_path='/test/temp/recording.wav')
+
+        audio_file_manager.save_audio.assert_not_called()
+        backend.transcribe_file.assert_called_once_with('/test/temp/recording.wav')
+
+    def test_trimmed_audio_is_sent_without_second_file(self):
+        """正常系: 無音除去で音声が変わってもWAVを保存し直さず、除去後の音声をメモリから送信する"""
+        handler, _, _, audio_file_manager, _ = _make_handler(config_dict={
+            'VAD': {'ENABLED': 'True', 'THRESHOLD_DB': '-40', 'FRAME_MS': '10', 'PADDING_MS': '0'},
+            'ELEVENLABS': {'IN_MEMORY_UPLOAD': 'False'},
+            'PATHS': {'TEMP_DIR': '/test/temp'}
+        })
+        transcribe_data = Mock(return_value='テキスト')
+        transcribe_file = Mock(return_value='テキスト')
+        frames = [b'\x00\x00' * 3200 + b'\x00\x40' * 1600]
+
+        with patch.object(handler.backend, 'transcribe_data', transcribe_data), \
+                patch.object(handler.backend, 'transcribe_file', transcribe_file):
+            handler.transcribe_frames(frames, 16000, Mock(), Mock(), audio_path='/test/temp/recording.wav')
+
+        audio_file_manager.save_audio.assert_not_called()
+        audio_file_manager.save_audio_in_background.assert_not_called()
+        transcribe_file.assert_not_called()
+        assert transcribe_data.call_args[0][1] == 'recording.wav'
+
+    def test_shipped_config_with_streaming_and_vad_writes_one_file(self, tmp_path):
+        """正常系: 同梱の設定で録音中の保存と無音除去を有効にしても、録音ごとに保存するWAVは1つだけ"""
+        parser = configparser.ConfigParser()
+        parser.read(SHIPPED_CONFIG, encoding='utf-8')
+        parser.set('PATHS', 'temp_dir', str(tmp_path))
+        parser.set('AUDIO', 'stream_to_disk', 'True')
+        parser.set('VAD', 'enabled', 'True')
+        config = AppConfig(parser)
+        audio_file_manager = AudioFileManager(config)
+        writer = audio_file_manager.open_stream_writer(config.audio_sample_rate)
+        assert writer is not None
+        frames = [b'\x00\x00' * 8000, b'\x00\x40' * 8000, b'\x00\x00' * 8000]
+        for frame in frames:
+            writer.write(frame)
+        audio_path = writer.close()
+        assert audio_path is not None
+        handler = TranscriptionHandler(config, Mock(), audio_file_manager, Mock(spec=UIQueueProcessor))
+        transcribe_data = Mock(return_value='テキスト')
+
+        with patch.object(handler.backend, 'transcribe_data', transcribe_data):
+            handler.transcribe_frames(frames, config.audio_sample_rate, Mock(), Mock(), audio_path=audio_path)
+        handler.stop_retry_queue()
+
+        trim_result = handler.upload_encoder.last_trim_result
+        assert trim_result is not None and trim_result.removed_ms > 0
+        assert [path.name for path in tmp_path.glob('*.wav')] == [os.path.basename(audio_path)]
+        transcribe_data.assert_called_once()
+
+
+class TestTranscriptionHandlerInMemoryUpload:
+    """メモリ上のWAVを送信する場合のテストクラス"""
+
+    def setup_method(self):
+        self.backend = Mock(spec=ElevenLabsBackend)
+        self.backend.transcribe_data.return_value = 'テキスト'
+        self.handler, _, _, self.afm, self.ui = _make_handler(config_dict={
+            'ELEVENLABS': {'IN_MEMORY_UPLOAD': 'True'},
+            'PATHS': {'TEMP_DIR': '/test/temp'}
+        }, backend=self.backend)
+
+    def test_sends_payload_and_saves_in_background(self):
+        """正常系: WAVをメモリ上で送信し、ファイル保存は別スレッドで行う"""
+        frames = [b'\x01\x00', b'\x02\x00']
+
+        self.handler.transcribe_frames(frames, 16000, Mock(), Mock())
+
+        self.afm.save_audio.assert_not_called()
+        self.afm.save_audio_in_background.assert_called_once_with(frames, 16000)
+        self.backend.transcribe_file.assert_not_called()
+        payload, file_name = self.backend.transcribe_data.call_args[0]
+        assert payload.read()[-4:] == b'\x01\x00\x02\x00'
+        assert file_name == 'audio.wav'
+
+    def test_streamed_file_is_not_saved_again(self):
+        """正常系: 録音中に保存済みの場合はバックグラウンド保存も行わない"""
+        self.handler.transcribe_frames([b'\x01\x00'], 16000, Mock(), Mock(), audio_path='/test/temp/recording.wav')
+
+        self.afm.save_audio_in_background.assert_not_called()
+        assert self.backend.transcribe_data.call_args[0][1] == 'recording.wav'
+
+    def test_failure_reports_error(self):
+        """異常系: 文字起こしに失敗した場合はエラーを通知する"""
+        self.backend.transcribe_data.return_value = None
+        on_error = Mock()
+
+        self.handler.transcribe_frames([b'\x01\x00'], 16000, Mock(), on_error)
+
+        self.ui.schedule_callback.assert_called_once_with(on_error, '音声ファイルの文字起こしに失敗しました')
+
+
+class TestTranscriptionHandlerUploadFormat:
+    """送信形式の切り替えのテストクラス"""
+
+    def test_encoded_audio_is_uploaded(self):
+        """正常系: 設定形式でエンコードし拡張子を合わせて送信する"""
+        backend = Mock(spec=ElevenLabsBackend)
+        backend.transcribe_data.return_value = 'テキスト'
+        handler, _, _, afm, _ = _make_handler(config_dict={
+            'ELEVENLABS': {'UPLOAD_FORMAT': 'flac'},
+            'PATHS': {'TEMP_DIR': '/test/temp'}
+        }, backend=backend)
+
+        encoded = EncodedAudio(b'fLaC', '.flac', 4)
+        with patch.object(handler.upload_encoder, 'encode_audio', return_value=encoded) as encode_audio:
+            handler.transcribe_frames([b'\x01\x00'], 16000, Mock(), Mock(), audio_path='/test/temp/recording.wav')
+
+        encode_audio.assert_called_once_with(b'\x01\x00', 16000, 1)
+        backend.transcribe_data.assert_called_once_with(b'fLaC', 'recording.flac')
+        afm.save_audio.assert_not_called()
+
+
+class TestTranscriptionHandlerSegments:
+    """区間文字起こしのテストクラス"""
+
+    def setup_method(self):
+        self.backend = Mock(spec=ElevenLabsBackend)
+        self.backend.transcribe_data.return_value = '区間。'
+        self.handler, _, _, self.afm, self.ui = _make_handler(backend=self.backend)
+
+    def test_transcribe_segment(self):
+        """正常系: 区間をエンコードして連番のファイル名で送信する"""
+        result = self.handler.transcribe_segment(b'\x01\x00', 1)
+
+        assert result == '区間。'
+        payload, file_name = self.backend.transcribe_data.call_args[0]
+        assert file_name == 'segment_002.wav'
+        assert payload.read()[-2:] == b'\x01\x00'
+
+    def test_transcribe_segment_cancelled(self):
+        """正常系: キャンセル後は送信しない"""
+        self.handler.cancel()
+
+        assert self.handler.transcribe_segment(b'\x01\x00', 0) is None
+        self.backend.transcribe_data.assert_not_called()
+
+    def test_transcribe_segments_stitches_result(self):
+        """正常系: 残りを送信して連結結果を渡す。句読点は貼り付け時の後処理に任せる"""
+        pipeline = Mock(segment_count=2)
+        pipeline.result.return_value = '前半。後半。'
+        on_complete = Mock()
+        frames = [b'\x01\x00']
+
+        self.handler.transcribe_segments(pipeline, frames, 16000, on_complete, Mock())
+
+        pipeline.finish.assert_called_once_with(b'\x01\x00')
+        self.afm.save_audio_in_background.assert_called_once_with(frames, 16000)
+        self.ui.schedule_callback.assert_called_once_with(on_complete, '前半。後半。')
+
+    def test_transcribe_segments_failure(self):
+        """異常系: 区間の失敗はエラーとして通知する"""
+        pipeline = Mock(segment_count=1)
+        pipeline.result.return_value = None
+        on_error = Mock()
+
+        self.handler.transcribe_segments(pipeline, [b'\x01\x00'], 16000, Mock(), on_error, '/test/temp/recording.wav')
+
+        self.afm.save_audio_in_background.assert_not_called()
+        self.ui.schedule_callback.assert_called_once_with(on_error, '音声ファイルの文字起こしに失敗しました')
+
+    def test_cancel_cancels_pipeline(self):
+        """正常系: キャンセル時に進行中の区間もキャンセルする"""
+        self.handler.segment_pipeline = Mock()
+
+        self.handler.cancel()
+
+        self.handler.segment_pipeline.cancel.assert_called_once()
+
+
+class TestTranscriptionHandlerJobQueue:
+    """ジョブキュー経由の文字起こしのテストクラス"""
+
+    def setup_method(self):
+        self.handler, _, _, _, self.ui = _make_handler(config_dict={
+            'TRANSCRIPTION': {'WORKERS': '2', 'MAX_PENDING': '2'},
+            'PATHS': {'TEMP_DIR': '/test/temp'}
+        })
+        # UIキューに積まれたコールバックをその場で実行する
+        self.ui.schedule_callback.side_effect = lambda callback, *args: callback(*args)
+
+    def test_results_are_delivered_in_submission_order(self):
+        """正常系: 後のジョブが先に完了しても受付順に通知する"""
+        first_release = threading.Event()
+        delivered = []
+
+        def transcribe_frames(frames, sample_rate, on_complete, on_error, audio_path=None):
+            if frames == [b'first']:
+                first_release.wait(5)
+            self.ui.schedule_callback(on_complete, frames[0])
+
+        with patch.object(self.handler, 'transcribe_frames', transcribe_frames):
+            self.handler.submit_frames([b'first'], 16000, delivered.append, Mock())
+            self.handler.submit_frames([b'second'], 16000, delivered.append, Mock())
+
+            assert self.handler.wait_for_processing(timeout=0.2) is False
+            assert delivered == []
+            first_release.set()
+
+            assert self.handler.wait_for_processing(timeout=5.0) is True
+        assert delivered == [b'first', b'second']
+
+    def test_failed_job_does_not_block_later_results(self):
+        """正常系: 結果を通知せずに終わったジョブがあっても後続の通知は止まらない"""
+        delivered = []
+
+        def transcribe_frames(frames, sample_rate, on_complete, on_error, audio_path=None):
+            if frames == [b'cancelled']:
+                return
+            self.ui.schedule_callback(on_error, 'エラー')
+
+        with patch.object(self.handler, 'transcribe_frames', transcribe_frames):
+            self.handler.submit_frames([b'cancelled'], 16000, Mock(), Mock())
+            self.handler.submit_frames([b'failed'], 16000, Mock(), delivered.append)
+
+            assert self.handler.wait_for_processing(timeout=5.0) is True
+        assert delivered == ['エラー']
+
+    def test_queue_limit(self):
+        """異常系: 上限に達すると新しいジョブを受け付けない"""
+        release = threading.Event()
+        with patch.object(self.handler, 'transcribe_frames', lambda *args: release.wait(5)):
+            self.handler.submit_frames([b'1'], 16000, Mock(), Mock())
+            self.handler.submit_frames([b'2'], 16000, Mock(), Mock())
+
+            assert self.handler.can_accept_job() is False
+            try:
+                with pytest.raises(RuntimeError, match='文字起こし待ちが上限に達しています'):
+                    self.handler.submit_frames([b'3'], 16000, Mock(), Mock())
+            finally:
+                release.set()
+                self.handler.wait_for_processing(timeout=5.0)
+
+    def test_queue_metrics(self):
+        """正常系: キューの深さと待ち時間を返す"""
+        with patch.object(self.handler, 'transcribe_frames', lambda *args: None):
+            self.handler.submit_frames([b'1'], 16000, Mock(), Mock())
+            self.handler.wait_for_processing(timeout=5.0)
+
+        metrics = self.handler.queue_metrics()
+
+        assert metrics['completed'] == 1
+        assert metrics['queue_depth'] == 0
+        assert metrics['held_results'] == 0
+        assert metrics['max_wait_ms'] >= 0
+
+
+class TestTranscriptionHandlerCache:
+    """文字起こしキャッシュのテストクラス"""
+
+    def setup_method(self):
+        self.on_complete = Mock()
+        self.on_error = Mock()
+
+    def _make(self, tmp_path):
+        self.backend = Mock(spec=ElevenLabsBackend)
+        self.backend.transcribe_file.return_value = '結果'
+        handler, _, _, audio_file_manager, ui = _make_handler(config_dict={
+            'TRANSCRIPTION': {'CACHE_ENABLED': 'True'},
+            'PATHS': {'TEMP_DIR': str(tmp_path / 'temp'), 'TRANSCRIPTION_CACHE_DIR': str(tmp_path / 'cache')},
+            'AUDIO': {'SAMPLE_RATE': '16000', 'CHANNELS': '1'},
+        }, backend=self.backend)
+        return handler, audio_file_manager, ui
+
+    def test_cache_disabled_by_default(self):
+        """正常系: 設定がなければキャッシュを使わない"""
+        handler, *_ = _make_handler()
+
+        assert handler.cache is None
+
+    def test_repeated_file_uses_cache(self, tmp_path):
+        """正常系: 同じファイルの再読込はAPIを呼ばずに結果を返す"""
+        handler, _, _ = self._make(tmp_path)
+        path = tmp_path / 'recording.wav'
+        path.write_bytes(b'RIFF' + b'\x00' * 100)
+
+        handler.handle_audio_file(str(path), self.on_complete, self.on_error)
+        handler.handle_audio_file(str(path), self.on_complete, self.on_error)
+
+        self.backend.transcribe_file.assert_called_once()
+        assert self.on_complete.call_count == 2
+        self.on_error.assert_not_called()
+
+    def test_failed_transcription_is_not_cached(self, tmp_path):
+        """異常系: 失敗した結果は保存しない"""
+        handler, _, _ = self._make(tmp_path)
+        self.backend.transcribe_file.return_value = None
+        path = tmp_path / 'recording.wav'
+        path.write_bytes(b'RIFF')
+
+        handler.handle_audio_file(str(path), self.on_complete, self.on_error)
+        handler.handle_audio_file(str(path), self.on_complete, self.on_error)
+
+        assert self.backend.transcribe_file.call_count == 2
+
+    def test_reload_of_recording_uses_cache(self, tmp_path):
+        """正常系: 録音を文字起こしした後、保存されたWAVの再読込はキャッシュから返す"""
+        handler, audio_file_manager, _ = self._make(tmp_path)
+        frames = [b'\x01\x00' * 800, b'\x02\x00' * 800]
+        saved = tmp_path / 'recording.wav'
+        with wave.open(str(saved), 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(16000)
+            wf.writeframes(b''.join(frames))
+        audio_file_manager.save_audio.return_value = str(saved)
+
+        handler.transcribe_frames(frames, 16000, self.on_complete, self.on_error)
+        handler.handle_audio_file(str(saved), self.on_complete, self.on_error)
+
+        self.backend.transcribe_file.assert_called_once()
+        self.on_complete.assert_called_with('結果')
+
+    def test_repeated_frames_skip_upload_but_save_audio(self, tmp_path):
+        """正常系: キャッシュにヒットしても再読込用の音声は保存する"""
+        handler, audio_file_manager, ui = self._make(tmp_path)
+        frames = [b'\x01\x00' * 800]
+        key = handler._frames_cache_key(frames, 16000)
+        assert handler.cache is not None and key is not None
+        handler.cache.put(key, 'キャッシュ結果')
+
+        handler.transcribe_frames(frames, 16000, self.on_complete, self.on_error)
+
+        self.backend.transcribe_file.assert_not_called()
+        audio_file_manager.save_audio_in_background.assert_called_once_with(frames, 16000)
+        ui.schedule_callback.assert_called_once_with(self.on_complete, 'キャッシュ結果')
+
+
+class TestTranscriptionHandlerRetry:
+    """通信障害時の再送信のテストクラス"""
+
+    def setup_method(self):
+        self.on_complete = Mock()
+        self.on_error = Mock()
+
+    def _make(self, tmp_path):
+        self.backend = Mock(spec=ElevenLabsBackend)
+        self.backend.transcribe_file.side_effect = TranscriptionNetworkError('接続できません')
+        handler, _, _, audio_file_manager, ui = _make_handler(config_dict={
+            'TRANSCRIPTION': {'RETRY_ENABLED': 'True'},
+            'PATHS': {'TEMP_DIR': str(tmp_path / 'temp'), 'RETRY_DIR': str(tmp_path / 'retry')},
+            'AUDIO': {'SAMPLE_RATE': '16000', 'CHANNELS': '1'},
+        }, backend=self.backend)
+        return handler, audio_file_manager, ui
+
+    def test_retry_disabled_by_default(self):
+        """正常系: 設定がなければ再送信キューを使わない"""
+        handler, *_ = _make_handler()
+
+        assert handler.retry_queue is None
+
+    @patch('service.transcription_handler.get_foreground_window', return_value=42)
+    def test_network_error_defers_recording(self, _mock_window, tmp_path):
+        """異常系: 通信エラー時は録音を再送信待ちに保存して保留を通知する"""
+        handler, audio_file_manager, ui = self._make(tmp_path)
+        audio_file_manager.save_audio.return_value = str(tmp_path / 'audio.wav')
+
+        handler.transcribe_frames([b'\x01\x00' * 100], 16000, self.on_complete, self.on_error)
+
+        assert handler.retry_queue is not None
+        jobs = handler.retry_queue.jobs()
+        assert len(jobs) == 1
+        assert jobs[0].target_window == 42
+        with wave.open(jobs[0].audio_path, 'rb') as wf:
+            assert wf.readframes(100) == b'\x01\x00' * 100
+        message = ui.schedule_callback.call_args.args[1]
+        assert '自動で再送信します' in message
+
+    def test_network_error_defers_reloaded_file(self, tmp_path):
+        """異常系: 音声再読込で通信エラーになった場合はファイルを複製して保存する"""
+        handler, _, _ = self._make(tmp_path)
+        path = tmp_path / 'recording.wav'
+        path.write_bytes(b'RIFF' + b'\x00' * 10)
+
+        handler.handle_audio_file(str(path), self.on_complete, self.on_error)
+
+        assert handler.retry_queue is not None
+        jobs = handler.retry_queue.jobs()
+        assert len(jobs) == 1
+        assert open(jobs[0].audio_path, 'rb').read() == path.read_bytes()
+        self.on_error.assert_called_once()
+        self.on_complete.assert_not_called()
+
+    def test_network_error_without_retry_queue(self):
+        """異常系: 再送信キューがなければエラーとして通知する"""
+        backend = Mock(spec=ElevenLabsBackend)
+        backend.transcribe_file.side_effect = TranscriptionNetworkError('接続できません')
+        handler, _, _, audio_file_manager, ui = _make_handler(backend=backend)
+        audio_file_manager.save_audio.return_value = '/test/temp/audio.wav'
+
+        handler.transcribe_frames([b'audio'], 16000, self.on_complete, self.on_error)
+
+        ui.schedule_callback.assert_called_once_with(self.on_error, '接続できません')
+
+    def test_transcribe_retry(self, tmp_path):
+        """正常系: 保存した音声を文字起こしし、句読点は貼り付け時の後処理に任せる"""
+        handler, _, _ = self._make(tmp_path)
+        self.backend.transcribe_file.side_effect = None
+        self.backend.transcribe_file.return_value = '結果。'
+
+        assert handler.transcribe_retry('/retry/job.wav') == '結果。'
+
+
+class TestTranscriptionHandlerHedging:
+    """追加送信設定のテストクラス"""
+
+    def test_hedging_disabled_by_default(self):
+        """正常系: 設定がなければ追加送信しない"""
+        handler, *_ = _make_handler()
+
+        assert handler.backend_chain.hedging is None
+        assert 'hedge_requests' not in handler.queue_metrics()
+
+    @patch('external_service.stt_backend.transcribe_audio_data')
+    def test_hedging_policy_is_passed(self, mock_transcribe_data):
+        """正常系: 有効時は追加送信の設定を付けてAPIを呼び、状況をメトリクスに含める"""
+        handler, *_ = _make_handler(config_dict={
+            'ELEVENLABS': {'HEDGE_ENABLED': 'True', 'HEDGE_PERCENTILE': '90', 'HEDGE_MAX_PER_MINUTE': '3'},
+            'PATHS': {'TEMP_DIR': '/test/temp'}
+        })
+        mock_transcribe_data.return_value = '結果'
+
+        handler.transcribe_segment(b'\x00\x00', 0)
+
+        assert handler.backend_chain.hedging is not None
+        assert handler.backend_chain.hedging.percentile == 90.0
+        assert handler.backend_chain.hedging.max_hedges_per_minute == 3
+        assert mock_transcribe_data.call_args.kwargs['hedging'] is handler.backend_chain.hedging
+        assert handler.queue_metrics()['hedge_hedges_fired'] == 0
+
+
+class TestTranscriptionHandlerAsyncEngine:
+    """asyncio方式の文字起こしのテストクラス"""
+
+    def setup_method(self):
+        self.async_client = Mock()
+        self.handler, _, _, self.audio_file_manager, self.ui = _make_handler(
+            config_dict={
+                'TRANSCRIPTION': {'ENGINE': 'asyncio', 'WORKERS': '2', 'MAX_PENDING': '4',
+                                  'JOB_TIMEOUT_SECONDS': '5'},
+                'PATHS': {'TEMP_DIR': '/test/temp'}
+            },
+            async_client=self.async_client
+        )
+        self.ui.schedule_callback.side_effect = lambda callback, *args: callback(*args)
+
+    def teardown_method(self):
+        engine = self.handler.async_engine
+        assert engine is not None
+        engine.close()
+
+    def test_threads_engine_by_default(self):
+        """正常系: 設定がなければワーカースレッド方式で処理する"""
+        handler, *_ = _make_handler(async_client=Mock())
+
+        assert handler.async_engine is None
+
+    def test_asyncio_requires_async_client(self):
+        """正常系: 非同期クライアントがなければワーカースレッド方式に戻す"""
+        handler, *_ = _make_handler(config_dict={'TRANSCRIPTION': {'ENGINE': 'asyncio'}})
+
+        assert handler.async_engine is None
+
+    def test_results_are_delivered_in_submission_order(self):
+        """正常系: 非同期クライアントで送信し、後のジョブが先に完了しても受付順に通知する"""
+        first_release = threading.Event()
+        delivered = []
+
+        async def transcribe(audio, file_name, config, client):
+            assert client is self.async_client
+            if audio.read().endswith(b'\x01\x00'):
+                while not first_release.is_set():
+                    await asyncio.sleep(0.01)
+                return 'first'
+            return 'second'
+
+        with patch.object(self.handler.backend_chain, 'transcribe_audio_data_async_func', transcribe):
+            self.handler.submit_frames([b'\x01\x00'], 16000, delivered.append, Mock())
+            self.handler.submit_frames([b'\x02\x00'], 16000, delivered.append, Mock())
+
+            assert self.handler.wait_for_processing(timeout=0.2) is False
+            assert delivered == []
+            first_release.set()
+
+            assert self.handler.wait_for_processing(timeout=5.0) is True
+            assert delivered == ['first', 'second']
+            self.audio_file_manager.save_audio_in_background.assert_called()
+
+    def test_cancel_aborts_in_flight_request(self):
+        """正常系: キャンセルすると送信中の通信ごと中断し、結果を通知しない"""
+        started = threading.Event()
+        on_complete = Mock()
+        on_error = Mock()
+
+        async def transcribe(audio, file_name, config, client):
+            started.set()
+            await asyncio.sleep(60)
+            return '届かない結果'
+
+        with patch.object(self.handler.backend_chain, 'transcribe_audio_data_async_func', transcribe):
+            self.handler.submit_frames([b'\x01\x00'], 16000, on_complete, on_error)
+            assert started.wait(5)
+
+            self.handler.cancel()
+
+            assert self.handler.wait_for_processing(timeout=5.0) is True
+            on_complete.assert_not_called()
+            on_error.assert_not_called()
+            assert self.handler.queue_metrics()['cancelled'] == 1
+
+    def test_job_timeout(self):
+        """異常系: 上限時間を過ぎたジョブは中断してエラーを通知する"""
+        self.handler.config._config['TRANSCRIPTION']['JOB_TIMEOUT_SECONDS'] = '0.1'
+        on_error = Mock()
+
+        async def transcribe(audio, file_name, config, client):
+            await asyncio.sleep(60)
+
+        with patch.object(self.handler.backend_chain, 'transcribe_audio_data_async_func', transcribe):
+            self.handler.submit_frames([b'\x01\x00'], 16000, Mock(), on_error)
+
+            assert self.handler.wait_for_processing(timeout=5.0) is True
+            on_error.assert_called_once_with('文字起こしがタイムアウトしました')
+
+    def test_failure_reports_error(self):
+        """異常系: 文字起こしに失敗した場合はエラーを通知する"""
+        on_error = Mock()
+
+        async def transcribe(audio, file_name, config, client):
+            return None
+
+        with patch.object(self.handler.backend_chain, 'transcribe_audio_data_async_func', transcribe):
+            self.handler.submit_frames([b'\x01\x00'], 16000, Mock(), on_error)
+
+            assert self.handler.wait_for_processing(timeout=5.0) is True
+            on_error.assert_called_once_with('音声ファイルの文字起こしに失敗しました')
+
+    def test_segments_run_in_thread(self):
+        """正常系: 区間文字起こしの残りはスレッドで実行して結果を通知する"""
+        delivered = []
+        caller = []
+
+        def transcribe_segments(pipeline, frames, sample_rate, on_complete, on_error, audio_path=None):
+            caller.append(threading.current_thread().name)
+            self.ui.schedule_callback(on_complete, '区間結果')
+
+        self.handler.transcribe_segments = transcribe_segments
+        self.handler.submit_segments(Mock(), [b'\x01\x00'], 16000, delivered.append, Mock())
+
+        assert self.handler.wait_for_processing(timeout=5.0) is True
+        assert delivered == ['区間結果']
+        assert caller and caller[0] != 'TranscriptionEventLoop'
+
+
+class TestTranscriptionHandlerAdaptiveTimeout:
+    """リクエストごとのタイムアウト設定のテストクラス"""
+
+    def test_disabled_by_default(self):
+        """正常系: 設定がなければSDKの既定のタイムアウトを使う"""
+        handler, *_ = _make_handler()
+
+        assert handler.backend_chain.timeouts is None
+        assert 'timeout_requests' not in handler.queue_metrics()
+
+    @patch('external_service.stt_backend.transcribe_audio_data')
+    def test_policy_is_passed(self, mock_transcribe_data):
+        """正常系: 有効時はタイムアウトの設定を付けてAPIを呼び、発生状況をメトリクスに含める"""
+        handler, *_ = _make_handler(config_dict={
+            'ELEVENLABS': {'ADAPTIVE_TIMEOUT': 'True', 'TIMEOUT_MIN_SECONDS': '5', 'HEDGE_ENABLED': 'True'},
+            'PATHS': {'TEMP_DIR': '/test/temp'}
+        })
+        mock_transcribe_data.return_value = '結果'
+
+        handler.transcribe_segment(b'\x00\x00', 0)
+
+        assert handler.backend_chain.timeouts is not None
+        assert handler.backend_chain.timeouts.min_seconds == 5.0
+        kwargs = mock_transcribe_data.call_args.kwargs
+        assert kwargs['timeouts'] is handler.backend_chain.timeouts
+        assert kwargs['hedging'] is handler.backend_chain.hedging
+        assert handler.queue_metrics()['timeout_read_fired'] == 0
+
+
+class TestTranscriptionHandlerOfflineFallback:
+    """ローカル音声認識への切り替えのテストクラス"""
+
+    CONFIG = {
+        'OFFLINE': {'ENABLED': 'True'},
+        'ELEVENLABS': {'IN_MEMORY_UPLOAD': 'True'},
+        'PATHS': {'TEMP_DIR': '/test/temp'},
+    }
+
+    def _make(self, async_client=None):
+        config_dict = dict(self.CONFIG)
+        if async_client is not None:
+            config_dict['TRANSCRIPTION'] = {'ENGINE': 'asyncio'}
+        with patch('service.backend_chain.is_local_backend_available', return_value=True), \
+                patch('service.backend_chain.LocalWhisperBackend') as mock_local:
+            offline = mock_local.from_config.return_value
+            offline.metrics.return_value = {'last_rtf': 0.5}
+            offline.transcribe_data.return_value = 'ローカル'
+            handler, *_, ui = _make_handler(config_dict=config_dict, async_client=async_client)
+        ui.schedule_callback.side_effect = lambda callback, *args: callback(*args)
+        self.cache = Mock()
+        self.cache.get.return_value = None
+        handler.cache = self.cache
+        return handler, offline
+
+    def test_disabled_by_default(self):
+        """正常系: 設定がなければローカル音声認識を使わない"""
+        handler, *_ = _make_handler()
+
+        assert handler.backend_chain.offline_backend is None
+
+    @patch('service.backend_chain.is_local_backend_available', return_value=False)
+    def test_unavailable_runtime(self, _mock_available, caplog):
+        """異常系: faster-whisperがなければ警告して従来どおりAPIのみ使う"""
+        handler, *_ = _make_handler(config_dict=self.CONFIG)
+
+        assert handler.backend_chain.offline_backend is None
+        assert 'faster-whisperが見つからないため' in caplog.text
+
+    def test_loads_model_in_background(self):
+        """正常系: 有効時は起動時に別スレッドでモデルの読み込みを始め、メトリクスに含める"""
+        handler, offline = self._make()
+
+        offline.load_in_background.assert_called_once()
+        assert isinstance(handler.backend, FallbackBackend)
+        assert handler.backend.fallback is offline
+        assert handler.queue_metrics()['offline_last_rtf'] == 0.5
+
+    def test_network_error_uses_local_and_skips_cache(self):
+        """正常系: 通信障害ならローカル音声認識の結果を返し、キャッシュには保存しない"""
+        handler, _ = self._make()
+        assert isinstance(handler.backend, FallbackBackend)
+        on_complete = Mock()
+        on_error = Mock()
+
+        with patch.object(handler.backend.primary, 'transcribe_data', side_effect=TranscriptionNetworkError('offline')):
+            handler.transcribe_frames([b'\x01\x00' * 800], 16000, on_complete, on_error, '/test/temp/a.wav')
+
+        on_complete.assert_called_once_with('ローカル')
+        on_error.assert_not_called()
+        self.cache.put.assert_not_called()
+
+    def test_local_failure_defers_to_retry_queue(self):
+        """異常系: ローカル音声認識でも失敗した場合は通信障害として再送信キューに保存する"""
+        handler, offline = self._make()
+        assert isinstance(handler.backend, FallbackBackend)
+        offline.transcribe_data.side_effect = RuntimeError('model not loaded')
+        handler.retry_queue = Mock()
+        on_error = Mock()
+
+        with patch.object(handler.backend.primary, 'transcribe_data', side_effect=TranscriptionNetworkError('offline')):
+            handler.transcribe_frames([b'\x01\x00' * 800], 16000, Mock(), on_error, '/test/temp/a.wav')
+
+        handler.retry_queue.enqueue_audio.assert_called_once()
+        assert '通信エラーのため文字起こしを保留しました' in on_error.call_args[0][0]
+
+    def test_asyncio_network_error_uses_local(self):
+        """正常系: asyncio方式でも通信障害ならローカル音声認識で文字起こしする"""
+        handler, offline = self._make(async_client=Mock())
+        failing = Mock(side_effect=TranscriptionNetworkError('offline'))
+        on_complete = Mock()
+        engine = handler.async_engine
+        assert engine is not None
+        try:
+            with patch.object(handler.backend_chain, 'transcribe_audio_data_async_func', failing):
+                asyncio.run(handler.transcribe_frames_async(
+                    [b'\x01\x00' * 800], 16000, on_complete, Mock(), '/test/temp/a.wav'
+                ))
+        finally:
+            engine.close()
+
+        on_complete.assert_called_once_with('ローカル')
+        offline.transcribe_data.assert_called_once()
+        self.cache.put.assert_not_called()
+
+    def test_asyncio_local_failure_defers_to_retry_queue(self):
+        """異常系: asyncio方式でもローカル音声認識で失敗した場合は再送信キューに保存する"""
+        handler, offline = self._make(async_client=Mock())
+        offline.transcribe_data.side_effect = RuntimeError('model not loaded')
+        handler.retry_queue = Mock()
+        failing = Mock(side_effect=TranscriptionNetworkError('offline'))
+        engine = handler.async_engine
+        assert engine is not None
+        try:
+            with patch.object(handler.backend_chain, 'transcribe_audio_data_async_func', failing):
+                asyncio.run(handler.transcribe_frames_async(
+                    [b'\x01\x00' * 800], 16000, Mock(), Mock(), '/test/temp/a.wav'
+                ))
+        finally:
+            engine.close()
+
+        handler.retry_queue.enqueue_audio.assert_called_once()
+
+
+class TestTranscriptionHandlerCircuitBreaker:
+    """回路遮断のテストクラス"""
+
+    CONFIG = {
+        'ELEVENLABS': {'CIRCUIT_BREAKER': 'True', 'BREAKER_FAILURE_THRESHOLD': '1', 'BREAKER_RESET_SECONDS': '60'},
+        'PATHS': {'TEMP_DIR': '/test/temp'},
+    }
+
+    def test_disabled_by_default(self):
+        """正常系: 設定がなければ回路遮断を使わず、ステータス表示にも添えない"""
+        handler, *_ = _make_handler()
+
+        assert handler.backend_chain.circuit_breaker is None
+        assert handler.api_status() is None
+
+    @patch('external_service.stt_backend.transcribe_audio_data')
+    def test_open_circuit_fails_fast(self, mock_transcribe_data):
+        """正常系: 通信障害が続いた後は送信せずに失敗し、状態をメトリクスと表示に反映する"""
+        handler, *_ = _make_handler(config_dict=self.CONFIG)
+        mock_transcribe_data.side_effect = TranscriptionNetworkError('timeout')
+        listener = Mock()
+        handler.add_api_status_listener(listener)
+
+        with pytest.raises(TranscriptionNetworkError):
+            handler.transcribe_segment(b'\x00\x00', 0)
+        with pytest.raises(CircuitOpenError):
+            handler.transcribe_segment(b'\x00\x00', 1)
+
+        assert mock_transcribe_data.call_count == 1
+        listener.assert_called_once_with()
+        assert handler.queue_metrics()['breaker_open'] == 1.0
+        assert handler.api_status() == 'API停止中'
+        handler.stop_retry_queue()
+
+    def test_asyncio_send_records_failures(self):
+        """正常系: asyncio方式の送信でも通信障害を記録し、停止中は送信しない"""
+        handler, *_ = _make_handler(
+            config_dict={**self.CONFIG, 'TRANSCRIPTION': {'ENGINE': 'asyncio'}}, async_client=Mock()
+        )
+        failing = Mock(side_effect=TranscriptionNetworkError('timeout'))
+        engine = handler.async_engine
+        assert engine is not None
+        try:
+            with patch.object(handler.backend_chain, 'transcribe_audio_data_async_func', failing):
+                with pytest.raises(TranscriptionNetworkError):
+                    asyncio.run(handler.backend_chain.send_async(b'audio', 'audio.wav'))
+                with pytest.raises(CircuitOpenError):
+                    asyncio.run(handler.backend_chain.send_async(b'audio', 'audio.wav'))
+        finally:
+            engine.close()
+            handler.stop_retry_queue()
+
+        failing.assert_called_once()
+
+    def test_half_open_status(self):
+        """正常系: 接続を確認できた後は再開を確認中と表示する"""
+        handler, *_ = _make_handler(config_dict=self.CONFIG)
+        assert handler.backend_chain.circuit_breaker is not None
+        handler.backend_chain.circuit_breaker._set_state(CircuitBreaker.HALF_OPEN)
+
+        assert handler.api_status() == 'API接続を確認中'
@@ -0,0 +1,136 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from service.transcription_queue import CompletionSequencer, TranscriptionJobQueue
+
+
+class TestCompletionSequencer:
+    """CompletionSequencerのテストクラス"""
+
+    def test_head_delivery_runs_immediately(self):
+        """正常系: 先頭のジョブの通知は完了を待たずに実行する"""
+        sequencer = CompletionSequencer()
+        callback = Mock()
+
+        sequencer.deliver(0, callback, 'text')
+
+        callback.assert_called_once_with('text')
+
+    def test_out_of_order_results_are_held(self):
+        """正常系: 後のジョブの結果は先行ジョブの完了まで保留する"""
+        sequencer = CompletionSequencer()
+        delivered = []
+
+        sequencer.deliver(1, delivered.append, 'second')
+        sequencer.finish(1)
+        assert delivered == []
+        assert sequencer.held_count == 1
+
+        sequencer.deliver(0, delivered.append, 'first')
+        assert delivered == ['first']
+        sequencer.finish(0)
+
+        assert delivered == ['first', 'second']
+        assert sequencer.held_count == 0
+
+    def test_finish_without_delivery(self):
+        """正常系: 通知のないジョブが完了しても後続へ進む"""
+        sequencer = CompletionSequencer()
+        callback = Mock()
+
+        sequencer.deliver(1, callback, 'text')
+        sequencer.finish(0)
+
+        callback.assert_called_once_with('text')
+
+    def test_callback_error_is_logged(self, caplog):
+        """異常系: 通知中の例外は記録され、後続の通知は続行する"""
+        sequencer = CompletionSequencer()
+        callback = Mock()
+
+        sequencer.deliver(1, callback, 'text')
+        sequencer.deliver(0, Mock(side_effect=ValueError('boom')))
+        sequencer.finish(0)
+
+        callback.assert_called_once_with('text')
+        assert "文字起こし結果の通知中にエラー: boom" in caplog.text
+
+
+class TestTranscriptionJobQueue:
+    """TranscriptionJobQueueのテストクラス"""
+
+    def test_jobs_run_concurrently(self):
+        """正常系: ワーカー数までのジョブを並行して処理する"""
+        job_queue = TranscriptionJobQueue(workers=2, max_pending=4)
+        barrier = threading.Barrier(2, timeout=5)
+
+        job_queue.submit(lambda sequence: barrier.wait())
+        job_queue.submit(lambda sequence: barrier.wait())
+
+        assert job_queue.join(timeout=5) is True
+        assert job_queue.metrics()['completed'] == 2
+
+    def test_sequence_numbers(self):
+        """正常系: 受付番号を順に割り当ててジョブへ渡す"""
+        job_queue = TranscriptionJobQueue(workers=1, max_pending=4)
+        received = []
+
+        assert job_queue.submit(received.append) == 0
+        assert job_queue.submit(received.append) == 1
+        job_queue.join(timeout=5)
+
+        assert received == [0, 1]
+
+    def test_max_pending(self):
+        """異常系: 処理中を含めて上限を超えるとRuntimeError"""
+        job_queue = TranscriptionJobQueue(workers=1, max_pending=2)
+        release = threading.Event()
+        job_queue.submit(lambda sequence: release.wait(5))
+        job_queue.submit(lambda sequence: release.wait(5))
+
+        assert job_queue.is_full() is True
+        with pytest.raises(RuntimeError, match='文字起こし待ちが上限に達しています'):
+            job_queue.submit(lambda sequence: None)
+
+        release.set()
+        assert job_queue.join(timeout=5) is True
+        assert job_queue.pending_count == 0
+
+    def test_metrics_wait_time(self):
+        """正常系: 待機中の件数と待ち時間を記録する"""
+        job_queue = TranscriptionJobQueue(workers=1, max_pending=4)
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking(sequence):
+            started.set()
+            release.wait(5)
+
+        job_queue.submit(blocking)
+        job_queue.submit(lambda sequence: None)
+        started.wait(5)
+
+        metrics = job_queue.metrics()
+        assert metrics['in_flight'] == 1
+        assert metrics['queue_depth'] == 1
+
+        threading.Timer(0.05, release.set).start()
+        job_queue.join(timeout=5)
+
+        metrics = job_queue.metrics()
+        assert metrics['completed'] == 2
+        assert metrics['max_wait_ms'] >= 40
+
+    def test_job_error_is_logged(self, caplog):
+        """異常系: ジョブの例外は記録され、ワーカーは処理を続ける"""
+        job_queue = TranscriptionJobQueue(workers=1, max_pending=4)
+        done = Mock()
+
+        job_queue.submit(Mock(side_effect=ValueError('boom')))
+        job_queue.submit(done)
+        job_queue.join(timeout=5)
+
+        done.assert_called_once_with(1)
+        assert "文字起こしジョブ#1 でエラー: boom" in caplog.text
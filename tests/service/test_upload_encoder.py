@@ -0,0 +1,79 @@
+from unittest.mock import Mock, patch
+
+from service.audio_encoder import EncodedAudio
+from service.upload_encoder import UploadEncoder
+from service.voice_activity import TrimResult
+from tests.conftest import dict_to_app_config
+
+
+def _make_encoder(config_dict: dict | None = None) -> UploadEncoder:
+    return UploadEncoder(dict_to_app_config(config_dict or {}))
+
+
+def _flac_encoder() -> Mock:
+    return Mock(return_value=EncodedAudio(b'encoded', '.flac', 7))
+
+
+class TestUploadEncoder:
+    """UploadEncoderのテストクラス"""
+
+    def test_upload_from_memory_for_compressed_format(self):
+        """正常系: WAV以外の送信形式ではファイルを介さずメモリから送信する"""
+        assert UploadEncoder(dict_to_app_config({'ELEVENLABS': {'UPLOAD_FORMAT': 'flac'}})).upload_from_memory
+        assert not UploadEncoder(dict_to_app_config({})).upload_from_memory
+
+    def test_encode_uses_saved_file_stem(self):
+        """正常系: 保存済みのファイル名の拡張子を送信形式に変えて送る"""
+        encoder = _make_encoder()
+        encode_audio = _flac_encoder()
+
+        with patch.object(encoder, 'encode_audio', encode_audio):
+            data, name = encoder.encode([b'\x00\x01', b'\x02\x03'], 16000, '/tmp/voice_20240101.wav')
+
+        assert (data, name) == (b'encoded', 'voice_20240101.flac')
+        encode_audio.assert_called_once_with(b'\x00\x01\x02\x03', 16000, 1)
+
+    def test_encode_without_saved_file(self):
+        """境界値: 保存していない録音はaudioの名前で送る"""
+        encoder = _make_encoder()
+
+        with patch.object(encoder, 'encode_audio', _flac_encoder()):
+            _, name = encoder.encode([b'\x00\x01'], 16000)
+
+        assert name == 'audio.flac'
+
+    def test_encode_segment_is_numbered(self):
+        """正常系: 区間は1始まりの連番のファイル名で送る"""
+        encoder = _make_encoder()
+
+        with patch.object(encoder, 'encode_audio', _flac_encoder()):
+            _, name = encoder.encode_segment(b'\x00\x01', 0)
+
+        assert name == 'segment_001.flac'
+
+
+class TestUploadEncoderTrimSilence:
+    """UploadEncoder.trim_silence()のテストクラス"""
+
+    def test_disabled_returns_frames(self):
+        """正常系: 無音除去が無効なら録音をそのまま返す"""
+        frames = [b'\x00\x01']
+
+        assert _make_encoder().trim_silence(frames, 16000) is frames
+
+    @patch('service.upload_encoder.trim_silence', return_value=TrimResult(b'\x01\x00', 1000.0, 400.0))
+    def test_returns_trimmed_audio(self, mock_trim):
+        """正常系: 無音を除去した録音を1つにまとめて返し、結果を記録する"""
+        encoder = _make_encoder({'VAD': {'ENABLED': 'True'}})
+
+        assert encoder.trim_silence([b'\x00\x01', b'\x01\x00'], 16000) == [b'\x01\x00']
+        assert encoder.last_trim_result == mock_trim.return_value
+
+    @patch('service.upload_encoder.trim_silence', side_effect=ValueError('broken'))
+    def test_error_returns_frames(self, _mock_trim):
+        """異常系: 無音除去に失敗した場合は録音をそのまま返す"""
+        frames = [b'\x00\x01']
+        encoder = _make_encoder({'VAD': {'ENABLED': 'True'}})
+
+        assert encoder.trim_silence(frames, 16000) is frames
+        assert encoder.last_trim_result is None
@@ -0,0 +1,185 @@
+from typing import Any
+
+import numpy as np
+import pytest
+
+from service.voice_activity import (
+    StreamingEndpointDetector,
+    TrimResult,
+    detect_voiced_frames,
+    frame_energy_db,
+    trim_silence,
+)
+
+SAMPLE_RATE = 1000
+FRAME_MS = 10
+
+
+def _tone(ms: int, amplitude: int = 10000) -> np.ndarray:
+    t = np.arange(ms * SAMPLE_RATE // 1000)
+    return (amplitude * np.sin(2 * np.pi * 50 * t / SAMPLE_RATE)).astype('<i2')
+
+
+def _silence(ms: int) -> np.ndarray:
+    return np.zeros(ms * SAMPLE_RATE // 1000, dtype='<i2')
+
+
+def _trim(pcm: bytes, **overrides: Any) -> TrimResult:
+    options: dict[str, Any] = dict(
+        sample_rate=SAMPLE_RATE, channels=1, threshold_db=-40.0, frame_ms=FRAME_MS,
+        padding_ms=0, min_speech_ms=30, max_pause_ms=0
+    )
+    options.update(overrides)
+    return trim_silence(pcm, **options)
+
+
+class TestFrameEnergy:
+    """frame_energy_dbのテストクラス"""
+
+    def test_silence_and_tone(self):
+        """正常系: 無音は低く、音声は高いエネルギーになる"""
+        samples = np.concatenate([_silence(10), _tone(10)])
+        energy = frame_energy_db(samples, 10)
+
+        assert energy.shape == (2,)
+        assert energy[0] < -100
+        assert energy[1] > -20
+
+    def test_shorter_than_frame(self):
+        """境界値: フレーム長未満の入力"""
+        assert frame_energy_db(_silence(5), 10).size == 0
+
+
+class TestDetectVoicedFrames:
+    """detect_voiced_framesのテストクラス"""
+
+    def test_short_click_is_ignored(self):
+        """正常系: 最小発話長未満のクリック音は発話とみなさない"""
+        energy = np.array([-90, -10, -90, -10, -10, -10, -90], dtype=float)
+        voiced = detect_voiced_frames(energy, -40, 3, 0)
+
+        assert voiced.tolist() == [False, False, False, True, True, True, False]
+
+    def test_padding_extends_voiced_region(self):
+        """正常系: 発話区間の前後に余白を付ける"""
+        energy = np.array([-90, -90, -10, -90, -90], dtype=float)
+        voiced = detect_voiced_frames(energy, -40, 1, 1)
+
+        assert voiced.tolist() == [False, True, True, True, False]
+
+
+class TestTrimSilence:
+    """trim_silenceのテストクラス"""
+
+    def test_trims_head_and_tail(self):
+        """正常系: 先頭と末尾の無音を除去する"""
+        pcm = np.concatenate([_silence(200), _tone(100), _silence(300)]).tobytes()
+
+        result = _trim(pcm)
+
+        assert len(result.audio) == 100 * 2
+        assert result.original_ms == pytest.approx(600)
+        assert result.removed_ms == pytest.approx(500)
+
+    def test_trim_without_copy(self):
+        """正常系: 短縮しない場合は元データのビューを返す"""
+        pcm = np.concatenate([_silence(100), _tone(100)]).tobytes()
+
+        result = _trim(pcm)
+
+        assert isinstance(result.audio, memoryview)
+        assert bytes(result.audio) == pcm[200:]
+
+    def test_click_at_start_is_trimmed(self):
+        """正常系: キー操作のクリック音も先頭の無音として除去する"""
+        pcm = np.concatenate([_tone(10), _silence(200), _tone(100)]).tobytes()
+
+        result = _trim(pcm)
+
+        assert len(result.audio) == 100 * 2
+
+    def test_padding_is_kept(self):
+        """正常系: 発話前後の余白を残す"""
+        pcm = np.concatenate([_silence(200), _tone(100), _silence(200)]).tobytes()
+
+        result = _trim(pcm, padding_ms=50)
+
+        assert len(result.audio) == 200 * 2
+
+    def test_collapse_long_pause(self):
+        """正常系: 発話間の長い無音を短縮する"""
+        pcm = np.concatenate([_tone(100), _silence(500), _tone(100)]).tobytes()
+
+        result = _trim(pcm, max_pause_ms=100)
+
+        assert len(result.audio) == 300 * 2
+        assert result.removed_ms == pytest.approx(400)
+
+    def test_short_pause_is_kept(self):
+        """境界値: 上限以下の無音は短縮しない"""
+        pcm = np.concatenate([_tone(100), _silence(80), _tone(100)]).tobytes()
+
+        result = _trim(pcm, max_pause_ms=100)
+
+        assert len(result.audio) == len(pcm)
+
+    def test_all_silence_returns_original(self):
+        """異常系: 発話がない場合は元の音声を返す"""
+        pcm = _silence(300).tobytes()
+
+        result = _trim(pcm)
+
+        assert result.audio is pcm
+        assert result.removed_ms == 0.0
+
+    def test_stereo(self):
+        """正常系: ステレオ音声"""
+        mono = np.concatenate([_silence(100), _tone(100)])
+        pcm = np.repeat(mono, 2).tobytes()
+
+        result = _trim(pcm, channels=2)
+
+        assert len(result.audio) == 100 * 2 * 2
+
+
+class TestStreamingEndpointDetector:
+    """StreamingEndpointDetectorのテストクラス"""
+
+    def setup_method(self):
+        self.detector = StreamingEndpointDetector(
+            SAMPLE_RATE, 1, threshold_db=-40.0, min_speech_ms=30, silence_ms=50
+        )
+
+    def _feed(self, pcm: np.ndarray, chunk_ms: int = 10) -> list[bool]:
+        step = chunk_ms * SAMPLE_RATE // 1000
+        data = pcm.tobytes()
+        return [self.detector.feed(data[i * 2:(i + step) * 2]) for i in range(0, len(pcm), step)]
+
+    def test_triggers_after_trailing_silence(self):
+        """正常系: 発話後に規定の無音が続くと一度だけTrueを返す"""
+        results = self._feed(np.concatenate([_tone(100), _silence(100)]))
+
+        assert results.count(True) == 1
+        assert results.index(True) == 14
+        assert self.detector.triggered is True
+
+    def test_silence_only_does_not_trigger(self):
+        """正常系: 発話前の無音では停止しない"""
+        assert not any(self._feed(_silence(500)))
+
+    def test_short_click_does_not_arm(self):
+        """正常系: 最小発話長に満たない音の後の無音では停止しない"""
+        assert not any(self._feed(np.concatenate([_tone(20), _silence(200)])))
+
+    def test_speech_resets_trailing_silence(self):
+        """正常系: 無音の途中で発話が再開すると計測をやり直す"""
+        pcm = np.concatenate([_tone(50), _silence(40), _tone(20), _silence(40)])
+        assert not any(self._feed(pcm))
+
+    def test_reset(self):
+        """正常系: resetで再び検出できる"""
+        self._feed(np.concatenate([_tone(100), _silence(100)]))
+        self.detector.reset()
+
+        assert self.detector.triggered is False
+        assert any(self._feed(np.concatenate([_tone(100), _silence(100)])))
@@ -0,0 +1,121 @@
+import io
+import struct
+import wave
+from unittest.mock import patch
+
+from service.wav_io import WAV_HEADER_SIZE, StreamingWavWriter, WavPayload, build_wav_header
+
+
+def _read_wav(path) -> tuple[int, int, bytes]:
+    with wave.open(str(path), 'rb') as wf:
+        return wf.getframerate(), wf.getnchannels(), wf.readframes(wf.getnframes())
+
+
+class TestBuildWavHeader:
+    """build_wav_headerのテストクラス"""
+
+    def test_header_matches_wave_module(self, tmp_path):
+        """正常系: waveモジュールが出力するヘッダーと一致する"""
+        path = tmp_path / 'expected.wav'
+        with wave.open(str(path), 'wb') as wf:
+            wf.setnchannels(2)
+            wf.setsampwidth(2)
+            wf.setframerate(16000)
+            wf.writeframes(b'\x01\x02' * 8)
+
+        assert build_wav_header(16, 16000, 2, 2) == path.read_bytes()[:WAV_HEADER_SIZE]
+
+
+class TestStreamingWavWriter:
+    """StreamingWavWriterのテストクラス"""
+
+    def test_chunks_are_written(self, tmp_path):
+        """正常系: 書き込んだチャンクが再生可能なWAVとして保存される"""
+        path = tmp_path / 'stream.wav'
+        writer = StreamingWavWriter(str(path), 16000, 1, 2)
+        writer.write(b'\x01\x00\x02\x00')
+        writer.write(bytearray(b'\x03\x00'))
+        writer.write(memoryview(b'\x04\x00'))
+
+        assert writer.close() == str(path)
+        assert writer.bytes_written == 8
+        assert _read_wav(path) == (16000, 1, b'\x01\x00\x02\x00\x03\x00\x04\x00')
+
+    def test_header_is_patched_while_recording(self, tmp_path):
+        """正常系: 録音中も定期的にヘッダーのサイズが更新される"""
+        path = tmp_path / 'stream.wav'
+        writer = StreamingWavWriter(str(path), 16000, 1, 2, header_interval=0.0)
+        writer.write(b'\x01\x00' * 4)
+        writer.write(b'\x02\x00' * 4)
+
+        writer._queue.put(None)
+        writer._thread.join()
+        data_size = struct.unpack('<I', path.read_bytes()[40:44])[0]
+        assert data_size == 16
+
+        writer._closed = True
+        writer._file.close()
+
+    def test_close_is_idempotent_and_ignores_late_chunks(self, tmp_path):
+        """正常系: close後の書き込みは無視され、再度のcloseでも同じパスを返す"""
+        path = tmp_path / 'stream.wav'
+        writer = StreamingWavWriter(str(path), 16000, 1, 2)
+        writer.write(b'\x01\x00')
+        writer.close()
+        writer.write(b'\x02\x00')
+
+        assert writer.close() == str(path)
+        assert _read_wav(path)[2] == b'\x01\x00'
+
+    def test_write_error_returns_none(self, tmp_path, caplog):
+        """異常系: 書き込みに失敗した場合はNoneを返す"""
+        writer = StreamingWavWriter(str(tmp_path / 'stream.wav'), 16000, 1, 2)
+
+        with patch.object(writer._file, 'write', side_effect=OSError('disk full')):
+            writer.write(b'\x01\x00')
+            assert writer.close() is None
+
+        assert "音声ファイルの書き込み中にエラーが発生しました: disk full" in caplog.text
+
+
+class TestWavPayload:
+    """WavPayloadのテストクラス"""
+
+    def setup_method(self):
+        self.pcm = bytes(range(200))
+        self.payload = WavPayload(memoryview(self.pcm), 16000, 1, 2)
+
+    def test_read_all(self):
+        """正常系: ヘッダーとPCMを連結したWAVとして読み出せる"""
+        data = self.payload.read()
+
+        assert len(data) == len(self.payload) == WAV_HEADER_SIZE + 200
+        with wave.open(io.BytesIO(data), 'rb') as wf:
+            assert wf.getframerate() == 16000
+            assert wf.readframes(wf.getnframes()) == self.pcm
+
+    def test_read_in_chunks_across_header(self):
+        """正常系: ヘッダーとデータの境界をまたいで分割読み込みできる"""
+        chunks = []
+        while chunk := self.payload.read(30):
+            chunks.append(chunk)
+
+        assert b''.join(chunks) == build_wav_header(200, 16000, 1, 2) + self.pcm
+
+    def test_seek_and_reread(self):
+        """正常系: 先頭に戻して再送信できる"""
+        first = self.payload.read()
+
+        assert self.payload.seek(0, io.SEEK_END) == len(self.payload)
+        self.payload.seek(0)
+        assert self.payload.read() == first
+        assert self.payload.tell() == len(self.payload)
+
+    def test_clone_reads_independently(self):
+        """正常系: 複製したストリームは元の読み出し位置に影響されない"""
+        self.payload.read(50)
+        clone = self.payload.clone()
+
+        assert clone.tell() == 0
+        assert clone.read() == build_wav_header(200, 16000, 1, 2) + self.pcm
+        assert self.payload.tell() == 50
@@ -1,6 +1,11 @@
+import configparser
+import os
 from unittest.mock import patch
 
 from tests.conftest import dict_to_app_config
+from utils.app_config import AppConfig
+
+SHIPPED_CONFIG = os.path.join(os.path.dirname(__file__), '..', '..', 'utils', 'config.ini')
 
 
 class TestAppConfigAudio:
@@ -20,6 +25,25 @@ class TestAppConfigAudio:
         assert config.audio_channels == 2
         assert config.audio_chunk == 2048
 
+    def test_audio_capture_mode(self):
+        """正常系: 録音方式のデフォルト値とカスタム値"""
+        assert dict_to_app_config({}).audio_capture_mode == 'blocking'
+        config = dict_to_app_config({'AUDIO': {'CAPTURE_MODE': 'callback'}})
+        assert config.audio_capture_mode == 'callback'
+
+    def test_audio_warm_engine_flags(self):
+        """正常系: 音声エンジン保持設定"""
+        assert dict_to_app_config({}).keep_audio_engine_warm is False
+        assert dict_to_app_config({}).keep_audio_stream_warm is False
+        config = dict_to_app_config({'AUDIO': {'KEEP_ENGINE_WARM': 'True', 'KEEP_STREAM_WARM': 'True'}})
+        assert config.keep_audio_engine_warm is True
+        assert config.keep_audio_stream_warm is True
+
+    def test_preroll_seconds(self):
+        """正常系: プリロール秒数"""
+        assert dict_to_app_config({}).preroll_seconds == 0.0
+        assert dict_to_app_config({'AUDIO': {'PREROLL_SECONDS': '1.5'}}).preroll_seconds == 1.5
+
 
 class TestAppConfigPaths:
     """パス設定プロパティのテストクラス"""
@@ -81,6 +105,24 @@ class TestAppConfigFormatting:
         config.use_punctuation = True
         assert config.use_punctuation is True
 
+    def test_normalize_width_default(self):
+        """正常系: デフォルトでは全角英数字をそのまま残す"""
+        assert dict_to_app_config({}).normalize_width is False
+
+    def test_normalize_width_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'FORMATTING': {'NORMALIZE_WIDTH': 'True'}})
+        assert config.normalize_width is True
+
+    def test_normalize_numerals_default(self):
+        """正常系: 付属の辞書に数字ごとのルールがないため、デフォルトで漢数字を変換する"""
+        assert dict_to_app_config({}).normalize_numerals is True
+
+    def test_normalize_numerals_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'FORMATTING': {'NORMALIZE_NUMERALS': 'False'}})
+        assert config.normalize_numerals is False
+
     def test_use_comma_setter(self):
         """正常系: use_commaのsetter"""
         config = dict_to_app_config({'FORMATTING': {'USE_COMMA': 'False'}})
@@ -88,6 +130,34 @@ class TestAppConfigFormatting:
         assert config.use_comma is True
 
 
+class TestAppConfigClipboard:
+    """クリップボード設定プロパティのテストクラス"""
+
+    def test_replacements_reload_seconds_default(self):
+        """正常系: デフォルトでは置換ルールファイルを監視しない"""
+        assert dict_to_app_config({}).replacements_reload_seconds == 0.0
+
+    def test_replacements_reload_seconds_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'CLIPBOARD': {'REPLACEMENTS_RELOAD_SECONDS': '2'}})
+        assert config.replacements_reload_seconds == 2.0
+
+    def test_replacements_cache_defaults(self):
+        """正常系: キャッシュは無効で、一時フォルダと同じ階層に保存する"""
+        config = dict_to_app_config({'PATHS': {'TEMP_DIR': os.path.join('base', 'temp')}})
+        assert config.replacements_cache is False
+        assert config.replacements_cache_file == os.path.join('base', 'replacements_cache.json')
+
+    def test_replacements_cache_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({
+            'CLIPBOARD': {'REPLACEMENTS_CACHE': 'True'},
+            'PATHS': {'REPLACEMENTS_CACHE_FILE': 'cache.json'}
+        })
+        assert config.replacements_cache is True
+        assert config.replacements_cache_file == 'cache.json'
+
+
 class TestAppConfigKeys:
     """キー設定プロパティのテストクラス"""
 
@@ -121,6 +191,32 @@ class TestAppConfigRecording:
         config = dict_to_app_config({'RECORDING': {'AUTO_STOP_TIMER': '120'}})
         assert config.auto_stop_timer == 120
 
+    def test_endpoint_defaults(self):
+        """正常系: 無音による自動停止はデフォルトで無効"""
+        config = dict_to_app_config({})
+        assert config.endpoint_silence_ms == 0
+        assert config.endpoint_min_speech_ms == 300
+
+    def test_endpoint_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'RECORDING': {'ENDPOINT_SILENCE_MS': '800', 'ENDPOINT_MIN_SPEECH_MS': '200'}})
+        assert config.endpoint_silence_ms == 800
+        assert config.endpoint_min_speech_ms == 200
+
+    def test_segment_defaults(self):
+        """正常系: 区間文字起こしはデフォルトで無効"""
+        config = dict_to_app_config({})
+        assert config.segment_transcription is False
+        assert config.segment_silence_ms == 700
+        assert config.segment_min_ms == 4000
+        assert config.segment_max_workers == 3
+
+    def test_segment_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'RECORDING': {'SEGMENT_TRANSCRIPTION': 'True', 'SEGMENT_MAX_WORKERS': '5'}})
+        assert config.segment_transcription is True
+        assert config.segment_max_workers == 5
+
 
 class TestAppConfigElevenLabs:
     """ElevenLabs設定プロパティのテストクラス"""
@@ -139,6 +235,53 @@ class TestAppConfigElevenLabs:
         assert config.elevenlabs_language == 'eng'
         assert config.tag_audio_events is True
 
+    def test_in_memory_upload(self):
+        """正常系: メモリ上のWAV送信はデフォルトで無効"""
+        assert dict_to_app_config({}).in_memory_upload is False
+        assert dict_to_app_config({'ELEVENLABS': {'IN_MEMORY_UPLOAD': 'True'}}).in_memory_upload is True
+
+    def test_upload_format(self):
+        """正常系: 送信形式のデフォルトはWAV"""
+        assert dict_to_app_config({}).upload_format == 'wav'
+        assert dict_to_app_config({'ELEVENLABS': {'UPLOAD_FORMAT': 'flac'}}).upload_format == 'flac'
+
+    def test_hedge_defaults(self):
+        """正常系: 追加送信はデフォルトで無効"""
+        config = dict_to_app_config({})
+        assert config.hedge_enabled is False
+        assert config.hedge_percentile == 95.0
+        assert config.hedge_min_samples == 20
+        assert config.hedge_max_per_minute == 6
+        assert config.hedge_min_delay_seconds == 1.0
+
+    def test_hedge_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'ELEVENLABS': {
+            'HEDGE_ENABLED': 'True', 'HEDGE_PERCENTILE': '99', 'HEDGE_MIN_SAMPLES': '5',
+            'HEDGE_MAX_PER_MINUTE': '2', 'HEDGE_MIN_DELAY_SECONDS': '3.5'
+        }})
+        assert config.hedge_enabled is True
+        assert config.hedge_percentile == 99.0
+        assert config.hedge_min_samples == 5
+        assert config.hedge_max_per_minute == 2
+        assert config.hedge_min_delay_seconds == 3.5
+
+    def test_connection_defaults(self):
+        """正常系: 接続の事前確立と維持はデフォルトで無効"""
+        config = dict_to_app_config({})
+        assert config.warmup_on_record is False
+        assert config.keepalive_seconds == 0.0
+        assert config.keepalive_expiry_seconds == 60.0
+
+    def test_connection_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'ELEVENLABS': {
+            'WARMUP_ON_RECORD': 'True', 'KEEPALIVE_SECONDS': '30', 'KEEPALIVE_EXPIRY_SECONDS': '120'
+        }})
+        assert config.warmup_on_record is True
+        assert config.keepalive_seconds == 30.0
+        assert config.keepalive_expiry_seconds == 120.0
+
 
 class TestAppConfigRawConfig:
     """内部_configプロパティのテストクラス"""
@@ -149,3 +292,190 @@ class TestAppConfigRawConfig:
         config = dict_to_app_config({'AUDIO': {'SAMPLE_RATE': '16000'}})
         assert isinstance(config._config, configparser.ConfigParser)
         assert config._config['AUDIO']['SAMPLE_RATE'] == '16000'
+
+
+class TestAppConfigStreamToDisk:
+    """録音中のファイル書き込み設定のテストクラス"""
+
+    def test_stream_to_disk_default(self):
+        """正常系: デフォルトは無効"""
+        assert dict_to_app_config({}).stream_to_disk is False
+
+    def test_stream_to_disk_custom(self):
+        """正常系: カスタム値"""
+        assert dict_to_app_config({'AUDIO': {'STREAM_TO_DISK': 'True'}}).stream_to_disk is True
+
+
+class TestAppConfigTranscription:
+    """文字起こしジョブ設定のテストクラス"""
+
+    def test_transcription_defaults(self):
+        """正常系: デフォルト値"""
+        config = dict_to_app_config({})
+        assert config.transcription_workers == 2
+        assert config.max_pending_jobs == 4
+
+    def test_transcription_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'TRANSCRIPTION': {'WORKERS': '3', 'MAX_PENDING': '8'}})
+        assert config.transcription_workers == 3
+        assert config.max_pending_jobs == 8
+
+    def test_adaptive_timeout_defaults(self):
+        """正常系: リクエストごとのタイムアウトは無効で、従来の240秒を上限にする"""
+        config = dict_to_app_config({})
+        assert config.adaptive_timeout is False
+        assert config.timeout_min_seconds == 10.0
+        assert config.timeout_max_seconds == 240.0
+        assert config.timeout_margin == 3.0
+
+    def test_adaptive_timeout_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'ELEVENLABS': {
+            'ADAPTIVE_TIMEOUT': 'True', 'TIMEOUT_MIN_SECONDS': '5', 'TIMEOUT_MAX_SECONDS': '120', 'TIMEOUT_MARGIN': '2.5'
+        }})
+        assert config.adaptive_timeout is True
+        assert config.timeout_min_seconds == 5.0
+        assert config.timeout_max_seconds == 120.0
+        assert config.timeout_margin == 2.5
+
+    def test_elevenlabs_base_url(self):
+        """正常系: 既定は空でElevenLabsへ送信し、指定した場合は前後の空白を除く"""
+        assert dict_to_app_config({}).elevenlabs_base_url == ''
+        config = dict_to_app_config({'ELEVENLABS': {'BASE_URL': ' http://127.0.0.1:8765 '}})
+        assert config.elevenlabs_base_url == 'http://127.0.0.1:8765'
+
+    def test_circuit_breaker_defaults(self):
+        """正常系: 回路遮断は無効で、60秒以内に3回の通信障害で30秒間送信を止める"""
+        config = dict_to_app_config({})
+        assert config.circuit_breaker is False
+        assert config.breaker_failure_threshold == 3
+        assert config.breaker_window_seconds == 60.0
+        assert config.breaker_reset_seconds == 30.0
+
+    def test_circuit_breaker_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'ELEVENLABS': {
+            'CIRCUIT_BREAKER': 'True', 'BREAKER_FAILURE_THRESHOLD': '5',
+            'BREAKER_WINDOW_SECONDS': '120', 'BREAKER_RESET_SECONDS': '10'
+        }})
+        assert config.circuit_breaker is True
+        assert config.breaker_failure_threshold == 5
+        assert config.breaker_window_seconds == 120.0
+        assert config.breaker_reset_seconds == 10.0
+
+    def test_offline_defaults(self):
+        """正常系: ローカル音声認識は無効で、int8量子化のsmallモデルを使う"""
+        config = dict_to_app_config({})
+        assert config.offline_enabled is False
+        assert config.offline_model == 'small'
+        assert config.offline_compute_type == 'int8'
+        assert config.offline_cpu_threads == 0
+        assert config.offline_language == 'ja'
+
+    def test_offline_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'OFFLINE': {
+            'ENABLED': 'True', 'MODEL': 'base', 'COMPUTE_TYPE': 'int8_float32', 'CPU_THREADS': '4', 'LANGUAGE': 'en'
+        }})
+        assert config.offline_enabled is True
+        assert config.offline_model == 'base'
+        assert config.offline_compute_type == 'int8_float32'
+        assert config.offline_cpu_threads == 4
+        assert config.offline_language == 'en'
+
+    def test_engine_defaults(self):
+        """正常系: 既定はワーカースレッド方式で、ジョブの上限時間は300秒"""
+        config = dict_to_app_config({})
+        assert config.transcription_engine == 'threads'
+        assert config.job_timeout_seconds == 300.0
+
+    def test_engine_custom(self):
+        """正常系: 実行方式は大文字小文字と前後の空白を無視する"""
+        config = dict_to_app_config({'TRANSCRIPTION': {'ENGINE': ' AsyncIO ', 'JOB_TIMEOUT_SECONDS': '0'}})
+        assert config.transcription_engine == 'asyncio'
+        assert config.job_timeout_seconds == 0.0
+
+    def test_cache_defaults(self):
+        """正常系: キャッシュは無効で、一時フォルダと同じ階層に保存する"""
+        config = dict_to_app_config({'PATHS': {'TEMP_DIR': os.path.join('base', 'temp')}})
+        assert config.cache_enabled is False
+        assert config.cache_max_entries == 1000
+        assert config.cache_max_mb == 20
+        assert config.transcription_cache_dir == os.path.join('base', 'transcription_cache')
+
+    def test_cache_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({
+            'TRANSCRIPTION': {'CACHE_ENABLED': 'True', 'CACHE_MAX_ENTRIES': '50', 'CACHE_MAX_MB': '5'},
+            'PATHS': {'TRANSCRIPTION_CACHE_DIR': 'cache_dir'}
+        })
+        assert config.cache_enabled is True
+        assert config.cache_max_entries == 50
+        assert config.cache_max_mb == 5
+        assert config.transcription_cache_dir == 'cache_dir'
+
+    def test_retry_defaults(self):
+        """正常系: 再送信は無効で、一時フォルダと同じ階層に保存する"""
+        config = dict_to_app_config({'PATHS': {'TEMP_DIR': os.path.join('base', 'temp')}})
+        assert config.retry_enabled is False
+        assert config.retry_base_seconds == 5.0
+        assert config.retry_max_seconds == 300.0
+        assert config.retry_max_attempts == 50
+        assert config.retry_dir == os.path.join('base', 'retry')
+
+    def test_retry_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({
+            'TRANSCRIPTION': {
+                'RETRY_ENABLED': 'True', 'RETRY_BASE_SECONDS': '2',
+                'RETRY_MAX_SECONDS': '60', 'RETRY_MAX_ATTEMPTS': '10'
+            },
+            'PATHS': {'RETRY_DIR': 'retry_dir'}
+        })
+        assert config.retry_enabled is True
+        assert config.retry_base_seconds == 2.0
+        assert config.retry_max_seconds == 60.0
+        assert config.retry_max_attempts == 10
+        assert config.retry_dir == 'retry_dir'
+
+
+class TestAppConfigVad:
+    """無音除去設定プロパティのテストクラス"""
+
+    def test_vad_defaults(self):
+        """正常系: デフォルト値"""
+        config = dict_to_app_config({})
+        assert config.vad_enabled is False
+        assert config.vad_threshold_db == -45.0
+        assert config.vad_frame_ms == 20
+        assert config.vad_padding_ms == 300
+        assert config.vad_min_speech_ms == 60
+        assert config.vad_max_pause_ms == 0
+
+    def test_vad_custom(self):
+        """正常系: カスタム値"""
+        config = dict_to_app_config({'VAD': {'ENABLED': 'True', 'THRESHOLD_DB': '-30.5', 'MAX_PAUSE_MS': '800'}})
+        assert config.vad_enabled is True
+        assert config.vad_threshold_db == -30.5
+        assert config.vad_max_pause_ms == 800
+
+
+class TestAppConfigShipped:
+    """同梱の設定ファイルのテストクラス"""
+
+    def test_optional_features_match_defaults(self):
+        """正常系: 同梱の設定では追加機能を有効にせず、設定がない場合の既定値と揃える"""
+        parser = configparser.ConfigParser()
+        parser.read(SHIPPED_CONFIG, encoding='utf-8')
+        shipped = AppConfig(parser)
+        defaults = dict_to_app_config({})
+        for name in (
+                'audio_capture_mode', 'keep_audio_engine_warm', 'keep_audio_stream_warm', 'preroll_seconds',
+                'stream_to_disk', 'replacements_reload_seconds', 'replacements_cache', 'in_memory_upload',
+                'upload_format', 'circuit_breaker', 'hedge_enabled', 'adaptive_timeout', 'warmup_on_record',
+                'keepalive_seconds', 'transcription_engine', 'cache_enabled', 'retry_enabled', 'offline_enabled',
+                'normalize_width', 'normalize_numerals', 'endpoint_silence_ms', 'segment_transcription',
+                'vad_enabled'
+        ):
+            assert getattr(shipped, name) == getattr(defaults, name), name
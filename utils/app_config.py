@@ -29,6 +29,31 @@ class AppConfig:
     def audio_chunk(self) -> int:
         return get_config_value(self._config, 'AUDIO', 'CHUNK', 1024)
 
+    @property
+    def audio_capture_mode(self) -> str:
+        """録音方式を返す。blocking: 読み取りループ / callback: ストリームコールバック"""
+        return get_config_value(self._config, 'AUDIO', 'CAPTURE_MODE', 'blocking')
+
+    @property
+    def keep_audio_engine_warm(self) -> bool:
+        """録音停止後もPortAudioを初期化したまま保持するか"""
+        return get_config_value(self._config, 'AUDIO', 'KEEP_ENGINE_WARM', False)
+
+    @property
+    def keep_audio_stream_warm(self) -> bool:
+        """録音停止後も入力ストリームを一時停止状態で開いたままにするか"""
+        return get_config_value(self._config, 'AUDIO', 'KEEP_STREAM_WARM', False)
+
+    @property
+    def preroll_seconds(self) -> float:
+        """待機中に保持して録音の先頭へ付加する音声の秒数。0で無効"""
+        return get_config_value(self._config, 'AUDIO', 'PREROLL_SECONDS', 0.0)
+
+    @property
+    def stream_to_disk(self) -> bool:
+        """録音中に音声を逐次WAVファイルへ書き込むか"""
+        return get_config_value(self._config, 'AUDIO', 'STREAM_TO_DISK', False)
+
     # --- PATHS ---
     @property
     def temp_dir(self) -> str:
@@ -38,6 +63,29 @@ class AppConfig:
     def cleanup_minutes(self) -> int:
         return get_config_value(self._config, 'PATHS', 'CLEANUP_MINUTES', 240)
 
+    @property
+    def transcription_cache_dir(self) -> str:
+        """文字起こしキャッシュの保存先。未設定時は一時フォルダと同じ階層に作成する"""
+        configured = get_config_value(self._config, 'PATHS', 'TRANSCRIPTION_CACHE_DIR', '')
+        return configured or self._temp_sibling_path('transcription_cache')
+
+    @property
+    def replacements_cache_file(self) -> str:
+        """構築済みの置換テーブルのキャッシュファイル。未設定時は一時フォルダと同じ階層に作成する"""
+        configured = get_config_value(self._config, 'PATHS', 'REPLACEMENTS_CACHE_FILE', '')
+        return configured or self._temp_sibling_path('replacements_cache.json')
+
+    @property
+    def retry_dir(self) -> str:
+        """再送信待ちの音声と履歴の保存先。未設定時は一時フォルダと同じ階層に作成する"""
+        configured = get_config_value(self._config, 'PATHS', 'RETRY_DIR', '')
+        return configured or self._temp_sibling_path('retry')
+
+    def _temp_sibling_path(self, name: str) -> str:
+        # 一時フォルダ内は保存期間を過ぎると削除されるため、同じ階層に置く
+        parent = os.path.dirname(os.path.normpath(self.temp_dir))
+        return os.path.join(parent, name)
+
     @property
     def replacements_file(self) -> str:
         """置換ルールファイルのパスを返す。未設定時はデフォルトパスを返す"""
@@ -62,6 +110,16 @@ class AppConfig:
     def paste_delay(self) -> float:
         return get_config_value(self._config, 'CLIPBOARD', 'PASTE_DELAY', 0.3)
 
+    @property
+    def replacements_reload_seconds(self) -> float:
+        """置換ルールファイルの変更を確認する間隔。0なら起動時に読み込んだルールを使い続ける"""
+        return get_config_value(self._config, 'CLIPBOARD', 'REPLACEMENTS_RELOAD_SECONDS', 0.0)
+
+    @property
+    def replacements_cache(self) -> bool:
+        """構築済みの置換テーブルをキャッシュファイルに保存し、起動時に再利用するか"""
+        return get_config_value(self._config, 'CLIPBOARD', 'REPLACEMENTS_CACHE', False)
+
     # --- ELEVENLABS ---
     @property
     def elevenlabs_model(self) -> str:
@@ -75,6 +133,168 @@ class AppConfig:
     def tag_audio_events(self) -> bool:
         return get_config_value(self._config, 'ELEVENLABS', 'TAG_AUDIO_EVENTS', False)
 
+    @property
+    def in_memory_upload(self) -> bool:
+        """WAVをメモリ上で組み立てて送信し、ファイル保存は並行して行うか"""
+        return get_config_value(self._config, 'ELEVENLABS', 'IN_MEMORY_UPLOAD', False)
+
+    @property
+    def upload_format(self) -> str:
+        """送信時の音声形式。wav: 無圧縮 / flac: 可逆圧縮(soundfileが必要)"""
+        return get_config_value(self._config, 'ELEVENLABS', 'UPLOAD_FORMAT', 'wav')
+
+    @property
+    def elevenlabs_base_url(self) -> str:
+        """音声認識APIの送信先。空ならElevenLabs、ローカルの代替サーバーを使う場合にそのURLを指定する"""
+        return get_config_value(self._config, 'ELEVENLABS', 'BASE_URL', '').strip()
+
+    @property
+    def circuit_breaker(self) -> bool:
+        """通信障害が続いた場合に送信を止めて即座に失敗させ、接続の回復を確認してから再開するか"""
+        return get_config_value(self._config, 'ELEVENLABS', 'CIRCUIT_BREAKER', False)
+
+    @property
+    def breaker_failure_threshold(self) -> int:
+        return get_config_value(self._config, 'ELEVENLABS', 'BREAKER_FAILURE_THRESHOLD', 3)
+
+    @property
+    def breaker_window_seconds(self) -> float:
+        return get_config_value(self._config, 'ELEVENLABS', 'BREAKER_WINDOW_SECONDS', 60.0)
+
+    @property
+    def breaker_reset_seconds(self) -> float:
+        return get_config_value(self._config, 'ELEVENLABS', 'BREAKER_RESET_SECONDS', 30.0)
+
+    @property
+    def hedge_enabled(self) -> bool:
+        """応答が遅いときに同じリクエストを追加送信し、先に返った応答を使うか"""
+        return get_config_value(self._config, 'ELEVENLABS', 'HEDGE_ENABLED', False)
+
+    @property
+    def hedge_percentile(self) -> float:
+        """追加送信までの待ち時間に使う直近の応答時間のパーセンタイル"""
+        return get_config_value(self._config, 'ELEVENLABS', 'HEDGE_PERCENTILE', 95.0)
+
+    @property
+    def hedge_min_samples(self) -> int:
+        return get_config_value(self._config, 'ELEVENLABS', 'HEDGE_MIN_SAMPLES', 20)
+
+    @property
+    def hedge_max_per_minute(self) -> int:
+        return get_config_value(self._config, 'ELEVENLABS', 'HEDGE_MAX_PER_MINUTE', 6)
+
+    @property
+    def hedge_min_delay_seconds(self) -> float:
+        return get_config_value(self._config, 'ELEVENLABS', 'HEDGE_MIN_DELAY_SECONDS', 1.0)
+
+    @property
+    def adaptive_timeout(self) -> bool:
+        """音声の長さと直近の処理速度からリクエストごとにタイムアウトを決めるか"""
+        return get_config_value(self._config, 'ELEVENLABS', 'ADAPTIVE_TIMEOUT', False)
+
+    @property
+    def timeout_min_seconds(self) -> float:
+        return get_config_value(self._config, 'ELEVENLABS', 'TIMEOUT_MIN_SECONDS', 10.0)
+
+    @property
+    def timeout_max_seconds(self) -> float:
+        return get_config_value(self._config, 'ELEVENLABS', 'TIMEOUT_MAX_SECONDS', 240.0)
+
+    @property
+    def timeout_margin(self) -> float:
+        """想定される処理時間に掛ける余裕の倍率"""
+        return get_config_value(self._config, 'ELEVENLABS', 'TIMEOUT_MARGIN', 3.0)
+
+    @property
+    def warmup_on_record(self) -> bool:
+        """録音開始時にAPIサーバーへの接続を事前に確立するか"""
+        return get_config_value(self._config, 'ELEVENLABS', 'WARMUP_ON_RECORD', False)
+
+    @property
+    def keepalive_seconds(self) -> float:
+        """待機中に接続を維持するための送信間隔。0で無効"""
+        return get_config_value(self._config, 'ELEVENLABS', 'KEEPALIVE_SECONDS', 0.0)
+
+    @property
+    def keepalive_expiry_seconds(self) -> float:
+        """使われていない接続をプールに保持する時間"""
+        return get_config_value(self._config, 'ELEVENLABS', 'KEEPALIVE_EXPIRY_SECONDS', 60.0)
+
+    # --- TRANSCRIPTION ---
+    @property
+    def transcription_workers(self) -> int:
+        """同時に処理する文字起こしジョブ数"""
+        return get_config_value(self._config, 'TRANSCRIPTION', 'WORKERS', 2)
+
+    @property
+    def max_pending_jobs(self) -> int:
+        """受け付ける文字起こしジョブの上限(処理中を含む)"""
+        return get_config_value(self._config, 'TRANSCRIPTION', 'MAX_PENDING', 4)
+
+    @property
+    def transcription_engine(self) -> str:
+        """文字起こしジョブの実行方式(threads: ワーカースレッド / asyncio: イベントループ)"""
+        return get_config_value(self._config, 'TRANSCRIPTION', 'ENGINE', 'threads').strip().lower()
+
+    @property
+    def job_timeout_seconds(self) -> float:
+        """asyncio方式で1件の文字起こしを打ち切るまでの秒数(0で無制限)"""
+        return get_config_value(self._config, 'TRANSCRIPTION', 'JOB_TIMEOUT_SECONDS', 300.0)
+
+    @property
+    def cache_enabled(self) -> bool:
+        """同じ音声と設定の文字起こし結果を再利用するか"""
+        return get_config_value(self._config, 'TRANSCRIPTION', 'CACHE_ENABLED', False)
+
+    @property
+    def cache_max_entries(self) -> int:
+        return get_config_value(self._config, 'TRANSCRIPTION', 'CACHE_MAX_ENTRIES', 1000)
+
+    @property
+    def cache_max_mb(self) -> int:
+        return get_config_value(self._config, 'TRANSCRIPTION', 'CACHE_MAX_MB', 20)
+
+    @property
+    def retry_enabled(self) -> bool:
+        """通信障害で失敗した文字起こしを保存し、接続回復後に自動で再送信するか"""
+        return get_config_value(self._config, 'TRANSCRIPTION', 'RETRY_ENABLED', False)
+
+    @property
+    def retry_base_seconds(self) -> float:
+        return get_config_value(self._config, 'TRANSCRIPTION', 'RETRY_BASE_SECONDS', 5.0)
+
+    @property
+    def retry_max_seconds(self) -> float:
+        return get_config_value(self._config, 'TRANSCRIPTION', 'RETRY_MAX_SECONDS', 300.0)
+
+    @property
+    def retry_max_attempts(self) -> int:
+        return get_config_value(self._config, 'TRANSCRIPTION', 'RETRY_MAX_ATTEMPTS', 50)
+
+    # --- OFFLINE ---
+    @property
+    def offline_enabled(self) -> bool:
+        """APIに接続できない場合にCPUで動くローカルの音声認識で文字起こしするか"""
+        return get_config_value(self._config, 'OFFLINE', 'ENABLED', False)
+
+    @property
+    def offline_model(self) -> str:
+        """faster-whisperのモデル名またはモデルを置いたフォルダ"""
+        return get_config_value(self._config, 'OFFLINE', 'MODEL', 'small')
+
+    @property
+    def offline_compute_type(self) -> str:
+        return get_config_value(self._config, 'OFFLINE', 'COMPUTE_TYPE', 'int8')
+
+    @property
+    def offline_cpu_threads(self) -> int:
+        """推論に使うスレッド数。0ならCPUのコア数に合わせる"""
+        return get_config_value(self._config, 'OFFLINE', 'CPU_THREADS', 0)
+
+    @property
+    def offline_language(self) -> str:
+        return get_config_value(self._config, 'OFFLINE', 'LANGUAGE', 'ja')
+
     # --- FORMATTING ---
     @property
     def use_punctuation(self) -> bool:
@@ -92,6 +312,16 @@ class AppConfig:
     def use_comma(self, value: bool) -> None:
         self._config['FORMATTING']['USE_COMMA'] = str(value)
 
+    @property
+    def normalize_width(self) -> bool:
+        """全角の英数字を半角にするか"""
+        return get_config_value(self._config, 'FORMATTING', 'NORMALIZE_WIDTH', False)
+
+    @property
+    def normalize_numerals(self) -> bool:
+        """漢数字をアラビア数字に変換するか。辞書に数字ごとのルールを並べる代わりに使う"""
+        return get_config_value(self._config, 'FORMATTING', 'NORMALIZE_NUMERALS', True)
+
     # --- KEYS ---
     @property
     def toggle_recording_key(self) -> str:
@@ -114,6 +344,64 @@ class AppConfig:
     def auto_stop_timer(self) -> int:
         return get_config_value(self._config, 'RECORDING', 'AUTO_STOP_TIMER', 60)
 
+    @property
+    def endpoint_silence_ms(self) -> int:
+        """発話後の無音がこの長さ続いたら自動停止する。0で無効"""
+        return get_config_value(self._config, 'RECORDING', 'ENDPOINT_SILENCE_MS', 0)
+
+    @property
+    def endpoint_min_speech_ms(self) -> int:
+        """自動停止の判定を始めるまでに必要な発話の長さ"""
+        return get_config_value(self._config, 'RECORDING', 'ENDPOINT_MIN_SPEECH_MS', 300)
+
+    @property
+    def segment_transcription(self) -> bool:
+        """録音中に無音位置で区切った区間を逐次文字起こしするか"""
+        return get_config_value(self._config, 'RECORDING', 'SEGMENT_TRANSCRIPTION', False)
+
+    @property
+    def segment_silence_ms(self) -> int:
+        """区間を区切るのに必要な無音の長さ"""
+        return get_config_value(self._config, 'RECORDING', 'SEGMENT_SILENCE_MS', 700)
+
+    @property
+    def segment_min_ms(self) -> int:
+        """区切る前に必要な区間の最小長。短い区間への分割による認識精度の低下を防ぐ"""
+        return get_config_value(self._config, 'RECORDING', 'SEGMENT_MIN_MS', 4000)
+
+    @property
+    def segment_max_workers(self) -> int:
+        return get_config_value(self._config, 'RECORDING', 'SEGMENT_MAX_WORKERS', 3)
+
+    # --- VAD ---
+    @property
+    def vad_enabled(self) -> bool:
+        return get_config_value(self._config, 'VAD', 'ENABLED', False)
+
+    @property
+    def vad_threshold_db(self) -> float:
+        """発話とみなすフレームエネルギーの閾値(dBFS)"""
+        return get_config_value(self._config, 'VAD', 'THRESHOLD_DB', -45.0)
+
+    @property
+    def vad_frame_ms(self) -> int:
+        return get_config_value(self._config, 'VAD', 'FRAME_MS', 20)
+
+    @property
+    def vad_padding_ms(self) -> int:
+        """発話区間の前後に残す余白"""
+        return get_config_value(self._config, 'VAD', 'PADDING_MS', 300)
+
+    @property
+    def vad_min_speech_ms(self) -> int:
+        """これより短い音(キーのクリック音など)は発話とみなさない"""
+        return get_config_value(self._config, 'VAD', 'MIN_SPEECH_MS', 60)
+
+    @property
+    def vad_max_pause_ms(self) -> int:
+        """発話間の無音をこの長さまで短縮する。0で短縮しない"""
+        return get_config_value(self._config, 'VAD', 'MAX_PAUSE_MS', 0)
+
     # --- WINDOW ---
     @property
     def window_width(self) -> int: